@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState, useCallback } from "react";
+import { useEffect, useRef, useState, useCallback } from "react";
 import {
   Card,
   CardContent,
@@ -30,7 +30,7 @@ import { PageHeader } from "@/components/page-header";
 import { PageLoading } from "@/components/loading";
 import { TableRowsSkeleton } from "@/components/skeleton";
 import { EmptyStateRow } from "@/components/empty-state";
-import { analyticsApi } from "@/lib/api";
+import { analyticsApi, SurveyInsightsResult } from "@/lib/api";
 import { toast } from "sonner";
 import {
   TrendingUp,
@@ -44,6 +44,7 @@ import {
   Loader2,
   Lightbulb,
   Inbox,
+  AlertCircle,
 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { formatCourseYearLabel } from "@/lib/utils";
@@ -65,11 +66,8 @@ interface ProgramDetail {
   unemployed: number;
 }
 
-interface SurveyInsights {
-  summary: string;
-  themes: { title: string; description: string }[];
-  recommendations: string[];
-}
+// AI tahlil fon job'ida bajariladi — `status=running` bo'lsa shu oraliqda so'raladi.
+const INSIGHTS_POLL_MS = 3000;
 
 export default function AnalyticsPage() {
   const [data, setData] = useState<CourseYearData[]>([]);
@@ -80,9 +78,9 @@ export default function AnalyticsPage() {
   const [loadingDetails, setLoadingDetails] = useState(false);
 
   // AI xulosa state
-  const [insights, setInsights] = useState<SurveyInsights | null>(null);
+  const [insights, setInsights] = useState<SurveyInsightsResult | null>(null);
   const [insightsLoading, setInsightsLoading] = useState(false);
-  const [insightsRequested, setInsightsRequested] = useState(false);
+  const unmounted = useRef(false);
 
   // Filter state
   const [academicYears, setAcademicYears] = useState<string[]>([]);
@@ -169,33 +167,72 @@ export default function AnalyticsPage() {
     }
   };
 
+  // Saqlangan natijani `status` running'dan chiqquncha qayta o'qiydi.
+  const waitForInsights = useCallback(async (initial: SurveyInsightsResult) => {
+    let current = initial;
+    setInsights(current);
+    if (current.status !== "running") return current;
+    setInsightsLoading(true);
+    try {
+      while (current.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, INSIGHTS_POLL_MS));
+        if (unmounted.current) return current;
+        const response = await analyticsApi.getSurveyInsights();
+        if (response.error || !response.data) {
+          toast.error("AI tahlil holatini olib bo'lmadi.");
+          return current;
+        }
+        current = response.data;
+        setInsights(current);
+      }
+      if (current.status === "failed") {
+        toast.error(current.last_error || "AI tahlil xatolik bilan tugadi.");
+      }
+      return current;
+    } finally {
+      if (!unmounted.current) setInsightsLoading(false);
+    }
+  }, []);
+
+  // Saqlangan AI tahlili sahifa ochilganda ko'rsatiladi (AI chaqirilmaydi).
+  useEffect(() => {
+    unmounted.current = false;
+    analyticsApi
+      .getSurveyInsights()
+      .then((response) => {
+        if (response.data) waitForInsights(response.data);
+      })
+      .catch((err) => console.error(err));
+    return () => {
+      unmounted.current = true;
+    };
+  }, [waitForInsights]);
+
   const handleGenerateInsights = async () => {
     setInsightsLoading(true);
-    setInsightsRequested(true);
     try {
-      const response = await analyticsApi.surveyInsights();
-      if (response.error || response.data?.error) {
+      const response = await analyticsApi.refreshSurveyInsights();
+      if (response.error || !response.data) {
         toast.error(
-          response.data?.error ||
-            (Array.isArray(response.error?.message)
-              ? response.error?.message.join(", ")
-              : response.error?.message) ||
-            "AI tahlilni yuklab bo'lmadi.",
+          (Array.isArray(response.error?.message)
+            ? response.error?.message.join(", ")
+            : response.error?.message) || "AI tahlilni yuklab bo'lmadi.",
         );
         return;
       }
-      if (response.data) {
-        setInsights({
-          summary: response.data.summary,
-          themes: response.data.themes || [],
-          recommendations: response.data.recommendations || [],
-        });
+      if (!response.data.queued) {
+        toast.info(
+          response.data.pending
+            ? "Yangi takliflar hali kam — saqlangan tahlil ko'rsatilmoqda."
+            : "Yangi takliflar yo'q — saqlangan tahlil ko'rsatilmoqda.",
+        );
       }
+      await waitForInsights(response.data);
     } catch (err) {
       console.error(err);
       toast.error("AI tahlilni yuklab bo'lmadi. Iltimos, qayta urinib ko'ring.");
     } finally {
-      setInsightsLoading(false);
+      if (!unmounted.current) setInsightsLoading(false);
     }
   };
 
@@ -543,14 +580,32 @@ export default function AnalyticsPage() {
                 AI takliflarni tahlil qilmoqda...
               </p>
             </div>
-          ) : !insights ? (
-            <p className="py-8 text-center text-sm text-muted-foreground">
-              {insightsRequested
-                ? "Tahlil natijasi mavjud emas."
-                : "Talabalar takliflari asosida AI tahlilni boshlash uchun yuqoridagi tugmani bosing."}
-            </p>
+          ) : !insights?.computed_at ? (
+            <div className="space-y-3 py-8 text-center">
+              {insights?.status === "failed" && insights.last_error ? (
+                <p className="flex items-center justify-center gap-1.5 text-sm text-destructive">
+                  <AlertCircle className="h-4 w-4" />
+                  {insights.last_error}
+                </p>
+              ) : null}
+              <p className="text-sm text-muted-foreground">
+                Talabalar takliflari asosida AI tahlilni boshlash uchun yuqoridagi tugmani bosing.
+              </p>
+            </div>
           ) : (
             <div className="space-y-8">
+              {insights.status === "failed" && insights.last_error ? (
+                <div className="flex items-start gap-2 rounded-md bg-destructive/5 px-3 py-2 text-xs text-destructive">
+                  <AlertCircle className="mt-0.5 h-3.5 w-3.5 shrink-0" />
+                  <span>
+                    Oxirgi yangilash muvaffaqiyatsiz: {insights.last_error}. Quyida avvalgi natija.
+                  </span>
+                </div>
+              ) : null}
+              <p className="font-mono text-[10px] uppercase tracking-wider text-muted-foreground">
+                {new Date(insights.computed_at).toLocaleString()} · {insights.analysed} ta taklif tahlil qilingan
+                {insights.pending ? ` · ${insights.pending} ta yangi kutmoqda` : ""}
+              </p>
               {/* Umumiy xulosa */}
               <div className="space-y-2">
                 <p className="font-mono text-[10px] font-medium uppercase tracking-[0.18em] text-muted-foreground">
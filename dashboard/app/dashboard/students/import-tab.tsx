@@ -1,15 +1,16 @@
 "use client";
 
-import { useCallback, useRef, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { Upload, FileSpreadsheet, CheckCircle2, XCircle, AlertCircle, Check, Info } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
 import { toast } from "sonner";
-import { rosterApi, RosterImportResult } from "@/lib/api";
+import { rosterApi, RosterImportError, RosterImportJob } from "@/lib/api";
 
-type ImportResult = RosterImportResult;
+// Fayl import'i fon job'ida bajariladi — holat shu oraliqda so'raladi.
+const POLL_INTERVAL_MS = 1500;
 
 const RULES = [
   "Birinchi qator — ustun nomlari; har bir keyingi qator — bitta talaba.",
@@ -32,8 +33,14 @@ export function ImportTab() {
   const [file, setFile] = useState<File | null>(null);
   const [dragging, setDragging] = useState(false);
   const [loading, setLoading] = useState(false);
-  const [result, setResult] = useState<ImportResult | null>(null);
+  const [job, setJob] = useState<RosterImportJob | null>(null);
+  const [errors, setErrors] = useState<RosterImportError[]>([]);
+  const [errorsPage, setErrorsPage] = useState(1);
+  const [hasMoreErrors, setHasMoreErrors] = useState(false);
   const inputRef = useRef<HTMLInputElement>(null);
+  const unmounted = useRef(false);
+
+  useEffect(() => () => { unmounted.current = true; }, []);
 
   const handleFile = (f: File) => {
     if (!f.name.match(/\.(xlsx|xls|csv)$/i)) {
@@ -41,7 +48,8 @@ export function ImportTab() {
       return;
     }
     setFile(f);
-    setResult(null);
+    setJob(null);
+    setErrors([]);
   };
 
   const onDrop = useCallback((e: React.DragEvent) => {
@@ -51,10 +59,18 @@ export function ImportTab() {
     if (f) handleFile(f);
   }, []);
 
+  const showErrors = (data: RosterImportJob, page: number) => {
+    const rows = data.errors?.results ?? [];
+    setErrors((prev) => (page === 1 ? rows : [...prev, ...rows]));
+    setErrorsPage(page);
+    setHasMoreErrors(Boolean(data.errors?.next));
+  };
+
   const onImport = async () => {
     if (!file) return;
     setLoading(true);
-    setResult(null);
+    setJob(null);
+    setErrors([]);
 
     try {
       const res = await rosterApi.import(file);
@@ -65,27 +81,56 @@ export function ImportTab() {
         toast.error(message || "Import xatosi");
         return;
       }
-      const data = res.data;
-      if (!data) {
+      if (!res.data) {
         toast.error("Import xatosi");
         return;
       }
-      setResult(data);
-      if (data.errors?.length === 0) {
+      let current: RosterImportJob = res.data;
+      setJob(current);
+      // Job tugaguncha holatni so'raymiz (navbat → bajarilmoqda → tayyor/xatolik).
+      while (current.status === "queued" || current.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+        if (unmounted.current) return;
+        const poll = await rosterApi.getImportJob(current.id);
+        if (poll.error || !poll.data) {
+          toast.error("Import holatini olib bo'lmadi");
+          return;
+        }
+        current = poll.data;
+        setJob(current);
+      }
+      if (current.status === "failed") {
+        toast.error(current.last_error || "Import xatosi");
+        return;
+      }
+      showErrors(current, 1);
+      if (current.error_count === 0) {
         toast.success(
-          `✓ Import yakunlandi: ${data.created} yangi, ${data.updated} yangilandi` +
-          (data.skipped ? `, ${data.skipped} o'tkazib yuborildi` : ""),
+          `✓ Import yakunlandi: ${current.created} yangi, ${current.updated} yangilandi` +
+          (current.skipped ? `, ${current.skipped} o'tkazib yuborildi` : ""),
         );
       } else {
-        toast.warning(`Import yakunlandi, lekin ${data.errors.length} ta xato bor`);
+        toast.warning(`Import yakunlandi, lekin ${current.error_count} ta xato bor`);
       }
     } catch {
       toast.error("Server bilan bog'lanishda xatolik");
     } finally {
-      setLoading(false);
+      if (!unmounted.current) setLoading(false);
+    }
+  };
+
+  const loadMoreErrors = async () => {
+    if (!job) return;
+    const res = await rosterApi.getImportJob(job.id, errorsPage + 1);
+    if (res.error || !res.data) {
+      toast.error("Xatolarni olib bo'lmadi");
+      return;
     }
+    showErrors(res.data, errorsPage + 1);
   };
 
+  const result = job && job.status === "done" ? job : null;
+
   return (
     <div className="mx-auto max-w-2xl space-y-8">
       {/* Upload — asosiy amal */}
@@ -131,7 +176,11 @@ export function ImportTab() {
 
         <Button onClick={onImport} disabled={!file || loading} size="lg" className="w-full">
           <Upload className="mr-2 h-4 w-4" />
-          {loading ? "Yuklanmoqda..." : "Import qilish"}
+          {loading
+            ? job && job.status !== "queued"
+              ? `Bajarilmoqda... ${job.progress ?? 0}%`
+              : "Yuklanmoqda..."
+            : "Import qilish"}
         </Button>
       </section>
 
@@ -140,7 +189,7 @@ export function ImportTab() {
         <Card>
           <CardHeader className="pb-3">
             <div className="flex items-center gap-2">
-              {result.errors.length === 0 ? (
+              {result.error_count === 0 ? (
                 <CheckCircle2 className="h-5 w-5 text-success" />
               ) : (
                 <AlertCircle className="h-5 w-5 text-warning" />
@@ -150,7 +199,7 @@ export function ImportTab() {
           </CardHeader>
           <CardContent className="space-y-5">
             {/* Reestr-uslubidagi statistika */}
-            <div className={`grid ${result.skipped ? "grid-cols-4" : "grid-cols-3"} overflow-hidden rounded-md border border-border`}>
+            <div className={`grid ${result.skipped ? "grid-cols-5" : "grid-cols-4"} overflow-hidden rounded-md border border-border`}>
               <div className="px-4 py-3 text-center">
                 <p className="font-mono text-2xl font-semibold tabular-nums text-success">
                   {result.created}
@@ -161,6 +210,10 @@ export function ImportTab() {
                 <p className="font-mono text-2xl font-semibold tabular-nums text-foreground">{result.updated}</p>
                 <p className="mt-0.5 font-mono text-[10px] uppercase tracking-wider text-muted-foreground">Yangilandi</p>
               </div>
+              <div className="border-l border-border px-4 py-3 text-center">
+                <p className="font-mono text-2xl font-semibold tabular-nums text-muted-foreground">{result.unchanged}</p>
+                <p className="mt-0.5 font-mono text-[10px] uppercase tracking-wider text-muted-foreground">O&apos;zgarmadi</p>
+              </div>
               {result.skipped ? (
                 <div className="border-l border-border px-4 py-3 text-center">
                   <p className="font-mono text-2xl font-semibold tabular-nums text-muted-foreground">{result.skipped}</p>
@@ -170,78 +223,42 @@ export function ImportTab() {
               <div className="border-l border-border px-4 py-3 text-center">
                 <p
                   className={`font-mono text-2xl font-semibold tabular-nums ${
-                    result.errors.length ? "text-destructive" : "text-muted-foreground"
+                    result.error_count ? "text-destructive" : "text-muted-foreground"
                   }`}
                 >
-                  {result.errors.length}
+                  {result.error_count}
                 </p>
                 <p className="mt-0.5 font-mono text-[10px] uppercase tracking-wider text-muted-foreground">Xato</p>
               </div>
             </div>
 
-            {/* Import qilingan talabalar */}
-            {result.students.length > 0 && (
-              <div className="space-y-1.5">
-                <p className="font-mono text-[11px] font-medium uppercase tracking-wider text-muted-foreground">
-                  Import qilingan talabalar
-                </p>
-                <div className="max-h-72 overflow-y-auto rounded-md border border-border">
-                  <Table>
-                    <TableHeader>
-                      <TableRow>
-                        <TableHead>ID</TableHead>
-                        <TableHead>Ism familya</TableHead>
-                        <TableHead>Dastur</TableHead>
-                        <TableHead className="text-center">Kurs</TableHead>
-                        <TableHead className="text-center">Holat</TableHead>
-                      </TableRow>
-                    </TableHeader>
-                    <TableBody>
-                      {result.students.map((s) => (
-                        <TableRow key={s.row}>
-                          <TableCell className="font-mono text-xs">{s.student_external_id}</TableCell>
-                          <TableCell className="text-sm">
-                            {[s.first_name, s.last_name].filter(Boolean).join(" ") || "—"}
-                          </TableCell>
-                          <TableCell className="text-sm">{s.program || "—"}</TableCell>
-                          <TableCell className="text-center font-mono text-sm tabular-nums">
-                            {s.course_year ?? "—"}
-                          </TableCell>
-                          <TableCell className="text-center">
-                            <Badge
-                              variant={s.status === "created" ? "default" : "secondary"}
-                              className="px-1.5 py-0 text-[10px]"
-                            >
-                              {s.status === "created" ? "Yangi" : "Yangilandi"}
-                            </Badge>
-                          </TableCell>
-                        </TableRow>
-                      ))}
-                    </TableBody>
-                  </Table>
-                </div>
-              </div>
-            )}
-
             {/* Xatolar */}
-            {result.errors.length > 0 && (
+            {errors.length > 0 && (
               <div className="space-y-1.5">
                 <p className="font-mono text-[11px] font-medium uppercase tracking-wider text-muted-foreground">
                   Xatolar
                 </p>
                 <div className="max-h-48 space-y-1 overflow-y-auto">
-                  {result.errors.map((e) => (
-                    <div key={e.row} className="flex items-start gap-2 rounded-md bg-destructive/5 px-3 py-2">
+                  {errors.map((e, idx) => (
+                    <div key={`${e.row}-${idx}`} className="flex items-start gap-2 rounded-md bg-destructive/5 px-3 py-2">
                       <XCircle className="mt-0.5 h-3.5 w-3.5 shrink-0 text-destructive" />
                       <span className="text-xs">
                         <Badge variant="outline" className="mr-1.5 px-1 py-0 font-mono text-[10px]">
                           {e.row}-qator
                         </Badge>
+                        {e.student_external_id ? (
+                          <span className="mr-1.5 font-mono text-[11px]">{e.student_external_id}</span>
+                        ) : null}
                         {e.error}
                       </span>
                     </div>
                   ))}
                 </div>
+                {hasMoreErrors && (
+                  <Button variant="outline" size="sm" className="w-full" onClick={loadMoreErrors}>
+                    Yana xatolarni ko&apos;rsatish ({errors.length} / {result.error_count})
+                  </Button>
+                )}
               </div>
             )}
           </CardContent>
@@ -565,34 +565,46 @@ export const catalogApi = {
 };
 
 // Roster import
-export interface RosterImportedStudent {
+export interface RosterImportError {
   row: number;
   student_external_id: string;
-  first_name: string;
-  last_name: string;
-  course_year: number | null;
-  program: string | null;
-  status: "created" | "updated";
+  error: string;
 }
 
-export interface RosterImportResult {
+/**
+ * Fayl import'i RosterImportJob sifatida navbatga qo'yiladi: POST 202 bilan job
+ * holatini qaytaradi, natija `GET /admin/roster/import/<id>` dan o'qiladi.
+ */
+export interface RosterImportJob {
+  id: string;
+  status: "queued" | "running" | "done" | "failed";
+  original_filename: string;
+  total_rows: number | null;
+  processed_rows: number;
+  progress: number | null;
   created: number;
   updated: number;
+  unchanged: number;
+  deactivated: number;
   /** ID'siz o'tkazib yuborilgan qatorlar (statistika jadvali qoldiqlari, bo'sh qatorlar). */
-  skipped?: number;
-  errors: { row: number; error: string }[];
-  students: RosterImportedStudent[];
+  skipped: number;
+  error_count: number;
+  last_error: string;
+  /** Faqat GET javobida: qator xatolari, sahifalangan (`?page=`). */
+  errors?: PaginatedResponse<RosterImportError>;
 }
 
 export const rosterApi = {
   import: (file: File) => {
     const form = new FormData();
     form.append("file", file);
-    return apiFetch<RosterImportResult>("/api/v1/admin/roster/import", {
+    return apiFetch<RosterImportJob>("/api/v1/admin/roster/import", {
       method: "POST",
       body: form,
     });
   },
+  getImportJob: (id: string, page = 1) =>
+    apiFetch<RosterImportJob>(`/api/v1/admin/roster/import/${id}?page=${page}`),
 };
 
 // Bot2 API
@@ -786,15 +798,29 @@ export const analyticsApi = {
       }>;
     }>(`/api/v1/analytics/bot2/enrollments-overview?${_analyticsParams(opts)}`),
 
-  surveyInsights: () =>
-    apiFetch<{
-      summary: string;
-      themes: { title: string; description: string }[];
-      recommendations: string[];
-      error?: string;
-    }>(`/api/v1/analytics/survey-insights`, { method: "POST" }),
+  /** Saqlangan AI tahlili (AI chaqirilmaydi). */
+  getSurveyInsights: () =>
+    apiFetch<SurveyInsightsResult>(`/api/v1/analytics/survey-insights`),
+
+  /** Fon yangilashini navbatga qo'yadi (202); natija `getSurveyInsights` bilan kutiladi. */
+  refreshSurveyInsights: () =>
+    apiFetch<SurveyInsightsResult & { queued: boolean }>(`/api/v1/analytics/survey-insights`, {
+      method: "POST",
+    }),
 };
 
+export interface SurveyInsightsResult {
+  campaign: string;
+  summary: string;
+  themes: { title: string; description: string; count?: number }[];
+  recommendations: string[];
+  computed_at: string | null;
+  status: "idle" | "running" | "failed";
+  last_error: string;
+  analysed: number;
+  pending: number;
+}
+
 // ── AI xarajat kuzatuvi (Gemini) ──────────────────────────────────────────────
 
 export interface AIUsageSummary {
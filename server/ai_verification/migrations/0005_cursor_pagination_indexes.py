@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_verification', '0004_alter_documentverification_document_type_and_more'),
+        ('bot2', '0024_survey_doc_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='documentverification',
+            name='ai_verifica_created_2266c2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['created_at', 'id'], name='ai_verifica_created_b41cea_idx'),
+        ),
+    ]
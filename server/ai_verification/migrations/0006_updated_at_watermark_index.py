@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_verification', '0005_cursor_pagination_indexes'),
+        ('bot2', '0030_updated_at_watermark_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['updated_at'], name='ai_verifica_updated_b23e5a_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
 
 from common.models import BaseModel
 
@@ -102,12 +102,64 @@ class DocumentVerification(BaseModel):
             models.Index(fields=["status"]),
             models.Index(fields=["confidence_level"]),
             models.Index(fields=["final_decision"]),
-            models.Index(fields=["-created_at"]),
+            # Default tartib + ?cursor= keyset sahifalash (created_at, id).
+            models.Index(fields=["created_at", "id"]),
+            # /surveys ro'yxati ETag'idagi Max(updated_at) watermark'i.
+            models.Index(fields=["updated_at"]),
         ]
 
     def __str__(self):
         return f"{self.student} | {self.document_type} | {self.status}"
 
+    # Bot2SurveyResponse.doc_status shu maydonlarga bog'liq.
+    _DOC_STATUS_FIELDS = ("student_id", "source_document_id", "document_type", "final_decision")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(f in loaded for f in cls._DOC_STATUS_FIELDS):
+            instance._doc_status_state = tuple(loaded[f] for f in cls._DOC_STATUS_FIELDS)
+        if all(f in loaded for f in ("confidence_level", "final_decision", "status")):
+            from analytics.rollups import verification_cell
+            instance._stats_cell = verification_cell(instance)
+        return instance
+
+    def _current_doc_status_state(self) -> tuple:
+        return tuple(getattr(self, f) for f in self._DOC_STATUS_FIELDS)
+
+    def save(self, *args, **kwargs):
+        from analytics.rollups import record_verification_cell, verification_cell
+        from bot2.services import refresh_verification_doc_status
+
+        adding = self._state.adding
+        # Qator, survey doc_status va verification_stats hisoblagichlari — bitta tranzaksiyada.
+        with transaction.atomic():
+            result = super().save(*args, **kwargs)
+            old = getattr(self, "_doc_status_state", None)
+            new = self._current_doc_status_state()
+            if old != new:
+                refresh_verification_doc_status(*{state[:2] for state in (old, new) if state})
+            # Yuklanmagan (from_db'siz) mavjud qatorning eski katagi noma'lum — faqat yangi qator.
+            cell = verification_cell(self)
+            if adding or hasattr(self, "_stats_cell"):
+                record_verification_cell(None if adding else self._stats_cell, cell)
+        self._doc_status_state = new
+        self._stats_cell = cell
+        return result
+
+    def delete(self, *args, **kwargs):
+        from analytics.rollups import record_verification_cell, verification_cell
+        from bot2.services import refresh_verification_doc_status
+
+        state = self._current_doc_status_state()
+        cell = getattr(self, "_stats_cell", None) or verification_cell(self)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_verification_doc_status(state[:2])
+            record_verification_cell(cell, None)
+        return result
+
     @property
     def confidence_color(self):
         """Dashboard uchun rang kodi."""
@@ -11,6 +11,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from analytics.rollups import VERIFICATION_COUNTER_PREFIX, read_counters
+from bot2.search import StudentSearchFilter
 from common.permissions import IsAdminUserRole
 from common.exceptions import APIError
 from .models import DocumentVerification, AIUsageLog
@@ -260,16 +262,20 @@ class DocumentVerificationListView(generics.ListAPIView):
         &document_type=cv|ielts|certificate|diploma|other
         &search=<talaba ismi/ID>
         &ordering=-created_at
+        &cursor=                  (keyset sahifalash: COUNT/OFFSET'siz, faqat next)
+        &count_mode=exact|cached|estimate|auto
     """
     permission_classes = [IsAuthenticated, IsAdminUserRole]
     serializer_class = DocumentVerificationSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, filters.OrderingFilter]
     filterset_fields = ["confidence_level", "final_decision", "status", "document_type"]
-    search_fields = [
-        "student__first_name", "student__last_name", "student__student_external_id",
-    ]
+    # Talaba qidiruv hujjati bo'yicha (bot2.search) — trigram indeksli bitta ustun.
+    search_document_field = "student__search_document"
     ordering_fields = ["created_at", "confidence_score", "processed_at"]
     ordering = ["-created_at"]
+    cursor_ordering = "-created_at"
+    cursor_ordering_fields = ["created_at"]
+    count_mode = "auto"
 
     def get_queryset(self):
         return DocumentVerification.objects.select_related(
@@ -282,16 +288,15 @@ class DocumentVerificationListView(generics.ListAPIView):
 def verification_stats(request):
     """3-toifa va qaror bo'yicha sanoq (kartalar uchun, butun ma'lumot bo'ylab).
 
+    Jonli hisoblagichlardan (analytics.StatCounter; DocumentVerification.save/delete
+    yangilaydi) — GROUP BY'siz bitta kichik o'qish.
+
     GET /api/v1/ai-verification/stats
     """
-    qs = DocumentVerification.objects.all()
-
-    def _counts(field):
-        return {row[field]: row["n"] for row in qs.values(field).annotate(n=Count("id"))}
-
-    conf = _counts("confidence_level")
-    dec = _counts("final_decision")
-    st = _counts("status")
+    counts = read_counters(VERIFICATION_COUNTER_PREFIX)
+    conf = {key.removeprefix("confidence."): n for key, n in counts.items() if key.startswith("confidence.")}
+    dec = {key.removeprefix("decision."): n for key, n in counts.items() if key.startswith("decision.")}
+    st = {key.removeprefix("status."): n for key, n in counts.items() if key.startswith("status.")}
 
     # Umumiy son holat bo'yicha sanoqlar yig'indisiga teng — qo'shimcha COUNT shart emas.
     total = sum(st.values())
@@ -302,7 +307,7 @@ def verification_stats(request):
             "green": conf.get("green", 0),
             "yellow": conf.get("yellow", 0),
             "red": conf.get("red", 0),
-            "none": conf.get(None, 0),
+            "none": conf.get("none", 0),
         },
         "by_decision": {
             "pending": dec.get("pending", 0),
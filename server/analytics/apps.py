@@ -5,3 +5,11 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "analytics"
     verbose_name = "Analytics"
+
+    def ready(self):
+        from django.core.signals import request_finished
+
+        from analytics.cache import flush_cache_stats
+
+        # Kesh hisoblagichlari javob yuborilgandan keyin yoziladi.
+        request_finished.connect(flush_cache_stats, dispatch_uid="analytics-cache-stats-flush")
@@ -0,0 +1,203 @@
+"""Versioned response cache for analytics endpoints.
+
+Key = (endpoint, normalized query params, data-version). Analytics inputs change
+only on survey submit, roster import/edit and enrollment edits; those write paths
+call `bump_data_version()`, so every cached entry is invalidated at once without
+scanning keys. Entries also expire after `ANALYTICS_CACHE_TTL` seconds, which
+bounds staleness for inputs that do not bump (catalog renames, bot registrations).
+
+Hit/miss/304 counters are kept per process and added to StatCounter rows
+(`analytics.cache.*`) at most every `CACHE_STATS_FLUSH_SECONDS`, after the
+response is sent (`request_finished`) — the request itself touches no shared
+state. `cache_stats()` is the stored totals plus this process's unflushed part.
+
+Responses also carry a strong ETag over the same key (`common.conditional`);
+a matching `If-None-Match` gets a 304 without touching the cache entry.
+
+With a read replica (`common.replica`) a request right after a bump could read
+pre-bump rows from the lagging replica and store them under the new version.
+The bump time is kept next to the version; within `REPLICA_PIN_SECONDS` of it a
+cache miss is computed on `default` instead.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from common.conditional import etag_matches, make_etag, normalized_params, not_modified, with_etag
+from common.replica import primary_reads, reading_from_replica
+
+DATA_VERSION_KEY = "analytics:data-version"
+DATA_BUMPED_AT_KEY = "analytics:data-version:bumped-at"
+CACHE_STATS_PREFIX = "analytics.cache."
+CACHE_STATS_FLUSH_SECONDS = 30
+HITS = "hits"
+MISSES = "misses"
+NOT_MODIFIED = "not_modified"
+
+logger = logging.getLogger(__name__)
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _fresh_version() -> int:
+    # Vaqtga asoslangan boshlang'ich qiymat: kesh tozalansa ham eski yozuvlar
+    # bilan to'qnashmaydi (oddiy 1 dan boshlash eski kalitlarni "tiriltirardi").
+    return time.time_ns()
+
+
+def data_version() -> int:
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        version = _fresh_version()
+        if not cache.add(DATA_VERSION_KEY, version, timeout=None):
+            version = cache.get(DATA_VERSION_KEY, version)
+    return version
+
+
+def _bump() -> None:
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, _fresh_version(), timeout=None)
+    cache.set(DATA_BUMPED_AT_KEY, time.time(), timeout=None)
+
+
+def bumped_recently() -> bool:
+    """The version changed less than `REPLICA_PIN_SECONDS` ago — a replica may
+    not have the new data yet."""
+    bumped_at = cache.get(DATA_BUMPED_AT_KEY)
+    return bumped_at is not None and time.time() - bumped_at < settings.REPLICA_PIN_SECONDS
+
+
+def bump_data_version() -> None:
+    """Invalidate every cached analytics response.
+
+    Bumps immediately and once more after the surrounding transaction commits:
+    a reader that recomputed from pre-commit data in between would otherwise
+    keep that stale payload under the new version.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def _count(name: str) -> None:
+    with _pending_lock:
+        _pending[name] += 1
+
+
+def flush_cache_stats(**kwargs) -> None:
+    """Add this process's pending counts to StatCounter if the last flush was
+    `CACHE_STATS_FLUSH_SECONDS` ago. Connected to `request_finished`."""
+    global _last_flush
+    with _pending_lock:
+        if not _pending or time.monotonic() - _last_flush < CACHE_STATS_FLUSH_SECONDS:
+            return
+        deltas = Counter({f"{CACHE_STATS_PREFIX}{name}": n for name, n in _pending.items()})
+        _pending.clear()
+        _last_flush = time.monotonic()
+
+    from analytics.rollups import bump_counters
+
+    try:
+        bump_counters(deltas)
+    except DatabaseError:
+        # Sanoq yo'qolmaydi — keyingi flush'da qayta urinadi.
+        logger.warning("analytics cache stats flush failed", exc_info=True)
+        with _pending_lock:
+            _pending.update({name[len(CACHE_STATS_PREFIX):]: n for name, n in deltas.items()})
+
+
+def reset_cache_stats() -> None:
+    """Drop this process's unflushed counts (tests)."""
+    with _pending_lock:
+        _pending.clear()
+
+
+def cache_stats() -> dict:
+    from analytics.rollups import read_counters
+
+    stored = Counter(read_counters(CACHE_STATS_PREFIX))
+    with _pending_lock:
+        stored.update(_pending)
+    hits, misses = stored[HITS], stored[MISSES]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "not_modified": stored[NOT_MODIFIED],
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "data_version": data_version(),
+    }
+
+
+def response_cache_key(endpoint: str, params) -> str:
+    """Key for `endpoint` + query params (order-insensitive) at the current version."""
+    # `format` (csv/xlsx eksport) bir xil ma'lumotdan hosil bo'ladi — kalitga kirmaydi.
+    normalized = normalized_params(params, exclude=("format",))
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    return f"analytics:resp:{endpoint}:{data_version()}:{digest}"
+
+
+def response_etag(key: str, request) -> str:
+    """ETag for the cache `key`, per export format and TTL window.
+
+    Inputs that do not bump the version (catalog renames) are bounded by the TTL
+    for cached payloads; the window term gives ETags the same bound.
+    """
+    window = int(time.time() // max(settings.ANALYTICS_CACHE_TTL, 1))
+    return make_etag(key, request.query_params.get("format", ""), window)
+
+
+def cached_response(endpoint: str):
+    """Cache successful `Response` payloads of a DRF function view and answer
+    conditional GETs (If-None-Match) with 304.
+
+    Goes below `@api_view`/`@permission_classes`, so auth and permissions run on
+    every request; only the computation is skipped.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = response_cache_key(endpoint, request.query_params)
+            etag = response_etag(key, request)
+            if etag_matches(request, etag):
+                _count(NOT_MODIFIED)
+                return not_modified(etag)
+
+            payload = cache.get(key)
+            if payload is not None:
+                _count(HITS)
+                response = with_etag(Response(payload), etag)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _count(MISSES)
+            if reading_from_replica() and bumped_recently():
+                # Replika hali eski bo'lishi mumkin — yangi versiya kaliti ostida
+                # saqlanadigan natija primary'dan hisoblanadi.
+                with primary_reads():
+                    response = view(request, *args, **kwargs)
+            else:
+                response = view(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, timeout=settings.ANALYTICS_CACHE_TTL)
+                with_etag(response, etag)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
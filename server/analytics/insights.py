@@ -0,0 +1,282 @@
+"""Incremental AI analysis of free-text survey suggestions (survey_insights).
+
+Every distinct suggestion is stored once per campaign as a `SurveyInsightItem`
+keyed by a fingerprint of its normalized text. A refresh sends only items that
+were never analysed to Gemini together with the current theme list; the model
+assigns them to existing themes or opens new ones, and the merged result is
+persisted on `SurveyInsight`. Reads never call the AI.
+
+Refreshes run in the background (`request_refresh` → shared AI thread-pool, or
+`manage.py refresh_survey_insights` from the scheduler) and re-analyse only once
+`SURVEY_INSIGHTS_MIN_NEW` new suggestions have accumulated.
+
+`ALL_CAMPAIGNS` is the insight over every campaign's suggestions together (the
+dashboard default, as before persistence); named campaigns are analysed alone.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from ai_verification.generation import generate_text
+from analytics.models import SurveyInsight, SurveyInsightItem
+from bot2.models import Bot2SurveyResponse
+
+logger = logging.getLogger(__name__)
+
+# Bitta AI chaqiruviga yuboriladigan yangi takliflar chegarasi.
+BATCH_SIZE = 200
+BATCH_CHARS = 12000
+MAX_BATCHES_PER_RUN = 5
+# Watermark'dan orqaga qayta ko'rish oynasi: kechikib commit bo'lgan javoblar
+# tushib qolmasin (fingerprint unique — qayta ko'rish takror yozmaydi).
+SCAN_OVERLAP = timedelta(minutes=10)
+# Shundan eski "running" holati osilib qolgan (o'lgan worker) deb hisoblanadi.
+STALE_RUN = timedelta(minutes=15)
+# Kampaniya bo'yicha ajratilmagan, barcha takliflar bo'yicha tahlil kaliti.
+ALL_CAMPAIGNS = "*"
+
+
+def suggestion_fingerprint(text: str) -> str:
+    """sha1 of the suggestion with case and whitespace normalized."""
+    normalized = " ".join((text or "").lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def collect_suggestions(campaign: str) -> int:
+    """Store suggestions submitted since the last scan as content-addressed items.
+
+    Returns the number of new distinct suggestions.
+    """
+    insight, _ = SurveyInsight.objects.get_or_create(campaign=campaign)
+    qs = Bot2SurveyResponse.objects.exclude(suggestions="").exclude(suggestions__isnull=True)
+    if campaign != ALL_CAMPAIGNS:
+        qs = qs.filter(survey_campaign=campaign)
+    if insight.scanned_until is not None:
+        qs = qs.filter(created_at__gte=insight.scanned_until - SCAN_OVERLAP)
+
+    scanned_until = insight.scanned_until
+    items = {}
+    for text, created_at in qs.values_list("suggestions", "created_at").iterator(chunk_size=2000):
+        text = text.strip()
+        if text:
+            items.setdefault(suggestion_fingerprint(text), text)
+        if scanned_until is None or created_at > scanned_until:
+            scanned_until = created_at
+
+    before = SurveyInsightItem.objects.filter(campaign=campaign).count()
+    SurveyInsightItem.objects.bulk_create(
+        [SurveyInsightItem(campaign=campaign, fingerprint=fp, text=text) for fp, text in items.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    SurveyInsight.objects.filter(pk=insight.pk).update(scanned_until=scanned_until)
+    return SurveyInsightItem.objects.filter(campaign=campaign).count() - before
+
+
+def pending_count(campaign: str) -> int:
+    return SurveyInsightItem.objects.filter(campaign=campaign, analysed_at__isnull=True).count()
+
+
+def _claim(campaign: str) -> bool:
+    """Mark the campaign's insight as running; False if another run holds it."""
+    stale = timezone.now() - STALE_RUN
+    with transaction.atomic():
+        insight = SurveyInsight.objects.select_for_update().get(campaign=campaign)
+        if insight.status == SurveyInsight.Status.RUNNING and insight.updated_at > stale:
+            return False
+        insight.status = SurveyInsight.Status.RUNNING
+        insight.save(update_fields=["status", "updated_at"])
+    return True
+
+
+def _next_batch(campaign: str) -> list[SurveyInsightItem]:
+    batch, total_len = [], 0
+    for item in SurveyInsightItem.objects.filter(campaign=campaign, analysed_at__isnull=True)[:BATCH_SIZE]:
+        if batch and total_len + len(item.text) > BATCH_CHARS:
+            break
+        batch.append(item)
+        total_len += len(item.text) + 1
+    return batch
+
+
+def _build_prompt(themes: list, batch: list[SurveyInsightItem]) -> str:
+    theme_block = "\n".join(
+        f"T{idx}. {t.get('title', '')} — {t.get('description', '')}" for idx, t in enumerate(themes, start=1)
+    ) or "(hozircha mavzu yo'q)"
+    feedback_block = "\n".join(f"{idx}. {item.text}" for idx, item in enumerate(batch, start=1))
+    return (
+        "Siz bandlik markazining tahlilchisisiz. Talabalar so'rovnomadagi erkin matnli "
+        "fikrlari allaqachon mavzularga ajratilgan (T-raqamli ro'yxat). Quyida YANGI "
+        "fikrlar raqamlangan ro'yxat ko'rinishida berilgan. Har bir yangi fikrni mos "
+        "mavjud mavzuga biriktiring yoki yangi mavzu oching va FAQAT o'zbek tilida JSON "
+        "qaytaring.\n\n"
+        "JSON tuzilishi:\n"
+        '{\n'
+        '  "themes": [{"previous": "T-raqam yoki null", "title": "qisqa mavzu nomi", '
+        '"description": "mavzu izohi", "items": [yangi fikr raqamlari]}],\n'
+        '  "summary": "barcha mavzular bo\'yicha 2-3 jumlalik umumiy xulosa (o\'zbekcha)",\n'
+        '  "recommendations": ["markaz uchun qisqa amaliy tavsiya", "..."]\n'
+        '}\n\n'
+        "Mavjud mavzularning HAMMASINI saqlang (previous maydonida T-raqami bilan), kerak "
+        "bo'lsa nomi/izohini aniqlashtiring.\n\n"
+        f"Mavjud mavzular:\n{theme_block}\n\n"
+        f"Yangi fikrlar:\n{feedback_block}"
+    )
+
+
+def _previous_index(value, old_count: int):
+    """'T3' / 3 / '3' → 0-based index into the old theme list, else None."""
+    if value is None:
+        return None
+    try:
+        idx = int(str(value).strip().lstrip("Tt")) - 1
+    except ValueError:
+        return None
+    return idx if 0 <= idx < old_count else None
+
+
+def _merge(insight: SurveyInsight, batch: list[SurveyInsightItem], payload: dict) -> None:
+    """Apply one AI answer: re-map old theme indexes, assign the batch, recount."""
+    old_themes = list(insight.themes or [])
+    new_themes, old_to_new, assignments = [], {}, {}
+    for theme in payload.get("themes") or []:
+        if not isinstance(theme, dict):
+            continue
+        position = len(new_themes)
+        prev = _previous_index(theme.get("previous"), len(old_themes))
+        if prev is not None and prev not in old_to_new:
+            old_to_new[prev] = position
+        new_themes.append({
+            "title": str(theme.get("title") or ""),
+            "description": str(theme.get("description") or ""),
+        })
+        for number in theme.get("items") or []:
+            if isinstance(number, int) and 1 <= number <= len(batch):
+                assignments.setdefault(number - 1, position)
+    # AI tushirib qoldirgan eski mavzular o'chmaydi — oxiriga qo'shiladi.
+    for idx, theme in enumerate(old_themes):
+        if idx not in old_to_new:
+            old_to_new[idx] = len(new_themes)
+            new_themes.append({"title": theme.get("title", ""), "description": theme.get("description", "")})
+
+    now = timezone.now()
+    with transaction.atomic():
+        for old, new in old_to_new.items():
+            if old != new:
+                # Vaqtinchalik siljish (+1000): qayta raqamlashda indekslar to'qnashmasin.
+                SurveyInsightItem.objects.filter(campaign=insight.campaign, theme_index=old).update(
+                    theme_index=new + 1000
+                )
+        for old, new in old_to_new.items():
+            if old != new:
+                SurveyInsightItem.objects.filter(campaign=insight.campaign, theme_index=new + 1000).update(
+                    theme_index=new
+                )
+        for pos, item in enumerate(batch):
+            item.theme_index = assignments.get(pos)
+            item.analysed_at = now
+        SurveyInsightItem.objects.bulk_update(batch, ["theme_index", "analysed_at"])
+
+        counts = dict(
+            SurveyInsightItem.objects.filter(campaign=insight.campaign, theme_index__isnull=False)
+            .values_list("theme_index")
+            .annotate(n=Count("id"))
+        )
+        for idx, theme in enumerate(new_themes):
+            theme["count"] = counts.get(idx, 0)
+        insight.themes = new_themes
+        insight.summary = str(payload.get("summary") or insight.summary)
+        recommendations = payload.get("recommendations")
+        if isinstance(recommendations, list):
+            insight.recommendations = [str(r) for r in recommendations]
+        insight.computed_at = now
+        insight.last_error = ""
+        insight.save(update_fields=["themes", "summary", "recommendations", "computed_at", "last_error", "updated_at"])
+
+
+def _due(campaign: str, force: bool) -> bool:
+    """Pending suggestions warrant an AI call: at least `SURVEY_INSIGHTS_MIN_NEW`
+    of them, or any with `force` / when nothing was ever computed."""
+    pending = pending_count(campaign)
+    if not pending:
+        return False
+    computed_at = SurveyInsight.objects.filter(campaign=campaign).values_list("computed_at", flat=True).first()
+    return force or computed_at is None or pending >= settings.SURVEY_INSIGHTS_MIN_NEW
+
+
+def refresh_survey_insights(campaign: str = "default", *, force: bool = False, claimed: bool = False) -> SurveyInsight:
+    """Collect new suggestions and analyse them if enough have accumulated.
+
+    Without `force`, the AI is called only when at least `SURVEY_INSIGHTS_MIN_NEW`
+    suggestions are pending (or nothing was ever computed). Failed AI calls leave
+    the batch pending, so the next run retries it. `claimed=True` — the caller
+    (`request_refresh`) already collected and marked the insight running.
+    """
+    if not claimed:
+        collect_suggestions(campaign)
+        if not _due(campaign, force) or not _claim(campaign):
+            return SurveyInsight.objects.get(campaign=campaign)
+    insight = SurveyInsight.objects.get(campaign=campaign)
+    status, error = SurveyInsight.Status.IDLE, ""
+    try:
+        for _ in range(MAX_BATCHES_PER_RUN):
+            batch = _next_batch(campaign)
+            if not batch:
+                break
+            result = generate_text(
+                _build_prompt(insight.themes or [], batch),
+                operation="survey_insights",
+                json_mode=True,
+                temperature=0.3,
+                max_output_tokens=8192,
+            )
+            if not result["ok"] or not isinstance(result["json"], dict):
+                status, error = SurveyInsight.Status.FAILED, "AI javob bermadi"
+                break
+            _merge(insight, batch, result["json"])
+    except Exception as exc:
+        logger.exception("survey_insights refresh failed (campaign=%s)", campaign)
+        status, error = SurveyInsight.Status.FAILED, str(exc)
+    finally:
+        SurveyInsight.objects.filter(pk=insight.pk).update(
+            status=status, last_error=error, updated_at=timezone.now()
+        )
+    insight.refresh_from_db()
+    return insight
+
+
+def request_refresh(campaign: str, *, force: bool = False) -> bool:
+    """Queue `refresh_survey_insights` on the shared background AI pool if there
+    is work. The insight is marked running before the task is queued, so a client
+    polling GET sees the run from the start. Returns whether a run was queued."""
+    from ai_verification.orchestration import submit_ai_task
+
+    collect_suggestions(campaign)
+    if not _due(campaign, force) or not _claim(campaign):
+        return False
+    submit_ai_task(refresh_survey_insights, campaign, force=force, claimed=True)
+    return True
+
+
+def insight_payload(campaign: str) -> dict:
+    """Stored result for `campaign` — no AI call."""
+    insight = SurveyInsight.objects.filter(campaign=campaign).first()
+    if insight is None:
+        insight = SurveyInsight(campaign=campaign)
+    return {
+        "campaign": campaign,
+        "summary": insight.summary,
+        "themes": insight.themes or [],
+        "recommendations": insight.recommendations or [],
+        "computed_at": insight.computed_at,
+        "status": insight.status,
+        "last_error": insight.last_error,
+        "analysed": SurveyInsightItem.objects.filter(campaign=campaign, analysed_at__isnull=False).count(),
+        "pending": pending_count(campaign),
+    }
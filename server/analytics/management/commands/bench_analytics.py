@@ -0,0 +1,265 @@
+"""Analytics benchmark: bulk-generate a synthetic campaign, then time endpoints.
+
+    python manage.py bench_analytics --students 200000 --surveys-per-student 3
+    python manage.py bench_analytics --skip-generate --runs 50 --output before.json
+
+Step 1 (generate) writes roster → student → survey rows with `bulk_create` in
+batches (memory stays flat at millions of rows), then rebuilds the read models
+(Bot2LatestSurvey, coverage/submission rollups) once, the way bulk imports do.
+
+Step 2 (bench) calls every analytics endpoint and the survey list in-process
+through the real DRF stack and reports p50/p95 latency, SQL query count and —
+on PostgreSQL — rows read (pg_stat_xact_user_tables: seq + index tuples) as JSON,
+so runs before/after a change can be diffed.
+"""
+
+import json
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from analytics.cache import bump_data_version
+from analytics.rollups import rebuild_coverage
+from authn.models import User
+from bot2.models import (
+    Bot2Student,
+    Bot2SurveyResponse,
+    ProgramEnrollment,
+    StudentRoster,
+    build_search_document,
+    classify_employment_status,
+)
+from bot2.services import rebuild_latest_surveys
+from catalog.models import CatalogItem
+
+ACADEMIC_YEAR = "2025-2026"
+EMPLOYMENT_STATUSES = ["employed", "unemployed", "Ishlayapman (xususiy sektor)", "Ishsizman, ish qidiryapman", ""]
+SUGGESTIONS = ["", "", "Ko'proq amaliyot kerak", "Stipendiya oshirilsin", "Ish yarmarkalari ko'paysin"]
+
+_ROWS_READ_SQL = (
+    "SELECT COALESCE(SUM(seq_tup_read + COALESCE(idx_tup_fetch, 0)), 0) FROM pg_stat_xact_user_tables"
+)
+
+
+def _percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Sintetik ma'lumot (N talaba × M so'rovnoma, bulk_create) yaratadi va analytics "
+        "endpointlari + survey ro'yxatining p50/p95, SQL so'rovlar soni va o'qilgan qatorlarini JSON'da beradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000, help="Yaratiladigan talabalar soni.")
+        parser.add_argument("--surveys-per-student", type=int, default=2)
+        parser.add_argument("--campaign", default="bench")
+        parser.add_argument("--days", type=int, default=180, help="submitted_at oynasi (kun).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--skip-generate", action="store_true", help="Faqat o'lchash (mavjud ma'lumotda).")
+        parser.add_argument("--runs", type=int, default=20, help="Har endpoint uchun chaqiruvlar soni.")
+        parser.add_argument("--with-cache", action="store_true", help="Analytics javob keshini o'chirmaslik.")
+        parser.add_argument("--output", help="JSON hisobot fayli (default: stdout).")
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        campaign = opts["campaign"]
+        generated = None
+        if not opts["skip_generate"]:
+            generated = self._generate(rng, opts)
+
+        report = {
+            "campaign": campaign,
+            "vendor": connection.vendor,
+            "generated": generated,
+            "dataset": {
+                "rosters": StudentRoster.objects.filter(roster_campaign=campaign).count(),
+                "surveys": Bot2SurveyResponse.objects.filter(survey_campaign=campaign).count(),
+                "surveys_all_campaigns": Bot2SurveyResponse.objects.count(),
+            },
+            "runs": opts["runs"],
+            "cache": opts["with_cache"],
+            "endpoints": self._bench(campaign, opts),
+        }
+        payload = json.dumps(report, indent=2, default=str)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+            self.stdout.write(self.style.SUCCESS(f"bench_analytics: hisobot {opts['output']} ga yozildi"))
+        else:
+            self.stdout.write(payload)
+
+    # ------------------------------------------------------------------ #
+    # Step 1: synthetic data
+    # ------------------------------------------------------------------ #
+
+    def _programs(self):
+        programs = list(CatalogItem.objects.filter(type=CatalogItem.ItemType.PROGRAM, is_active=True))
+        if programs:
+            return programs
+        return [
+            CatalogItem.objects.update_or_create(
+                type=CatalogItem.ItemType.PROGRAM, code=f"BENCH-{idx}",
+                defaults={"name": f"Bench Program {idx}", "is_active": True, "sort_order": idx},
+            )[0]
+            for idx in range(1, 6)
+        ]
+
+    def _generate(self, rng, opts) -> dict:
+        campaign = opts["campaign"]
+        n_students = opts["students"]
+        per_student = opts["surveys_per_student"]
+        batch_size = opts["batch_size"]
+        programs = self._programs()
+        prefix = f"BENCH-{campaign}-"
+        # Qayta ishga tushirish qo'shimcha talabalar qo'shadi (ID to'qnashmaydi).
+        offset = StudentRoster.objects.filter(student_external_id__startswith=prefix).count()
+        now = timezone.now()
+        window = opts["days"] * 24 * 3600
+
+        started = time.perf_counter()
+        surveys_written = 0
+        for batch_start in range(0, n_students, batch_size):
+            rosters, students, surveys = [], [], []
+            for i in range(batch_start, min(batch_start + batch_size, n_students)):
+                ext_id = f"{prefix}{offset + i:08d}"
+                roster = StudentRoster(
+                    student_external_id=ext_id,
+                    program=programs[rng.randrange(len(programs))],
+                    course_year=rng.randint(1, 5),
+                    is_active=True,
+                    roster_campaign=campaign,
+                )
+                student = Bot2Student(student_external_id=ext_id, roster=roster, consent=True)
+                student.search_document = build_search_document(student)
+                rosters.append(roster)
+                students.append(student)
+                for _ in range(per_student):
+                    status = EMPLOYMENT_STATUSES[rng.randrange(len(EMPLOYMENT_STATUSES))]
+                    surveys.append(Bot2SurveyResponse(
+                        student=student,
+                        roster=roster,
+                        program=roster.program,
+                        course_year=roster.course_year,
+                        survey_campaign=campaign,
+                        employment_status=status,
+                        # bulk_create save()ni chetlab o'tadi — klass shu yerda.
+                        employment_class=classify_employment_status(status),
+                        suggestions=SUGGESTIONS[rng.randrange(len(SUGGESTIONS))],
+                        answers={"q1": rng.randint(1, 5)},
+                        submitted_at=now - timedelta(seconds=rng.randrange(window)),
+                    ))
+            with transaction.atomic():
+                StudentRoster.objects.bulk_create(rosters, batch_size=batch_size)
+                Bot2Student.objects.bulk_create(students, batch_size=batch_size)
+                Bot2SurveyResponse.objects.bulk_create(surveys, batch_size=batch_size)
+            surveys_written += len(surveys)
+            self.stderr.write(f"  generate: {min(batch_start + batch_size, n_students)}/{n_students} talaba")
+        insert_seconds = time.perf_counter() - started
+
+        for program in programs:
+            for year in range(1, 5):
+                ProgramEnrollment.objects.update_or_create(
+                    program=program, course_year=year, academic_year=ACADEMIC_YEAR, campaign=campaign,
+                    defaults={"student_count": max(1, n_students // (len(programs) * 4)), "is_active": True},
+                )
+
+        # bulk_create read-model/rollup'larni chetlab o'tadi — bir marta qayta quramiz.
+        started = time.perf_counter()
+        rebuild_latest_surveys()
+        rebuild_coverage([campaign])
+        bump_data_version()
+        return {
+            "students": n_students,
+            "surveys": surveys_written,
+            "insert_seconds": round(insert_seconds, 2),
+            "rebuild_seconds": round(time.perf_counter() - started, 2),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Step 2: timings
+    # ------------------------------------------------------------------ #
+
+    def _targets(self, campaign, opts):
+        now = timezone.now()
+        ranged = {
+            "campaign": campaign,
+            "from": (now - timedelta(days=opts["days"] + 1)).isoformat(),
+            "to": (now + timedelta(days=1)).isoformat(),
+        }
+        return [
+            ("course-year-coverage", "analytics-bot2-course", ranged),
+            ("program-coverage", "analytics-bot2-program", ranged),
+            ("program-course-matrix", "analytics-bot2-matrix", ranged),
+            ("program-details-by-year", "analytics-bot2-program-year", {**ranged, "course_year": "2"}),
+            ("enrollments-overview", "analytics-bot2-enrollments-overview", ranged),
+            ("academic-years", "analytics-bot2-academic-years", {"campaign": campaign}),
+            ("timeseries", "analytics-bot2-timeseries", {**ranged, "group_by": "program"}),
+            ("bundle", "analytics-bot2-bundle", {**ranged, "course_year": "2", "panels": "coverage,program,matrix,details,overview"}),
+            ("students-by-direction", "analytics-students-by-direction", {"campaign": campaign}),
+            ("surveys-list", "bot2-survey-list", {"survey_campaign": campaign}),
+            ("surveys-list-latest", "bot2-survey-list", {"survey_campaign": campaign, "latest_only": "true"}),
+        ]
+
+    def _bench(self, campaign, opts) -> dict:
+        factory = APIRequestFactory()
+        # Saqlanmagan admin — o'lchash DB'ga foydalanuvchi yozmaydi.
+        user = User(email="bench@localhost", role=User.Role.ADMIN)
+        caches = {} if opts["with_cache"] else {
+            "CACHES": {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        }
+        results = {}
+        with override_settings(**caches):
+            for name, url_name, params in self._targets(campaign, opts):
+                path = reverse(url_name)
+                view = resolve(path).func
+                timings, queries, rows_read, status_code = [], None, None, None
+                for _ in range(max(opts["runs"], 1)):
+                    request = factory.get(path, params)
+                    force_authenticate(request, user=user)
+                    with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+                        before = self._rows_read()
+                        started = time.perf_counter()
+                        response = view(request)
+                        if hasattr(response, "render"):
+                            response.render()
+                        timings.append((time.perf_counter() - started) * 1000)
+                        after = self._rows_read()
+                    status_code = response.status_code
+                    # Birinchi chaqiruv hisoblagichlari (pg_stat so'rovlarisiz).
+                    if queries is None:
+                        queries = len(ctx.captured_queries) - (2 if before is not None else 0)
+                        rows_read = after - before if before is not None else None
+                timings.sort()
+                results[name] = {
+                    "status": status_code,
+                    "p50_ms": round(_percentile(timings, 0.50), 2),
+                    "p95_ms": round(_percentile(timings, 0.95), 2),
+                    "min_ms": round(timings[0], 2),
+                    "max_ms": round(timings[-1], 2),
+                    "queries": queries,
+                    "rows_read": rows_read,
+                }
+                self.stderr.write(f"  bench: {name} p50={results[name]['p50_ms']}ms")
+        return results
+
+    def _rows_read(self):
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(_ROWS_READ_SQL)
+            return int(cursor.fetchone()[0])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import rebuild_coverage
+
+
+class Command(BaseCommand):
+    help = (
+        "Coverage rollup'ini (CoverageTotal + CoverageResponseDay + SubmissionDay) roster, ProgramEnrollment "
+        "va so'rovnomalardan qayta quradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--campaign",
+            action="append",
+            dest="campaigns",
+            help="Faqat shu kampaniya(lar)ni qayta qurish (takrorlash mumkin).",
+        )
+
+    def handle(self, *args, **opts):
+        rebuild_coverage(opts["campaigns"])
+        scope = ", ".join(opts["campaigns"]) if opts["campaigns"] else "barcha kampaniyalar"
+        self.stdout.write(self.style.SUCCESS(f"rebuild_coverage_rollup: {scope} qayta qurildi"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import rebuild_stat_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "survey_stats / verification_stats hisoblagichlarini (StatCounter) manba jadvallardan "
+        "qayta sanaydi va farqlarni tuzatadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Faqat farqlarni ko'rsatish (yozmaydi).")
+
+    def handle(self, *args, **opts):
+        drift = rebuild_stat_counters(dry_run=opts["check"])
+        for name, (stored, actual) in drift.items():
+            self.stdout.write(f"  {name}: {stored} → {actual}")
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("rebuild_stat_counters: hisoblagichlar mos"))
+        elif opts["check"]:
+            self.stdout.write(self.style.WARNING(f"rebuild_stat_counters: {len(drift)} ta farq (--check, yozilmadi)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"rebuild_stat_counters: {len(drift)} ta hisoblagich tuzatildi"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from analytics.insights import ALL_CAMPAIGNS, refresh_survey_insights
+from bot2.models import Bot2SurveyResponse
+
+
+class Command(BaseCommand):
+    help = (
+        "survey_insights natijasini yangilaydi: yangi takliflarni yig'adi va "
+        "SURVEY_INSIGHTS_MIN_NEW dan ko'p bo'lsa faqat ularni AI'da tahlil qiladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--campaign",
+            help="Faqat shu kampaniya (default: takliflari bor hammasi, alohida va birgalikda)",
+        )
+        parser.add_argument("--force", action="store_true", help="Chegarani e'tiborsiz qoldirish")
+
+    def handle(self, *args, **opts):
+        if opts["campaign"]:
+            campaigns = [opts["campaign"]]
+        else:
+            campaigns = list(
+                Bot2SurveyResponse.objects.exclude(suggestions="")
+                .values_list("survey_campaign", flat=True)
+                .distinct()
+                .order_by("survey_campaign")
+            ) + [ALL_CAMPAIGNS]
+        for campaign in campaigns:
+            insight = refresh_survey_insights(campaign, force=opts["force"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{campaign}: {len(insight.themes)} ta mavzu, status={insight.status}, "
+                f"computed_at={insight.computed_at}"
+            ))
@@ -0,0 +1,110 @@
+from datetime import timezone as dt_timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_coverage(apps, schema_editor):
+    """Fill the rollup from existing data (analytics.rollups.rebuild_coverage bilan
+    bir xil hisob, tarixiy modellar orqali)."""
+    StudentRoster = apps.get_model('bot2', 'StudentRoster')
+    ProgramEnrollment = apps.get_model('bot2', 'ProgramEnrollment')
+    Bot2LatestSurvey = apps.get_model('bot2', 'Bot2LatestSurvey')
+    CoverageTotal = apps.get_model('analytics', 'CoverageTotal')
+    CoverageResponseDay = apps.get_model('analytics', 'CoverageResponseDay')
+
+    totals = [
+        CoverageTotal(
+            campaign=r['roster_campaign'], source='roster', academic_year='',
+            program_id=r['program_id'], course_year=r['course_year'], total=r['total'],
+        )
+        for r in StudentRoster.objects.filter(is_active=True)
+        .values('roster_campaign', 'program_id', 'course_year').annotate(total=Count('id'))
+    ]
+    totals += [
+        CoverageTotal(
+            campaign=r['campaign'], source='enrollment', academic_year=r['academic_year'],
+            program_id=r['program_id'], course_year=r['course_year'], total=r['total'] or 0,
+        )
+        for r in ProgramEnrollment.objects.filter(is_active=True)
+        .values('campaign', 'academic_year', 'program_id', 'course_year')
+        .annotate(total=Sum('student_count'))
+    ]
+    CoverageTotal.objects.bulk_create(totals, batch_size=1000)
+
+    employed = (
+        Q(survey__employment_status__iexact='employed')
+        | Q(survey__employment_status__icontains='ishlayapman')
+        | Q(survey__employment_status__icontains='ишлаяпман')
+    )
+    days = (
+        Bot2LatestSurvey.objects.filter(submitted_at__isnull=False)
+        .annotate(day=TruncDate('submitted_at', tzinfo=dt_timezone.utc))
+        .values('survey_campaign', 'day', 'survey__program_id', 'survey__course_year')
+        .annotate(responded=Count('id'), employed=Count('id', filter=employed))
+    )
+    CoverageResponseDay.objects.bulk_create(
+        [
+            CoverageResponseDay(
+                campaign=r['survey_campaign'], day=r['day'],
+                program_id=r['survey__program_id'], course_year=r['survey__course_year'],
+                responded=r['responded'], employed=r['employed'],
+            )
+            for r in days
+        ],
+        batch_size=1000,
+    )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('bot2', '0021_bot2latestsurvey'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverageResponseDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('course_year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('responded', models.IntegerField(default=0)),
+                ('employed', models.IntegerField(default=0)),
+                ('program', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.catalogitem')),
+            ],
+            options={
+                'ordering': ('campaign', 'day'),
+                'indexes': [models.Index(fields=['campaign', 'day'], name='analytics_c_campaig_743860_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'day', 'program', 'course_year'), name='uq_coverage_response_day_cell')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CoverageTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64)),
+                ('source', models.CharField(choices=[('enrollment', 'ProgramEnrollment'), ('roster', 'StudentRoster')], max_length=16)),
+                ('academic_year', models.CharField(blank=True, max_length=20)),
+                ('course_year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('program', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.catalogitem')),
+            ],
+            options={
+                'ordering': ('campaign', 'source', 'academic_year', 'course_year'),
+                'indexes': [models.Index(fields=['campaign', 'source', 'academic_year'], name='analytics_c_campaig_66c6de_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'source', 'academic_year', 'program', 'course_year'), name='uq_coverage_total_cell')],
+            },
+        ),
+        migrations.RunPython(backfill_coverage, noop_reverse),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_coverage_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyInsight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64, unique=True)),
+                ('summary', models.TextField(blank=True)),
+                ('themes', models.JSONField(blank=True, default=list)),
+                ('recommendations', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('idle', 'Idle'), ('running', 'Running'), ('failed', 'Failed')], default='idle', max_length=16)),
+                ('last_error', models.TextField(blank=True)),
+                ('scanned_until', models.DateTimeField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('campaign',),
+            },
+        ),
+        migrations.CreateModel(
+            name='SurveyInsightItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64)),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('text', models.TextField()),
+                ('theme_index', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('analysed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('campaign', 'created_at'),
+                'indexes': [models.Index(fields=['campaign', 'analysed_at'], name='analytics_s_campaig_f3c341_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'fingerprint'), name='uq_survey_insight_item_fingerprint')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:17
+
+from datetime import timezone as dt_timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_submission_days(apps, schema_editor):
+    """analytics.rollups.rebuild_submission_days bilan bir xil hisob (tarixiy modellar)."""
+    Bot2SurveyResponse = apps.get_model('bot2', 'Bot2SurveyResponse')
+    SubmissionDay = apps.get_model('analytics', 'SubmissionDay')
+    rows = (
+        Bot2SurveyResponse.objects.filter(submitted_at__isnull=False)
+        .annotate(day=TruncDate('submitted_at', tzinfo=dt_timezone.utc))
+        .values('survey_campaign', 'day', 'program_id', 'course_year', 'employment_class')
+        .annotate(submissions=Count('id'))
+    )
+    SubmissionDay.objects.bulk_create(
+        [
+            SubmissionDay(
+                campaign=r['survey_campaign'], day=r['day'], program_id=r['program_id'],
+                course_year=r['course_year'], employment_class=r['employment_class'],
+                submissions=r['submissions'],
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_survey_insights'),
+        ('bot2', '0023_bot2surveyresponse_employment_class'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('course_year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('employment_class', models.CharField(max_length=16)),
+                ('submissions', models.IntegerField(default=0)),
+                ('program', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.catalogitem')),
+            ],
+            options={
+                'ordering': ('campaign', 'day'),
+                'indexes': [models.Index(fields=['campaign', 'day'], name='analytics_s_campaig_e0c586_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'day', 'program', 'course_year', 'employment_class'), name='uq_submission_day_cell')],
+            },
+        ),
+        migrations.RunPython(backfill_submission_days, noop_reverse),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:08
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stat_counters(apps, schema_editor):
+    """Hisoblagichlarni manba jadvallardan to'ldiradi (analytics.rollups'dagi
+    latest_class_counts/verification_counts bilan bir xil nomlar va sanoq)."""
+    Bot2LatestSurvey = apps.get_model('bot2', 'Bot2LatestSurvey')
+    DocumentVerification = apps.get_model('ai_verification', 'DocumentVerification')
+    StatCounter = apps.get_model('analytics', 'StatCounter')
+
+    counts = Counter()
+    rows = (
+        Bot2LatestSurvey.objects.filter(is_student_latest=True)
+        .values('survey__employment_class').annotate(n=Count('id'))
+    )
+    for row in rows:
+        counts[f"survey.latest.{row['survey__employment_class'] or 'unknown'}"] += row['n']
+    for field, label in (('confidence_level', 'confidence'), ('final_decision', 'decision'), ('status', 'status')):
+        for row in DocumentVerification.objects.values(field).annotate(n=Count('id')):
+            counts[f"verification.{label}.{row[field] or 'none'}"] += row['n']
+    StatCounter.objects.bulk_create([StatCounter(name=name, value=value) for name, value in counts.items()])
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_submission_day'),
+        ('ai_verification', '0005_cursor_pagination_indexes'),
+        ('bot2', '0026_student_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('name',),
+            },
+        ),
+        migrations.RunPython(backfill_stat_counters, noop_reverse),
+    ]
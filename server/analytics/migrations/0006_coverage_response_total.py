@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_response_totals(apps, schema_editor):
+    """Har bir katak uchun kunlik bucket'lar yig'indisi (rollups bilan bir xil sanoq)."""
+    CoverageResponseDay = apps.get_model('analytics', 'CoverageResponseDay')
+    CoverageResponseTotal = apps.get_model('analytics', 'CoverageResponseTotal')
+    CoverageResponseTotal.objects.bulk_create(
+        [
+            CoverageResponseTotal(
+                campaign=r['campaign'], program_id=r['program_id'],
+                course_year=r['course_year'], responded=r['responded'],
+            )
+            for r in CoverageResponseDay.objects.values('campaign', 'program_id', 'course_year')
+            .annotate(responded=Sum('responded'))
+        ],
+        batch_size=1000,
+    )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_stat_counters'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverageResponseTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('campaign', models.CharField(max_length=64)),
+                ('course_year', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('responded', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('program', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.catalogitem')),
+            ],
+            options={
+                'ordering': ('campaign', 'course_year'),
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'program', 'course_year'), name='uq_coverage_response_total_cell')],
+            },
+        ),
+        migrations.RunPython(backfill_response_totals, noop_reverse),
+    ]
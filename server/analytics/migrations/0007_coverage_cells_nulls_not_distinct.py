@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:59
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cells(apps, schema_editor):
+    """NULL program/course_year kataklari parallel yozuvlarda ikkilangan bo'lishi
+    mumkin: har bir katakdan eng kichik pk qoladi, sanoqlar unga qo'shiladi."""
+    cells = (
+        ('CoverageTotal', ('campaign', 'source', 'academic_year', 'program_id', 'course_year'), ('total',)),
+        ('CoverageResponseDay', ('campaign', 'day', 'program_id', 'course_year'), ('responded', 'employed')),
+    )
+    for model_name, fields, counters in cells:
+        model = apps.get_model('analytics', model_name)
+        duplicates = (
+            model.objects.values(*fields)
+            .annotate(rows=Count('id'), keep=Min('id'), **{f'sum_{c}': Sum(c) for c in counters})
+            .filter(rows__gt=1)
+            .order_by()
+        )
+        for cell in duplicates:
+            model.objects.filter(pk=cell['keep']).update(**{c: cell[f'sum_{c}'] for c in counters})
+            model.objects.filter(**{f: cell[f] for f in fields}).exclude(pk=cell['keep']).delete()
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_coverage_response_total'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cells, noop_reverse),
+        migrations.RemoveConstraint(
+            model_name='coverageresponseday',
+            name='uq_coverage_response_day_cell',
+        ),
+        migrations.RemoveConstraint(
+            model_name='coveragetotal',
+            name='uq_coverage_total_cell',
+        ),
+        migrations.AddConstraint(
+            model_name='coverageresponseday',
+            constraint=models.UniqueConstraint(fields=('campaign', 'day', 'program', 'course_year'), name='uq_coverage_response_day_cell', nulls_distinct=False),
+        ),
+        migrations.AddConstraint(
+            model_name='coveragetotal',
+            constraint=models.UniqueConstraint(fields=('campaign', 'source', 'academic_year', 'program', 'course_year'), name='uq_coverage_total_cell', nulls_distinct=False),
+        ),
+    ]
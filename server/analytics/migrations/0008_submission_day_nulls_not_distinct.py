@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:00
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+CELL_FIELDS = ('campaign', 'day', 'program_id', 'course_year', 'employment_class')
+
+
+def merge_duplicate_cells(apps, schema_editor):
+    """Ikkilangan SubmissionDay kataklari: eng kichik pk qoladi, sanoq unga qo'shiladi."""
+    SubmissionDay = apps.get_model('analytics', 'SubmissionDay')
+    duplicates = (
+        SubmissionDay.objects.values(*CELL_FIELDS)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('submissions'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for cell in duplicates:
+        SubmissionDay.objects.filter(pk=cell['keep']).update(submissions=cell['total'])
+        SubmissionDay.objects.filter(**{f: cell[f] for f in CELL_FIELDS}).exclude(pk=cell['keep']).delete()
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_coverage_cells_nulls_not_distinct'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cells, noop_reverse),
+        migrations.RemoveConstraint(
+            model_name='submissionday',
+            name='uq_submission_day_cell',
+        ),
+        migrations.AddConstraint(
+            model_name='submissionday',
+            constraint=models.UniqueConstraint(fields=('campaign', 'day', 'program', 'course_year', 'employment_class'), name='uq_submission_day_cell', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:00
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+CELL_FIELDS = ('campaign', 'program_id', 'course_year')
+
+
+def merge_duplicate_cells(apps, schema_editor):
+    """Ikkilangan CoverageResponseTotal kataklari: eng kichik pk qoladi, sanoq unga qo'shiladi."""
+    CoverageResponseTotal = apps.get_model('analytics', 'CoverageResponseTotal')
+    duplicates = (
+        CoverageResponseTotal.objects.values(*CELL_FIELDS)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('responded'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for cell in duplicates:
+        CoverageResponseTotal.objects.filter(pk=cell['keep']).update(responded=cell['total'])
+        CoverageResponseTotal.objects.filter(**{f: cell[f] for f in CELL_FIELDS}).exclude(pk=cell['keep']).delete()
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_submission_day_nulls_not_distinct'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cells, noop_reverse),
+        migrations.RemoveConstraint(
+            model_name='coverageresponsetotal',
+            name='uq_coverage_response_total_cell',
+        ),
+        migrations.AddConstraint(
+            model_name='coverageresponsetotal',
+            constraint=models.UniqueConstraint(fields=('campaign', 'program', 'course_year'), name='uq_coverage_response_total_cell', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,223 @@
+from django.db import models
+
+from catalog.models import CatalogItem
+
+
+class CoverageTotal(models.Model):
+    """Pre-aggregated denominator cell: how many students a (program, course_year)
+    has in a campaign.
+
+    `source=enrollment` rows mirror active ProgramEnrollment sums per academic_year;
+    `source=roster` rows (academic_year="") count active StudentRoster rows and back
+    the year-5 graduate fallback. Maintained by `analytics.rollups`.
+    """
+
+    class Source(models.TextChoices):
+        ENROLLMENT = "enrollment", "ProgramEnrollment"
+        ROSTER = "roster", "StudentRoster"
+
+    campaign = models.CharField(max_length=64)
+    source = models.CharField(max_length=16, choices=Source.choices)
+    academic_year = models.CharField(max_length=20, blank=True)
+    program = models.ForeignKey(
+        CatalogItem, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    course_year = models.PositiveSmallIntegerField(null=True, blank=True)
+    total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("campaign", "source", "academic_year", "course_year")
+        constraints = [
+            # program/course_year NULL bo'lishi mumkin: NULL'lar teng hisoblanmasa
+            # parallel birinchi yozuvlar bir katakni ikki marta yaratadi.
+            models.UniqueConstraint(
+                fields=["campaign", "source", "academic_year", "program", "course_year"],
+                name="uq_coverage_total_cell",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["campaign", "source", "academic_year"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign}/{self.source}/{self.academic_year} {self.program_id} y{self.course_year}: {self.total}"
+
+
+class CoverageResponseDay(models.Model):
+    """Daily responder bucket: students whose latest answer in `campaign`
+    (Bot2LatestSurvey) was submitted on `day` (UTC), split by the survey's
+    program/course_year. Each student sits in exactly one bucket per campaign, so
+    summing buckets over a range counts distinct responders.
+    """
+
+    campaign = models.CharField(max_length=64)
+    day = models.DateField()
+    program = models.ForeignKey(
+        CatalogItem, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    course_year = models.PositiveSmallIntegerField(null=True, blank=True)
+    responded = models.IntegerField(default=0)
+    employed = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("campaign", "day")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "day", "program", "course_year"],
+                name="uq_coverage_response_day_cell",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["campaign", "day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} {self.day} {self.program_id} y{self.course_year}: {self.responded}"
+
+
+class CoverageResponseTotal(models.Model):
+    """Responders per (campaign, program, course_year): the CoverageResponseDay
+    buckets of a cell summed over all days, kept alongside them so the
+    ProgramEnrollment list reads one row per enrollment instead of counting
+    surveys. Maintained by the same `analytics.rollups` write paths, including
+    the cascading Bot2Student/StudentRoster deletes (`shift_response_days`).
+    """
+
+    campaign = models.CharField(max_length=64)
+    program = models.ForeignKey(
+        CatalogItem, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    course_year = models.PositiveSmallIntegerField(null=True, blank=True)
+    responded = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("campaign", "course_year")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "program", "course_year"],
+                name="uq_coverage_response_total_cell",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} {self.program_id} y{self.course_year}: {self.responded}"
+
+
+class SurveyInsight(models.Model):
+    """Persisted AI analysis of free-text survey suggestions for one campaign.
+
+    `themes` is the merged cluster list ([{title, description, count}]); it only
+    grows/changes when `analytics.insights.refresh_survey_insights` analyses new
+    suggestions, so reads are a single-row lookup.
+    """
+
+    class Status(models.TextChoices):
+        IDLE = "idle", "Idle"
+        RUNNING = "running", "Running"
+        FAILED = "failed", "Failed"
+
+    campaign = models.CharField(max_length=64, unique=True)
+    summary = models.TextField(blank=True)
+    themes = models.JSONField(default=list, blank=True)
+    recommendations = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.IDLE)
+    last_error = models.TextField(blank=True)
+    # Bot2SurveyResponse.created_at bo'yicha yig'ish watermark'i (SurveyInsightItem).
+    scanned_until = models.DateTimeField(null=True, blank=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("campaign",)
+
+    def __str__(self) -> str:
+        return f"{self.campaign}: {len(self.themes)} themes @ {self.computed_at}"
+
+
+class SurveyInsightItem(models.Model):
+    """One distinct suggestion text per campaign, addressed by its fingerprint.
+
+    Rows are collected from survey responses once; `analysed_at` is set when the
+    text has been sent to the AI and `theme_index` points into
+    `SurveyInsight.themes` (null — not assigned to any theme).
+    """
+
+    campaign = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=40)
+    text = models.TextField()
+    theme_index = models.PositiveSmallIntegerField(null=True, blank=True)
+    analysed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("campaign", "created_at")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "fingerprint"], name="uq_survey_insight_item_fingerprint"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["campaign", "analysed_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} {self.fingerprint[:8]}"
+
+
+class SubmissionDay(models.Model):
+    """Daily submission counter: every survey row submitted on `day` (UTC), split
+    by program/course_year/employment_class. Unlike CoverageResponseDay it counts
+    submissions, not distinct responders — resubmissions add to their own day.
+    Backs the timeseries endpoint; maintained by `analytics.rollups.record_submission`.
+    """
+
+    campaign = models.CharField(max_length=64)
+    day = models.DateField()
+    program = models.ForeignKey(
+        CatalogItem, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    course_year = models.PositiveSmallIntegerField(null=True, blank=True)
+    employment_class = models.CharField(max_length=16)
+    submissions = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("campaign", "day")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["campaign", "day", "program", "course_year", "employment_class"],
+                name="uq_submission_day_cell",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["campaign", "day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign} {self.day} {self.program_id} y{self.course_year} {self.employment_class}: {self.submissions}"
+
+
+class StatCounter(models.Model):
+    """Live dashboard counter (survey_stats / verification_stats cards).
+
+    One row per counter name, e.g. "survey.latest.employed" or
+    "verification.decision.accepted"; the write paths bump the rows in the same
+    transaction as the source change (`analytics.rollups.record_latest_class` /
+    `record_verification_cell`), so the endpoints read a handful of rows instead
+    of aggregating. `manage.py rebuild_stat_counters` repairs any drift.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("name",)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
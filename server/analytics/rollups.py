@@ -0,0 +1,594 @@
+"""Coverage rollup (program × course_year × campaign × academic_year).
+
+Denominators live in `CoverageTotal`, responders in daily `CoverageResponseDay`
+buckets. Write paths keep both current:
+
+* survey submit   → `record_response_move` (from `bot2.services.record_latest_survey`)
+* batch submit    → `shift_response_days` (from `bot2.services.refresh_latest_surveys`)
+* roster save     → `bump_roster_total` (StudentRoster.save/delete)
+* roster import   → `refresh_roster_totals` / `rebuild_response_days` (bulk paths)
+* enrollment edit → `refresh_enrollment_totals` (ProgramEnrollment.save/delete)
+
+Every responder bucket move also moves the cell's all-days sum in
+`CoverageResponseTotal` (ProgramEnrollment list `responded_count`).
+
+Daily submission counters (`SubmissionDay`, timeseries endpoint) follow every
+survey row write via `record_submission` (Bot2SurveyResponse.save), or
+`record_submissions` after a `bulk_create`.
+
+`manage.py rebuild_coverage_rollup` recomputes everything from the source tables.
+
+Dashboard stat cards read `StatCounter` rows: students by the class of their
+cross-campaign latest survey (`record_latest_class`, from the Bot2LatestSurvey
+write paths) and DocumentVerification rows by confidence/decision/status
+(`record_verification_cell`, DocumentVerification.save/delete). Cascading
+student/roster deletes subtract via `student_counts`/`subtract_counts` (and
+their responders via `latest_responses` → `shift_response_days`, submissions
+via `submission_counts` → `subtract_submissions`);
+`manage.py rebuild_stat_counters` repairs drift.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+
+from analytics.cache import bump_data_version
+from analytics.models import (
+    CoverageResponseDay,
+    CoverageResponseTotal,
+    CoverageTotal,
+    StatCounter,
+    SubmissionDay,
+)
+from bot2.models import Bot2LatestSurvey, EmploymentClass
+
+UTC = dt_timezone.utc
+
+
+def employed_q(prefix: str = "") -> Q:
+    """Survey employed (prefix e.g. "survey__"): indexed equality on
+    `employment_class`, filled by bot2.models.classify_employment_status."""
+    return Q(**{f"{prefix}employment_class": EmploymentClass.EMPLOYED})
+
+
+def _bump(model, lookup: dict, **deltas) -> None:
+    """Add `deltas` to the cell identified by `lookup`, creating it on first use."""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Parallel yozuv katakni birinchi yaratdi — endi UPDATE yetarli.
+        model.objects.filter(**lookup).update(**updates)
+
+
+# --------------------------------------------------------------------------- #
+# Totals
+# --------------------------------------------------------------------------- #
+
+def bump_roster_total(campaign: str, program_id, course_year, delta: int) -> None:
+    _bump(
+        CoverageTotal,
+        {
+            "campaign": campaign,
+            "source": CoverageTotal.Source.ROSTER,
+            "academic_year": "",
+            "program_id": program_id,
+            "course_year": course_year,
+        },
+        total=delta,
+    )
+
+
+def refresh_roster_totals(campaigns: Iterable[str]) -> None:
+    """Recount roster cells for `campaigns` (one GROUP BY each) — used by bulk
+    roster writes that bypass StudentRoster.save()."""
+    from bot2.models import StudentRoster
+
+    for campaign in set(campaigns):
+        rows = (
+            StudentRoster.objects.filter(is_active=True, roster_campaign=campaign)
+            .values("program_id", "course_year")
+            .annotate(total=Count("id"))
+        )
+        _replace_totals(
+            campaign, CoverageTotal.Source.ROSTER, "",
+            [(r["program_id"], r["course_year"], r["total"]) for r in rows],
+        )
+
+
+def refresh_enrollment_totals(campaign: str, academic_year: str) -> None:
+    from bot2.models import ProgramEnrollment
+
+    rows = (
+        ProgramEnrollment.objects.filter(is_active=True, campaign=campaign, academic_year=academic_year)
+        .values("program_id", "course_year")
+        .annotate(total=Sum("student_count"))
+    )
+    _replace_totals(
+        campaign, CoverageTotal.Source.ENROLLMENT, academic_year,
+        [(r["program_id"], r["course_year"], r["total"] or 0) for r in rows],
+    )
+
+
+def _replace_totals(campaign, source, academic_year, cells) -> None:
+    with transaction.atomic():
+        CoverageTotal.objects.filter(
+            campaign=campaign, source=source, academic_year=academic_year
+        ).delete()
+        CoverageTotal.objects.bulk_create([
+            CoverageTotal(
+                campaign=campaign, source=source, academic_year=academic_year,
+                program_id=program_id, course_year=course_year, total=total,
+            )
+            for program_id, course_year, total in cells
+        ])
+
+
+def total_rows(campaign: str, academic_year: Optional[str] = None):
+    """Enrollment cells of `academic_year`, or roster cells when it is None."""
+    if academic_year:
+        return CoverageTotal.objects.filter(
+            campaign=campaign, source=CoverageTotal.Source.ENROLLMENT, academic_year=academic_year
+        )
+    return CoverageTotal.objects.filter(
+        campaign=campaign, source=CoverageTotal.Source.ROSTER, academic_year=""
+    )
+
+
+# --------------------------------------------------------------------------- #
+# Responder day buckets
+# --------------------------------------------------------------------------- #
+
+def record_response_move(old_survey, new_survey) -> None:
+    """The student's campaign-latest answer moved from `old_survey` (None on first
+    answer) to `new_survey`: shift one responder between day buckets (and their
+    all-days totals). A same-cell move — e.g. a same-day re-answer — nets to
+    no write."""
+    shift_response_days([old_survey] if old_survey is not None else [], [new_survey])
+
+
+def shift_response_days(removed: Iterable, added: Iterable) -> None:
+    """Many `record_response_move`s at once: `removed` surveys left the
+    campaign-latest set, `added` ones entered it. One `_bump` per touched bucket."""
+    deltas: dict = {}
+    totals: Counter = Counter()
+    for surveys, sign in ((removed, -1), (added, 1)):
+        for survey in surveys:
+            if survey.submitted_at is None:
+                continue
+            cell = (
+                survey.survey_campaign,
+                survey.submitted_at.astimezone(UTC).date(),
+                survey.program_id,
+                survey.course_year,
+            )
+            counts = deltas.setdefault(cell, [0, 0])
+            counts[0] += sign
+            totals[(survey.survey_campaign, survey.program_id, survey.course_year)] += sign
+            if survey.employment_class == EmploymentClass.EMPLOYED:
+                counts[1] += sign
+    for (campaign, day, program_id, course_year), (responded, employed) in deltas.items():
+        if responded or employed:
+            _bump(
+                CoverageResponseDay,
+                {"campaign": campaign, "day": day, "program_id": program_id, "course_year": course_year},
+                responded=responded,
+                employed=employed,
+            )
+    for (campaign, program_id, course_year), responded in totals.items():
+        if responded:
+            _bump(
+                CoverageResponseTotal,
+                {"campaign": campaign, "program_id": program_id, "course_year": course_year},
+                responded=responded,
+            )
+
+
+def latest_responses(surveys) -> list:
+    """Campaign-latest answers among `surveys` (a queryset) — the responders a
+    cascading student/roster delete takes out; collected before the delete and
+    passed to `shift_response_days(removed, ())` afterwards."""
+    return list(
+        surveys.filter(latest_marker__isnull=False, submitted_at__isnull=False).only(
+            "survey_campaign", "submitted_at", "program_id", "course_year", "employment_class"
+        )
+    )
+
+
+def rebuild_response_days(campaigns: Optional[Iterable[str]] = None) -> None:
+    """Recompute responder buckets (and their CoverageResponseTotal sums) from
+    Bot2LatestSurvey — all campaigns or a subset."""
+    markers = Bot2LatestSurvey.objects.filter(submitted_at__isnull=False)
+    buckets = CoverageResponseDay.objects.all()
+    totals = CoverageResponseTotal.objects.all()
+    if campaigns is not None:
+        campaigns = set(campaigns)
+        markers = markers.filter(survey_campaign__in=campaigns)
+        buckets = buckets.filter(campaign__in=campaigns)
+        totals = totals.filter(campaign__in=campaigns)
+    rows = (
+        markers.annotate(day=TruncDate("submitted_at", tzinfo=UTC))
+        .values("survey_campaign", "day", "survey__program_id", "survey__course_year")
+        .annotate(
+            responded=Count("id"),
+            employed=Count("id", filter=employed_q("survey__")),
+        )
+    )
+    with transaction.atomic():
+        buckets.delete()
+        CoverageResponseDay.objects.bulk_create(
+            [
+                CoverageResponseDay(
+                    campaign=r["survey_campaign"],
+                    day=r["day"],
+                    program_id=r["survey__program_id"],
+                    course_year=r["survey__course_year"],
+                    responded=r["responded"],
+                    employed=r["employed"],
+                )
+                for r in rows
+            ],
+            batch_size=1000,
+        )
+        totals.delete()
+        CoverageResponseTotal.objects.bulk_create(
+            [
+                CoverageResponseTotal(
+                    campaign=r["survey_campaign"],
+                    program_id=r["survey__program_id"],
+                    course_year=r["survey__course_year"],
+                    responded=r["responded"],
+                )
+                for r in markers.values("survey_campaign", "survey__program_id", "survey__course_year")
+                .annotate(responded=Count("id"))
+            ],
+            batch_size=1000,
+        )
+
+
+def responded_total_subquery():
+    """Stored responder count of the outer row's (campaign, program_id,
+    course_year) cell — for `.annotate()` on ProgramEnrollment."""
+    return Subquery(
+        CoverageResponseTotal.objects.filter(
+            campaign=OuterRef("campaign"),
+            program_id=OuterRef("program_id"),
+            course_year=OuterRef("course_year"),
+        ).values("responded")[:1]
+    )
+
+
+# --------------------------------------------------------------------------- #
+# Submission day counters
+# --------------------------------------------------------------------------- #
+
+_SUBMISSION_CELL_FIELDS = ("campaign", "day", "program_id", "course_year", "employment_class")
+
+
+def submission_cell(survey) -> Optional[tuple]:
+    """The SubmissionDay cell `survey` counts in (None without submitted_at)."""
+    if survey.submitted_at is None:
+        return None
+    return (
+        survey.survey_campaign,
+        survey.submitted_at.astimezone(UTC).date(),
+        survey.program_id,
+        survey.course_year,
+        survey.employment_class,
+    )
+
+
+def record_submission(old_cell: Optional[tuple], new_cell: Optional[tuple]) -> None:
+    """Move one submission from `old_cell` to `new_cell` (either may be None:
+    insert → (None, cell); an edit that changes day/program/class → both)."""
+    if old_cell == new_cell:
+        return
+    if old_cell is not None:
+        _bump(SubmissionDay, dict(zip(_SUBMISSION_CELL_FIELDS, old_cell)), submissions=-1)
+    if new_cell is not None:
+        _bump(SubmissionDay, dict(zip(_SUBMISSION_CELL_FIELDS, new_cell)), submissions=1)
+
+
+def record_submissions(cells: Iterable[Optional[tuple]]) -> None:
+    """`record_submission(None, cell)` for many inserted rows — one `_bump` per cell."""
+    for cell, count in Counter(cell for cell in cells if cell is not None).items():
+        _bump(SubmissionDay, dict(zip(_SUBMISSION_CELL_FIELDS, cell)), submissions=count)
+
+
+def submission_counts(surveys) -> Counter:
+    """{SubmissionDay cell: submissions} of `surveys` (a queryset), one GROUP BY.
+    Cascading student/roster deletes take it before deleting and hand it to
+    `subtract_submissions` afterwards."""
+    rows = (
+        surveys.filter(submitted_at__isnull=False)
+        .annotate(day=TruncDate("submitted_at", tzinfo=UTC))
+        .values("survey_campaign", "day", "program_id", "course_year", "employment_class")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    return Counter({
+        (r["survey_campaign"], r["day"], r["program_id"], r["course_year"], r["employment_class"]): r["n"]
+        for r in rows
+    })
+
+
+def subtract_submissions(counts: Counter) -> None:
+    for cell, count in counts.items():
+        _bump(SubmissionDay, dict(zip(_SUBMISSION_CELL_FIELDS, cell)), submissions=-count)
+
+
+def rebuild_submission_days(campaigns: Optional[Iterable[str]] = None) -> None:
+    """Recompute SubmissionDay counters from Bot2SurveyResponse."""
+    from bot2.models import Bot2SurveyResponse
+
+    surveys = Bot2SurveyResponse.objects.filter(submitted_at__isnull=False)
+    counters = SubmissionDay.objects.all()
+    if campaigns is not None:
+        campaigns = set(campaigns)
+        surveys = surveys.filter(survey_campaign__in=campaigns)
+        counters = counters.filter(campaign__in=campaigns)
+    rows = (
+        surveys.annotate(day=TruncDate("submitted_at", tzinfo=UTC))
+        .values("survey_campaign", "day", "program_id", "course_year", "employment_class")
+        .annotate(submissions=Count("id"))
+    )
+    with transaction.atomic():
+        counters.delete()
+        SubmissionDay.objects.bulk_create(
+            [
+                SubmissionDay(
+                    campaign=r["survey_campaign"],
+                    day=r["day"],
+                    program_id=r["program_id"],
+                    course_year=r["course_year"],
+                    employment_class=r["employment_class"],
+                    submissions=r["submissions"],
+                )
+                for r in rows
+            ],
+            batch_size=1000,
+        )
+
+
+def rebuild_coverage(campaigns: Optional[Iterable[str]] = None) -> None:
+    """Full rebuild of totals, buckets and submission counters from the source tables."""
+    from bot2.models import ProgramEnrollment, StudentRoster
+
+    if campaigns is None:
+        roster_campaigns = set(StudentRoster.objects.values_list("roster_campaign", flat=True).distinct())
+        enrollment_keys = set(ProgramEnrollment.objects.values_list("campaign", "academic_year").distinct())
+        stale = CoverageTotal.objects.all()
+    else:
+        campaigns = set(campaigns)
+        roster_campaigns = campaigns
+        enrollment_keys = set(
+            ProgramEnrollment.objects.filter(campaign__in=campaigns)
+            .values_list("campaign", "academic_year").distinct()
+        )
+        stale = CoverageTotal.objects.filter(campaign__in=campaigns)
+    with transaction.atomic():
+        stale.delete()
+        refresh_roster_totals(roster_campaigns)
+        for campaign, academic_year in enrollment_keys:
+            refresh_enrollment_totals(campaign, academic_year)
+        rebuild_response_days(campaigns)
+        rebuild_submission_days(campaigns)
+    bump_data_version()
+
+
+def _day_start(day) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=UTC)
+
+
+def responded_cells(start, end, campaign: str, course_year=None) -> dict:
+    """Distinct responders per (program_id, course_year) whose latest answer in
+    [start, end] belongs to that cell — same result as the per-student latest
+    subquery, at O(cells) for whole days.
+
+    Whole UTC days inside the range are summed from buckets; the partial edge
+    days are read from Bot2LatestSurvey. Students whose campaign-latest answer is
+    after `end` are not in any in-range bucket, so their latest in-range answer
+    is looked up directly (only those students are scanned).
+
+    Returns {(program_id, course_year): {"program__name", "responded", "employed"}}.
+    """
+    from bot2.models import Bot2LatestSurvey, Bot2SurveyResponse
+
+    cells: dict = {}
+
+    def _add(rows, prefix=""):
+        for r in rows:
+            key = (r[f"{prefix}program__id"], r[f"{prefix}course_year"])
+            cell = cells.setdefault(
+                key, {"program__name": r[f"{prefix}program__name"], "responded": 0, "employed": 0}
+            )
+            cell["responded"] += r["responded"] or 0
+            cell["employed"] += r["employed"] or 0
+
+    start_utc = start.astimezone(UTC)
+    first_day = start_utc.date()
+    if start_utc != _day_start(first_day):
+        first_day += timedelta(days=1)
+    end_day = end.astimezone(UTC).date()  # exclusive: the day holding `end` is partial
+
+    if first_day < end_day:
+        buckets = CoverageResponseDay.objects.filter(
+            campaign=campaign, day__gte=first_day, day__lt=end_day
+        )
+        if course_year:
+            buckets = buckets.filter(course_year=course_year)
+        _add(
+            buckets.values("program__id", "program__name", "course_year")
+            .annotate(responded=Sum("responded"), employed=Sum("employed"))
+        )
+        edges = (
+            Q(submitted_at__gte=start, submitted_at__lt=_day_start(first_day))
+            | Q(submitted_at__gte=_day_start(end_day), submitted_at__lte=end)
+        )
+    else:
+        edges = Q(submitted_at__gte=start, submitted_at__lte=end)
+
+    markers = Bot2LatestSurvey.objects.filter(survey_campaign=campaign)
+    edge_rows = markers.filter(edges)
+    if course_year:
+        edge_rows = edge_rows.filter(survey__course_year=course_year)
+    _add(
+        edge_rows.values("survey__program__id", "survey__program__name", "survey__course_year")
+        .annotate(responded=Count("id"), employed=Count("id", filter=employed_q("survey__"))),
+        prefix="survey__",
+    )
+
+    base = Bot2SurveyResponse.objects.filter(
+        submitted_at__gte=start, submitted_at__lte=end, survey_campaign=campaign
+    )
+    latest_ids = (
+        base.filter(student_id=OuterRef("student_id"))
+        .order_by("-submitted_at", "-created_at", "-id")
+        .values("id")[:1]
+    )
+    earlier_latest = (
+        base.filter(student_id__in=markers.filter(submitted_at__gt=end).values("student_id"))
+        .annotate(latest_id=Subquery(latest_ids))
+        .filter(id=F("latest_id"))
+    )
+    if course_year:
+        earlier_latest = earlier_latest.filter(course_year=course_year)
+    _add(
+        earlier_latest.values("program__id", "program__name", "course_year")
+        .annotate(responded=Count("id"), employed=Count("id", filter=employed_q()))
+    )
+    return cells
+
+
+# --------------------------------------------------------------------------- #
+# Dashboard stat counters (survey_stats, verification_stats)
+# --------------------------------------------------------------------------- #
+
+SURVEY_COUNTER_PREFIX = "survey.latest."
+VERIFICATION_COUNTER_PREFIX = "verification."
+# DocumentVerification maydoni → hisoblagich nomi bo'lagi.
+VERIFICATION_COUNTER_FIELDS = (
+    ("confidence_level", "confidence"),
+    ("final_decision", "decision"),
+    ("status", "status"),
+)
+
+
+def latest_class_counter(employment_class) -> str:
+    return f"{SURVEY_COUNTER_PREFIX}{employment_class or EmploymentClass.UNKNOWN}"
+
+
+def verification_cell(verification) -> tuple:
+    """Counter names `verification` counts in (one per confidence/decision/status)."""
+    return tuple(
+        f"{VERIFICATION_COUNTER_PREFIX}{label}.{getattr(verification, field) or 'none'}"
+        for field, label in VERIFICATION_COUNTER_FIELDS
+    )
+
+
+def bump_counters(deltas) -> None:
+    """Apply {counter name: delta}; rows are touched in name order so concurrent
+    writers lock them in the same order (no deadlocks)."""
+    for name in sorted(deltas):
+        if deltas[name]:
+            _bump(StatCounter, {"name": name}, value=deltas[name])
+
+
+def read_counters(prefix: str) -> dict:
+    """{name without `prefix`: value} — one indexed range read."""
+    return {
+        name[len(prefix):]: value
+        for name, value in StatCounter.objects.filter(name__startswith=prefix).values_list("name", "value")
+    }
+
+
+def record_latest_class(old_class, new_class, *, had_latest: bool) -> None:
+    """A student's cross-campaign latest survey changed: `had_latest=False` — the
+    student is counted for the first time; otherwise moved between classes."""
+    if had_latest and old_class == new_class:
+        return
+    deltas = Counter({latest_class_counter(new_class): 1})
+    if had_latest:
+        deltas[latest_class_counter(old_class)] -= 1
+    bump_counters(deltas)
+
+
+def record_verification_cell(old_cell: Optional[tuple], new_cell: Optional[tuple]) -> None:
+    """Move one verification between counter cells (insert: old None; delete: new None)."""
+    if old_cell == new_cell:
+        return
+    deltas = Counter(new_cell or ())
+    deltas.subtract(old_cell or ())
+    bump_counters(deltas)
+
+
+def latest_class_counts(student_ids: Optional[Iterable] = None) -> Counter:
+    """{counter name: students} over the students' cross-campaign latest surveys."""
+    markers = Bot2LatestSurvey.objects.filter(is_student_latest=True)
+    if student_ids is not None:
+        markers = markers.filter(student_id__in=list(student_ids))
+    rows = markers.values("survey__employment_class").annotate(n=Count("id"))
+    return Counter({latest_class_counter(r["survey__employment_class"]): r["n"] for r in rows})
+
+
+def verification_counts(student_ids: Optional[Iterable] = None) -> Counter:
+    """{counter name: verifications} — one GROUP BY per counted field."""
+    from ai_verification.models import DocumentVerification
+
+    qs = DocumentVerification.objects.all()
+    if student_ids is not None:
+        qs = qs.filter(student_id__in=list(student_ids))
+    counts = Counter()
+    for field, label in VERIFICATION_COUNTER_FIELDS:
+        for row in qs.values(field).annotate(n=Count("id")):
+            counts[f"{VERIFICATION_COUNTER_PREFIX}{label}.{row[field] or 'none'}"] += row["n"]
+    return counts
+
+
+def student_counts(student_ids: Iterable) -> Counter:
+    """What the students contribute to the counters. Cascading deletes take it
+    before deleting and hand it to `subtract_counts` afterwards."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return Counter()
+    return latest_class_counts(student_ids) + verification_counts(student_ids)
+
+
+def subtract_counts(counts: Counter) -> None:
+    bump_counters(Counter({name: -n for name, n in counts.items()}))
+
+
+def rebuild_stat_counters(prefixes=(SURVEY_COUNTER_PREFIX, VERIFICATION_COUNTER_PREFIX), dry_run: bool = False) -> dict:
+    """Recompute counters under `prefixes` from the source tables; returns the
+    drift {name: (stored, actual)}. With `dry_run` nothing is written.
+
+    The counter rows are locked first, so writers that bump meanwhile wait and
+    apply their delta on top of the recomputed value (their change is not yet
+    visible to the recount, which only sees committed rows).
+    """
+    with transaction.atomic():
+        scope = Q()
+        for prefix in prefixes:
+            scope |= Q(name__startswith=prefix)
+        stored = dict(StatCounter.objects.select_for_update().filter(scope).values_list("name", "value"))
+        actual = Counter()
+        if SURVEY_COUNTER_PREFIX in prefixes:
+            actual += latest_class_counts()
+        if VERIFICATION_COUNTER_PREFIX in prefixes:
+            actual += verification_counts()
+        drift = {
+            name: (stored.get(name, 0), actual.get(name, 0))
+            for name in sorted(set(stored) | set(actual))
+            if stored.get(name, 0) != actual.get(name, 0)
+        }
+        if not dry_run:
+            for name, (_, value) in drift.items():
+                StatCounter.objects.update_or_create(name=name, defaults={"value": value})
+    return drift
@@ -1,28 +1,77 @@
-import io
 from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
 
-from django.db.models import Count, Q, Sum, F, Subquery, OuterRef
-from django.http import HttpResponse
+from django.db.models import Count, Sum
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from ai_verification.generation import generate_text
-from bot2.models import Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
-from common.exceptions import build_error_response
+from analytics.cache import cache_stats, cached_response
+from analytics.insights import ALL_CAMPAIGNS, insight_payload, request_refresh
+from analytics.models import SubmissionDay
+from analytics.rollups import employed_q, responded_cells, total_rows
+from bot2.models import Bot2LatestSurvey, Bot2Student, ProgramEnrollment, StudentRoster
+from common.exceptions import APIError, build_error_response
+from common.export import ExportTable, dict_table, exportable, streaming_export
 from common.permissions import IsAdminUserRole, IsViewerOrAdminReadOnly
+from common.replica import replica_reads
 from common.time import parse_iso_datetime
 
 
 BOT2_COURSE_YEARS = [1, 2, 3, 4, 5]
+UTC = dt_timezone.utc
 
+# ?format=csv|xlsx eksport ustunlari (JSON kalitlari bilan bir xil nomlar).
+_COVERAGE_COLUMNS = ("total", "responded", "coverage_percent")
+_DIRECTION_COLUMNS = (
+    "program_id", "program_name", "program_name_uz", "program_name_ru", "total", "registered", "employed",
+)
 
-def _bot2_roster_totals_qs(campaign: str, course_year: int | None = None):
-    qs = StudentRoster.objects.filter(is_active=True, roster_campaign=campaign)
-    if course_year is not None:
-        qs = qs.filter(course_year=course_year)
-    return qs
+
+def _course_year_coverage_tables(data):
+    return [dict_table("course_years", ("course_year", *_COVERAGE_COLUMNS), data)]
+
+
+def _program_coverage_tables(data):
+    return [dict_table("programs", ("program_id", "program_name", *_COVERAGE_COLUMNS), data)]
+
+
+def _program_course_matrix_tables(data):
+    names = {p["id"]: p["name"] for p in data["programs"]}
+    rows = ({**cell, "program_name": names.get(cell["program_id"])} for cell in data["cells"])
+    return [dict_table("matrix", ("program_id", "program_name", "course_year", *_COVERAGE_COLUMNS), rows)]
+
+
+def _program_details_by_year_tables(data):
+    columns = ("program_id", "program_name", *_COVERAGE_COLUMNS, "employed", "unemployed")
+    return [dict_table("programs", columns, data)]
+
+
+def _enrollments_overview_tables(data):
+    return [
+        dict_table("by_program", ("program_id", "program_name", "course_year", *_COVERAGE_COLUMNS), data["by_program"]),
+        dict_table("by_year", ("course_year", *_COVERAGE_COLUMNS), data["by_year"]),
+        dict_table("summary", ("total_students", "total_responded", "coverage_percent"), [data]),
+    ]
+
+
+def _academic_years_tables(data):
+    return [ExportTable("academic_years", ["academic_year"], ([year] for year in data))]
+
+
+def _students_by_direction_tables(data):
+    return [dict_table("directions", _DIRECTION_COLUMNS, data)]
+
+
+def _timeseries_tables(data):
+    periods = data["periods"]
+    rows = (
+        [period, series["key"], series["label"], count]
+        for series in data["series"]
+        for period, count in zip(periods, series["counts"])
+    )
+    return [ExportTable("timeseries", ["period", "key", "label", "submissions"], rows)]
 
 
 def _resolve_academic_year(campaign: str, academic_year: str | None) -> str | None:
@@ -52,24 +101,6 @@ def _require_range(request):
     return start, end, None
 
 
-def _latest_responses_qs(start, end, campaign):
-    """
-    Return latest survey response per student within time range and campaign.
-    Uses submitted_at for ordering, then created_at/id as tiebreakers.
-    """
-    base = Bot2SurveyResponse.objects.filter(
-        submitted_at__gte=start,
-        submitted_at__lte=end,
-        survey_campaign=campaign,
-    )
-    latest_ids = (
-        base.filter(student_id=OuterRef("student_id"))
-        .order_by("-submitted_at", "-created_at", "-id")
-        .values("id")[:1]
-    )
-    return base.annotate(latest_id=Subquery(latest_ids)).filter(id=F("latest_id"))
-
-
 def _coverage_percent(responded, total):
     """Coverage %, clamped to [0, 100]. Totals and responses come from
     independent sources, so off-roster responders could otherwise push it >100."""
@@ -78,38 +109,85 @@ def _coverage_percent(responded, total):
     return round(min((responded or 0) * 100.0 / total, 100.0), 2)
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def bot2_course_year_coverage(request):
+def _roster_year5_rows(campaign: str):
+    """ProgramEnrollment currently tracks 1-4. For graduates (5), fall back to roster counts."""
+    return total_rows(campaign).filter(course_year=5)
+
+
+class _Bot2Scope:
+    """Query params of one analytics request plus the base sets panels share.
+
+    Per-panel endpoints build one scope per request; `bot2_bundle` builds one for
+    all requested panels, so the range, the academic year and the responder cells
+    are resolved once per round-trip.
+    """
+
+    def __init__(self, request, start=None, end=None, shared: bool = False):
+        params = request.query_params
+        self.start = start
+        self.end = end
+        self.campaign = params.get("campaign", "default")
+        self.course_year = params.get("course_year")
+        self.granularity = params.get("granularity") or "day"
+        self.group_by = params.get("group_by") or None
+        self._academic_year_param = params.get("academic_year")
+        # shared=True: course_year-filtered cells are sliced from the full set
+        # instead of running their own query (several panels reuse it).
+        self._shared = shared
+        self._memo = {}
+
+    @property
+    def academic_year(self) -> str | None:
+        if "academic_year" not in self._memo:
+            self._memo["academic_year"] = _resolve_academic_year(self.campaign, self._academic_year_param)
+        return self._memo["academic_year"]
+
+    def cells(self, course_year=None) -> dict:
+        """`responded_cells` for the scope's range/campaign, memoized per course_year."""
+        key = ("cells", str(course_year) if course_year else None)
+        if key in self._memo:
+            return self._memo[key]
+        if course_year and self._shared:
+            try:
+                year = int(course_year)
+            except (TypeError, ValueError):
+                year = None
+            if year is not None:
+                cells = {k: v for k, v in self.cells().items() if k[1] == year}
+                self._memo[key] = cells
+                return cells
+        cells = responded_cells(self.start, self.end, self.campaign, course_year=course_year)
+        self._memo[key] = cells
+        return cells
+
+
+def _range_scope(request):
+    """(scope, None) for a valid from/to range, else (None, error response)."""
     start, end, error = _require_range(request)
     if error:
-        return error
-    campaign = request.query_params.get("campaign", "default")
-    academic_year = _resolve_academic_year(campaign, request.query_params.get("academic_year"))
+        return None, error
+    return _Bot2Scope(request, start, end), None
+
+
+def _course_year_coverage_data(scope: _Bot2Scope) -> list:
+    campaign = scope.campaign
+    academic_year = scope.academic_year
 
     total_map = {}
 
     if academic_year:
-        enroll_qs = ProgramEnrollment.objects.filter(is_active=True, campaign=campaign, academic_year=academic_year)
-        totals = enroll_qs.values("course_year").annotate(total_students=Sum("student_count"))
+        totals = total_rows(campaign, academic_year).values("course_year").annotate(total_students=Sum("total"))
         total_map.update({row["course_year"]: (row["total_students"] or 0) for row in totals})
 
         # ProgramEnrollment currently tracks 1-4. For graduates (5), fall back to roster counts.
-        total_map[5] = _bot2_roster_totals_qs(campaign=campaign, course_year=5).count()
+        total_map[5] = _roster_year5_rows(campaign).aggregate(total=Sum("total"))["total"] or 0
     else:
-        totals = (
-            _bot2_roster_totals_qs(campaign=campaign)
-            .values("course_year")
-            .annotate(total_students=Count("id"))
-        )
+        totals = total_rows(campaign).values("course_year").annotate(total_students=Sum("total"))
         total_map.update({row["course_year"]: (row["total_students"] or 0) for row in totals})
 
-    responded = (
-        _latest_responses_qs(start, end, campaign)
-        .values("course_year")
-        .annotate(count=Count("student_id", distinct=True))
-    )
-    resp_map = {row["course_year"]: row["count"] for row in responded}
+    resp_map = defaultdict(int)
+    for (_, year), cell in scope.cells().items():
+        resp_map[year] += cell["responded"]
 
     result = []
     for year in BOT2_COURSE_YEARS:
@@ -117,18 +195,25 @@ def bot2_course_year_coverage(request):
         resp = resp_map.get(year, 0)
         coverage = _coverage_percent(resp, total)
         result.append({"course_year": year, "total": total, "responded": resp, "coverage_percent": coverage})
-    return Response(result)
+    return result
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def bot2_program_coverage(request):
-    start, end, error = _require_range(request)
+@exportable(_course_year_coverage_tables, "course-year-coverage")
+@cached_response("course-year-coverage")
+def bot2_course_year_coverage(request):
+    scope, error = _range_scope(request)
     if error:
         return error
-    campaign = request.query_params.get("campaign", "default")
-    academic_year = _resolve_academic_year(campaign, request.query_params.get("academic_year"))
-    course_year = request.query_params.get("course_year")
+    return Response(_course_year_coverage_data(scope))
+
+
+def _program_coverage_data(scope: _Bot2Scope) -> list:
+    campaign = scope.campaign
+    academic_year = scope.academic_year
+    course_year = scope.course_year
 
     # Per-program totals. ProgramEnrollment tracks only years 1-4, so graduates
     # (year 5) always come from roster counts; accumulate per program.
@@ -141,33 +226,26 @@ def bot2_program_coverage(request):
             total_map[pid] = {"program__name": name, "total": value or 0}
 
     if academic_year and course_year != "5":
-        enroll_qs = ProgramEnrollment.objects.filter(is_active=True, campaign=campaign, academic_year=academic_year)
+        enroll_qs = total_rows(campaign, academic_year)
         if course_year:
             enroll_qs = enroll_qs.filter(course_year=course_year)
-        for row in enroll_qs.values("program__id", "program__name").annotate(total=Sum("student_count")):
+        for row in enroll_qs.values("program__id", "program__name").annotate(total=Sum("total")):
             _add_total(row["program__id"], row["program__name"], row["total"])
         # Fold in graduates (year 5) from the roster unless filtered to a 1-4 year.
         if not course_year:
-            for row in (
-                _bot2_roster_totals_qs(campaign=campaign, course_year=5)
-                .values("program__id", "program__name")
-                .annotate(total=Count("id"))
-            ):
+            for row in _roster_year5_rows(campaign).values("program__id", "program__name").annotate(total=Sum("total")):
                 _add_total(row["program__id"], row["program__name"], row["total"])
     else:
-        roster_qs = _bot2_roster_totals_qs(campaign=campaign)
+        roster_qs = total_rows(campaign)
         if course_year:
             roster_qs = roster_qs.filter(course_year=course_year)
-        for row in roster_qs.values("program__id", "program__name").annotate(total=Count("id")):
+        for row in roster_qs.values("program__id", "program__name").annotate(total=Sum("total")):
             _add_total(row["program__id"], row["program__name"], row["total"])
 
-    resp_qs = _latest_responses_qs(start, end, campaign)
-    if course_year:
-        resp_qs = resp_qs.filter(course_year=course_year)
-    resp_map = {
-        r["program__id"]: r
-        for r in resp_qs.values("program__id", "program__name").annotate(count=Count("student_id", distinct=True))
-    }
+    resp_map = {}
+    for (program_id, _), cell in scope.cells(course_year).items():
+        row = resp_map.setdefault(program_id, {"program__name": cell["program__name"], "count": 0})
+        row["count"] += cell["responded"]
 
     data = []
     # Iterate the union of totals and responses so programs that have responses
@@ -186,40 +264,45 @@ def bot2_program_coverage(request):
                 "coverage_percent": _coverage_percent(resp, total),
             }
         )
-    return Response(data)
+    return data
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def bot2_program_course_matrix(request):
-    start, end, error = _require_range(request)
+@exportable(_program_coverage_tables, "program-coverage")
+@cached_response("program-coverage")
+def bot2_program_coverage(request):
+    scope, error = _range_scope(request)
     if error:
         return error
-    campaign = request.query_params.get("campaign", "default")
-    academic_year = _resolve_academic_year(campaign, request.query_params.get("academic_year"))
+    return Response(_program_coverage_data(scope))
+
+
+def _program_course_matrix_data(scope: _Bot2Scope) -> dict:
+    campaign = scope.campaign
+    academic_year = scope.academic_year
 
     if academic_year:
-        enroll_qs = ProgramEnrollment.objects.filter(is_active=True, campaign=campaign, academic_year=academic_year)
-        totals = enroll_qs.values("program__id", "program__name", "course_year").annotate(total=Sum("student_count"))
+        totals = (
+            total_rows(campaign, academic_year)
+            .values("program__id", "program__name", "course_year")
+            .annotate(total=Sum("total"))
+        )
 
         # ProgramEnrollment currently tracks 1-4. For graduates (5), fall back to roster counts.
         roster_totals = (
-            _bot2_roster_totals_qs(campaign=campaign, course_year=5)
+            _roster_year5_rows(campaign)
             .values("program__id", "program__name", "course_year")
-            .annotate(total=Count("id"))
+            .annotate(total=Sum("total"))
         )
     else:
         totals = (
-            _bot2_roster_totals_qs(campaign=campaign)
+            total_rows(campaign)
             .values("program__id", "program__name", "course_year")
-            .annotate(total=Count("id"))
+            .annotate(total=Sum("total"))
         )
         roster_totals = []
-    responded = (
-        _latest_responses_qs(start, end, campaign)
-        .values("program__id", "program__name", "course_year")
-        .annotate(count=Count("student_id", distinct=True))
-    )
 
     programs = {}
     totals_map = defaultdict(dict)
@@ -233,9 +316,9 @@ def bot2_program_course_matrix(request):
         totals_map[row["program__id"]][row["course_year"]] = row["total"]
 
     resp_map = defaultdict(dict)
-    for row in responded:
-        programs[row["program__id"]] = row["program__name"]
-        resp_map[row["program__id"]][row["course_year"]] = row["count"]
+    for (program_id, year), cell in scope.cells().items():
+        programs[program_id] = cell["program__name"]
+        resp_map[program_id][year] = cell["responded"]
 
     program_list = [{"id": pid, "name": name} for pid, name in programs.items()]
     cells = []
@@ -254,79 +337,53 @@ def bot2_program_course_matrix(request):
                 }
             )
 
-    return Response({"years": BOT2_COURSE_YEARS, "programs": program_list, "cells": cells})
+    return {"years": BOT2_COURSE_YEARS, "programs": program_list, "cells": cells}
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def bot2_program_details_by_year(request):
-    """Get program breakdown for a specific course year with employment stats."""
-    start, end, error = _require_range(request)
+@exportable(_program_course_matrix_tables, "program-course-matrix")
+@cached_response("program-course-matrix")
+def bot2_program_course_matrix(request):
+    scope, error = _range_scope(request)
     if error:
         return error
-    campaign = request.query_params.get("campaign", "default")
-    academic_year = _resolve_academic_year(campaign, request.query_params.get("academic_year"))
-    course_year = request.query_params.get("course_year")
-    
+    return Response(_program_course_matrix_data(scope))
+
+
+def _program_details_by_year_data(scope: _Bot2Scope) -> list:
+    campaign = scope.campaign
+    academic_year = scope.academic_year
+    course_year = scope.course_year
+
     if not course_year:
-        return build_error_response("COURSE_YEAR_REQUIRED", "course_year query param is required.", status.HTTP_400_BAD_REQUEST)
-    
+        raise APIError("COURSE_YEAR_REQUIRED", "course_year query param is required.")
+
     try:
         course_year = int(course_year)
     except ValueError:
-        return build_error_response("INVALID_COURSE_YEAR", "course_year must be an integer.", status.HTTP_400_BAD_REQUEST)
+        raise APIError("INVALID_COURSE_YEAR", "course_year must be an integer.")
 
     if academic_year and course_year != 5:
-        enroll_qs = ProgramEnrollment.objects.filter(
-            is_active=True, campaign=campaign, academic_year=academic_year, course_year=course_year
+        totals = (
+            total_rows(campaign, academic_year).filter(course_year=course_year)
+            .values("program__id", "program__name").annotate(total=Sum("total"))
         )
-        totals = enroll_qs.values("program__id", "program__name").annotate(total=Sum("student_count"))
     else:
         totals = (
-            _bot2_roster_totals_qs(campaign=campaign, course_year=course_year)
-            .values("program__id", "program__name")
-            .annotate(total=Count("id"))
+            total_rows(campaign).filter(course_year=course_year)
+            .values("program__id", "program__name").annotate(total=Sum("total"))
         )
     total_map = {row["program__id"]: {"name": row["program__name"], "total": row["total"] or 0} for row in totals}
-    
-    # Get survey responses per program for this year (count unique students)
-    responded = (
-        _latest_responses_qs(start, end, campaign)
-        .filter(course_year=course_year)
-        .values("program__id", "program__name")
-        .annotate(count=Count("student_id", distinct=True))
-    )
-    
-    # Employment status breakdown (unique students)
-    employment = (
-        _latest_responses_qs(start, end, campaign)
-        .filter(course_year=course_year)
-        .values("program__id", "employment_status")
-        .annotate(count=Count("student_id", distinct=True))
-    )
-    
-    # Add responded counts
-    for row in responded:
-        if row["program__id"] in total_map:
-            total_map[row["program__id"]]["responded"] = row["count"]
-        else:
-            total_map[row["program__id"]] = {"name": row["program__name"], "total": 0, "responded": row["count"]}
-    
-    # Add employment breakdown
-    for program_id in total_map:
-        total_map[program_id]["employed"] = 0
-        total_map[program_id]["unemployed"] = 0
-    
-    for row in employment:
-        if row["program__id"] in total_map:
-            emp_status = row["employment_status"].lower() if row["employment_status"] else ""
-            # DIQQAT: "employed" — "unemployed" ning qism-satri, shuning uchun ingliz
-            # qiymati aniq tenglik bilan tekshiriladi (bot aynan "employed"/"unemployed"
-            # yozadi); uz/ru markerlari qism-satr sifatida to'qnashmaydi.
-            if emp_status == "employed" or "ishlayapman" in emp_status or "ишлаяпман" in emp_status:
-                total_map[row["program__id"]]["employed"] += row["count"]
-            else:
-                total_map[row["program__id"]]["unemployed"] += row["count"]
+
+    # Responded + employment breakdown per program for this year (unique students).
+    # Employed/unemployed follows Bot2SurveyResponse.employment_class.
+    for (program_id, _), cell in scope.cells(course_year).items():
+        info = total_map.setdefault(program_id, {"name": cell["program__name"], "total": 0})
+        info["responded"] = info.get("responded", 0) + cell["responded"]
+        info["employed"] = info.get("employed", 0) + cell["employed"]
+        info["unemployed"] = info.get("unemployed", 0) + cell["responded"] - cell["employed"]
 
     # Format response
     data = []
@@ -346,59 +403,52 @@ def bot2_program_details_by_year(request):
     
     # Sort by total students descending
     data.sort(key=lambda x: x["total"], reverse=True)
-    
-    return Response(data)
+    return data
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def enrollments_overview(request):
-    """
-    Aggregate ProgramEnrollment by program and course year with coverage metrics.
-    Requires time range to align with survey responses.
-    """
-    start, end, error = _require_range(request)
+@exportable(_program_details_by_year_tables, "program-details-by-year")
+@cached_response("program-details-by-year")
+def bot2_program_details_by_year(request):
+    """Get program breakdown for a specific course year with employment stats."""
+    scope, error = _range_scope(request)
     if error:
         return error
+    return Response(_program_details_by_year_data(scope))
 
-    campaign = request.query_params.get("campaign", "default")
-    academic_year = _resolve_academic_year(campaign, request.query_params.get("academic_year"))
+
+def _enrollments_overview_data(scope: _Bot2Scope) -> dict:
+    campaign = scope.campaign
+    academic_year = scope.academic_year
 
     if academic_year:
-        enroll_qs = ProgramEnrollment.objects.filter(is_active=True, campaign=campaign, academic_year=academic_year)
         totals = list(
-            enroll_qs.values("program__id", "program__name", "course_year")
-            .annotate(total=Sum("student_count"))
+            total_rows(campaign, academic_year)
+            .values("program__id", "program__name", "course_year")
+            .annotate(total=Sum("total"))
             .order_by("program__name", "course_year")
         )
 
         # Add graduates (course_year=5) totals from roster counts.
         totals.extend(
             list(
-                _bot2_roster_totals_qs(campaign=campaign, course_year=5)
+                _roster_year5_rows(campaign)
                 .values("program__id", "program__name", "course_year")
-                .annotate(total=Count("id"))
+                .annotate(total=Sum("total"))
                 .order_by("program__name", "course_year")
             )
         )
     else:
         totals = list(
-            _bot2_roster_totals_qs(campaign=campaign)
+            total_rows(campaign)
             .values("program__id", "program__name", "course_year")
-            .annotate(total=Count("id"))
+            .annotate(total=Sum("total"))
             .order_by("program__name", "course_year")
         )
 
-    responded = (
-        _latest_responses_qs(start, end, campaign)
-        .values("program__id", "program__name", "course_year")
-        .annotate(count=Count("student_id", distinct=True))
-    )
-
-    resp_map = {}
-    for row in responded:
-        key = (row["program__id"], row["course_year"])
-        resp_map[key] = row["count"]
+    resp_map = {key: cell["responded"] for key, cell in scope.cells().items()}
 
     overview = []
     total_students = 0
@@ -444,29 +494,49 @@ def enrollments_overview(request):
 
     overall_coverage = _coverage_percent(total_responded, total_students)
 
-    return Response(
-        {
-            "total_students": total_students,
-            "total_responded": total_responded,
-            "coverage_percent": overall_coverage,
-            "by_year": yearly_list,
-            "by_program": overview,
-        }
-    )
+    return {
+        "total_students": total_students,
+        "total_responded": total_responded,
+        "coverage_percent": overall_coverage,
+        "by_year": yearly_list,
+        "by_program": overview,
+    }
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def bot2_academic_years(request):
-    """List distinct academic_year values from ProgramEnrollment, newest first."""
-    campaign = request.query_params.get("campaign", "default")
+@exportable(_enrollments_overview_tables, "enrollments-overview")
+@cached_response("enrollments-overview")
+def enrollments_overview(request):
+    """
+    Aggregate ProgramEnrollment by program and course year with coverage metrics.
+    Requires time range to align with survey responses.
+    """
+    scope, error = _range_scope(request)
+    if error:
+        return error
+    return Response(_enrollments_overview_data(scope))
+
+
+def _academic_years_data(scope: _Bot2Scope) -> list:
     years = (
-        ProgramEnrollment.objects.filter(is_active=True, campaign=campaign)
+        ProgramEnrollment.objects.filter(is_active=True, campaign=scope.campaign)
         .values_list("academic_year", flat=True)
         .distinct()
         .order_by("-academic_year")
     )
-    return Response(list(years))
+    return list(years)
+
+
+@replica_reads
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+@exportable(_academic_years_tables, "academic-years")
+@cached_response("academic-years")
+def bot2_academic_years(request):
+    """List distinct academic_year values from ProgramEnrollment, newest first."""
+    return Response(_academic_years_data(_Bot2Scope(request)))
 
 
 def _students_by_direction_data(campaign: str) -> list:
@@ -474,7 +544,7 @@ def _students_by_direction_data(campaign: str) -> list:
     Faza F: Students grouped by direction/program.
     - total: StudentRoster count per program
     - registered: Bot2Student count (has telegram_user_id)
-    - employed: latest survey per student where employment_status looks like "employed"
+    - employed: latest survey per student with employment_class == "employed"
     """
     # Roster totals per program
     totals = (
@@ -504,31 +574,22 @@ def _students_by_direction_data(campaign: str) -> list:
     )
     registered_map = {row["roster__program_id"]: row["count"] for row in registered}
 
-    # Employed: latest survey per student, check employment_status.
-    # total/registered kabi bir xil kampaniya + faol roster bilan cheklanadi,
-    # aks holda employed soni total'dan oshib ketishi mumkin.
-    latest_ids = (
-        Bot2SurveyResponse.objects
-        .filter(student_id=OuterRef("student_id"), submitted_at__isnull=False)
-        .order_by("-submitted_at", "-created_at")
-        .values("id")[:1]
-    )
+    # Employed: latest survey per student (Bot2LatestSurvey read model), check
+    # employment_class. total/registered kabi bir xil kampaniya + faol roster
+    # bilan cheklanadi, aks holda employed soni total'dan oshib ketishi mumkin.
     employed_count = (
-        Bot2SurveyResponse.objects
-        .filter(roster__is_active=True, roster__roster_campaign=campaign)
-        .annotate(latest_id=Subquery(latest_ids))
-        .filter(id=F("latest_id"))
+        Bot2LatestSurvey.objects
         .filter(
-            # "employed" — "unemployed" ning qism-satri, shuning uchun ingliz qiymati
-            # aniq (iexact) tekshiriladi; uz/ru markerlari to'qnashmaydi.
-            Q(employment_status__icontains="ishlayapman")
-            | Q(employment_status__iexact="employed")
-            | Q(employment_status__icontains="ишлаяпман")
+            is_student_latest=True,
+            submitted_at__isnull=False,
+            survey__roster__is_active=True,
+            survey__roster__roster_campaign=campaign,
         )
-        .values("roster__program_id")
+        .filter(employed_q("survey__"))
+        .values("survey__roster__program_id")
         .annotate(count=Count("student_id", distinct=True))
     )
-    employed_map = {row["roster__program_id"]: row["count"] for row in employed_count}
+    employed_map = {row["survey__roster__program_id"]: row["count"] for row in employed_count}
 
     result = []
     for program_id, info in total_map.items():
@@ -546,120 +607,212 @@ def _students_by_direction_data(campaign: str) -> list:
     return result
 
 
+@replica_reads
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+@exportable(_students_by_direction_tables, "students-by-direction")
+@cached_response("students-by-direction")
 def students_by_direction(request):
     """GET /api/v1/analytics/students-by-direction — per-program totals."""
     campaign = request.query_params.get("campaign", "default")
     return Response(_students_by_direction_data(campaign))
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
-def students_by_direction_xlsx(request):
-    """GET /api/v1/analytics/students-by-direction.xlsx — openpyxl export."""
-    try:
-        import openpyxl
-        from openpyxl.styles import Font, PatternFill, Alignment
-    except ImportError:
-        return Response({"detail": "openpyxl not installed."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+TIMESERIES_GRANULARITIES = {"day": 1, "week": 7}
+# group_by → (SubmissionDay maydonlari, yorliq maydoni)
+TIMESERIES_GROUPS = {
+    "program": (("program_id", "program__name"), "program__name"),
+    "course_year": (("course_year",), "course_year"),
+    "employment": (("employment_class",), "employment_class"),
+}
 
-    campaign = request.query_params.get("campaign", "default")
-    rows = _students_by_direction_data(campaign)
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Students by Direction"
+def _timeseries_data(scope: _Bot2Scope) -> dict:
+    """Submissions per day/week from SubmissionDay counters — O(days × groups).
+
+    Counters are per UTC day, so from/to select whole days (the days holding
+    `from` and `to` are both included). Weeks start on Monday; `periods` lists
+    every period in range and each series has a count per period (zeros filled).
+    """
+    step = TIMESERIES_GRANULARITIES.get(scope.granularity)
+    if step is None:
+        raise APIError("INVALID_GRANULARITY", f"granularity must be one of: {', '.join(TIMESERIES_GRANULARITIES)}.")
+    if scope.group_by and scope.group_by not in TIMESERIES_GROUPS:
+        raise APIError("INVALID_GROUP_BY", f"group_by must be one of: {', '.join(TIMESERIES_GROUPS)}.")
+
+    def _period(day):
+        return day - timedelta(days=day.weekday()) if step == 7 else day
+
+    first = _period(scope.start.astimezone(UTC).date())
+    last = _period(scope.end.astimezone(UTC).date())
+    periods = []
+    day = first
+    while day <= last:
+        periods.append(day)
+        day += timedelta(days=step)
+    position = {period: idx for idx, period in enumerate(periods)}
+
+    counters = SubmissionDay.objects.filter(
+        campaign=scope.campaign,
+        day__gte=scope.start.astimezone(UTC).date(),
+        day__lte=scope.end.astimezone(UTC).date(),
+    )
+    if scope.course_year:
+        try:
+            counters = counters.filter(course_year=int(scope.course_year))
+        except ValueError:
+            raise APIError("INVALID_COURSE_YEAR", "course_year must be an integer.")
+    fields, label_field = TIMESERIES_GROUPS[scope.group_by] if scope.group_by else ((), None)
+
+    series = {}
+    for row in counters.values("day", *fields).annotate(count=Sum("submissions")):
+        key = row[fields[0]] if fields else "all"
+        entry = series.setdefault(key, {
+            "key": key,
+            "label": row[label_field] if label_field else "all",
+            "counts": [0] * len(periods),
+            "total": 0,
+        })
+        entry["counts"][position[_period(row["day"])]] += row["count"] or 0
+        entry["total"] += row["count"] or 0
+
+    return {
+        "granularity": scope.granularity,
+        "group_by": scope.group_by,
+        "periods": periods,
+        "series": sorted(series.values(), key=lambda e: (e["label"] is None, str(e["label"]))),
+    }
+
+
+@replica_reads
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+@exportable(_timeseries_tables, "timeseries")
+@cached_response("timeseries")
+def bot2_timeseries(request):
+    """GET /api/v1/analytics/bot2/timeseries?from&to&granularity=day|week&group_by=program|course_year|employment"""
+    scope, error = _range_scope(request)
+    if error:
+        return error
+    return Response(_timeseries_data(scope))
+
+
+# Bundle panel nomi → (ma'lumot funksiyasi, from/to talab qilinadimi). Har panel
+# o'z endpointi bilan aynan bir xil funksiyadan foydalanadi.
+BOT2_BUNDLE_PANELS = {
+    "coverage": (_course_year_coverage_data, True),
+    "program": (_program_coverage_data, True),
+    "matrix": (_program_course_matrix_data, True),
+    "details": (_program_details_by_year_data, True),
+    "overview": (_enrollments_overview_data, True),
+    "academic_years": (_academic_years_data, False),
+    "directions": (lambda scope: _students_by_direction_data(scope.campaign), False),
+    "timeseries": (_timeseries_data, True),
+}
+
+BOT2_BUNDLE_TABLES = {
+    "coverage": _course_year_coverage_tables,
+    "program": _program_coverage_tables,
+    "matrix": _program_course_matrix_tables,
+    "details": _program_details_by_year_tables,
+    "overview": _enrollments_overview_tables,
+    "academic_years": _academic_years_tables,
+    "directions": _students_by_direction_tables,
+    "timeseries": _timeseries_tables,
+}
+
+
+def _bundle_tables(data):
+    """xlsx: har panel jadvali alohida sheet ("panel.jadval")."""
+    return [
+        table._replace(title=f"{panel}.{table.title}")
+        for panel, payload in data.items()
+        for table in BOT2_BUNDLE_TABLES[panel](payload)
+    ]
+
+
+@replica_reads
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+@exportable(_bundle_tables, "bundle")
+@cached_response("bundle")
+def bot2_bundle(request):
+    """GET /api/v1/analytics/bot2/bundle?panels=coverage,matrix,overview,...
+
+    Several panels in one round-trip: the range, academic year and responder
+    cells are computed once and shared. Each panel's payload equals the response
+    of its own endpoint for the same query params."""
+    raw = request.query_params.get("panels", "")
+    panels = list(dict.fromkeys(p.strip() for p in raw.split(",") if p.strip()))
+    if not panels:
+        return build_error_response("PANELS_REQUIRED", "panels query param is required.", status.HTTP_400_BAD_REQUEST)
+    unknown = [p for p in panels if p not in BOT2_BUNDLE_PANELS]
+    if unknown:
+        return build_error_response(
+            "INVALID_PANEL",
+            "Unknown panel(s).",
+            status.HTTP_400_BAD_REQUEST,
+            details={"unknown": unknown, "allowed": list(BOT2_BUNDLE_PANELS)},
+        )
 
-    headers = ["Program", "Total", "Registered", "Employed", "Registered %", "Employed %"]
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(fill_type="solid", fgColor="1F4E79")
+    start = end = None
+    if any(BOT2_BUNDLE_PANELS[p][1] for p in panels):
+        start, end, error = _require_range(request)
+        if error:
+            return error
+    scope = _Bot2Scope(request, start, end, shared=True)
+    return Response({panel: BOT2_BUNDLE_PANELS[panel][0](scope) for panel in panels})
 
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
 
-    for row_idx, row in enumerate(rows, start=2):
+def _direction_percent_rows(rows):
+    for row in rows:
         total = row["total"] or 0
         registered = row["registered"] or 0
         employed = row["employed"] or 0
         reg_pct = round(registered * 100.0 / total, 1) if total else 0.0
         emp_pct = round(employed * 100.0 / total, 1) if total else 0.0
-        emp_pct = min(emp_pct, 100.0)
+        yield [row["program_name"], total, registered, employed, reg_pct, min(emp_pct, 100.0)]
 
-        ws.cell(row=row_idx, column=1, value=row["program_name"])
-        ws.cell(row=row_idx, column=2, value=total)
-        ws.cell(row=row_idx, column=3, value=registered)
-        ws.cell(row=row_idx, column=4, value=employed)
-        ws.cell(row=row_idx, column=5, value=reg_pct)
-        ws.cell(row=row_idx, column=6, value=emp_pct)
 
-    ws.column_dimensions["A"].width = 40
-
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-
-    response = HttpResponse(
-        buf.read(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+@replica_reads
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+def students_by_direction_xlsx(request):
+    """GET /api/v1/analytics/students-by-direction.xlsx — openpyxl write-only, streamed."""
+    campaign = request.query_params.get("campaign", "default")
+    table = ExportTable(
+        "Students by Direction",
+        ["Program", "Total", "Registered", "Employed", "Registered %", "Employed %"],
+        _direction_percent_rows(_students_by_direction_data(campaign)),
+        widths={"A": 40},
     )
-    response["Content-Disposition"] = f'attachment; filename="students-by-direction-{campaign}.xlsx"'
-    return response
+    return streaming_export("xlsx", f"students-by-direction-{campaign}", [table])
 
 
-@api_view(["POST"])
+@api_view(["GET"])
 @permission_classes([IsAuthenticated, IsAdminUserRole])
+def analytics_cache_stats(request):
+    """GET /api/v1/analytics/cache-stats — javob keshining hit/miss hisoblagichlari."""
+    return Response(cache_stats())
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
 def survey_insights(request):
-    """POST /api/v1/analytics/survey-insights — AI tahlil (Gemini) talabalar
+    """/api/v1/analytics/survey-insights — AI tahlil (Gemini) talabalar
     so'rovnomadagi erkin matnli takliflari bo'yicha mavzular + xulosa + tavsiyalar.
 
-    Aniq, hisoblanadigan (billable) amal: hech narsa saqlanmaydi, har chaqiruvda
-    so'nggi takliflar AI'ga yuboriladi."""
-    suggestions = list(
-        Bot2SurveyResponse.objects.exclude(suggestions="")
-        .exclude(suggestions__isnull=True)
-        .order_by("-submitted_at")
-        .values_list("suggestions", flat=True)[:200]
-    )
-    if not suggestions:
-        return Response({"summary": "Tahlil uchun yetarli fikr yo'q.", "themes": [], "recommendations": []})
-
-    # Raqamlangan ro'yxat, umumiy uzunlikni ~12000 belgiga cheklaymiz.
-    numbered = []
-    total_len = 0
-    for idx, text in enumerate(suggestions, start=1):
-        line = f"{idx}. {(text or '').strip()}"
-        if total_len + len(line) > 12000:
-            break
-        numbered.append(line)
-        total_len += len(line) + 1
-    feedback_block = "\n".join(numbered)
-
-    prompt = (
-        "Siz bandlik markazining tahlilchisisiz. Quyida universitet talabalarining "
-        "so'rovnomada qoldirgan erkin matnli fikr va takliflari raqamlangan ro'yxat "
-        "ko'rinishida berilgan. Ularni tahlil qiling va FAQAT o'zbek tilida JSON qaytaring.\n\n"
-        "JSON tuzilishi:\n"
-        '{\n'
-        '  "summary": "2-3 jumlalik umumiy xulosa (o\'zbekcha)",\n'
-        '  "themes": [{"title": "qisqa mavzu nomi", "description": "mavzu izohi"}],\n'
-        '  "recommendations": ["markaz uchun qisqa amaliy tavsiya", "..."]\n'
-        '}\n\n'
-        "themes — eng ko'p takrorlanadigan asosiy mavzular. recommendations — bandlik "
-        "markazi amalga oshirishi mumkin bo'lgan qisqa harakatlar.\n\n"
-        f"Talabalar fikrlari:\n{feedback_block}"
-    )
-
-    result = generate_text(
-        prompt,
-        operation="survey_insights",
-        json_mode=True,
-        temperature=0.3,
-        max_output_tokens=4096,
-    )
-    if not result["ok"] or result["json"] is None:
-        return Response({"error": "AI javob bermadi"}, status=502)
-    return Response(result["json"])
+    `?campaign=` berilmasa — barcha kampaniyalar takliflari birgalikda (ALL_CAMPAIGNS).
+
+    GET — saqlangan natija (`computed_at`, `status`, `last_error` bilan), AI chaqirilmaydi.
+    POST (admin) — fon yangilashini navbatga qo'yadi va joriy natijani 202 bilan
+    qaytaradi (`queued`; navbatga qo'yilgan bo'lsa `status=running` — mijoz GET
+    bilan kutadi). Faqat yangi (fingerprint bo'yicha ko'rilmagan) takliflar tahlil
+    qilinadi, va faqat ular `SURVEY_INSIGHTS_MIN_NEW` dan ko'p bo'lsa;
+    `?force=true` chegarani e'tiborsiz qoldiradi. Qarang: analytics/insights.py."""
+    campaign = request.query_params.get("campaign") or ALL_CAMPAIGNS
+    if request.method == "GET":
+        return Response(insight_payload(campaign))
+    force = request.query_params.get("force", "").lower() in ("1", "true", "yes")
+    queued = request_refresh(campaign, force=force)
+    return Response({**insight_payload(campaign), "queued": queued}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,9 @@
+import django_filters
+
+from audit.models import AuditLog
+
+
+class AuditLogFilterSet(django_filters.FilterSet):
+    class Meta:
+        model = AuditLog
+        fields = ["actor_type", "actor_user", "actor_service", "action", "entity_table", "entity_id"]
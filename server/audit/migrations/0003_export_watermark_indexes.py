@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_rename_audit_audit_actor_t_8a43ba_idx_audit_audit_actor_t_d85e51_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['updated_at', 'id'], name='audit_audit_updated_4660bf_idx'),
+        ),
+    ]
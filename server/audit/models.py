@@ -42,6 +42,7 @@ class AuditLog(BaseModel):
             models.Index(fields=["action"]),
             models.Index(fields=["entity_table"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self) -> str:
@@ -70,3 +70,33 @@ def log_audit(
         created_at=timezone.now(),
         updated_at=timezone.now(),
     )
+
+
+def log_audit_bulk(
+    *,
+    actor_type: str,
+    action: str,
+    entries,
+    actor_service: Optional[str] = None,
+    meta: Optional[dict] = None,
+):
+    """`log_audit` for many entities in one INSERT; `entries` — (entity, after_data) pairs."""
+    now = timezone.now()
+    AuditLog.objects.bulk_create(
+        [
+            AuditLog(
+                actor_type=actor_type,
+                actor_service=actor_service or "",
+                action=action,
+                entity_table=entity._meta.db_table,
+                entity_id=getattr(entity, "id", None),
+                before_data={},
+                after_data=_sanitize_payload(after_data),
+                meta=_sanitize_payload(meta),
+                created_at=now,
+                updated_at=now,
+            )
+            for entity, after_data in entries
+        ],
+        batch_size=500,
+    )
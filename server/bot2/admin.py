@@ -8,6 +8,8 @@ from bot2.models import (
     StudentRoster,
     ProgramEnrollment,
     Bot2Document,
+    RosterImportJob,
+    AcademicYearRollover,
 )
 
 
@@ -116,3 +118,24 @@ class Bot2DocumentAdmin(admin.ModelAdmin):
     list_select_related = ("student",)
     search_fields = ["student__student_external_id"]
     readonly_fields = ["file_size", "mime_type", "created_at", "updated_at"]
+
+
+@admin.register(RosterImportJob)
+class RosterImportJobAdmin(ReadOnlyAdmin):
+    list_display = (
+        "created_at", "status", "source", "original_filename", "processed_rows",
+        "created_count", "updated_count", "skipped_count", "error_count", "created_by",
+    )
+    list_filter = ("status", "source")
+    list_select_related = ("created_by",)
+    exclude = ("payload",)
+
+
+@admin.register(AcademicYearRollover)
+class AcademicYearRolloverAdmin(ReadOnlyAdmin):
+    list_display = (
+        "created_at", "campaign", "academic_year", "next_academic_year",
+        "snapshot_rows", "next_year_rows", "promoted_count", "graduated_count", "created_by",
+    )
+    list_filter = ("campaign",)
+    list_select_related = ("created_by",)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from analytics.cache import bump_data_version
+from analytics.rollups import rebuild_response_days, rebuild_submission_days
+from bot2.services import backfill_employment_class
+
+
+class Command(BaseCommand):
+    help = (
+        "Bot2SurveyResponse.employment_class ni employment_status'dan qayta hisoblaydi "
+        "(chunk'lab; klassifikator qoidasi o'zgarganda yoki eski qatorlar uchun)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        changed = backfill_employment_class(chunk_size=opts["chunk_size"])
+        if changed:
+            # Kunlik bucket'lar va submission hisoblagichlari klass bo'yicha ajratilgan.
+            rebuild_response_days()
+            rebuild_submission_days()
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f"backfill_employment_class: {changed} ta qator yangilandi"))
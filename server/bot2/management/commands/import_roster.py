@@ -1,38 +1,17 @@
-import csv
 from pathlib import Path
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-from bot2.services import parse_roster_payload, bulk_upsert_roster_rows
-
-
-def _iter_xlsx(path: str):
-    import openpyxl
-    from bot2.views import _normalize_row
-
-    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    ws = wb.active
-    it = ws.iter_rows(values_only=True)
-    headers = list(next(it, []))
-    for values in it:
-        if all(v is None for v in values):
-            continue
-        yield _normalize_row(dict(zip(headers, values)))
-    wb.close()
-
-
-def _iter_csv(path: str):
-    from bot2.views import _normalize_row
-
-    # utf-8-sig BOM'ni olib tashlaydi; muvaffaqiyatsiz bo'lsa cp1251 (Excel legacy).
-    try:
-        with open(path, newline="", encoding="utf-8-sig") as f:
-            rows = [_normalize_row(r) for r in csv.DictReader(f)]
-    except UnicodeDecodeError:
-        with open(path, newline="", encoding="cp1251") as f:
-            rows = [_normalize_row(r) for r in csv.DictReader(f)]
-    yield from rows
+from bot2.models import RosterImportJob
+from bot2.roster_import import (
+    copy_loader_available,
+    is_xlsx,
+    iter_csv_rows,
+    iter_xlsx_rows,
+    run_roster_import,
+    xlsx_row_estimate,
+)
 
 
 class Command(BaseCommand):
@@ -40,34 +19,65 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--file", required=True, help="Path to CSV or .xlsx file")
+        parser.add_argument(
+            "--loader",
+            choices=["auto", "orm", "copy"],
+            default="auto",
+            help="copy: PostgreSQL COPY into a staging table + one merge; orm: chunked "
+                 "bulk upsert; auto: copy for files above ROSTER_IMPORT_COPY_MIN_BYTES on PostgreSQL.",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=RosterImportJob.Mode.values,
+            default=RosterImportJob.Mode.UPSERT,
+            help="mirror: deactivate active rosters of --campaign that are absent from the file.",
+        )
+        parser.add_argument("--campaign", default="default", help="Campaign mirrored by --mode mirror.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the diff; write nothing.")
 
     def handle(self, *args, **options):
         file_path = options["file"]
-        suffix = Path(file_path).suffix.lower()
-        rows = _iter_xlsx(file_path) if suffix in (".xlsx", ".xls") else _iter_csv(file_path)
-
-        # Bir xil robust parsing + partiyali upsert (API import bilan izchil):
-        # ID'siz qatorlar (statistika jadvali qoldiqlari) o'tkazib yuboriladi,
-        # program qidiruvlari keshlanadi, yozuv bitta partiyada.
-        program_cache: dict = {}
-        valid: list = []
-        skipped = errors = 0
-        for idx, row in enumerate(rows, start=1):
-            if not str(row.get("student_external_id") or "").strip():
-                skipped += 1
-                continue
-            try:
-                valid.append(parse_roster_payload(row, program_cache=program_cache))
-            except Exception as exc:
-                errors += 1
-                self.stderr.write(f"Row {idx}: {exc}")
+        loader = options["loader"]
+        if loader == "copy" and not copy_loader_available():
+            raise CommandError("--loader copy requires PostgreSQL.")
+        if loader == "copy" and options["dry_run"]:
+            raise CommandError("--dry-run is computed by the ORM loader; use --loader orm or auto.")
+        if options["dry_run"]:
+            loader = "orm"
+        elif loader == "auto":
+            # SQLite va kichik fayllar — ORM yo'li; COPY faqat katta sinxronlarda o'zini oqlaydi.
+            large = Path(file_path).stat().st_size >= settings.ROSTER_IMPORT_COPY_MIN_BYTES
+            loader = "copy" if large and copy_loader_available() else "orm"
 
-        with transaction.atomic():
-            result = bulk_upsert_roster_rows(valid) if valid else {}
-        created = sum(1 for _, was_created in result.values() if was_created)
-        updated = sum(1 for _, was_created in result.values() if not was_created)
+        # API import bilan bir xil yo'l (bot2/roster_import.py): fayl oqim
+        # sifatida o'qiladi, ID'siz qatorlar o'tkazib yuboriladi, yozuv
+        # ROSTER_IMPORT_CHUNK_SIZE qatorli tranzaksiyalarda; natija job'da.
+        with open(file_path, "rb") as f:
+            xlsx = is_xlsx(file_path)
+            job = RosterImportJob.objects.create(
+                source=RosterImportJob.Source.FILE,
+                original_filename=Path(file_path).name,
+                total_rows=xlsx_row_estimate(f) if xlsx else None,
+                mode=options["mode"],
+                campaign=options["campaign"] if options["mode"] == RosterImportJob.Mode.MIRROR else "",
+                dry_run=options["dry_run"],
+            )
+            run_roster_import(job.pk, rows=iter_xlsx_rows(f) if xlsx else iter_csv_rows(f), loader=loader)
 
+        job.refresh_from_db()
+        for err in job.errors.order_by("row", "id").iterator():
+            self.stderr.write(f"Row {err.row}: {err.error}")
+        if job.status == RosterImportJob.Status.FAILED:
+            self.stderr.write(self.style.ERROR(
+                f"Import failed after {job.processed_rows} rows: {job.last_error}"
+            ))
+            return
         self.stdout.write(self.style.SUCCESS(
-            f"Import completed. Created: {created}, Updated: {updated}, "
-            f"Skipped: {skipped}, Errors: {errors}"
+            f"{'Dry run' if job.dry_run else 'Import'} completed. Created: {job.created_count}, "
+            f"Updated: {job.updated_count}, Unchanged: {job.unchanged_count}, "
+            f"Deactivated: {job.deactivated_count}, Skipped: {job.skipped_count}, Errors: {job.error_count}"
         ))
+        if job.dry_run:
+            for kind, entries in (job.samples or {}).items():
+                for entry in entries:
+                    self.stdout.write(f"  {kind}: {entry}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from bot2.models import Bot2SurveyResponse
+from bot2.services import refresh_doc_status
+
+
+class Command(BaseCommand):
+    help = (
+        "Bot2SurveyResponse.doc_status / employment_doc_status ni DocumentVerification'lardan "
+        "qayta hisoblaydi (chunk'lab; faqat o'zgargan qatorlar yoziladi)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaign", help="Faqat shu kampaniya so'rovnomalari.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        surveys = Bot2SurveyResponse.objects.all()
+        if opts["campaign"]:
+            surveys = surveys.filter(survey_campaign=opts["campaign"])
+        changed = refresh_doc_status(surveys, chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"rebuild_doc_status: {changed} ta qator yangilandi"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from bot2.services import rebuild_latest_surveys
+
+
+class Command(BaseCommand):
+    help = (
+        "Bot2LatestSurvey read-model'ini Bot2SurveyResponse jadvalidan qayta quradi "
+        "(backfill yoki nomuvofiqlikni tuzatish uchun)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--student",
+            action="append",
+            dest="students",
+            help="Faqat shu Bot2Student id(lar)i uchun qayta qurish (takrorlash mumkin).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        written = rebuild_latest_surveys(opts["students"], chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"rebuild_latest_surveys: {written} ta qator yozildi"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bot2.search import refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Bot2Student.search_document (dashboard ?search= hujjati) ni talaba va uning "
+        "akkauntlaridan qayta quradi (chunk'lab; faqat o'zgargan qatorlar yoziladi)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        changed = refresh_search_documents(chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"rebuild_search_documents: {changed} ta talaba yangilandi"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bot2.rollover import rollover_academic_year, rollover_payload
+from common.exceptions import APIError
+
+
+class Command(BaseCommand):
+    help = (
+        "O'quv yilini yopadi: roster sonlari yopilayotgan yil ProgramEnrollment'iga "
+        "yoziladi, faol rosterlar bitta UPDATE bilan keyingi kursga o'tkaziladi "
+        "(4 → 5 bitiruvchi). (campaign, academic_year) uchun bir marta bajariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--academic-year", required=True, help="Closing academic year, e.g. 2025-2026")
+        parser.add_argument("--campaign", default="default")
+        parser.add_argument("--next-academic-year", default=None, help="Defaults to the following year")
+
+    def handle(self, *args, **opts):
+        try:
+            record, performed = rollover_academic_year(
+                opts["campaign"], opts["academic_year"], next_year=opts["next_academic_year"],
+            )
+        except APIError as exc:
+            raise CommandError(str(exc.detail))
+        data = rollover_payload(record)
+        if not performed:
+            self.stdout.write(self.style.WARNING(
+                f"rollover_academic_year: {record} allaqachon bajarilgan ({data['created_at']}) — o'zgarish yo'q"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"rollover_academic_year: {record}; snapshot: {data['snapshot_rows']} katak, "
+            f"keyingi yil: {data['next_year_rows']} yangi katak, ko'tarildi: {data['promoted']} "
+            f"(bitiruvchi: {data['graduated']})"
+        ))
@@ -0,0 +1,68 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_latest_surveys(apps, schema_editor):
+    """Mavjud so'rovnomalardan read-model'ni to'ldiradi (bot2.services.rebuild_latest_surveys
+    bilan bir xil algoritm: talaba bo'yicha guruhlangan, eng yangisi birinchi)."""
+    Bot2SurveyResponse = apps.get_model('bot2', 'Bot2SurveyResponse')
+    Bot2LatestSurvey = apps.get_model('bot2', 'Bot2LatestSurvey')
+    rows = (
+        Bot2SurveyResponse.objects.order_by(
+            'student_id', F('submitted_at').desc(nulls_last=True), '-created_at', '-id'
+        )
+        .values_list('id', 'student_id', 'survey_campaign', 'submitted_at')
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    current_student = None
+    seen = set()
+    for survey_id, student_id, campaign, submitted_at in rows:
+        if student_id != current_student:
+            current_student = student_id
+            seen = set()
+        if campaign in seen:
+            continue
+        batch.append(Bot2LatestSurvey(
+            student_id=student_id, survey_campaign=campaign, survey_id=survey_id,
+            submitted_at=submitted_at, is_student_latest=not seen,
+        ))
+        seen.add(campaign)
+        if len(batch) >= 2000:
+            Bot2LatestSurvey.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Bot2LatestSurvey.objects.bulk_create(batch)
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0020_bot2document_survey_session_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bot2LatestSurvey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('survey_campaign', models.CharField(max_length=64)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_student_latest', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_surveys', to='bot2.bot2student')),
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='latest_marker', to='bot2.bot2surveyresponse')),
+            ],
+            options={
+                'ordering': ('student', 'survey_campaign'),
+                'indexes': [models.Index(fields=['survey_campaign', 'submitted_at'], name='bot2_bot2la_survey__4ecf68_idx'), models.Index(fields=['is_student_latest'], name='bot2_bot2la_is_stud_ddf935_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'survey_campaign'), name='uq_latest_survey_student_campaign')],
+            },
+        ),
+        migrations.RunPython(backfill_latest_surveys, noop_reverse),
+    ]
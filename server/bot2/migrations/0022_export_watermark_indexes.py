@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0021_bot2latestsurvey'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bot2student',
+            index=models.Index(fields=['updated_at', 'id'], name='bot2_bot2st_updated_2f0855_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bot2surveyresponse',
+            index=models.Index(fields=['updated_at', 'id'], name='bot2_bot2su_updated_3f5c20_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentroster',
+            index=models.Index(fields=['updated_at', 'id'], name='bot2_studen_updated_83346e_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models, transaction
+from django.utils import timezone
+
+# bot2.models.classify_employment_status'ning shu paytdagi nusxasi — migratsiya
+# keyingi o'zgarishlardan qat'i nazar bir xil natija berishi uchun.
+_EMPLOYED_MARKERS = ('ishlayapman', 'ишлаяпман')
+
+
+def classify_employment_status(value):
+    status = (value or '').strip().lower()
+    if not status:
+        return 'unknown'
+    if status == 'employed' or any(marker in status for marker in _EMPLOYED_MARKERS):
+        return 'employed'
+    return 'unemployed'
+
+
+def backfill_employment_class(apps, schema_editor):
+    """Mavjud so'rovnomalarni klassifikatsiya qiladi: pk bo'yicha chunk'lar, har
+    biri alohida qisqa tranzaksiya, faqat klassi o'zgargan qatorlar yoziladi."""
+    Bot2SurveyResponse = apps.get_model('bot2', 'Bot2SurveyResponse')
+    last_pk = None
+    while True:
+        chunk = Bot2SurveyResponse.objects.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', 'employment_status', 'employment_class')[:2000])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        by_class = {}
+        for pk, status, current in rows:
+            new = classify_employment_status(status)
+            if new != current:
+                by_class.setdefault(new, []).append(pk)
+        with transaction.atomic():
+            now = timezone.now()
+            for employment_class, pks in by_class.items():
+                Bot2SurveyResponse.objects.filter(pk__in=pks).update(
+                    employment_class=employment_class, updated_at=now
+                )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0022_export_watermark_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot2surveyresponse',
+            name='employment_class',
+            field=models.CharField(choices=[('employed', 'Employed'), ('unemployed', 'Unemployed'), ('unknown', 'Unknown')], db_index=True, default='unknown', max_length=16),
+        ),
+        migrations.RunPython(backfill_employment_class, noop_reverse),
+    ]
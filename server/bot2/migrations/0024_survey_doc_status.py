@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:47
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, CharField, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+
+def _doc_status_case(DocumentVerification, **doc_filter):
+    """So'rovnoma holati uning tekshiruvlari bo'yicha: so'rovnomaga bog'langan
+    hujjatlarniki va talabaning manba hujjatsiz (dashboard) tekshiruvlari."""
+    match = (
+        Q(source_document__survey=OuterRef('pk'))
+        | Q(source_document__isnull=True, student=OuterRef('student'))
+    )
+
+    def has(decision):
+        return Exists(DocumentVerification.objects.filter(match, final_decision=decision, **doc_filter))
+
+    return Case(
+        When(has('accepted'), then=Value('verified')),
+        When(has('pending'), then=Value('pending')),
+        When(has('rejected'), then=Value('rejected')),
+        default=Value('no_docs'),
+        output_field=CharField(),
+    )
+
+
+def backfill_doc_status(apps, schema_editor):
+    """Mavjud so'rovnomalar uchun hujjat holatini hisoblaydi (bot2.services.refresh_doc_status
+    bilan bir xil algoritm: pk bo'yicha chunk'lar, faqat o'zgargan qatorlar yoziladi)."""
+    Bot2SurveyResponse = apps.get_model('bot2', 'Bot2SurveyResponse')
+    DocumentVerification = apps.get_model('ai_verification', 'DocumentVerification')
+    last_pk = None
+    while True:
+        chunk = Bot2SurveyResponse.objects.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(
+            chunk.annotate(
+                new_doc=_doc_status_case(DocumentVerification),
+                new_employment=_doc_status_case(DocumentVerification, document_type='employment'),
+            ).values_list('pk', 'doc_status', 'employment_doc_status', 'new_doc', 'new_employment')[:2000]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        by_status = {}
+        for pk, doc, employment, new_doc, new_employment in rows:
+            if (doc, employment) != (new_doc, new_employment):
+                by_status.setdefault((new_doc, new_employment), []).append(pk)
+        with transaction.atomic():
+            now = timezone.now()
+            for (doc, employment), pks in by_status.items():
+                Bot2SurveyResponse.objects.filter(pk__in=pks).update(
+                    doc_status=doc, employment_doc_status=employment, updated_at=now
+                )
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_verification', '0004_alter_documentverification_document_type_and_more'),
+        ('bot2', '0023_bot2surveyresponse_employment_class'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot2surveyresponse',
+            name='doc_status',
+            field=models.CharField(choices=[('verified', 'Verified'), ('pending', 'Pending'), ('rejected', 'Rejected'), ('no_docs', 'No documents')], default='no_docs', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='bot2surveyresponse',
+            name='employment_doc_status',
+            field=models.CharField(choices=[('verified', 'Verified'), ('pending', 'Pending'), ('rejected', 'Rejected'), ('no_docs', 'No documents')], default='no_docs', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='bot2surveyresponse',
+            index=models.Index(fields=['doc_status', 'submitted_at'], name='bot2_bot2su_doc_sta_460660_idx'),
+        ),
+        migrations.RunPython(backfill_doc_status, noop_reverse),
+    ]
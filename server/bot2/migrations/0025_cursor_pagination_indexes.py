@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0024_survey_doc_status'),
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bot2surveyresponse',
+            name='bot2_bot2su_submitt_f8b20f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bot2student',
+            index=models.Index(fields=['created_at', 'id'], name='bot2_bot2st_created_46e9f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bot2surveyresponse',
+            index=models.Index(fields=['submitted_at', 'id'], name='bot2_bot2su_submitt_42c9fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bot2surveyresponse',
+            index=models.Index(fields=['created_at', 'id'], name='bot2_bot2su_created_817a50_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentroster',
+            index=models.Index(fields=['created_at', 'id'], name='bot2_studen_created_65464f_idx'),
+        ),
+    ]
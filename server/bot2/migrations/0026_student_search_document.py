@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:00
+
+from django.db import migrations, models
+from django.db.models import Prefetch
+
+
+# bot2.models'dagi qidiruv hujjati qurilishining shu paytdagi nusxasi.
+STUDENT_SEARCH_FIELDS = ('student_external_id', 'username', 'first_name', 'last_name', 'phone', 'telegram_user_id')
+ACCOUNT_SEARCH_FIELDS = ('username', 'first_name', 'last_name', 'phone', 'telegram_user_id')
+_APOSTROPHES = str.maketrans({'ʻ': "'", 'ʼ': "'", '‘': "'", '’': "'", '`': "'", '´': "'"})
+
+
+def normalize_search_text(value):
+    return ' '.join(str(value or '').translate(_APOSTROPHES).casefold().split())
+
+
+def build_search_document(student, accounts):
+    parts = []
+    sources = [(student, STUDENT_SEARCH_FIELDS), *((account, ACCOUNT_SEARCH_FIELDS) for account in accounts)]
+    for obj, fields in sources:
+        for field in fields:
+            text = normalize_search_text(getattr(obj, field))
+            if text:
+                parts.append(text)
+                if field == 'phone':
+                    parts.append(''.join(ch for ch in text if ch.isdigit()))
+    return ' '.join(dict.fromkeys(part for part in parts if part))
+
+
+def backfill_search_document(apps, schema_editor):
+    """Mavjud talabalar uchun qidiruv hujjati (bot2.search.refresh_search_documents
+    bilan bir xil yo'l: pk bo'yicha chunk'lar, faqat o'zgargan qatorlar yoziladi)."""
+    Bot2Student = apps.get_model('bot2', 'Bot2Student')
+    Bot2StudentAccount = apps.get_model('bot2', 'Bot2StudentAccount')
+    students = Bot2Student.objects.only('search_document', *STUDENT_SEARCH_FIELDS).prefetch_related(
+        Prefetch('accounts', queryset=Bot2StudentAccount.objects.only('student_id', *ACCOUNT_SEARCH_FIELDS))
+    ).order_by('pk')
+    last_pk = None
+    while True:
+        chunk = students if last_pk is None else students.filter(pk__gt=last_pk)
+        rows = list(chunk[:2000])
+        if not rows:
+            return
+        last_pk = rows[-1].pk
+        stale = []
+        for student in rows:
+            document = build_search_document(student, student.accounts.all())
+            if document != student.search_document:
+                student.search_document = document
+                stale.append(student)
+        if stale:
+            Bot2Student.objects.bulk_update(stale, ['search_document'], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    # ?search= LIKE '%term%' uchun; SQLite'da indeks yo'q (oddiy skan).
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS bot2_student_search_trgm_idx "
+        "ON bot2_bot2student USING gin (search_document gin_trgm_ops);"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS bot2_student_search_trgm_idx;")
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0025_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot2student',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, noop_reverse),
+        migrations.RunPython(create_trigram_index, reverse_code=drop_trigram_index),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0027_roster_import_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='campaign',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='deactivated_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='dry_run',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='mode',
+            field=models.CharField(choices=[('upsert', 'Upsert'), ('mirror', 'Mirror')], default='upsert', max_length=8),
+        ),
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='samples',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rosterimportjob',
+            name='unchanged_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentroster',
+            name='import_fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='RosterImportKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_external_id', models.CharField(max_length=100)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keys', to='bot2.rosterimportjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'student_external_id'], name='bot2_roster_job_id_60a72b_idx')],
+            },
+        ),
+    ]
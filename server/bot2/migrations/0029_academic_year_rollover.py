@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0028_roster_import_fingerprint_mirror'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcademicYearRollover',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('campaign', models.CharField(max_length=64)),
+                ('academic_year', models.CharField(help_text="Yopilayotgan o'quv yili, masalan 2025-2026", max_length=20)),
+                ('next_academic_year', models.CharField(max_length=20)),
+                ('snapshot_rows', models.PositiveIntegerField(default=0)),
+                ('next_year_rows', models.PositiveIntegerField(default=0)),
+                ('promoted_count', models.PositiveIntegerField(default=0)),
+                ('graduated_count', models.PositiveIntegerField(default=0)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='academic_year_rollovers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'academic_year'), name='uniq_rollover_campaign_year')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot2', '0029_academic_year_rollover'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bot2studentaccount',
+            index=models.Index(fields=['updated_at'], name='bot2_bot2st_updated_3d15aa_idx'),
+        ),
+    ]
@@ -1,10 +1,71 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 
 from catalog.models import CatalogItem
-from common.models import BaseModel
+from common.models import BaseModel, clean_in_memory
+
+
+class EmploymentClass(models.TextChoices):
+    EMPLOYED = "employed", "Employed"
+    UNEMPLOYED = "unemployed", "Unemployed"
+    UNKNOWN = "unknown", "Unknown"
+
+
+class DocStatus(models.TextChoices):
+    """Hujjat tekshiruvi holati (ustuvorlik: verified > pending > rejected > no_docs)."""
+    VERIFIED = "verified", "Verified"
+    PENDING = "pending", "Pending"
+    REJECTED = "rejected", "Rejected"
+    NO_DOCS = "no_docs", "No documents"
+
+
+# Bandlik belgisi: "employed" — "unemployed" ning qism-satri, shuning uchun ingliz
+# qiymati aniq tekshiriladi; uz/ru markerlari qism-satr sifatida to'qnashmaydi.
+_EMPLOYED_MARKERS = ("ishlayapman", "ишлаяпман")
+
+
+def classify_employment_status(value: str | None) -> str:
+    """Erkin matnli `employment_status` → EmploymentClass (yagona qoida).
+
+    Bo'sh — unknown; "employed" yoki uz/ru "ishlayapman" markeri — employed;
+    qolgan har qanday javob — unemployed.
+    """
+    status = (value or "").strip().lower()
+    if not status:
+        return EmploymentClass.UNKNOWN
+    if status == "employed" or any(marker in status for marker in _EMPLOYED_MARKERS):
+        return EmploymentClass.EMPLOYED
+    return EmploymentClass.UNEMPLOYED
+
+
+# Talaba qidiruv hujjati (Bot2Student.search_document) tarkibi.
+STUDENT_SEARCH_FIELDS = ("student_external_id", "username", "first_name", "last_name", "phone", "telegram_user_id")
+ACCOUNT_SEARCH_FIELDS = ("username", "first_name", "last_name", "phone", "telegram_user_id")
+# O'zbek lotin yozuvidagi o'/g' apostrof variantlari bitta belgiga keltiriladi.
+_APOSTROPHES = str.maketrans({"ʻ": "'", "ʼ": "'", "‘": "'", "’": "'", "`": "'", "´": "'"})
+
+
+def normalize_search_text(value) -> str:
+    """Qidiruv uchun matn: kichik harf, apostroflar bir xil, ortiqcha bo'shliqsiz."""
+    return " ".join(str(value or "").translate(_APOSTROPHES).casefold().split())
+
+
+def build_search_document(student, accounts=()) -> str:
+    """Talabaning qidiriladigan matni: ID, ism-familiya, username, telefonlar va
+    Telegram ID'lari (o'zi + barcha akkauntlari). Telefonning faqat raqamli
+    shakli ham qo'shiladi ("+998 90 ..." ham, "99890..." ham topiladi)."""
+    parts = []
+    sources = [(student, STUDENT_SEARCH_FIELDS), *((account, ACCOUNT_SEARCH_FIELDS) for account in accounts)]
+    for obj, fields in sources:
+        for field in fields:
+            text = normalize_search_text(getattr(obj, field))
+            if text:
+                parts.append(text)
+                if field == "phone":
+                    parts.append("".join(ch for ch in text if ch.isdigit()))
+    return " ".join(dict.fromkeys(part for part in parts if part))
 
 
 class StudentRoster(BaseModel):
@@ -28,6 +89,9 @@ class StudentRoster(BaseModel):
     is_active = models.BooleanField(default=True)
     birth_date = models.DateField(null=True, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
+    # Oxirgi qo'llangan import qatorining izi (services.roster_fingerprint); save()
+    # va importdan tashqari UPDATE'lar uni tozalaydi — teng iz = qator o'zgarmagan.
+    import_fingerprint = models.CharField(max_length=40, blank=True, default="", editable=False)
 
     class Meta:
         ordering = ("student_external_id",)
@@ -36,6 +100,10 @@ class StudentRoster(BaseModel):
             models.Index(fields=["course_year"]),
             models.Index(fields=["is_active"]),
             models.Index(fields=["roster_campaign"]),
+            # /export/roster.ndjson?updated_since= watermark skani.
+            models.Index(fields=["updated_at", "id"]),
+            # ?cursor=&ordering=created_at keyset sahifalash.
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self) -> str:
@@ -49,11 +117,74 @@ class StudentRoster(BaseModel):
                 "program must reference a catalog item with type=program or direction."
             )
 
+    _COVERAGE_FIELDS = ("is_active", "roster_campaign", "program_id", "course_year")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        # Coverage rollup deltasi uchun yuklangan holat (deferred maydon bo'lsa — None).
+        if all(f in loaded for f in cls._COVERAGE_FIELDS):
+            instance._coverage_cell = tuple(loaded[f] for f in cls._COVERAGE_FIELDS)
+        return instance
+
+    def _current_coverage_cell(self) -> tuple:
+        return tuple(getattr(self, f) for f in self._COVERAGE_FIELDS)
+
     def save(self, *args, **kwargs):
         # Enforce clean() on every write path (admin CRUD + bot auto-create),
         # not only the roster-import path which called full_clean() explicitly.
         self.full_clean()
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        # Import'dan tashqari yozuv — keyingi import qatorni qayta solishtirsin.
+        self.import_fingerprint = ""
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "import_fingerprint"}
+        result = super().save(*args, **kwargs)
+        self._sync_coverage(None if adding else getattr(self, "_coverage_cell", False))
+        return result
+
+    def delete(self, *args, **kwargs):
+        old = getattr(self, "_coverage_cell", None) or self._current_coverage_cell()
+        from analytics.rollups import (
+            bump_roster_total,
+            latest_responses,
+            shift_response_days,
+            student_counts,
+            submission_counts,
+            subtract_counts,
+            subtract_submissions,
+        )
+        # Kaskad talabalar/so'rovnomalar/verification'larni save/delete hook'larisiz o'chiradi.
+        with transaction.atomic():
+            counts = student_counts(self.students.values_list("pk", flat=True))
+            surveys = Bot2SurveyResponse.objects.filter(Q(roster=self) | Q(student__roster=self))
+            responders = latest_responses(surveys)
+            submissions = submission_counts(surveys)
+            result = super().delete(*args, **kwargs)
+            if old[0]:
+                bump_roster_total(old[1], old[2], old[3], -1)
+            subtract_counts(counts)
+            shift_response_days(responders, ())
+            subtract_submissions(submissions)
+        return result
+
+    def _sync_coverage(self, old) -> None:
+        """Move this roster between CoverageTotal cells (old → new state)."""
+        from analytics.rollups import bump_roster_total, refresh_roster_totals
+
+        new = self._current_coverage_cell()
+        self._coverage_cell = new
+        if old is False:
+            # Oldingi holat noma'lum (bulk_create/deferred) — kampaniyani qayta sanaymiz.
+            refresh_roster_totals([self.roster_campaign])
+            return
+        if old == new:
+            return
+        if old and old[0]:
+            bump_roster_total(old[1], old[2], old[3], -1)
+        if new[0]:
+            bump_roster_total(new[1], new[2], new[3], 1)
 
 
 class Bot2Student(BaseModel):
@@ -101,21 +232,63 @@ class Bot2Student(BaseModel):
     # {"skills": [...], "languages": [...], "experience_summary": "...", "level": "..."}
     ai_skills = models.JSONField(default=dict, blank=True)
     ai_skills_at = models.DateTimeField(null=True, blank=True)
+    # ?search= uchun qidiruv hujjati (build_search_document; PostgreSQL'da trigram
+    # GIN indeksi, migratsiya 0026). save() va akkaunt save/delete yangilaydi,
+    # bulk yo'llar — bot2.search.refresh_search_documents.
+    search_document = models.TextField(blank=True, default="", editable=False)
 
     class Meta:
         ordering = ("student_external_id",)
         # No explicit single-field indexes: student_external_id and telegram_user_id
         # are unique=True, which already creates an index for each.
+        indexes = [
+            # /export/students.ndjson?updated_since= watermark skani.
+            models.Index(fields=["updated_at", "id"]),
+            # ?cursor=&ordering=created_at keyset sahifalash.
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def clean(self):
         # Region validation
         if self.region and self.region.type != CatalogItem.ItemType.REGION:
             raise ValidationError("region must reference a catalog item with type=region.")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, prevalidated=False, **kwargs):
+        # prevalidated=True: submit_survey FK/unique'ni o'zi ta'minlaydi (query budget).
+        if prevalidated:
+            clean_in_memory(self)
+        else:
+            self.full_clean()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(STUDENT_SEARCH_FIELDS):
+            accounts = () if self._state.adding else self.accounts.all()
+            self.search_document = build_search_document(self, accounts)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_document"}
         return super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        # Kaskad (so'rovnomalar, verification'lar) hook'larsiz — stat hisoblagichlari,
+        # javob berganlar bucket'lari va kunlik submission'lar shu yerda.
+        from analytics.rollups import (
+            latest_responses,
+            shift_response_days,
+            student_counts,
+            submission_counts,
+            subtract_counts,
+            subtract_submissions,
+        )
+        with transaction.atomic():
+            counts = student_counts([self.pk])
+            surveys = Bot2SurveyResponse.objects.filter(student=self)
+            responders = latest_responses(surveys)
+            submissions = submission_counts(surveys)
+            result = super().delete(*args, **kwargs)
+            subtract_counts(counts)
+            shift_response_days(responders, ())
+            subtract_submissions(submissions)
+        return result
+
     def __str__(self) -> str:
         return f"Bot2 Student {self.student_external_id}"
 
@@ -144,8 +317,33 @@ class Bot2StudentAccount(BaseModel):
         ordering = ("-last_seen_at", "-created_at")
         indexes = [
             models.Index(fields=["student", "is_active"]),
+            # /surveys ro'yxati ETag'idagi Max(updated_at) watermark'i.
+            models.Index(fields=["updated_at"]),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Qayta bog'lashda eski talabaning qidiruv hujjati ham yangilanadi.
+        instance._db_student_id = dict(zip(field_names, values)).get("student_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & {*ACCOUNT_SEARCH_FIELDS, "student"}:
+            from bot2.search import refresh_search_documents
+            refresh_search_documents({self.student_id, getattr(self, "_db_student_id", None)} - {None})
+        self._db_student_id = self.student_id
+        return result
+
+    def delete(self, *args, **kwargs):
+        student_id = self.student_id
+        result = super().delete(*args, **kwargs)
+        from bot2.search import refresh_search_documents
+        refresh_search_documents([student_id])
+        return result
+
     def __str__(self) -> str:
         flag = "" if self.is_active else " (inactive)"
         return f"Account tg={self.telegram_user_id} → {self.student.student_external_id}{flag}"
@@ -186,8 +384,17 @@ class Bot2SurveyResponse(BaseModel):
         default="survey",
     )
     employment_status = models.CharField(max_length=100, blank=True)
+    # employment_status'dan save() da hisoblanadi (classify_employment_status);
+    # analytics shu ustun bo'yicha tenglik bilan guruhlaydi.
+    employment_class = models.CharField(
+        max_length=16, choices=EmploymentClass.choices, default=EmploymentClass.UNKNOWN, db_index=True
+    )
     employment_company = models.CharField(max_length=255, blank=True)
     employment_role = models.CharField(max_length=255, blank=True)
+    # DocumentVerification'lardan saqlanadigan holat (bot2.services.refresh_doc_status):
+    # doc_status — istalgan turdagi hujjat, employment_doc_status — faqat ish joyi hujjati.
+    doc_status = models.CharField(max_length=16, choices=DocStatus.choices, default=DocStatus.NO_DOCS)
+    employment_doc_status = models.CharField(max_length=16, choices=DocStatus.choices, default=DocStatus.NO_DOCS)
     suggestions = models.TextField(blank=True)
     consents = models.JSONField(default=dict, blank=True)
     answers = models.JSONField(default=dict, blank=True)
@@ -204,10 +411,18 @@ class Bot2SurveyResponse(BaseModel):
         ]
         indexes = [
             models.Index(fields=["survey_campaign"]),
-            models.Index(fields=["submitted_at"]),
+            # submitted_at oralig'i filtri + ?cursor= keyset sahifalash (submitted_at, id).
+            models.Index(fields=["submitted_at", "id"]),
+            models.Index(fields=["created_at", "id"]),
             models.Index(fields=["roster", "survey_campaign"]),
+            # /export/surveys.ndjson?updated_since= watermark skani.
+            models.Index(fields=["updated_at", "id"]),
+            # ?doc_status= filtri + default tartib (-submitted_at).
+            models.Index(fields=["doc_status", "submitted_at"]),
         ]
 
+    _SUBMISSION_FIELDS = ("survey_campaign", "submitted_at", "program_id", "course_year", "employment_class")
+
     def clean(self):
         if self.roster and self.student and self.student.roster_id != self.roster_id:
             raise ValidationError("Survey roster must match student's roster.")
@@ -217,14 +432,85 @@ class Bot2SurveyResponse(BaseModel):
         if self.roster and self.course_year and self.roster.course_year and self.roster.course_year != self.course_year:
             raise ValidationError("Survey course_year must match roster course_year.")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rollup: qayta saqlashda oldingi klass bucket'dan chiqariladi.
+        instance._db_employment_class = dict(zip(field_names, values)).get("employment_class")
+        # SubmissionDay deltasi uchun yuklangan katak (deferred maydon bo'lsa — yo'q).
+        if all(f in field_names for f in cls._SUBMISSION_FIELDS):
+            from analytics.rollups import submission_cell
+            instance._submission_cell = submission_cell(instance)
+        return instance
+
+    def save(self, *args, prevalidated=False, **kwargs):
+        self.employment_class = classify_employment_status(self.employment_status)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "employment_status" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "employment_class"}
+        # prevalidated=True: FK/unique tekshiruvi DB cheklovlariga qoldiriladi
+        # (idempotency_key poygasi IntegrityError bo'lib chiqadi).
+        if prevalidated:
+            clean_in_memory(self)
+        else:
+            self.full_clean()
+        adding = self._state.adding
+        result = super().save(*args, **kwargs)
+        # Read-model'ni (Bot2LatestSurvey) shu tranzaksiyada yangilaymiz — har bir
+        # yozish yo'li (submit_survey, seed buyruqlari, admin) qamrab olinadi.
+        from analytics.rollups import record_submission, submission_cell
+        from bot2.services import record_latest_survey
+        record_latest_survey(self)
+        self._db_employment_class = self.employment_class
+        cell = submission_cell(self)
+        if adding or hasattr(self, "_submission_cell"):
+            record_submission(None if adding else self._submission_cell, cell)
+        self._submission_cell = cell
+        return result
 
     def __str__(self) -> str:
         return f"Survey {self.survey_campaign} for {self.student}"
 
 
+class Bot2LatestSurvey(models.Model):
+    """Read model: each student's latest survey per campaign.
+
+    Append-only `Bot2SurveyResponse` grows every campaign; analytics only needs the
+    latest row per student. One row per (student, survey_campaign) is maintained in
+    the same transaction as the survey insert (see `record_latest_survey`), so
+    "latest per student" reads cost O(students), not O(survey rows).
+    `is_student_latest` marks the student's latest row across all campaigns.
+    Rebuild with `manage.py rebuild_latest_surveys`.
+    """
+
+    student = models.ForeignKey(
+        Bot2Student, on_delete=models.CASCADE, related_name="latest_surveys"
+    )
+    survey_campaign = models.CharField(max_length=64)
+    survey = models.OneToOneField(
+        Bot2SurveyResponse, on_delete=models.CASCADE, related_name="latest_marker"
+    )
+    # Denormalized from `survey` so time-range filters stay on this table's index.
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    is_student_latest = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("student", "survey_campaign")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "survey_campaign"], name="uq_latest_survey_student_campaign"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["survey_campaign", "submitted_at"]),
+            models.Index(fields=["is_student_latest"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Latest {self.survey_campaign} survey for {self.student_id}"
+
+
 class Bot2Document(BaseModel):
     class DocType(models.TextChoices):
         CV = "cv", "CV"
@@ -255,6 +541,14 @@ class Bot2Document(BaseModel):
     class Meta:
         ordering = ("-created_at",)
 
+    def delete(self, *args, **kwargs):
+        # Verification'lar source_document=NULL bo'lib talaba darajasiga o'tadi.
+        student_id = self.student_id
+        result = super().delete(*args, **kwargs)
+        from bot2.services import refresh_doc_status
+        refresh_doc_status(Bot2SurveyResponse.objects.filter(student_id=student_id))
+        return result
+
     def __str__(self) -> str:
         return f"{self.doc_type} — {self.student.student_external_id}"
 
@@ -301,6 +595,155 @@ class ProgramEnrollment(BaseModel):
     def __str__(self) -> str:
         return f"{self.program.name} - {self.course_year}-kurs: {self.student_count}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._coverage_key = (loaded.get("campaign"), loaded.get("academic_year"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        self._sync_coverage()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._sync_coverage()
+        return result
+
+    def _sync_coverage(self) -> None:
+        """Recompute the CoverageTotal slice(s) this row belongs (belonged) to."""
+        from analytics.rollups import refresh_enrollment_totals
+
+        new = (self.campaign, self.academic_year)
+        old = getattr(self, "_coverage_key", None)
+        refresh_enrollment_totals(*new)
+        if old and None not in old and old != new:
+            refresh_enrollment_totals(*old)
+        self._coverage_key = new
+
+
+class AcademicYearRollover(BaseModel):
+    """One academic-year change of a roster campaign (`bot2.rollover`): closing
+    year's ProgramEnrollment snapshot + course_year promotion. Unique per
+    (campaign, academic_year), so a repeated rollover is a no-op."""
+
+    campaign = models.CharField(max_length=64)
+    academic_year = models.CharField(max_length=20, help_text="Yopilayotgan o'quv yili, masalan 2025-2026")
+    next_academic_year = models.CharField(max_length=20)
+    snapshot_rows = models.PositiveIntegerField(default=0)
+    next_year_rows = models.PositiveIntegerField(default=0)
+    promoted_count = models.PositiveIntegerField(default=0)
+    graduated_count = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(
+        "authn.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="academic_year_rollovers",
+    )
+
+    class Meta:
+        ordering = ("-created_at",)
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "academic_year"], name="uniq_rollover_campaign_year"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign}: {self.academic_year} → {self.next_academic_year}"
+
+
+class RosterImportJob(BaseModel):
+    """One roster upload (`POST /admin/roster/import`), processed in chunks by
+    `bot2.roster_import.run_roster_import` — in the background for files and large
+    JSON payloads. Counters are updated after every chunk, so the job endpoint
+    reports progress while the import runs; row errors live in RosterImportError."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Navbatda"
+        RUNNING = "running", "Bajarilmoqda"
+        DONE = "done", "Tayyor"
+        FAILED = "failed", "Xatolik"
+
+    class Source(models.TextChoices):
+        FILE = "file", "Fayl"
+        JSON = "json", "JSON"
+
+    class Mode(models.TextChoices):
+        UPSERT = "upsert", "Upsert"
+        # Kampaniyaning faylda yo'q faol qatorlari o'chiriladi (is_active=False).
+        MIRROR = "mirror", "Mirror"
+
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    source = models.CharField(max_length=8, choices=Source.choices)
+    file = models.FileField(upload_to="roster_imports/%Y/%m/", blank=True)
+    original_filename = models.CharField(max_length=255, blank=True)
+    # Navbatga qo'yilgan katta JSON import qatorlari (fayl yo'q).
+    payload = models.JSONField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        "authn.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="roster_import_jobs",
+    )
+    # Ma'lum bo'lsa (JSON, .xlsx o'lchami) — progress uchun; CSV'da NULL.
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    mode = models.CharField(max_length=8, choices=Mode.choices, default=Mode.UPSERT)
+    # mirror rejimida qaysi kampaniya fayl bilan tenglashtiriladi.
+    campaign = models.CharField(max_length=64, blank=True)
+    # dry_run — hech narsa yozilmaydi; hisoblar va `samples` kutilgan farqni ko'rsatadi.
+    dry_run = models.BooleanField(default=False)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    deactivated_count = models.PositiveIntegerField(default=0)
+    samples = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    def __str__(self) -> str:
+        return f"RosterImportJob({self.id}, {self.status}, {self.processed_rows} rows)"
+
+
+class RosterImportError(models.Model):
+    """A rejected input row of a RosterImportJob (1-based `row` in the file/payload)."""
+
+    job = models.ForeignKey(RosterImportJob, on_delete=models.CASCADE, related_name="errors")
+    row = models.PositiveIntegerField()
+    student_external_id = models.CharField(max_length=100, blank=True)
+    error = models.TextField()
+
+    class Meta:
+        ordering = ("job", "row")
+        indexes = [
+            models.Index(fields=["job", "row"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job_id} row {self.row}: {self.error}"
+
+
+class RosterImportKey(models.Model):
+    """A student ID seen in a mirror-mode RosterImportJob. The campaign's rosters
+    without a key are deactivated with one anti-join UPDATE when the job ends;
+    the keys are deleted right after."""
+
+    job = models.ForeignKey(RosterImportJob, on_delete=models.CASCADE, related_name="keys")
+    student_external_id = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "student_external_id"]),
+        ]
+
 
 class BotFsmState(models.Model):
     """Persistent FSM storage for aiogram — survives bot restarts."""
@@ -0,0 +1,153 @@
+"""Academic-year rollover (`POST /api/v1/admin/roster/rollover`,
+`manage.py rollover_academic_year`).
+
+For one roster campaign and the closing academic year, in one transaction:
+
+1. the active rosters' (program, course_year) counts are written into that
+   year's ProgramEnrollment rows (one GROUP BY, one upsert);
+2. the next year's ProgramEnrollment rows are created from the same snapshot
+   shifted one course up — rows that already exist (entered by hand) are kept;
+3. active rosters in courses 1–4 are promoted with a single UPDATE
+   (4 → 5 = graduated, 5 stays 5).
+
+Bot2SurveyResponse rows are never touched — their program/course_year snapshot
+is append-only. Every run records an AcademicYearRollover, unique per
+(campaign, academic_year): a repeated rollover returns the stored result and
+changes nothing.
+"""
+
+import re
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from analytics.cache import bump_data_version
+from analytics.rollups import refresh_enrollment_totals, refresh_roster_totals
+from audit.utils import log_audit
+from bot2.models import AcademicYearRollover, ProgramEnrollment, StudentRoster
+from common.exceptions import APIError
+
+GRADUATE_COURSE_YEAR = 5
+
+_ACADEMIC_YEAR_RE = re.compile(r"^(\d{4})-(\d{4})$")
+
+
+def next_academic_year(academic_year: str) -> str:
+    """"2025-2026" → "2026-2027"."""
+    match = _ACADEMIC_YEAR_RE.match(academic_year or "")
+    if not match or int(match.group(2)) != int(match.group(1)) + 1:
+        raise APIError("VALIDATION_ERROR", "academic_year must look like 2025-2026.")
+    end = int(match.group(2))
+    return f"{end}-{end + 1}"
+
+
+def rollover_academic_year(
+    campaign: str, academic_year: str, *, next_year: Optional[str] = None, actor=None, request=None,
+) -> tuple[AcademicYearRollover, bool]:
+    """Close `academic_year` for roster campaign `campaign`. Returns
+    (AcademicYearRollover, performed) — performed=False if it was already done."""
+    default_next = next_academic_year(academic_year)  # yopilayotgan yil formatini ham tekshiradi
+    next_year = next_year or default_next
+    existing = AcademicYearRollover.objects.filter(campaign=campaign, academic_year=academic_year).first()
+    if existing is not None:
+        return existing, False
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # Yozuv birinchi yaratiladi: parallel ikkinchi chaqiruv unique
+            # cheklovga urilib, kurslarni ikki marta ko'tarmaydi.
+            record = AcademicYearRollover.objects.create(
+                campaign=campaign, academic_year=academic_year, next_academic_year=next_year, created_by=actor,
+            )
+            counts = list(
+                StudentRoster.objects.filter(
+                    roster_campaign=campaign, is_active=True, program__isnull=False, course_year__isnull=False,
+                )
+                .values("program_id", "course_year")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            ProgramEnrollment.objects.bulk_create(
+                [
+                    ProgramEnrollment(
+                        program_id=r["program_id"], course_year=r["course_year"], student_count=r["total"],
+                        academic_year=academic_year, campaign=campaign,
+                    )
+                    for r in counts
+                ],
+                update_conflicts=True,
+                unique_fields=["program", "course_year", "academic_year", "campaign"],
+                update_fields=["student_count", "updated_at"],
+            )
+
+            existing_next = set(
+                ProgramEnrollment.objects.filter(academic_year=next_year, campaign=campaign)
+                .values_list("program_id", "course_year")
+            )
+            next_rows = [
+                ProgramEnrollment(
+                    program_id=r["program_id"], course_year=r["course_year"] + 1, student_count=r["total"],
+                    academic_year=next_year, campaign=campaign,
+                )
+                for r in counts
+                if r["course_year"] < GRADUATE_COURSE_YEAR
+                and (r["program_id"], r["course_year"] + 1) not in existing_next
+            ]
+            ProgramEnrollment.objects.bulk_create(next_rows)
+
+            promotable = StudentRoster.objects.filter(
+                roster_campaign=campaign, is_active=True,
+                course_year__gte=1, course_year__lt=GRADUATE_COURSE_YEAR,
+            )
+            graduated = promotable.filter(course_year=GRADUATE_COURSE_YEAR - 1).count()
+            # Bitta set-based UPDATE; keyingi import qatorlarni qayta solishtirishi
+            # uchun fingerprint tozalanadi.
+            promoted = promotable.update(course_year=F("course_year") + 1, import_fingerprint="", updated_at=now)
+
+            record.snapshot_rows = len(counts)
+            record.next_year_rows = len(next_rows)
+            record.promoted_count = promoted
+            record.graduated_count = graduated
+            record.save(update_fields=[
+                "snapshot_rows", "next_year_rows", "promoted_count", "graduated_count", "updated_at",
+            ])
+
+            # bulk_create/update save() ni chetlab o'tadi — coverage rollup'lar shu yerda.
+            refresh_roster_totals([campaign])
+            refresh_enrollment_totals(campaign, academic_year)
+            refresh_enrollment_totals(campaign, next_year)
+    except IntegrityError:
+        existing = AcademicYearRollover.objects.filter(campaign=campaign, academic_year=academic_year).first()
+        if existing is None:
+            raise
+        return existing, False
+
+    bump_data_version()
+    log_audit(
+        actor_type="user" if actor else "service",
+        actor_user=actor,
+        actor_service="" if actor else "rollover_academic_year",
+        action="update",
+        entity=record,
+        request=request,
+        after_data=rollover_payload(record),
+        meta={"type": "academic_year_rollover"},
+    )
+    return record, True
+
+
+def rollover_payload(record: AcademicYearRollover) -> dict:
+    return {
+        "id": str(record.pk),
+        "campaign": record.campaign,
+        "academic_year": record.academic_year,
+        "next_academic_year": record.next_academic_year,
+        "snapshot_rows": record.snapshot_rows,
+        "next_year_rows": record.next_year_rows,
+        "promoted": record.promoted_count,
+        "graduated": record.graduated_count,
+        "created_at": record.created_at.isoformat(),
+    }
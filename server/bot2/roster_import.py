@@ -0,0 +1,741 @@
+"""Roster import jobs (`POST /api/v1/admin/roster/import`).
+
+Every import is a `RosterImportJob`. Files, and JSON payloads above
+`ROSTER_IMPORT_INLINE_MAX_ROWS`, are stored on the job and processed on the shared
+background pool (`submit_ai_task`); small JSON payloads run inside the request
+and keep the old response shape. Either way rows are streamed — `.xlsx` through
+openpyxl's read-only iterator, CSV through `csv.reader` over the decoded file —
+the header row is mapped once per file (`compile_headers`), and valid rows are
+upserted `ROSTER_IMPORT_CHUNK_SIZE` at a time with `bulk_upsert_roster_rows`,
+each chunk in its own transaction together with the job's counters. Rejected
+rows are stored as `RosterImportError`, which the job endpoint pages through.
+
+A failed job keeps the chunks committed before the failure (`processed_rows`
+tells how far it got); re-importing the same file is safe — the upsert is
+idempotent. Each roster stores the fingerprint of the last import row applied
+to it, so rows of a re-imported export that did not change are recognized
+without loading the roster. `dry_run` jobs only compute the diff (counts and
+`samples`); `mirror` jobs also deactivate the campaign's rosters that are absent
+from the file, with one anti-join UPDATE at the end.
+
+`manage.py import_roster --loader copy` (PostgreSQL only) swaps the per-chunk
+upsert for `_CopyImport`: COPY into an unlogged staging table and one
+`INSERT ... ON CONFLICT` merge at the end.
+"""
+
+import codecs
+import csv
+import io
+import logging
+import uuid
+from typing import Iterable, Optional
+
+import openpyxl
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from audit.utils import log_audit
+from bot2.models import RosterImportError, RosterImportJob, RosterImportKey, StudentRoster
+from bot2.services import (
+    _roster_defaults,
+    bulk_upsert_roster_rows,
+    finish_roster_upsert,
+    parse_roster_payload,
+    roster_fingerprint,
+)
+from catalog.models import CatalogItem
+from common.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+# dry_run javobidagi har bir turdagi (create/update/deactivate) namunalar soni.
+DIFF_SAMPLE_SIZE = 20
+
+# Column aliases: Excel header → internal field name
+# Turli Unicode apostroflar (o'/o'/o` ...) — bir xil ' ga keltiriladi, shunda
+# "Tug'ilgan sanasi" kabi real Excel sarlavhalari ishonchli tanib olinadi.
+_APOSTROPHES = "‘’ʻʼ´`"
+_EXCEL_ERRORS = {"#ref!", "#n/a", "#value!", "#div/0!", "#name?", "#null!", "#num!"}
+
+_XLSX_COLUMN_MAP = {
+    # Talaba ID
+    "student_id": "student_external_id",
+    "student id": "student_external_id",
+    "studentid": "student_external_id",
+    "id": "student_external_id",
+    "matricula": "student_external_id",
+    "talaba id": "student_external_id",
+    "talaba_id": "student_external_id",
+    "talaba": "student_external_id",
+    # Alohida ism / familiya
+    "ism": "first_name",
+    "first_name": "first_name",
+    "first name": "first_name",
+    "firstname": "first_name",
+    "name": "first_name",
+    "familya": "last_name",
+    "familiya": "last_name",
+    "last_name": "last_name",
+    "last name": "last_name",
+    "lastname": "last_name",
+    "surname": "last_name",
+    # Birlashgan to'liq ism — pastda first/last ga bo'linadi
+    "ism familya": "full_name",
+    "full_name": "full_name",
+    "full name": "full_name",
+    "fullname": "full_name",
+    "fio": "full_name",
+    "to'liq ism": "full_name",
+    "to'liq ismi": "full_name",
+    "to'liq ism sharifi": "full_name",
+    "to'liq ismi sharifi": "full_name",
+    "ism sharifi": "full_name",
+    "ismi sharifi": "full_name",
+    # Kurs
+    "year": "course_year",
+    "yil": "course_year",
+    "kurs": "course_year",
+    "course": "course_year",
+    "course year": "course_year",
+    "course_year": "course_year",
+    # Tug'ilgan sana
+    "tug'ilgan sana": "birth_date",
+    "tug'ilgan sanasi": "birth_date",
+    "tug'ilgan_sana": "birth_date",
+    "tug'ilgan": "birth_date",
+    "birth_date": "birth_date",
+    "birth date": "birth_date",
+    "birthdate": "birth_date",
+    "date of birth": "birth_date",
+    "dob": "birth_date",
+}
+
+
+def _canon_header(raw) -> str:
+    """Sarlavhani normallashtiradi: strip, lower, apostroflarni birlashtiradi,
+    ichki bo'sh joylarni siqadi."""
+    if raw is None:
+        return ""
+    s = str(raw).strip().lower()
+    for ap in _APOSTROPHES:
+        s = s.replace(ap, "'")
+    return " ".join(s.split())
+
+
+def _map_header(raw) -> str:
+    """Sarlavhani kanonik maydon nomiga xaritalaydi. Tanib bo'lmasa —
+    normallashgan sarlavhaning O'ZINI qaytaradi (program_id/program_code/campaign/
+    is_active kabi to'g'ridan-to'g'ri maydonlar ham CSV orqali o'tishi uchun);
+    keraksiz ustunlar (Group, Tel, Grant, Stats ...) parse bosqichida e'tiborsiz."""
+    c = _canon_header(raw)
+    if not c:
+        return c
+    if c in _XLSX_COLUMN_MAP:
+        return _XLSX_COLUMN_MAP[c]
+    # Iflos real sarlavhalar uchun ehtiyotkor substring qoidalari:
+    if "tug'ilgan" in c:
+        return "birth_date"
+    if ("full" in c and "name" in c) or "ism sharif" in c or "ismi sharif" in c:
+        return "full_name"
+    return c
+
+
+def compile_headers(raw_headers) -> list:
+    """Map a file's header row once (None for unnamed columns); data rows are
+    then normalized with `_normalize_values` without re-mapping every cell."""
+    return [None if raw is None else _map_header(raw) for raw in raw_headers]
+
+
+def _normalize_row(raw: dict) -> dict:
+    """Map header aliases (apostrophe/whitespace/case-insensitive) to canonical
+    field names, drop Excel error cells (#REF! ...), and split a merged full-name
+    column into first/last. Shared by the .xlsx and .csv upload paths."""
+    return _normalize_values(compile_headers(raw.keys()), raw.values())
+
+
+def _normalize_values(headers: list, values) -> dict:
+    """`_normalize_row` for a data row whose headers are already compiled."""
+    row: dict = {}
+    for canon, val in zip(headers, values):
+        if canon is None or val is None:
+            continue
+        value = val.strip() if isinstance(val, str) else val
+        if isinstance(value, str):
+            if value == "" or value.lower() in _EXCEL_ERRORS:
+                continue
+        row[canon] = value
+
+    # Birlashgan to'liq ism ("SURNAME FIRST PATRONYMIC") → birinchi bo'sh joydan
+    # bo'linadi. Dashboard nomni "{first_name} {last_name}" tartibida ko'rsatgani
+    # uchun bu ko'rinuvchi tartibni saqlaydi. Alohida first/last berilgan bo'lsa —
+    # ular ustidan yozilmaydi.
+    full = row.pop("full_name", None)
+    if isinstance(full, str) and full:
+        parts = full.split(None, 1)
+        row.setdefault("first_name", parts[0])
+        if len(parts) > 1:
+            row.setdefault("last_name", parts[1])
+
+    return row
+
+
+# --------------------------------------------------------------------------- #
+# Streaming readers
+# --------------------------------------------------------------------------- #
+
+def iter_xlsx_rows(fileobj) -> Iterable[dict]:
+    """Normalized data rows of the active sheet; fully empty rows are dropped."""
+    wb = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows_iter = wb.active.iter_rows(values_only=True)
+        headers = compile_headers(next(rows_iter, []))  # first row = headers
+        for values in rows_iter:
+            if all(v is None for v in values):
+                continue
+            row = _normalize_values(headers, values)
+            if row:
+                yield row
+    finally:
+        wb.close()
+
+
+def xlsx_row_estimate(fileobj) -> Optional[int]:
+    """Data rows according to the sheet dimension (None if the file has none)."""
+    wb = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        max_row = wb.active.max_row
+    finally:
+        wb.close()
+        fileobj.seek(0)
+    return max(max_row - 1, 0) if max_row else None
+
+
+def csv_encoding(fileobj) -> str:
+    """utf-8-sig (strips a BOM), or cp1251 — legacy Excel CSV exports — when the
+    bytes are not valid UTF-8. Checked block by block, never the whole file at once."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for block in iter(lambda: fileobj.read(1 << 20), b""):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1251"
+    finally:
+        fileobj.seek(0)
+
+
+def iter_csv_rows(fileobj) -> Iterable[dict]:
+    reader = csv.reader(codecs.getreader(csv_encoding(fileobj))(fileobj))
+    headers = compile_headers(next(reader, []))
+    for values in reader:
+        if values:  # csv.DictReader kabi butunlay bo'sh satrlar tashlanadi
+            yield _normalize_values(headers, values)
+
+
+def is_xlsx(filename: str) -> bool:
+    name = (filename or "").lower()
+    return name.endswith(".xlsx") or name.endswith(".xls")
+
+
+# --------------------------------------------------------------------------- #
+# Chunked processing
+# --------------------------------------------------------------------------- #
+
+class _ChunkedImport:
+    """Validates rows one by one and upserts them chunk by chunk for `job`.
+
+    `collect=True` also keeps the per-student summary and the error list in
+    memory — only for the bounded inline (JSON) imports that return them."""
+
+    def __init__(self, job: RosterImportJob, *, chunk_size: Optional[int] = None, collect: bool = False):
+        self.job = job
+        self.chunk_size = chunk_size or settings.ROSTER_IMPORT_CHUNK_SIZE
+        self.collect = collect
+        self.dry_run = job.dry_run
+        self.mirror = job.mode == RosterImportJob.Mode.MIRROR
+        self.program_cache: dict = {}
+        self.seen: set = set()          # created/updated har roster uchun bir marta
+        self.valid: list = []           # (idx, parsed) — joriy chunk
+        self.errors: list = []          # RosterImportError — joriy chunk
+        self.imported: list = []
+        self.error_list: list = []
+        self.samples: dict = {"create": [], "update": []}
+        self.processed = self.created = self.updated = self.skipped = self.error_count = 0
+        self.unchanged = self.deactivated = self.staged = 0
+
+    def run(self, rows: Iterable) -> None:
+        for idx, row in enumerate(rows, start=1):
+            self.processed = idx
+            self._validate(idx, row)
+            if idx % self.chunk_size == 0:
+                self._flush()
+        self._flush()
+        self._finish()
+
+    def _validate(self, idx: int, row) -> None:
+        # ID'siz qatorlar (Excel'dagi statistika jadvali qoldiqlari, bo'sh
+        # qatorlar) xato emas — jimgina o'tkazib yuboriladi va `skipped` ga sanaladi.
+        if not isinstance(row, dict):
+            self._error(idx, "", "Row must be an object.")
+            return
+        sid = str(row.get("student_external_id") or "").strip()
+        if not sid:
+            self.skipped += 1
+            return
+        try:
+            self.valid.append((idx, parse_roster_payload(row, program_cache=self.program_cache)))
+        except APIError as exc:
+            self._error(idx, sid, exc.detail)
+        except Exception as exc:
+            self._error(idx, sid, str(exc))
+
+    def _error(self, idx: int, sid: str, message) -> None:
+        self.error_count += 1
+        self.errors.append(RosterImportError(job=self.job, row=idx, student_external_id=sid[:100], error=str(message)))
+        if self.collect:
+            self.error_list.append({"row": idx, "error": message})
+
+    def _flush(self) -> None:
+        with transaction.atomic():
+            result = bulk_upsert_roster_rows(
+                [parsed for _, parsed in self.valid], dry_run=self.dry_run, load_unchanged=self.collect,
+            ) if self.valid else {}
+            self.staged += len(self.valid)
+            keys = []
+            # Fayl ichida ID takrorlansa oxirgisi g'olib (keyingi chunk'da ham);
+            # javob/hisobda esa har noyob roster birinchi paydo bo'lish qatori bilan.
+            for idx, parsed in self.valid:
+                sid = parsed["student_external_id"]
+                if sid in self.seen:
+                    continue
+                self.seen.add(sid)
+                keys.append(sid)
+                roster, row_status, changes = result[sid]
+                if row_status == "created":
+                    self.created += 1
+                    self._sample("create", {"row": idx, "student_external_id": sid})
+                elif row_status == "updated":
+                    self.updated += 1
+                    self._sample("update", {"row": idx, "student_external_id": sid, "changes": changes})
+                else:
+                    self.unchanged += 1
+                if self.collect and not self.dry_run:
+                    self.imported.append(_imported_entry(idx, roster, row_status))
+            if self.mirror:
+                # Xatoli qatorlar ham faylda bor — ular o'chirilmasligi kerak.
+                keys += [e.student_external_id for e in self.errors if e.student_external_id]
+                RosterImportKey.objects.bulk_create(
+                    [RosterImportKey(job=self.job, student_external_id=sid) for sid in keys], batch_size=1000,
+                )
+            if self.errors:
+                RosterImportError.objects.bulk_create(self.errors, batch_size=1000)
+            RosterImportJob.objects.filter(pk=self.job.pk).update(
+                processed_rows=self.processed,
+                created_count=self.created,
+                updated_count=self.updated,
+                unchanged_count=self.unchanged,
+                skipped_count=self.skipped,
+                error_count=self.error_count,
+                updated_at=timezone.now(),
+            )
+        self.valid, self.errors = [], []
+
+    def _sample(self, kind: str, entry: dict) -> None:
+        if len(self.samples[kind]) < DIFF_SAMPLE_SIZE:
+            self.samples[kind].append(entry)
+
+    def _finish(self) -> None:
+        if self.mirror:
+            self._deactivate_absent()
+        RosterImportJob.objects.filter(pk=self.job.pk).update(
+            deactivated_count=self.deactivated,
+            samples=self.samples if self.dry_run else None,
+            updated_at=timezone.now(),
+        )
+
+    def _deactivate_absent(self) -> None:
+        """mirror: the campaign's active rosters absent from the file are
+        deactivated with one anti-join UPDATE (NOT EXISTS over RosterImportKey)."""
+        keys = RosterImportKey.objects.filter(job=self.job)
+        # Birorta yaroqli qator bo'lmasa (bo'sh/buzilgan fayl) kampaniya o'chirilmaydi.
+        if self.staged:
+            absent = StudentRoster.objects.filter(roster_campaign=self.job.campaign, is_active=True).filter(
+                ~Exists(keys.filter(student_external_id=OuterRef("student_external_id")))
+            )
+            if self.dry_run:
+                self.deactivated = absent.count()
+                self.samples["deactivate"] = [
+                    {"student_external_id": sid}
+                    for sid in absent.order_by("student_external_id")
+                    .values_list("student_external_id", flat=True)[:DIFF_SAMPLE_SIZE]
+                ]
+            else:
+                now = timezone.now()
+                with transaction.atomic():
+                    self.deactivated = absent.update(is_active=False, import_fingerprint="", updated_at=now)
+                    if self.deactivated:
+                        finish_roster_upsert({self.job.campaign}, [], [], now=now)
+        keys.delete()
+
+
+# --------------------------------------------------------------------------- #
+# PostgreSQL COPY loader
+# --------------------------------------------------------------------------- #
+
+# Staging jadvali ustunlari (COPY tartibi). `seq` — fayldagi tartib: takror ID'da
+# oxirgi qator g'olib bo'lishi uchun.
+_STAGING_COLUMNS = (
+    "seq", "id", "student_external_id", "first_name", "last_name", "birth_date",
+    "program_id", "course_year", "is_active", "roster_campaign", "import_fingerprint",
+)
+
+# "Bo'sh qiymat ustidan yozmaydi": staging'da berilmagan maydon NULL, EXCLUDED'da
+# esa matn uchun '' (NOT NULL ustun) — ikkala holatda ham eski qiymat qoladi.
+_MERGE_VALUES = (
+    "COALESCE(NULLIF(EXCLUDED.first_name, ''), r.first_name)",
+    "COALESCE(NULLIF(EXCLUDED.last_name, ''), r.last_name)",
+    "COALESCE(EXCLUDED.birth_date, r.birth_date)",
+    "COALESCE(EXCLUDED.program_id, r.program_id)",
+    "COALESCE(EXCLUDED.course_year, r.course_year)",
+    "EXCLUDED.is_active",
+    "EXCLUDED.roster_campaign",
+)
+_MERGE_FIELDS = ("first_name", "last_name", "birth_date", "program_id", "course_year", "is_active", "roster_campaign")
+
+
+def copy_loader_available() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def _copy_value(value) -> str:
+    """One field in COPY text format (NULL is \\N)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+class _CopyImport(_ChunkedImport):
+    """`_ChunkedImport` for full-roster syncs on PostgreSQL.
+
+    Validation and error rows are the same; each chunk of valid rows is
+    `COPY`'d into an UNLOGGED staging table instead of being upserted, and at
+    the end a single `INSERT ... ON CONFLICT (student_external_id) DO UPDATE`
+    merges the staging table into StudentRoster with the `_roster_defaults`
+    rules (blank never overwrites). No model instances are built and unchanged
+    rows are not rewritten. Nothing reaches StudentRoster before the merge, so
+    a failed job leaves the roster untouched."""
+
+    def run(self, rows: Iterable) -> None:
+        self.staging = f"roster_import_staging_{self.job.pk.hex}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE {self.staging} ("
+                "seq bigint NOT NULL, id uuid NOT NULL, student_external_id varchar(100) NOT NULL, "
+                "first_name varchar(150), last_name varchar(150), birth_date date, program_id uuid, "
+                "course_year smallint, is_active boolean NOT NULL, roster_campaign varchar(64) NOT NULL, "
+                "import_fingerprint varchar(40) NOT NULL)"
+            )
+            try:
+                super().run(rows)
+            finally:
+                cursor.execute(f"DROP TABLE IF EXISTS {self.staging}")
+
+    def _flush(self) -> None:
+        with transaction.atomic():
+            if self.valid:
+                buf = io.StringIO()
+                for idx, parsed in self.valid:
+                    defaults = _roster_defaults(parsed)
+                    program = defaults.get("program")
+                    buf.write("\t".join(_copy_value(v) for v in (
+                        idx, uuid.uuid4(), parsed["student_external_id"],
+                        defaults.get("first_name"), defaults.get("last_name"), defaults.get("birth_date"),
+                        program.pk if program is not None else None, defaults.get("course_year"),
+                        bool(defaults["is_active"]), defaults["roster_campaign"], roster_fingerprint(defaults),
+                    )))
+                    buf.write("\n")
+                buf.seek(0)
+                self.staged += len(self.valid)
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {self.staging} ({', '.join(_STAGING_COLUMNS)}) FROM STDIN", buf
+                    )
+            if self.errors:
+                RosterImportError.objects.bulk_create(self.errors, batch_size=1000)
+            RosterImportJob.objects.filter(pk=self.job.pk).update(
+                processed_rows=self.processed,
+                skipped_count=self.skipped,
+                error_count=self.error_count,
+                updated_at=timezone.now(),
+            )
+        self.valid, self.errors = [], []
+
+    def _finish(self) -> None:
+        with transaction.atomic():
+            self._merge()
+            super()._finish()
+
+    def _merge(self) -> None:
+        roster = StudentRoster._meta.db_table
+        now = timezone.now()
+        fields = ", ".join(_MERGE_FIELDS)
+        # Ma'lumot maydonlari o'zgargan — updated_at yangilanadi; faqat eskirgan
+        # fingerprint bo'lsa qator yoziladi, lekin updated_at saqlanadi.
+        data_changed = (
+            f"({', '.join(f'r.{f}' for f in _MERGE_FIELDS)}) IS DISTINCT FROM ({', '.join(_MERGE_VALUES)})"
+        )
+        with connection.cursor() as cursor:
+            # CTE'lar bitta snapshot'ni ko'radi: `prev` — merge'dan oldingi qiymatlar.
+            cursor.execute(
+                f"""
+                WITH src AS (
+                    SELECT DISTINCT ON (student_external_id) *
+                    FROM {self.staging} ORDER BY student_external_id, seq DESC
+                ), prev AS (
+                    SELECT r.student_external_id, {", ".join(f"r.{f}" for f in _MERGE_FIELDS)}
+                    FROM {roster} r JOIN src USING (student_external_id)
+                ), merged AS (
+                    INSERT INTO {roster} AS r (
+                        id, student_external_id, {fields}, import_fingerprint, metadata, created_at, updated_at
+                    )
+                    SELECT id, student_external_id, COALESCE(first_name, ''), COALESCE(last_name, ''),
+                           birth_date, program_id, course_year, is_active, roster_campaign,
+                           import_fingerprint, '{{}}'::jsonb, %s, %s
+                    FROM src ORDER BY student_external_id
+                    ON CONFLICT (student_external_id) DO UPDATE SET
+                        {", ".join(f"{f} = {v}" for f, v in zip(_MERGE_FIELDS, _MERGE_VALUES))},
+                        import_fingerprint = EXCLUDED.import_fingerprint,
+                        updated_at = CASE WHEN {data_changed} THEN EXCLUDED.updated_at ELSE r.updated_at END
+                    WHERE {data_changed} OR r.import_fingerprint IS DISTINCT FROM EXCLUDED.import_fingerprint
+                    RETURNING r.id, r.student_external_id, {", ".join(f"r.{f}" for f in _MERGE_FIELDS)},
+                              (r.xmax = 0) AS inserted
+                )
+                SELECT m.id, m.inserted, m.roster_campaign, p.roster_campaign,
+                       ({", ".join(f"m.{f}" for f in _MERGE_FIELDS)})
+                           IS DISTINCT FROM ({", ".join(f"p.{f}" for f in _MERGE_FIELDS)}),
+                       m.program_id IS NOT NULL AND m.program_id IS DISTINCT FROM p.program_id,
+                       m.course_year IS NOT NULL AND m.course_year IS DISTINCT FROM p.course_year
+                FROM merged m LEFT JOIN prev p USING (student_external_id)
+                """,
+                [now, now],
+            )
+            rows = cursor.fetchall()
+            cursor.execute(f"SELECT count(DISTINCT student_external_id) FROM {self.staging}")
+            total = cursor.fetchone()[0]
+
+        touched: set = set()
+        backfill_program: list = []
+        backfill_course: list = []
+        for pk, inserted, campaign, campaign_before, changed, program_changed, course_changed in rows:
+            if inserted:
+                self.created += 1
+                touched.add(campaign)
+                continue
+            if not changed:
+                continue    # faqat fingerprint yangilangan
+            self.updated += 1
+            touched.update({campaign, campaign_before})
+            if program_changed:
+                backfill_program.append(pk)
+            if course_changed:
+                backfill_course.append(pk)
+        # O'zgarmagan mavjud qatorlar RETURNING'da yo'q.
+        self.unchanged = total - self.created - self.updated
+
+        finish_roster_upsert(touched, backfill_program, backfill_course, now=now)
+        RosterImportJob.objects.filter(pk=self.job.pk).update(
+            created_count=self.created, updated_count=self.updated, unchanged_count=self.unchanged, updated_at=now,
+        )
+
+    def _deactivate_absent(self) -> None:
+        """mirror: one anti-join UPDATE against the staging table (valid rows)
+        and the job's RosterImportError rows (rejected but present in the file)."""
+        if not self.staged:
+            return
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {StudentRoster._meta.db_table} r
+                SET is_active = false, import_fingerprint = '', updated_at = %s
+                WHERE r.roster_campaign = %s AND r.is_active
+                  AND NOT EXISTS (SELECT 1 FROM {self.staging} s WHERE s.student_external_id = r.student_external_id)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {RosterImportError._meta.db_table} e
+                      WHERE e.job_id = %s AND e.student_external_id = r.student_external_id
+                  )
+                """,
+                [now, self.job.campaign, self.job.pk],
+            )
+            self.deactivated = cursor.rowcount
+        if self.deactivated:
+            finish_roster_upsert({self.job.campaign}, [], [], now=now)
+
+
+def _imported_entry(idx: int, roster: StudentRoster, row_status: str) -> dict:
+    # Haqiqiy (upsert'dan keyingi) holat: qator bermagan program saqlanib qoladi.
+    return {
+        "row": idx,
+        "student_external_id": roster.student_external_id,
+        "first_name": roster.first_name,
+        "last_name": roster.last_name,
+        "course_year": roster.course_year,
+        "program_id": roster.program_id,
+        "status": row_status,
+    }
+
+
+def _job_rows(job: RosterImportJob, fileobj):
+    if job.source == RosterImportJob.Source.JSON:
+        return job.payload or []
+    if is_xlsx(job.original_filename):
+        return iter_xlsx_rows(fileobj)
+    return iter_csv_rows(fileobj)
+
+
+def run_roster_import(
+    job_id, *, rows: Optional[Iterable] = None, collect: bool = False, request=None, loader: str = "orm",
+) -> _ChunkedImport:
+    """Process job `job_id` to the end. `rows` — rows supplied by the caller
+    (inline JSON, the management command) instead of the job's file/payload;
+    `collect` — keep the inline response data; `request` — for the audit row;
+    `loader="copy"` — the PostgreSQL COPY + staging merge path (`_CopyImport`)."""
+    job = RosterImportJob.objects.select_related("created_by").get(pk=job_id)
+    RosterImportJob.objects.filter(pk=job.pk).update(
+        status=RosterImportJob.Status.RUNNING, started_at=timezone.now(), updated_at=timezone.now(),
+    )
+    importer = (_CopyImport if loader == "copy" else _ChunkedImport)(job, collect=collect)
+    fileobj = None
+    final = {"status": RosterImportJob.Status.DONE}
+    try:
+        if job.file:
+            fileobj = job.file.open("rb")
+        importer.run(rows if rows is not None else _job_rows(job, fileobj))
+    except Exception as exc:
+        logger.exception("Roster import job %s failed after %s rows", job.pk, importer.processed)
+        final = {
+            "status": RosterImportJob.Status.FAILED,
+            "processed_rows": importer.processed,
+            "last_error": str(exc) or exc.__class__.__name__,
+        }
+    finally:
+        if fileobj is not None:
+            fileobj.close()
+        # Yuklangan fayl (shaxsiy ma'lumotlar) qayta ishlangach saqlanmaydi.
+        if job.file:
+            job.file.delete(save=False)
+            final["file"] = ""
+        if job.payload is not None:
+            final["payload"] = None
+    now = timezone.now()
+    RosterImportJob.objects.filter(pk=job.pk).update(finished_at=now, updated_at=now, **final)
+
+    if job.dry_run:
+        return importer    # hech narsa yozilmadi — audit yo'q
+    log_audit(
+        actor_type="user" if job.created_by else "service",
+        actor_user=job.created_by,
+        actor_service="" if job.created_by else "import_roster",
+        action="update",
+        entity=StudentRoster(),
+        request=request,
+        after_data={
+            "created": importer.created, "updated": importer.updated, "unchanged": importer.unchanged,
+            "deactivated": importer.deactivated, "skipped": importer.skipped, "errors": importer.error_count,
+        },
+        meta={"type": "roster_import", "job_id": str(job.pk), "status": final["status"], "mode": job.mode},
+    )
+    return importer
+
+
+def enqueue_roster_import(job: RosterImportJob) -> None:
+    """Run the job on the shared background pool (synchronously under pytest)."""
+    from ai_verification.orchestration import submit_ai_task
+
+    def _run():
+        try:
+            run_roster_import(job.pk)
+        except Exception:
+            logger.exception("Roster import job %s crashed", job.pk)
+
+    submit_ai_task(_run)
+
+
+def inline_response(importer: _ChunkedImport) -> dict:
+    """The pre-job response shape (counts, errors, `students`) for inline imports."""
+    program_ids = {r["program_id"] for r in importer.imported if r["program_id"]}
+    program_names = (
+        dict(CatalogItem.objects.filter(id__in=program_ids).values_list("id", "name"))
+        if program_ids else {}
+    )
+    students = [
+        {**{k: v for k, v in r.items() if k != "program_id"}, "program": program_names.get(r["program_id"])}
+        for r in importer.imported
+    ]
+    return {
+        "job_id": str(importer.job.pk),
+        "created": importer.created,
+        "updated": importer.updated,
+        "unchanged": importer.unchanged,
+        "deactivated": importer.deactivated,
+        "skipped": importer.skipped,
+        "errors": importer.error_list,
+        "students": students,
+    }
+
+
+def dry_run_response(importer: _ChunkedImport) -> dict:
+    """`?dry_run=1` inline response: only the computed diff, nothing was written."""
+    return {
+        "job_id": str(importer.job.pk),
+        "dry_run": True,
+        "mode": importer.job.mode,
+        "created": importer.created,
+        "updated": importer.updated,
+        "unchanged": importer.unchanged,
+        "deactivated": importer.deactivated,
+        "skipped": importer.skipped,
+        "errors": importer.error_list,
+        "samples": importer.samples,
+    }
+
+
+def job_payload(job: RosterImportJob) -> dict:
+    """Job status/progress for `GET /admin/roster/import/<job_id>` (errors are
+    paged by the view)."""
+    progress = None
+    if job.status == RosterImportJob.Status.DONE:
+        progress = 100.0
+    elif job.total_rows:
+        progress = round(min(job.processed_rows * 100.0 / job.total_rows, 99.9), 1)
+    return {
+        "id": str(job.pk),
+        "status": job.status,
+        "source": job.source,
+        "original_filename": job.original_filename,
+        "mode": job.mode,
+        "campaign": job.campaign,
+        "dry_run": job.dry_run,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "progress": progress,
+        "created": job.created_count,
+        "updated": job.updated_count,
+        "unchanged": job.unchanged_count,
+        "deactivated": job.deactivated_count,
+        "skipped": job.skipped_count,
+        "error_count": job.error_count,
+        "last_error": job.last_error,
+        "samples": job.samples,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,75 @@
+"""Dashboard `?search=` over the maintained student search document.
+
+`Bot2Student.search_document` holds the normalized text of everything the
+dashboard searches by — external id, names, usernames, phones and Telegram ids
+of the student and all linked accounts (`bot2.models.build_search_document`).
+A search is one `LIKE '%term%'` per term on that single column: on PostgreSQL
+a `pg_trgm` GIN index serves it (migration 0026), on SQLite it is a plain scan
+of one table. Surveys and verifications filter through the `student` FK, so no
+reverse join and no `.distinct()` is needed.
+
+Writes through the models keep the document current (`Bot2Student.save`,
+`Bot2StudentAccount.save/delete`); bulk paths call `refresh_search_documents`.
+"""
+
+from typing import Iterable, Optional
+
+from django.db.models import Prefetch
+from rest_framework import filters
+
+from bot2.models import (
+    ACCOUNT_SEARCH_FIELDS,
+    STUDENT_SEARCH_FIELDS,
+    Bot2Student,
+    Bot2StudentAccount,
+    build_search_document,
+    normalize_search_text,
+)
+
+
+def refresh_search_documents(student_ids: Optional[Iterable] = None, chunk_size: int = 2000) -> int:
+    """Recompute `search_document` for `student_ids` (None — every student, in
+    pk-ordered chunks); only changed rows are written. Returns the number of rows changed."""
+    students = Bot2Student.objects.only("search_document", *STUDENT_SEARCH_FIELDS).prefetch_related(
+        Prefetch("accounts", queryset=Bot2StudentAccount.objects.only("student_id", *ACCOUNT_SEARCH_FIELDS))
+    ).order_by("pk")
+    if student_ids is not None:
+        student_ids = set(student_ids)
+        if not student_ids:
+            return 0
+        students = students.filter(pk__in=student_ids)
+
+    changed = 0
+    last_pk = None
+    while True:
+        chunk = students if last_pk is None else students.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return changed
+        last_pk = rows[-1].pk
+        stale = []
+        for student in rows:
+            document = build_search_document(student, student.accounts.all())
+            if document != student.search_document:
+                student.search_document = document
+                stale.append(student)
+        if stale:
+            Bot2Student.objects.bulk_update(stale, ["search_document"], batch_size=500)
+            changed += len(stale)
+        if len(rows) < chunk_size:
+            return changed
+
+
+class StudentSearchFilter(filters.SearchFilter):
+    """SearchFilter over `view.search_document_field` (e.g. "search_document" or
+    "student__search_document"); every whitespace-separated term must match."""
+
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, "search_document_field", None)
+        if field is None:
+            return super().filter_queryset(request, queryset, view)
+        for term in self.get_search_terms(request):
+            text = normalize_search_text(term)
+            if text:
+                queryset = queryset.filter(**{f"{field}__contains": text})
+        return queryset
@@ -7,6 +7,7 @@ from bot2.models import (
     StudentRoster,
     ProgramEnrollment,
     Bot2Document,
+    EmploymentClass,
 )
 from catalog.models import CatalogItem
 
@@ -40,7 +41,7 @@ class Bot2StudentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Bot2Student
-        fields = "__all__"
+        exclude = ("search_document",)
         read_only_fields = ("roster", "state")
 
 
@@ -98,43 +99,11 @@ class Bot2SurveyResponseSerializer(serializers.ModelSerializer):
         Ishlamaydigan talaba uchun istalgan qabul qilingan hujjat yetarli.
         'rejected' — hujjat yuklangan va AI tomonidan rad etilgan; 'no_docs' dan farqli —
         hujjat umuman yuklanmagan.
-        Annotated by the viewset for performance; DB fallback for detail endpoint.
+        Both variants are persisted on the row (bot2.services.refresh_doc_status).
         """
-        from ai_verification.models import DocumentVerification
-        employed = obj.employment_status == "employed"
-
-        if employed:
-            has_accepted = getattr(obj, "has_accepted_employment_doc", None)
-            has_pending = getattr(obj, "has_pending_employment_doc", None)
-            has_rejected = getattr(obj, "has_rejected_employment_doc", None)
-            if has_accepted is None:
-                if not obj.student_id:
-                    return "no_docs"
-                qs = DocumentVerification.objects.filter(
-                    student_id=obj.student_id, document_type="employment"
-                )
-                has_pending = qs.filter(final_decision="pending").exists()
-                has_accepted = qs.filter(final_decision="accepted").exists()
-                has_rejected = qs.filter(final_decision="rejected").exists()
-        else:
-            has_accepted = getattr(obj, "has_accepted_doc", None)
-            has_pending = getattr(obj, "has_pending_doc", None)
-            has_rejected = getattr(obj, "has_rejected_doc", None)
-            if has_accepted is None:
-                if not obj.student_id:
-                    return "no_docs"
-                qs = DocumentVerification.objects.filter(student_id=obj.student_id)
-                has_pending = qs.filter(final_decision="pending").exists()
-                has_accepted = qs.filter(final_decision="accepted").exists()
-                has_rejected = qs.filter(final_decision="rejected").exists()
-
-        if has_accepted:
-            return "verified"
-        if has_pending:
-            return "pending"
-        if has_rejected:
-            return "rejected"
-        return "no_docs"
+        if obj.employment_class == EmploymentClass.EMPLOYED:
+            return obj.employment_doc_status
+        return obj.doc_status
 
 
 class ProgramEnrollmentSerializer(serializers.ModelSerializer):
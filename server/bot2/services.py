@@ -1,11 +1,25 @@
+import copy
+import hashlib
 import re
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Iterable, Optional
 
 from django.db import transaction
-from django.db.models import Q
-
-from bot2.models import StudentRoster
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Subquery, Value, When
+
+from analytics.cache import bump_data_version
+from analytics.rollups import (
+    SURVEY_COUNTER_PREFIX,
+    bump_counters,
+    latest_class_counts,
+    rebuild_response_days,
+    rebuild_stat_counters,
+    record_latest_class,
+    record_response_move,
+    refresh_roster_totals,
+    shift_response_days,
+)
+from bot2.models import Bot2Document, Bot2LatestSurvey, Bot2SurveyResponse, DocStatus, StudentRoster
 from catalog.models import CatalogItem
 from common.exceptions import APIError
 
@@ -124,15 +138,15 @@ def upsert_roster_row(data: dict) -> tuple[StudentRoster, bool]:
             # program/course_year to'ldiriladi — mavjud (non-null) qiymat hech
             # qachon qayta import bilan ustidan yozilmaydi.
             if "program" in changed_fields or "course_year" in changed_fields:
-                from bot2.models import Bot2SurveyResponse
                 if "program" in changed_fields and existing.program_id:
-                    Bot2SurveyResponse.objects.filter(
-                        roster=existing, program__isnull=True
-                    ).update(program=existing.program)
+                    backfill_survey_snapshots("program", [existing.pk])
                 if "course_year" in changed_fields and existing.course_year:
-                    Bot2SurveyResponse.objects.filter(
-                        roster=existing, course_year__isnull=True
-                    ).update(course_year=existing.course_year)
+                    backfill_survey_snapshots("course_year", [existing.pk])
+                # update() save()ni chetlab o'tadi — responder kataklarini qayta sanaymiz.
+                rebuild_response_days(
+                    Bot2LatestSurvey.objects.filter(survey__roster=existing)
+                    .values_list("survey_campaign", flat=True).distinct()
+                )
 
         return existing, False
 
@@ -145,6 +159,31 @@ def upsert_roster_row(data: dict) -> tuple[StudentRoster, bool]:
     return roster, True
 
 
+# Bitta backfill UPDATE'idagi roster pk'lari (IN ro'yxati; SQLite parametr chegarasi).
+SNAPSHOT_BACKFILL_BATCH = 2000
+
+
+def backfill_survey_snapshots(field: str, roster_ids: Iterable, now=None) -> int:
+    """Copy the roster's `field` ("program" / "course_year") into its surveys'
+    snapshot where it is still NULL — append-only: a non-null snapshot is never
+    overwritten. One correlated UPDATE per `SNAPSHOT_BACKFILL_BATCH` rosters
+    (the rosters are already saved, so the value is read from them in SQL)
+    instead of one UPDATE per roster; same statement on PostgreSQL and SQLite.
+    Returns the number of surveys filled."""
+    from django.utils import timezone
+
+    column = StudentRoster._meta.get_field(field).attname
+    value = Subquery(StudentRoster.objects.filter(pk=OuterRef("roster_id")).values(column)[:1])
+    roster_ids = list(roster_ids)
+    now = now or timezone.now()
+    filled = 0
+    for start in range(0, len(roster_ids), SNAPSHOT_BACKFILL_BATCH):
+        filled += Bot2SurveyResponse.objects.filter(
+            roster_id__in=roster_ids[start:start + SNAPSHOT_BACKFILL_BATCH], **{f"{field}__isnull": True}
+        ).update(**{column: value, "updated_at": now})
+    return filled
+
+
 def _roster_defaults(data: dict) -> dict:
     """upsert_roster_row bilan bir xil "qaysi maydonlar yoziladi" qoidasi."""
     defaults: dict = {
@@ -157,17 +196,48 @@ def _roster_defaults(data: dict) -> dict:
     return defaults
 
 
-def bulk_upsert_roster_rows(parsed_rows: list[dict]) -> dict:
+# Import qatori yozadigan maydonlar (`_roster_defaults` kalitlari) — fingerprint tartibi.
+_FINGERPRINT_FIELDS = ("first_name", "last_name", "birth_date", "program", "course_year", "is_active", "roster_campaign")
+
+
+def roster_fingerprint(defaults: dict) -> str:
+    """sha1 of what an import row writes (`_roster_defaults`). A roster stores the
+    fingerprint of the last import row applied to it, and every other write path
+    clears it — so an equal fingerprint means re-applying the row is a no-op."""
+    parts = []
+    for field in _FINGERPRINT_FIELDS:
+        value = defaults.get(field)
+        if field == "program" and value is not None:
+            value = value.pk
+        parts.append("\x00" if value is None else str(value))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _diff_value(value):
+    if isinstance(value, CatalogItem):
+        return str(value.pk)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def bulk_upsert_roster_rows(parsed_rows: list[dict], *, dry_run: bool = False, load_unchanged: bool = True) -> dict:
     """Ko'p qatorli rosterni samarali upsert qiladi (katta Excel import uchun).
 
-    Har qatorda alohida SELECT + save (+ full_clean) o'rniga: mavjud qatorlar
-    BITTA so'rovda oldindan olinadi, yangilar `bulk_create`, o'zgarganlar
+    Har qatorda alohida SELECT + save (+ full_clean) o'rniga: avval faqat
+    (ID, import_fingerprint) juftliklari olinadi — fingerprint'i teng qatorlar
+    o'zgarmagan, ular uchun model obyekti umuman yuklanmaydi. Qolgan mavjud
+    qatorlar BITTA so'rovda olinadi, yangilar `bulk_create`, o'zgarganlar
     `bulk_update` bilan yoziladi. Semantikasi `upsert_roster_row` bilan bir xil
     (program/course_year faqat berilganda ustidan yoziladi; survey snapshotlarida
     faqat NULL qiymatlar backfill qilinadi — append-only saqlanadi).
 
+    `dry_run=True` — hech narsa yozilmaydi, faqat natija hisoblanadi.
+    `load_unchanged=False` — o'zgarmagan qatorlar uchun roster o'rniga None.
+
     Fayl ichida bir xil ID takrorlansa — oxirgisi g'olib. Qaytaradi:
-    {student_external_id: (StudentRoster, was_created)}.
+    {student_external_id: (StudentRoster | None, status, changes)}, status —
+    "created" / "updated" / "unchanged", changes — {field: [eski, yangi]}.
     """
     from django.utils import timezone
 
@@ -179,59 +249,397 @@ def bulk_upsert_roster_rows(parsed_rows: list[dict]) -> dict:
             ordered_ids.append(sid)
         by_id[sid] = data  # oxirgisi g'olib
 
+    fingerprints = {sid: roster_fingerprint(_roster_defaults(by_id[sid])) for sid in ordered_ids}
+    stored = dict(
+        StudentRoster.objects.filter(student_external_id__in=ordered_ids)
+        .values_list("student_external_id", "import_fingerprint")
+    )
+    unchanged = [sid for sid in ordered_ids if stored.get(sid) == fingerprints[sid]]
+    to_load = [sid for sid in ordered_ids if sid in stored and stored[sid] != fingerprints[sid]]
+    if load_unchanged:
+        to_load += unchanged
     existing_map = {
         r.student_external_id: r
-        for r in StudentRoster.objects.filter(student_external_id__in=ordered_ids)
-    }
+        for r in StudentRoster.objects.filter(student_external_id__in=to_load)
+    } if to_load else {}
+    unchanged = set(unchanged)
 
     to_create: list[StudentRoster] = []
     to_update: list[StudentRoster] = []
     update_fields: set[str] = set()
-    backfill: list[tuple[StudentRoster, bool, bool]] = []
-    result: dict[str, tuple[StudentRoster, bool]] = {}
+    backfill_program: list = []   # survey snapshot'lari to'ldiriladigan roster pk'lari
+    backfill_course: list = []
+    result: dict[str, tuple] = {}
+    touched_campaigns: set[str] = set()
     now = timezone.now()
 
     for sid in ordered_ids:
+        if sid in unchanged:
+            result[sid] = (existing_map.get(sid), "unchanged", {})
+            continue
         data = by_id[sid]
         defaults = _roster_defaults(data)
         ex = existing_map.get(sid)
         if ex is None:
-            roster = StudentRoster(student_external_id=sid, **defaults)
+            roster = StudentRoster(student_external_id=sid, import_fingerprint=fingerprints[sid], **defaults)
             to_create.append(roster)
-            result[sid] = (roster, True)
-        else:
-            changed: list[str] = []
-            for field, value in defaults.items():
-                if getattr(ex, field) != value:
-                    setattr(ex, field, value)
-                    changed.append(field)
-            if changed:
-                ex.updated_at = now  # bulk_update auto_now'ni ishga tushirmaydi
-                to_update.append(ex)
-                update_fields.update(changed)
-                do_prog = "program" in changed and bool(ex.program_id)
-                do_course = "course_year" in changed and bool(ex.course_year)
-                if do_prog or do_course:
-                    backfill.append((ex, do_prog, do_course))
-            result[sid] = (ex, False)
-
+            touched_campaigns.add(roster.roster_campaign)
+            result[sid] = (roster, "created", {})
+            continue
+        changes: dict = {}
+        campaign_before = ex.roster_campaign
+        for field, value in defaults.items():
+            # program FK obyektini yuklamaslik uchun pk bo'yicha solishtiriladi.
+            old = ex.program_id if field == "program" else getattr(ex, field)
+            new = value.pk if field == "program" else value
+            if old != new:
+                changes[field] = [_diff_value(old), _diff_value(new)]
+                setattr(ex, field, value)
+        if changes:
+            ex.updated_at = now  # bulk_update auto_now'ni ishga tushirmaydi
+            touched_campaigns.update({campaign_before, ex.roster_campaign})
+            update_fields.update(changes)
+            if "program" in changes and ex.program_id:
+                backfill_program.append(ex.pk)
+            if "course_year" in changes and ex.course_year:
+                backfill_course.append(ex.pk)
+        # Faqat fingerprint eskirgan bo'lsa ham yoziladi (updated_at o'zgarmaydi) —
+        # keyingi import bu qatorni yuklamasdan o'tkazib yuboradi.
+        ex.import_fingerprint = fingerprints[sid]
+        to_update.append(ex)
+        result[sid] = (ex, "updated" if changes else "unchanged", changes)
+
+    if dry_run:
+        return result
     if to_create:
         StudentRoster.objects.bulk_create(to_create, batch_size=500)
     if to_update:
         StudentRoster.objects.bulk_update(
-            to_update, fields=list(update_fields) + ["updated_at"], batch_size=500
+            to_update, fields=list(update_fields) + ["import_fingerprint", "updated_at"], batch_size=500
         )
 
-    if backfill:
-        from bot2.models import Bot2SurveyResponse
-        for roster, do_prog, do_course in backfill:
-            if do_prog:
-                Bot2SurveyResponse.objects.filter(
-                    roster=roster, program__isnull=True
-                ).update(program=roster.program)
-            if do_course:
-                Bot2SurveyResponse.objects.filter(
-                    roster=roster, course_year__isnull=True
-                ).update(course_year=roster.course_year)
-
+    finish_roster_upsert(touched_campaigns, backfill_program, backfill_course, now=now)
     return result
+
+
+def finish_roster_upsert(touched_campaigns, backfill_program: list, backfill_course: list, now=None) -> None:
+    """Side effects of a set-based roster write that bypassed `save()`
+    (`bulk_upsert_roster_rows`, the COPY loader in bot2.roster_import).
+
+    `touched_campaigns` — campaigns whose rosters were created/changed (empty if
+    nothing was written); `backfill_program` / `backfill_course` — roster pks whose
+    program / course_year changed to a non-null value."""
+    if backfill_program:
+        backfill_survey_snapshots("program", backfill_program, now=now)
+    if backfill_course:
+        backfill_survey_snapshots("course_year", backfill_course, now=now)
+
+    # bulk_create/bulk_update save() ni chetlab o'tadi — coverage rollup'ni shu
+    # yerda yangilaymiz: tegilgan kampaniyalar qayta sanaladi, backfill qilingan
+    # so'rovnomalar esa kun bucket'larida yangi program/kursga ko'chadi.
+    if touched_campaigns:
+        refresh_roster_totals(touched_campaigns)
+    if backfill_program or backfill_course:
+        rebuild_response_days(
+            Bot2LatestSurvey.objects.filter(survey__roster_id__in=set(backfill_program) | set(backfill_course))
+            .values_list("survey_campaign", flat=True).distinct()
+        )
+    if touched_campaigns:
+        bump_data_version()
+
+
+# --------------------------------------------------------------------------- #
+# Bot2LatestSurvey read model
+# --------------------------------------------------------------------------- #
+
+_EPOCH = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+# "Eng oxirgi javob" tartibi: submitted_at (NULL oxirida), keyin created_at/id.
+LATEST_SURVEY_ORDERING = (F("submitted_at").desc(nulls_last=True), "-created_at", "-id")
+
+
+def _latest_sort_key(submitted_at, created_at, pk) -> tuple:
+    """Python counterpart of LATEST_SURVEY_ORDERING (larger = newer)."""
+    return (submitted_at is not None, submitted_at or _EPOCH, created_at or _EPOCH, pk)
+
+
+def _survey_sort_key(survey) -> tuple:
+    return _latest_sort_key(survey.submitted_at, survey.created_at, survey.pk)
+
+
+def _sync_student_latest_flag(student_id, changed_marker_id=None, previous_survey=None) -> None:
+    """Move `is_student_latest` to the student's newest row across campaigns.
+    A student has one row per campaign, so this touches a handful of rows.
+
+    `changed_marker_id`/`previous_survey`: the campaign marker the caller just
+    re-pointed and the survey it pointed at before — the student's previous
+    latest class for the survey_stats counters is read from it without a query.
+    """
+    markers = list(
+        Bot2LatestSurvey.objects.filter(student_id=student_id)
+        .select_related("survey")
+        .only(
+            "id", "is_student_latest", "survey",
+            "survey__submitted_at", "survey__created_at", "survey__employment_class",
+        )
+    )
+    if not markers:
+        return
+    best = max(markers, key=lambda m: _survey_sort_key(m.survey))
+    flagged = next((m for m in markers if m.is_student_latest), None)
+    stale = [m.pk for m in markers if m.is_student_latest and m.pk != best.pk]
+    if stale:
+        Bot2LatestSurvey.objects.filter(pk__in=stale).update(is_student_latest=False)
+    if not best.is_student_latest:
+        Bot2LatestSurvey.objects.filter(pk=best.pk).update(is_student_latest=True)
+
+    old_class = None
+    if flagged is not None:
+        before = previous_survey if flagged.pk == changed_marker_id else flagged.survey
+        old_class = before.employment_class
+    record_latest_class(old_class, best.survey.employment_class, had_latest=flagged is not None)
+
+
+def record_latest_survey(survey: Bot2SurveyResponse) -> None:
+    """Point the (student, campaign) read-model row at `survey` if it is newer.
+
+    Called from `Bot2SurveyResponse.save()`, i.e. inside the caller's transaction
+    (submit_survey'ning atomic bloki). The existing row is locked, so two
+    concurrent submits for the same student serialize here instead of both
+    "winning". Older rows (replays, backdated seeds) leave the marker alone.
+    """
+    with transaction.atomic():
+        marker, created = (
+            Bot2LatestSurvey.objects.select_for_update()
+            .select_related("survey")
+            .get_or_create(
+                student_id=survey.student_id,
+                survey_campaign=survey.survey_campaign,
+                defaults={"survey": survey, "submitted_at": survey.submitted_at},
+            )
+        )
+        previous = None
+        if not created:
+            if marker.survey_id == survey.pk:
+                old_class = getattr(survey, "_db_employment_class", None) or survey.employment_class
+                if marker.submitted_at == survey.submitted_at and old_class == survey.employment_class:
+                    return
+                # Xuddi shu qator qayta saqlandi: eski kun bucket'i marker'dagi sana
+                # va oldingi bandlik klassi.
+                previous = copy.copy(survey)
+                previous.submitted_at = marker.submitted_at
+                previous.employment_class = old_class
+            elif _survey_sort_key(survey) <= _survey_sort_key(marker.survey):
+                return
+            else:
+                previous = marker.survey
+            marker.survey = survey
+            marker.submitted_at = survey.submitted_at
+            marker.save(update_fields=["survey", "submitted_at", "updated_at"])
+        record_response_move(previous, survey)
+        _sync_student_latest_flag(survey.student_id, marker.pk, previous)
+
+
+def rebuild_latest_surveys(student_ids: Optional[Iterable] = None, chunk_size: int = 2000) -> int:
+    """Recompute Bot2LatestSurvey from scratch (all students, or only `student_ids`).
+
+    One ordered linear scan over the survey table: rows arrive grouped by student,
+    newest first, so the first row per campaign is that campaign's latest and the
+    first row per student is the cross-campaign latest. Returns rows written.
+    """
+    surveys = Bot2SurveyResponse.objects.all()
+    markers = Bot2LatestSurvey.objects.all()
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        surveys = surveys.filter(student_id__in=student_ids)
+        markers = markers.filter(student_id__in=student_ids)
+
+    rows = (
+        surveys.order_by("student_id", *LATEST_SURVEY_ORDERING)
+        .values_list("id", "student_id", "survey_campaign", "submitted_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    written = 0
+    batch: list[Bot2LatestSurvey] = []
+    with transaction.atomic():
+        # survey_stats hisoblagichlari: oldin/keyin farqi (to'liq qayta qurishda — qayta sanash).
+        before = latest_class_counts(student_ids) if student_ids is not None else None
+        markers.delete()
+        current_student = None
+        seen_campaigns: set = set()
+        for survey_id, student_id, campaign, submitted_at in rows:
+            if student_id != current_student:
+                current_student = student_id
+                seen_campaigns = set()
+            if campaign in seen_campaigns:
+                continue
+            batch.append(Bot2LatestSurvey(
+                student_id=student_id,
+                survey_campaign=campaign,
+                survey_id=survey_id,
+                submitted_at=submitted_at,
+                is_student_latest=not seen_campaigns,
+            ))
+            seen_campaigns.add(campaign)
+            if len(batch) >= chunk_size:
+                Bot2LatestSurvey.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            Bot2LatestSurvey.objects.bulk_create(batch)
+            written += len(batch)
+        if before is None:
+            rebuild_stat_counters((SURVEY_COUNTER_PREFIX,))
+        else:
+            after = latest_class_counts(student_ids)
+            after.subtract(before)
+            bump_counters(after)
+    return written
+
+
+def _latest_marker_surveys(student_ids: list) -> dict:
+    """{survey pk: survey} of the students' current campaign-latest rows."""
+    return {
+        survey.pk: survey
+        for survey in Bot2SurveyResponse.objects.filter(latest_marker__student_id__in=student_ids).only(
+            "id", "survey_campaign", "submitted_at", "program_id", "course_year", "employment_class"
+        )
+    }
+
+
+def refresh_latest_surveys(student_ids: Iterable) -> None:
+    """Bulk-path counterpart of `record_latest_survey` (surveys written with
+    `bulk_create`): rebuild the read model for `student_ids` and move the
+    responder day buckets by the before/after difference."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+    with transaction.atomic():
+        before = _latest_marker_surveys(student_ids)
+        rebuild_latest_surveys(student_ids)
+        after = _latest_marker_surveys(student_ids)
+        shift_response_days(
+            removed=[survey for pk, survey in before.items() if pk not in after],
+            added=[survey for pk, survey in after.items() if pk not in before],
+        )
+
+
+# --------------------------------------------------------------------------- #
+# employment_class backfill
+# --------------------------------------------------------------------------- #
+
+def backfill_employment_class(chunk_size: int = 2000) -> int:
+    """Re-classify `employment_status` → `employment_class` in pk-ordered chunks.
+
+    Each chunk is its own short transaction (keyset pagination, no long locks);
+    only rows whose class actually changes are written, with `updated_at` bumped
+    so /export incremental pulls pick them up. Returns the number of rows changed.
+    """
+    from django.utils import timezone
+
+    from bot2.models import classify_employment_status
+
+    changed = 0
+    last_pk = None
+    while True:
+        chunk = Bot2SurveyResponse.objects.order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list("pk", "employment_status", "employment_class")[:chunk_size])
+        if not rows:
+            if changed:
+                # UPDATE save()ni chetlab o'tadi — survey_stats hisoblagichlari qayta sanaladi.
+                rebuild_stat_counters((SURVEY_COUNTER_PREFIX,))
+            return changed
+        last_pk = rows[-1][0]
+        by_class: dict[str, list] = {}
+        for pk, status, current in rows:
+            new = classify_employment_status(status)
+            if new != current:
+                by_class.setdefault(new, []).append(pk)
+        with transaction.atomic():
+            now = timezone.now()
+            for employment_class, pks in by_class.items():
+                changed += Bot2SurveyResponse.objects.filter(pk__in=pks).update(
+                    employment_class=employment_class, updated_at=now
+                )
+
+
+# --------------------------------------------------------------------------- #
+# Document verification status (doc_status / employment_doc_status)
+# --------------------------------------------------------------------------- #
+
+def _doc_status_case(verification_model, **doc_filter) -> Case:
+    """A survey's status over its verifications: those of documents bound to the
+    survey plus the student's ones without a source document (dashboard upload)."""
+    match = (
+        Q(source_document__survey=OuterRef("pk"))
+        | Q(source_document__isnull=True, student=OuterRef("student"))
+    )
+
+    def has(decision):
+        return Exists(verification_model.objects.filter(match, final_decision=decision, **doc_filter))
+
+    return Case(
+        When(has("accepted"), then=Value(DocStatus.VERIFIED.value)),
+        When(has("pending"), then=Value(DocStatus.PENDING.value)),
+        When(has("rejected"), then=Value(DocStatus.REJECTED.value)),
+        default=Value(DocStatus.NO_DOCS.value),
+        output_field=CharField(),
+    )
+
+
+def refresh_doc_status(surveys=None, chunk_size: int = 2000) -> int:
+    """Recompute `doc_status` / `employment_doc_status` for `surveys` (a queryset,
+    default: all) in pk-ordered chunks; only changed rows are written (with
+    `updated_at`). Returns rows changed.
+    """
+    from django.utils import timezone
+
+    from ai_verification.models import DocumentVerification
+
+    if surveys is None:
+        surveys = Bot2SurveyResponse.objects.all()
+
+    changed = 0
+    last_pk = None
+    while True:
+        chunk = surveys.order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(
+            chunk.annotate(
+                new_doc=_doc_status_case(DocumentVerification),
+                new_employment=_doc_status_case(DocumentVerification, document_type="employment"),
+            ).values_list("pk", "doc_status", "employment_doc_status", "new_doc", "new_employment")[:chunk_size]
+        )
+        if not rows:
+            return changed
+        last_pk = rows[-1][0]
+        by_status: dict[tuple, list] = {}
+        for pk, doc, employment, new_doc, new_employment in rows:
+            if (doc, employment) != (new_doc, new_employment):
+                by_status.setdefault((new_doc, new_employment), []).append(pk)
+        if by_status:
+            with transaction.atomic():
+                now = timezone.now()
+                for (doc, employment), pks in by_status.items():
+                    changed += Bot2SurveyResponse.objects.filter(pk__in=pks).update(
+                        doc_status=doc, employment_doc_status=employment, updated_at=now
+                    )
+        if len(rows) < chunk_size:
+            return changed
+
+
+def refresh_verification_doc_status(*states) -> int:
+    """Refresh the surveys a verification counts for; each state is its
+    `(student_id, source_document_id)` — before and after a change."""
+    match = Q()
+    for student_id, source_document_id in states:
+        if source_document_id:
+            match |= Q(pk__in=Bot2Document.objects.filter(pk=source_document_id).values("survey_id"))
+        elif student_id:
+            match |= Q(student_id=student_id)
+    if not match:
+        return 0
+    return refresh_doc_status(Bot2SurveyResponse.objects.filter(match))
@@ -1,31 +1,52 @@
-import csv
-import io
 import logging
-import uuid
-
-import openpyxl
-from typing import List
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, models, transaction
 import django_filters
-from django.db.models import Count, Exists, OuterRef, Q, F, Subquery
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.db.models.functions import Coalesce
 from django.http import HttpRequest
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from audit.utils import log_audit
-from bot2.models import Bot2Student, Bot2StudentAccount, Bot2SurveyResponse, StudentRoster, ProgramEnrollment, Bot2Document, BotFsmState
-from bot2.services import parse_roster_payload, bulk_upsert_roster_rows
+from analytics.cache import bump_data_version, data_version
+from analytics.rollups import (
+    SURVEY_COUNTER_PREFIX,
+    read_counters,
+    rebuild_response_days,
+    record_submissions,
+    refresh_roster_totals,
+    responded_total_subquery,
+    submission_cell,
+)
+from audit.utils import log_audit, log_audit_bulk
+from bot2.models import ACCOUNT_SEARCH_FIELDS, DocStatus, EmploymentClass, Bot2Student, Bot2StudentAccount, Bot2SurveyResponse, StudentRoster, ProgramEnrollment, Bot2Document, BotFsmState, RosterImportJob, classify_employment_status
+from bot2.roster_import import (
+    dry_run_response,
+    enqueue_roster_import,
+    inline_response,
+    is_xlsx,
+    job_payload,
+    run_roster_import,
+    xlsx_row_estimate,
+)
+from bot2.rollover import rollover_academic_year, rollover_payload
+from bot2.search import StudentSearchFilter, refresh_search_documents
+from bot2.services import refresh_doc_status, refresh_latest_surveys
+from catalog.cache import PROGRAM_TYPES, REGION_TYPES, get_catalog_item, get_catalog_items, normalize_id
 from catalog.models import CatalogItem
 from common.auth import verify_service_token
+from common.conditional import etag_matches, make_etag, normalized_params, not_modified, updated_watermark, with_etag
 from common.exceptions import APIError, build_error_response
+from common.export import EXPORT_RENDERERS, ExportTable, export_format, streaming_export
+from common.pagination import DefaultPagination
 from common.permissions import IsAdminUserRole, IsViewerOrAdminReadOnly
+from common.replica import ReplicaReadMixin
 from common.throttles import SurveySubmitThrottle
 from common.time import parse_iso_datetime
 
@@ -57,6 +78,11 @@ class Bot2StudentRosterViewSet(viewsets.ModelViewSet):
     filterset_class = StudentRosterFilterSet
     search_fields = ["student_external_id", "first_name", "last_name"]
     ordering_fields = ["student_external_id", "course_year", "created_at"]
+    # ?cursor= — keyset sahifalash (common.pagination), COUNT/OFFSET'siz.
+    cursor_ordering = "student_external_id"
+    cursor_ordering_fields = ["student_external_id", "created_at"]
+    # Katta jadvalda COUNT(*) o'rniga taxmin/kesh (common.pagination, ?count_mode=).
+    count_mode = "auto"
 
     def get_serializer_class(self):
         from bot2.serializers import StudentRosterSerializer
@@ -64,6 +90,7 @@ class Bot2StudentRosterViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         instance = serializer.save()
+        bump_data_version()
         log_audit(
             actor_type="user", actor_user=self.request.user, action="create",
             entity=instance, request=self.request,
@@ -72,6 +99,7 @@ class Bot2StudentRosterViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         instance = serializer.save()
+        bump_data_version()
         log_audit(
             actor_type="user", actor_user=self.request.user, action="update",
             entity=instance, request=self.request,
@@ -85,6 +113,7 @@ class Bot2StudentRosterViewSet(viewsets.ModelViewSet):
             after_data={"student_external_id": instance.student_external_id},
         )
         instance.delete()
+        bump_data_version()
 
 
 class Bot2StudentFilterSet(django_filters.FilterSet):
@@ -107,20 +136,20 @@ class Bot2StudentFilterSet(django_filters.FilterSet):
 
 
 class Bot2StudentViewSet(viewsets.ModelViewSet):
-    # distinct(): searching across the reverse `accounts` join can otherwise return a
-    # student once per matching account.
-    queryset = Bot2Student.objects.select_related("roster", "region").prefetch_related("accounts").distinct()
+    queryset = Bot2Student.objects.select_related("roster", "region").prefetch_related("accounts")
     serializer_class = None
     permission_classes = [IsAuthenticated, IsViewerOrAdminReadOnly]
     # Students are created by the bot; direct POST would 500 (roster is read-only).
     http_method_names = ["get", "head", "options", "patch", "put", "delete"]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, filters.OrderingFilter]
     filterset_class = Bot2StudentFilterSet
-    search_fields = [
-        "student_external_id", "username", "first_name", "last_name",
-        "accounts__phone", "accounts__telegram_user_id",
-    ]
+    # ?search= — ID, ism, username, telefon, Telegram ID (akkauntlar ham) bitta
+    # indekslangan ustunda (bot2.search); accounts join'i va distinct() kerak emas.
+    search_document_field = "search_document"
     ordering_fields = ["created_at"]
+    cursor_ordering = "student_external_id"
+    cursor_ordering_fields = ["student_external_id", "created_at"]
+    count_mode = "auto"
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -165,6 +194,8 @@ class Bot2StudentViewSet(viewsets.ModelViewSet):
             after_data={"student_external_id": instance.student_external_id},
         )
         instance.delete()
+        # So'rovnomalari kaskad o'chadi — analytics keshi va ETag'lar eskiradi.
+        bump_data_version()
 
 
 class Bot2SurveyFilterSet(django_filters.FilterSet):
@@ -176,14 +207,8 @@ class Bot2SurveyFilterSet(django_filters.FilterSet):
     def filter_latest_only(self, qs, name, value):
         if not value:
             return qs
-        latest_id_sq = Bot2SurveyResponse.objects.filter(
-            student=OuterRef("student"), student__isnull=False,
-        ).order_by("-submitted_at", "-created_at", "-id").values("id")[:1]
-        return (
-            qs.filter(student__isnull=False)
-            .annotate(_latest_id_for_filter=Subquery(latest_id_sq))
-            .filter(_latest_id_for_filter=F("id"))
-        )
+        # Bot2LatestSurvey read model: talabaning kampaniyalararo eng oxirgi javobi.
+        return qs.filter(latest_marker__is_student_latest=True)
 
     def filter_want_help(self, qs, name, value):
         return qs.filter(consents__want_help=value)
@@ -196,7 +221,7 @@ class Bot2SurveyFilterSet(django_filters.FilterSet):
         fields = ["student", "program", "course_year", "survey_campaign", "source", "employment_status"]
 
 
-class Bot2SurveyResponseViewSet(viewsets.ReadOnlyModelViewSet):
+class Bot2SurveyResponseViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     # Append-only store: so'rovnomalar faqat bot orqali (submit_survey) yaratiladi va
     # hech qachon tahrirlanmaydi/o'chirilmaydi — dashboard uchun faqat list/retrieve.
     queryset = Bot2SurveyResponse.objects.select_related(
@@ -204,13 +229,16 @@ class Bot2SurveyResponseViewSet(viewsets.ReadOnlyModelViewSet):
     ).prefetch_related("student__accounts")
     serializer_class = None
     permission_classes = [IsAuthenticated, IsViewerOrAdminReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, filters.OrderingFilter]
     filterset_class = Bot2SurveyFilterSet
-    search_fields = ["student__student_external_id", "student__username"]
+    search_document_field = "student__search_document"
     ordering_fields = ["submitted_at", "created_at"]
+    cursor_ordering = "-submitted_at"
+    cursor_ordering_fields = ["submitted_at", "created_at"]
+    count_mode = "auto"
+    renderer_classes = EXPORT_RENDERERS
 
     def get_queryset(self):
-        from ai_verification.models import DocumentVerification
         qs = super().get_queryset()
         submitted_from = self.request.query_params.get("from")
         submitted_to = self.request.query_params.get("to")
@@ -218,70 +246,11 @@ class Bot2SurveyResponseViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(submitted_at__gte=dt)
         if submitted_to and (dt := parse_iso_datetime(submitted_to)):
             qs = qs.filter(submitted_at__lte=dt)
-        # Annotate doc verification status (ikkala yo'l OR bilan birlashadi).
-        _doc_q = (
-            Q(source_document__survey=OuterRef("pk")) |
-            Q(source_document__isnull=True, student=OuterRef("student"))
-        )
-        qs = qs.annotate(
-            # Ishlamaydigan talabalar: istalgan turdagi hujjat
-            has_accepted_doc=Exists(
-                DocumentVerification.objects.filter(_doc_q, final_decision="accepted")
-            ),
-            # Faqat admin ko'rishini kutayotgan (pending) hujjatlar — rejected hisobga olinmaydi
-            has_pending_doc=Exists(
-                DocumentVerification.objects.filter(_doc_q, final_decision="pending")
-            ),
-            # Ishlaydigan talabalar: faqat ish joyi hujjati (employment)
-            has_accepted_employment_doc=Exists(
-                DocumentVerification.objects.filter(
-                    _doc_q, final_decision="accepted", document_type="employment"
-                )
-            ),
-            has_pending_employment_doc=Exists(
-                DocumentVerification.objects.filter(
-                    _doc_q, final_decision="pending", document_type="employment"
-                )
-            ),
-            # Rad etilgan hujjat — hech qanday accepted/pending hujjati yo'q ekanini
-            # "hujjat yo'q" dan ajratish uchun (hujjat yuklangan, lekin rad etilgan).
-            has_rejected_doc=Exists(
-                DocumentVerification.objects.filter(_doc_q, final_decision="rejected")
-            ),
-            has_rejected_employment_doc=Exists(
-                DocumentVerification.objects.filter(
-                    _doc_q, final_decision="rejected", document_type="employment"
-                )
-            ),
-        )
-
-        # Hujjat holati bo'yicha filter
+        # Hujjat holati bo'yicha filter — saqlangan ustun (bot2.services.refresh_doc_status):
+        # verified | pending | rejected | no_docs, istalgan turdagi hujjat bo'yicha.
         doc_status = self.request.query_params.get("doc_status")
-        if doc_status == "verified":
-            # Tasdiqlangan: qabul qilingan hujjati bor (istalgan tur)
-            qs = qs.filter(
-                Q(has_accepted_doc=True) | Q(has_accepted_employment_doc=True)
-            )
-        elif doc_status == "pending":
-            # Ko'rib chiqilmoqda: pending hujjat bor lekin hali tasdiqlangani yo'q
-            qs = qs.filter(
-                Q(has_accepted_doc=False) & Q(has_accepted_employment_doc=False) &
-                (Q(has_pending_doc=True) | Q(has_pending_employment_doc=True))
-            )
-        elif doc_status == "rejected":
-            # Rad etildi: qabul qilingan/pending hujjati yo'q, lekin rad etilgani bor
-            qs = qs.filter(
-                Q(has_accepted_doc=False) & Q(has_accepted_employment_doc=False) &
-                Q(has_pending_doc=False) & Q(has_pending_employment_doc=False) &
-                (Q(has_rejected_doc=True) | Q(has_rejected_employment_doc=True))
-            )
-        elif doc_status == "no_docs":
-            # Hujjat yo'q: hech qanday hujjat (accepted/pending/rejected) yo'q
-            qs = qs.filter(
-                has_accepted_doc=False, has_accepted_employment_doc=False,
-                has_pending_doc=False, has_pending_employment_doc=False,
-                has_rejected_doc=False, has_rejected_employment_doc=False,
-            )
+        if doc_status in DocStatus.values:
+            qs = qs.filter(doc_status=doc_status)
 
         return qs
 
@@ -289,6 +258,71 @@ class Bot2SurveyResponseViewSet(viewsets.ReadOnlyModelViewSet):
         from bot2.serializers import Bot2SurveyResponseSerializer
         return Bot2SurveyResponseSerializer
 
+    def _list_etag(self, request) -> str:
+        """Survey submit bumps the data-version; student/account/document/catalog
+        edits move their `updated_at` watermark (ro'yxat shu jadvallarni ko'rsatadi)."""
+        from ai_verification.models import DocumentVerification
+        return make_etag(
+            "bot2-surveys",
+            normalized_params(request.query_params),
+            data_version(),
+            *updated_watermark(
+                Bot2SurveyResponse.objects.all(),
+                Bot2Student.objects.all(),
+                Bot2StudentAccount.objects.all(),
+                DocumentVerification.objects.all(),
+                CatalogItem.objects.all(),
+            ),
+        )
+
+    def list(self, request, *args, **kwargs):
+        fmt = export_format(request)
+        if not fmt:
+            # Conditional GET: mos If-None-Match — 304, sahifa so'rovi bajarilmaydi.
+            etag = self._list_etag(request)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            response = super().list(request, *args, **kwargs)
+            return with_etag(response, etag) if response.status_code == status.HTTP_200_OK else response
+        # Eksport: filtrlangan to'liq ro'yxat, sahifalashsiz, chunk'lab o'qiladi —
+        # 100k+ qator ham xotiraga birdaniga yuklanmaydi.
+        qs = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        table = ExportTable("surveys", SURVEY_EXPORT_COLUMNS, _survey_export_rows(qs))
+        return streaming_export(fmt, "surveys", [table])
+
+
+SURVEY_EXPORT_COLUMNS = [
+    "id", "student_external_id", "first_name", "last_name", "gender", "region",
+    "program", "course_year", "survey_campaign", "employment_status",
+    "employment_company", "employment_role", "suggestions", "doc_verification_status",
+    "submitted_at",
+]
+
+
+def _survey_export_rows(qs):
+    from bot2.serializers import Bot2SurveyResponseSerializer
+
+    doc_status = Bot2SurveyResponseSerializer().get_doc_verification_status
+    for survey in qs.iterator(chunk_size=2000):
+        student = survey.student
+        yield [
+            survey.id,
+            student.student_external_id if student else "",
+            student.first_name if student else "",
+            student.last_name if student else "",
+            student.gender if student else "",
+            student.region.name if student and student.region else "",
+            survey.program.name if survey.program else "",
+            survey.course_year,
+            survey.survey_campaign,
+            survey.employment_status,
+            survey.employment_company,
+            survey.employment_role,
+            survey.suggestions,
+            doc_status(survey),
+            survey.submitted_at,
+        ]
+
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
@@ -297,42 +331,27 @@ def survey_stats(request):
 
     Har bir talabaning ENG OXIRGI javobi bo'yicha hisoblanadi (bir talaba — bir
     qator, max submitted_at): unikal talabalar soni hamda ishlaydigan /
-    ishlamaydiganlar soni. Butun jadval bo'ylab Python sikli emas — bitta
-    annotatsiyalangan aggregate so'rov.
+    ishlamaydiganlar soni (`employment_class` bo'yicha; javobsiz — unknown,
+    hech biriga kirmaydi). Jonli hisoblagichlardan (analytics.StatCounter,
+    Bot2LatestSurvey yozuvlari bilan bir tranzaksiyada yangilanadi) — bitta
+    kichik o'qish, narxi ma'lumot hajmiga bog'liq emas.
     """
-    latest_id_sq = Bot2SurveyResponse.objects.filter(
-        student=OuterRef("student"), student__isnull=False,
-    ).order_by(
-        F("submitted_at").desc(nulls_last=True), "-created_at", "-id",
-    ).values("id")[:1]
-    latest_qs = (
-        Bot2SurveyResponse.objects.filter(student__isnull=False)
-        .annotate(_latest_id=Subquery(latest_id_sq))
-        .filter(_latest_id=F("id"))
-    )
-    agg = latest_qs.aggregate(
-        unique_students=Count("id"),
-        employed=Count("id", filter=Q(employment_status="employed")),
-        unemployed=Count("id", filter=Q(employment_status="unemployed")),
-    )
+    counts = read_counters(SURVEY_COUNTER_PREFIX)
     return Response({
-        "unique_students": agg["unique_students"] or 0,
-        "employed": agg["employed"] or 0,
-        "unemployed": agg["unemployed"] or 0,
+        "unique_students": sum(counts.values()),
+        "employed": counts.get(EmploymentClass.EMPLOYED, 0),
+        "unemployed": counts.get(EmploymentClass.UNEMPLOYED, 0),
     })
 
 
 class ProgramEnrollmentViewSet(viewsets.ModelViewSet):
+    """`responded_count` — (program, course_year, campaign) katagi bo'yicha
+    saqlangan javob berganlar soni (analytics.CoverageResponseTotal, submit va
+    roster backfill bilan yangilanadi); so'rovnomalar har so'rovda sanalmaydi.
+    `POST recompute-responded/` — katak(lar)ni manba jadvallardan qayta sanaydi."""
+
     queryset = ProgramEnrollment.objects.select_related("program").annotate(
-        responded_count=Count(
-            "program__bot2_program_surveys__roster_id",
-            distinct=True,
-            filter=Q(
-                program__bot2_program_surveys__course_year=F("course_year"),
-                program__bot2_program_surveys__survey_campaign=F("campaign"),
-                program__bot2_program_surveys__submitted_at__isnull=False,
-            ),
-        )
+        responded_count=Coalesce(responded_total_subquery(), 0)
     )
     serializer_class = None
     permission_classes = [IsAuthenticated, IsViewerOrAdminReadOnly]
@@ -347,6 +366,7 @@ class ProgramEnrollmentViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         instance = serializer.save()
+        bump_data_version()
         log_audit(
             actor_type="user", actor_user=self.request.user, action="create",
             entity=instance, request=self.request,
@@ -355,6 +375,7 @@ class ProgramEnrollmentViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         instance = serializer.save()
+        bump_data_version()
         log_audit(
             actor_type="user", actor_user=self.request.user, action="update",
             entity=instance, request=self.request,
@@ -368,9 +389,26 @@ class ProgramEnrollmentViewSet(viewsets.ModelViewSet):
             after_data={"program": str(instance.program), "course_year": instance.course_year},
         )
         instance.delete()
+        bump_data_version()
+
+    @action(
+        detail=False, methods=["post"], url_path="recompute-responded",
+        permission_classes=[IsAuthenticated, IsAdminUserRole],
+    )
+    def recompute_responded(self, request):
+        """Saqlangan responded_count'ni qayta hisoblaydi: body'da `campaign`
+        berilsa — faqat shu kampaniya, aks holda enrollment'lardagi barcha kampaniyalar."""
+        campaign = (request.data.get("campaign") or "").strip()
+        if campaign:
+            campaigns = [campaign]
+        else:
+            campaigns = sorted(set(ProgramEnrollment.objects.values_list("campaign", flat=True)))
+        rebuild_response_days(campaigns)
+        bump_data_version()
+        return Response({"campaigns": campaigns})
 
 
-class Bot2DocumentViewSet(viewsets.ReadOnlyModelViewSet):
+class Bot2DocumentViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["student", "doc_type", "survey"]
@@ -436,256 +474,123 @@ def student_extract_skills(request, pk):
     return Response({"detail": "Ko'nikma tahlili boshlandi."}, status=status.HTTP_202_ACCEPTED)
 
 
-# Column aliases: Excel header → internal field name
-# Turli Unicode apostroflar (o'/o'/o` ...) — bir xil ' ga keltiriladi, shunda
-# "Tug'ilgan sanasi" kabi real Excel sarlavhalari ishonchli tanib olinadi.
-_APOSTROPHES = "‘’ʻʼ´`"
-_EXCEL_ERRORS = {"#ref!", "#n/a", "#value!", "#div/0!", "#name?", "#null!", "#num!"}
-
-_XLSX_COLUMN_MAP = {
-    # Talaba ID
-    "student_id": "student_external_id",
-    "student id": "student_external_id",
-    "studentid": "student_external_id",
-    "id": "student_external_id",
-    "matricula": "student_external_id",
-    "talaba id": "student_external_id",
-    "talaba_id": "student_external_id",
-    "talaba": "student_external_id",
-    # Alohida ism / familiya
-    "ism": "first_name",
-    "first_name": "first_name",
-    "first name": "first_name",
-    "firstname": "first_name",
-    "name": "first_name",
-    "familya": "last_name",
-    "familiya": "last_name",
-    "last_name": "last_name",
-    "last name": "last_name",
-    "lastname": "last_name",
-    "surname": "last_name",
-    # Birlashgan to'liq ism — pastda first/last ga bo'linadi
-    "ism familya": "full_name",
-    "full_name": "full_name",
-    "full name": "full_name",
-    "fullname": "full_name",
-    "fio": "full_name",
-    "to'liq ism": "full_name",
-    "to'liq ismi": "full_name",
-    "to'liq ism sharifi": "full_name",
-    "to'liq ismi sharifi": "full_name",
-    "ism sharifi": "full_name",
-    "ismi sharifi": "full_name",
-    # Kurs
-    "year": "course_year",
-    "yil": "course_year",
-    "kurs": "course_year",
-    "course": "course_year",
-    "course year": "course_year",
-    "course_year": "course_year",
-    # Tug'ilgan sana
-    "tug'ilgan sana": "birth_date",
-    "tug'ilgan sanasi": "birth_date",
-    "tug'ilgan_sana": "birth_date",
-    "tug'ilgan": "birth_date",
-    "birth_date": "birth_date",
-    "birth date": "birth_date",
-    "birthdate": "birth_date",
-    "date of birth": "birth_date",
-    "dob": "birth_date",
-}
-
-
-def _canon_header(raw) -> str:
-    """Sarlavhani normallashtiradi: strip, lower, apostroflarni birlashtiradi,
-    ichki bo'sh joylarni siqadi."""
-    if raw is None:
-        return ""
-    s = str(raw).strip().lower()
-    for ap in _APOSTROPHES:
-        s = s.replace(ap, "'")
-    return " ".join(s.split())
-
-
-def _map_header(raw) -> str:
-    """Sarlavhani kanonik maydon nomiga xaritalaydi. Tanib bo'lmasa —
-    normallashgan sarlavhaning O'ZINI qaytaradi (program_id/program_code/campaign/
-    is_active kabi to'g'ridan-to'g'ri maydonlar ham CSV orqali o'tishi uchun);
-    keraksiz ustunlar (Group, Tel, Grant, Stats ...) parse bosqichida e'tiborsiz."""
-    c = _canon_header(raw)
-    if not c:
-        return c
-    if c in _XLSX_COLUMN_MAP:
-        return _XLSX_COLUMN_MAP[c]
-    # Iflos real sarlavhalar uchun ehtiyotkor substring qoidalari:
-    if "tug'ilgan" in c:
-        return "birth_date"
-    if ("full" in c and "name" in c) or "ism sharif" in c or "ismi sharif" in c:
-        return "full_name"
-    return c
-
-
-def _normalize_row(raw: dict) -> dict:
-    """Map header aliases (apostrophe/whitespace/case-insensitive) to canonical
-    field names, drop Excel error cells (#REF! ...), and split a merged full-name
-    column into first/last. Shared by the .xlsx and .csv upload paths."""
-    row: dict = {}
-    for key, val in raw.items():
-        if key is None or val is None:
-            continue
-        canon = _map_header(key)
-        value = val.strip() if isinstance(val, str) else val
-        if isinstance(value, str):
-            if value == "" or value.lower() in _EXCEL_ERRORS:
-                continue
-        row[canon] = value
-
-    # Birlashgan to'liq ism ("SURNAME FIRST PATRONYMIC") → birinchi bo'sh joydan
-    # bo'linadi. Dashboard nomni "{first_name} {last_name}" tartibida ko'rsatgani
-    # uchun bu ko'rinuvchi tartibni saqlaydi. Alohida first/last berilgan bo'lsa —
-    # ular ustidan yozilmaydi.
-    full = row.pop("full_name", None)
-    if isinstance(full, str) and full:
-        parts = full.split(None, 1)
-        row.setdefault("first_name", parts[0])
-        if len(parts) > 1:
-            row.setdefault("last_name", parts[1])
-
-    return row
-
-
-def _parse_xlsx(file) -> list[dict]:
-    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
-    ws = wb.active
-    rows_iter = ws.iter_rows(values_only=True)
-
-    raw_headers = list(next(rows_iter, []))  # first row = headers
-
-    result = []
-    for raw_row in rows_iter:
-        if all(v is None for v in raw_row):
-            continue  # skip fully empty rows
-        row = _normalize_row(dict(zip(raw_headers, raw_row)))
-        if row:
-            result.append(row)
-
-    wb.close()
-    return result
-
-
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsAdminUserRole])
-@transaction.atomic
 def import_roster(request):
-    created = 0
-    updated = 0
-    skipped = 0
-    errors: List[dict] = []
-    imported: List[dict] = []
-
-    rows = []
-    if request.FILES.get("file"):
-        file = request.FILES["file"]
-        filename = file.name.lower()
-        # Fayl darajasidagi parse xatolari (eski .xls, buzilgan .xlsx, noto'g'ri
-        # kodlangan CSV) 500 emas, aniq 400 bilan qaytishi kerak.
-        try:
-            if filename.endswith(".xlsx") or filename.endswith(".xls"):
-                rows = _parse_xlsx(file)
-            else:
-                raw_bytes = file.read()
-                try:
-                    decoded = raw_bytes.decode("utf-8-sig")  # utf-8-sig strips BOM
-                except UnicodeDecodeError:
-                    # Excel'dan eksport qilingan legacy CSV ko'pincha cp1251 bo'ladi
-                    decoded = raw_bytes.decode("cp1251")
-                reader = csv.DictReader(io.StringIO(decoded))
-                rows = [_normalize_row(r) for r in reader]
-        except Exception:
-            logger.exception("import_roster: uploaded file could not be parsed (%s)", file.name)
-            return build_error_response(
-                "INVALID_FILE",
-                "Faylni o'qib bo'lmadi. Iltimos, .xlsx (Excel) yoki UTF-8/CP1251 "
-                "kodlangan CSV formatidagi to'g'ri fayl yuboring (eski .xls format "
-                "qo'llab-quvvatlanmaydi).",
-                status.HTTP_400_BAD_REQUEST,
-            )
-    elif isinstance(request.data, list):
+    """Roster import'ni RosterImportJob sifatida boshlaydi (bot2/roster_import.py).
+
+    Fayl (.xlsx/.csv) va ROSTER_IMPORT_INLINE_MAX_ROWS dan katta JSON navbatga
+    qo'yiladi: 202 + job holati; jarayon, hisoblar va xatolar —
+    `GET /admin/roster/import/<job_id>`. Kichik JSON ro'yxat so'rov ichida
+    bajariladi va avvalgi javobni qaytaradi (created/updated/unchanged/skipped/
+    errors/students; xatoli qatorlar bo'lsa 207).
+
+    `?dry_run=1` — hech narsa yozilmaydi, faqat farq (hisoblar + `samples`).
+    `?mode=mirror[&campaign=...]` — kampaniyaning faylda yo'q faol qatorlari
+    import oxirida o'chiriladi (is_active=False)."""
+    mode = request.query_params.get("mode") or RosterImportJob.Mode.UPSERT
+    if mode not in RosterImportJob.Mode.values:
+        return build_error_response(
+            "VALIDATION_ERROR", f"mode must be one of: {', '.join(RosterImportJob.Mode.values)}.",
+            status.HTTP_400_BAD_REQUEST,
+        )
+    options = {
+        "mode": mode,
+        "campaign": (request.query_params.get("campaign") or "default") if mode == RosterImportJob.Mode.MIRROR else "",
+        "dry_run": request.query_params.get("dry_run", "").lower() in ("1", "true", "yes"),
+        "created_by": request.user,
+    }
+    upload = request.FILES.get("file")
+    if upload:
+        total_rows = None
+        if is_xlsx(upload.name):
+            # Fayl darajasidagi xatolar (eski .xls, buzilgan .xlsx) navbatga
+            # tushmasdan, darhol aniq 400 bilan qaytadi.
+            try:
+                total_rows = xlsx_row_estimate(upload)
+            except Exception:
+                logger.exception("import_roster: uploaded file could not be parsed (%s)", upload.name)
+                return build_error_response(
+                    "INVALID_FILE",
+                    "Faylni o'qib bo'lmadi. Iltimos, .xlsx (Excel) yoki UTF-8/CP1251 "
+                    "kodlangan CSV formatidagi to'g'ri fayl yuboring (eski .xls format "
+                    "qo'llab-quvvatlanmaydi).",
+                    status.HTTP_400_BAD_REQUEST,
+                )
+        job = RosterImportJob.objects.create(
+            source=RosterImportJob.Source.FILE, file=upload, original_filename=upload.name,
+            total_rows=total_rows, **options,
+        )
+        return _queued_import_response(job)
+
+    if isinstance(request.data, list):
         rows = request.data
-    elif isinstance(request.data, dict) and "rows" in request.data:
+    elif isinstance(request.data, dict) and isinstance(request.data.get("rows"), list):
         rows = request.data["rows"]
     else:
         return build_error_response("INVALID_PAYLOAD", "Provide Excel/CSV file or JSON list.", status.HTTP_400_BAD_REQUEST)
 
-    # 1-bosqich: har qatorni validatsiya qilamiz (tartibni saqlagan holda).
-    # ID'siz qatorlar (Excel'dagi statistika jadvali qoldiqlari, bo'sh qatorlar)
-    # xato emas — jimgina o'tkazib yuboriladi va `skipped` ga sanaladi.
-    # program_cache bir xil program_id/code takror qidirilmasligini ta'minlaydi.
-    program_cache: dict = {}
-    valid: List[tuple] = []  # (idx, parsed)
-    for idx, row in enumerate(rows, start=1):
-        if not isinstance(row, dict):
-            errors.append({"row": idx, "error": "Row must be an object."})
-            continue
-        if not str(row.get("student_external_id") or "").strip():
-            skipped += 1
-            continue
-        try:
-            valid.append((idx, parse_roster_payload(row, program_cache=program_cache)))
-        except APIError as exc:
-            errors.append({"row": idx, "error": exc.detail})
-        except Exception as exc:
-            errors.append({"row": idx, "error": str(exc)})
-
-    # 2-bosqich: barcha to'g'ri qatorlarni BITTA partiyada upsert qilamiz.
-    result = bulk_upsert_roster_rows([p for _, p in valid]) if valid else {}
-
-    # 3-bosqich: javobni quramiz — har noyob roster bitta yozuv (fayl ichida ID
-    # takrorlansa oxirgisi g'olib), birinchi paydo bo'lish qatori bilan.
-    seen = set()
-    for idx, parsed in valid:
-        sid = parsed["student_external_id"]
-        if sid in seen:
-            continue
-        seen.add(sid)
-        roster, was_created = result[sid]
-        if was_created:
-            created += 1
-        else:
-            updated += 1
-        imported.append({
-            "row": idx,
-            "student_external_id": roster.student_external_id,
-            "first_name": roster.first_name,
-            "last_name": roster.last_name,
-            "course_year": roster.course_year,
-            "program_id": roster.program_id,
-            "status": "created" if was_created else "updated",
-        })
+    if len(rows) > settings.ROSTER_IMPORT_INLINE_MAX_ROWS:
+        job = RosterImportJob.objects.create(
+            source=RosterImportJob.Source.JSON, payload=rows, total_rows=len(rows), **options,
+        )
+        return _queued_import_response(job)
 
-    # Resolve program names for the imported rows in a single query
-    program_ids = {r["program_id"] for r in imported if r["program_id"]}
-    program_names = (
-        dict(CatalogItem.objects.filter(id__in=program_ids).values_list("id", "name"))
-        if program_ids else {}
+    job = RosterImportJob.objects.create(source=RosterImportJob.Source.JSON, total_rows=len(rows), **options)
+    importer = run_roster_import(
+        job.pk, rows=rows, collect=True, request=request._request if isinstance(request._request, HttpRequest) else None,
     )
-    for r in imported:
-        r["program"] = program_names.get(r.pop("program_id"))
+    job.refresh_from_db(fields=["status", "last_error"])
+    if job.status == RosterImportJob.Status.FAILED:
+        return build_error_response("IMPORT_FAILED", job.last_error, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if job.dry_run:
+        return Response(dry_run_response(importer))
+    status_code = status.HTTP_207_MULTI_STATUS if importer.error_list else status.HTTP_200_OK
+    return Response(inline_response(importer), status=status_code)
 
-    log_audit(
-        actor_type="user",
-        actor_user=request.user,
-        action="update",
-        entity=StudentRoster(),
-        request=request._request if isinstance(request._request, HttpRequest) else None,
-        after_data={"created": created, "updated": updated, "skipped": skipped, "errors": len(errors)},
-        meta={"type": "roster_import"},
+
+def _queued_import_response(job):
+    enqueue_roster_import(job)
+    job.refresh_from_db()
+    return Response(job_payload(job), status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminUserRole])
+def roster_import_job(request, job_id):
+    """GET /api/v1/admin/roster/import/<job_id> — import holati, hisoblar va
+    sahifalangan xatolar (`errors`: `?page=`/`?page_size=`)."""
+    job = RosterImportJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return build_error_response("NOT_FOUND", "Import topilmadi", status.HTTP_404_NOT_FOUND)
+    paginator = DefaultPagination()
+    page = paginator.paginate_queryset(
+        job.errors.order_by("row", "id").values("row", "student_external_id", "error"), request
     )
+    payload = job_payload(job)
+    payload["errors"] = paginator.get_paginated_response(list(page)).data
+    return Response(payload)
 
-    status_code = status.HTTP_207_MULTI_STATUS if errors else status.HTTP_200_OK
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdminUserRole])
+def roster_rollover(request):
+    """POST /api/v1/admin/roster/rollover — o'quv yilini yopish (bot2/rollover.py).
+
+    Body: `academic_year` (yopilayotgan, masalan "2025-2026"), `campaign`
+    (standart "default"), ixtiyoriy `next_academic_year`. Bajarilsa 201; shu
+    (campaign, academic_year) uchun avval bajarilgan bo'lsa — 200 va saqlangan
+    natija, hech narsa o'zgarmaydi."""
+    academic_year = str(request.data.get("academic_year") or "").strip()
+    campaign = str(request.data.get("campaign") or "").strip() or "default"
+    next_year = str(request.data.get("next_academic_year") or "").strip() or None
+    record, performed = rollover_academic_year(
+        campaign, academic_year, next_year=next_year, actor=request.user,
+        request=request._request if isinstance(request._request, HttpRequest) else None,
+    )
     return Response(
-        {"created": created, "updated": updated, "skipped": skipped, "errors": errors, "students": imported},
-        status=status_code,
+        {**rollover_payload(record), "performed": performed},
+        status=status.HTTP_201_CREATED if performed else status.HTTP_200_OK,
     )
 
 
@@ -695,18 +600,13 @@ def _safe_program_id(value):
     junk; passing any of those to a UUID-typed `id=` filter raises ValidationError and
     500s. Normalizing to None lets the roster's own program take over and degrades a
     truly-missing program to a clean 4xx instead of a crash."""
-    if value is None:
-        return None
-    text = str(value).strip()
-    if text.lower() in ("", "none", "null"):
-        return None
-    try:
-        return str(uuid.UUID(text))
-    except (ValueError, AttributeError, TypeError):
-        return None
+    return normalize_id(value)
 
 
-def _link_account(student, telegram_user_id, *, username="", first_name="", last_name="", phone="", allow_relink=False):
+def _link_account(
+    student, telegram_user_id, *, username="", first_name="", last_name="", phone="",
+    allow_relink=False, pending_student_fields=None,
+):
     """Attach a Telegram account to `student`, creating or re-activating the link, and
     keep ALL such accounts (a student may log in from several Telegram accounts with the
     same student_external_id). A telegram_user_id already linked to a DIFFERENT student
@@ -714,35 +614,45 @@ def _link_account(student, telegram_user_id, *, username="", first_name="", last
     verified register flow (bot_verify success + consent). All other call sites refuse
     the move, so a stale/forged payload can never silently hand one student's account
     (and PII) to another. The student's denormalized 'primary' Telegram/phone fields are
-    synced to this most-recent account. Returns the Bot2StudentAccount (or None)."""
+    synced to this most-recent account; with `pending_student_fields` (a list) the
+    changed field names are appended to it and saving the student is left to the
+    caller. Returns the Bot2StudentAccount (or None)."""
     if not telegram_user_id:
         return None
 
-    if not allow_relink:
-        existing = Bot2StudentAccount.objects.filter(telegram_user_id=telegram_user_id).first()
-        if existing and existing.student_id != student.id:
-            logger.warning(
-                "Refusing to re-link telegram account %s from student %s to student %s without verification",
-                telegram_user_id, existing.student_id, student.id,
-            )
-            return None
+    account = Bot2StudentAccount.objects.filter(telegram_user_id=telegram_user_id).first()
+    if account and account.student_id != student.id and not allow_relink:
+        logger.warning(
+            "Refusing to re-link telegram account %s from student %s to student %s without verification",
+            telegram_user_id, account.student_id, student.id,
+        )
+        return None
 
-    account, _ = Bot2StudentAccount.objects.update_or_create(
-        telegram_user_id=telegram_user_id,
-        defaults={
-            "student": student,
-            "username": username or "",
-            "first_name": first_name or "",
-            "last_name": last_name or "",
-            "is_active": True,
-            "last_seen_at": timezone.now(),
-        },
-    )
+    now = timezone.now()
+    values = {
+        "student": student,
+        "username": username or "",
+        "first_name": first_name or "",
+        "last_name": last_name or "",
+        "is_active": True,
+        "last_seen_at": now,
+    }
     # Only overwrite the stored phone when this call actually carries one, so we never
     # wipe a previously captured number.
-    if phone and account.phone != phone:
-        account.phone = phone
-        account.save(update_fields=["phone", "updated_at"])
+    if phone:
+        values["phone"] = phone
+    # Mavjud akkaunt — bitta UPDATE (0 qator: parallel o'chirilgan → update_or_create).
+    if account and Bot2StudentAccount.objects.filter(pk=account.pk).update(**values, updated_at=now):
+        searched_before = (account.student_id, *(getattr(account, f) for f in ACCOUNT_SEARCH_FIELDS))
+        for attr, val in values.items():
+            setattr(account, attr, val)
+        # UPDATE save()ni chetlab o'tadi — qidiruv hujjati faqat o'zgarganda yangilanadi.
+        if searched_before != (account.student_id, *(getattr(account, f) for f in ACCOUNT_SEARCH_FIELDS)):
+            refresh_search_documents({searched_before[0], account.student_id})
+    else:
+        account, _ = Bot2StudentAccount.objects.update_or_create(
+            telegram_user_id=telegram_user_id, defaults=values,
+        )
 
     # Mirror the latest account onto the student's denormalized convenience fields.
     # Only overwrite with non-blank values so a later sparse update never wipes data.
@@ -757,18 +667,16 @@ def _link_account(student, telegram_user_id, *, username="", first_name="", last
         if val and getattr(student, attr) != val:
             setattr(student, attr, val)
             fields.append(attr)
-    if fields:
+    if pending_student_fields is not None:
+        pending_student_fields.extend(fields)
+    elif fields:
         fields.append("updated_at")
         student.save(update_fields=fields)
     return account
 
 
-def _sync_student_name(student, roster, fallback_first="", fallback_last=""):
-    """Keep the student's name populated for the survey detail page and Excel export.
-
-    The roster (Excel import) is the authoritative source of the official name, so it
-    wins when present; otherwise we fall back to the Telegram-supplied name (latest
-    submission wins). A blank value never overwrites a populated one."""
+def _student_name_changes(student, roster, fallback_first="", fallback_last=""):
+    """Apply the roster/Telegram name to `student` in memory; returns changed fields."""
     fields = []
     desired_first = (getattr(roster, "first_name", "") or "").strip() or (fallback_first or "").strip()
     if desired_first and student.first_name != desired_first:
@@ -778,12 +686,51 @@ def _sync_student_name(student, roster, fallback_first="", fallback_last=""):
     if desired_last and student.last_name != desired_last:
         student.last_name = desired_last
         fields.append("last_name")
+    return fields
+
+
+def _sync_student_name(student, roster, fallback_first="", fallback_last=""):
+    """Keep the student's name populated for the survey detail page and Excel export.
+
+    The roster (Excel import) is the authoritative source of the official name, so it
+    wins when present; otherwise we fall back to the Telegram-supplied name (latest
+    submission wins). A blank value never overwrites a populated one."""
+    fields = _student_name_changes(student, roster, fallback_first, fallback_last)
     if fields:
         fields.append("updated_at")
         student.save(update_fields=fields)
     return student
 
 
+def _idempotent_replay(idempotency_key):
+    """200 response for an already stored `idempotency_key`, or None."""
+    existing = (
+        Bot2SurveyResponse.objects.filter(idempotency_key=idempotency_key)
+        .values("id", "program_id", "course_year")
+        .first()
+    )
+    if not existing:
+        return None
+    return Response(
+        {"ok": True, "response_id": str(existing["id"]), "idempotent": True,
+         "roster": {"program_id": str(existing["program_id"]) if existing["program_id"] else None,
+                    "course_year": existing["course_year"]}},
+        status=status.HTTP_200_OK,
+    )
+
+
+# Takroriy topshiruv (roster, talaba va Telegram akkaunt mavjud) uchun SQL so'rovlar
+# chegarasi — tests/test_submit_query_budget.py shuni tekshiradi. Tarkibi:
+#   token 1 · idempotency 1 · roster+program 1 · talaba+region 1 · akkaunt 2
+#   · talaba UPDATE ≤1 · survey INSERT 1 · read-model/rollup'lar 8 (savepoint bilan)
+#   · hujjatlar 1 · doc_status SELECT 1 (+ o'zgarsa UPDATE 1)
+#   · tranzaksiya/savepoint 4 · audit (commit'dan keyin) 1
+#   (qidiruv hujjati faqat talaba/akkaunt qidiruv maydonlari o'zgarganda yangilanadi)
+# Katalog (program/region) tekshiruvi catalog.cache'dan — so'rovsiz.
+SUBMIT_SURVEY_QUERY_BUDGET = 24
+SURVEY_DOC_KEYS = ("cv_doc_id", "cert_doc_id", "employment_doc_id")
+
+
 @api_view(["POST"])
 @permission_classes([])
 @throttle_classes([SurveySubmitThrottle])
@@ -792,6 +739,12 @@ def submit_survey(request):
     """
     Append-only survey submission. Each call creates a new Bot2SurveyResponse row.
     Dedup via idempotency_key (bot-supplied UUIDv4): same key → return existing row.
+
+    Hot path with a fixed query budget (`SUBMIT_SURVEY_QUERY_BUDGET`): relations are
+    fetched with their FK targets, catalog ids are validated from `catalog.cache`,
+    the student is written at most once, documents are bound with one UPDATE and the
+    audit row is inserted after commit. Uniqueness (idempotency_key) is enforced by
+    the DB constraint — a lost race surfaces as IntegrityError and is replayed.
     """
     verify_service_token(request.headers.get("X-SERVICE-TOKEN"), service_name="bot2")
 
@@ -809,15 +762,11 @@ def submit_survey(request):
 
     idempotency_key = request.data.get("idempotency_key") or None
     if idempotency_key:
-        existing = Bot2SurveyResponse.objects.filter(idempotency_key=idempotency_key).first()
-        if existing:
-            return Response(
-                {"ok": True, "response_id": str(existing.id), "idempotent": True,
-                 "roster": {"program_id": str(existing.program_id) if existing.program_id else None, "course_year": existing.course_year}},
-                status=status.HTTP_200_OK,
-            )
+        replay = _idempotent_replay(idempotency_key)
+        if replay:
+            return replay
 
-    roster = StudentRoster.objects.filter(student_external_id=student_external_id).first()
+    roster = StudentRoster.objects.select_related("program").filter(student_external_id=student_external_id).first()
     program = None
 
     # Resolve program: prefer roster value, fall back to payload.
@@ -828,11 +777,7 @@ def submit_survey(request):
     if not roster:
         if not program_id_payload:
             return build_error_response("ROSTER_NOT_FOUND", "Student roster not found and program_id not provided.", status.HTTP_400_BAD_REQUEST)
-        program = CatalogItem.objects.filter(
-            id=program_id_payload
-        ).filter(
-            Q(type=CatalogItem.ItemType.PROGRAM) | Q(type=CatalogItem.ItemType.DIRECTION)
-        ).first()
+        program = get_catalog_item(program_id_payload, PROGRAM_TYPES)
         if not program:
             return build_error_response("INVALID_PROGRAM", "program_id must reference a program or direction catalog item.", status.HTTP_400_BAD_REQUEST)
     else:
@@ -844,17 +789,13 @@ def submit_survey(request):
             program = roster.program
         elif program_id_payload:
             # Roster exists but has no program — student selected it in bot
-            program = CatalogItem.objects.filter(
-                id=program_id_payload
-            ).filter(
-                Q(type=CatalogItem.ItemType.PROGRAM) | Q(type=CatalogItem.ItemType.DIRECTION)
-            ).first()
+            program = get_catalog_item(program_id_payload, PROGRAM_TYPES)
 
     campaign = request.data.get("survey_campaign") or "default"
     region_id = request.data.get("region_id")
     region = None
     if region_id:
-        region = CatalogItem.objects.filter(id=region_id, type=CatalogItem.ItemType.REGION).first()
+        region = get_catalog_item(region_id, REGION_TYPES)
         if not region:
             return build_error_response("INVALID_REGION", "region_id must reference a region catalog item.", status.HTTP_400_BAD_REQUEST)
 
@@ -890,10 +831,24 @@ def submit_survey(request):
                 student_defaults["gender"] = request.data["gender"]
             if region is not None:
                 student_defaults["region"] = region
-            student, _ = Bot2Student.objects.update_or_create(
-                student_external_id=student_external_id,
-                defaults=student_defaults,
+            student_fields = []
+            student = (
+                Bot2Student.objects.select_related("region")
+                .filter(student_external_id=student_external_id)
+                .first()
             )
+            if student is None:
+                # Birinchi topshiruv: yaratish poygasini update_or_create hal qiladi.
+                student, _ = Bot2Student.objects.update_or_create(
+                    student_external_id=student_external_id,
+                    defaults=student_defaults,
+                )
+            else:
+                for attr, value in student_defaults.items():
+                    current = getattr(student, Bot2Student._meta.get_field(attr).attname)
+                    if current != getattr(value, "pk", value):
+                        setattr(student, attr, value)
+                        student_fields.append(attr)
             _link_account(
                 student,
                 telegram_user_id,
@@ -901,15 +856,20 @@ def submit_survey(request):
                 first_name=request.data.get("first_name", "") or "",
                 last_name=request.data.get("last_name", "") or "",
                 phone=request.data.get("phone", "") or "",
+                pending_student_fields=student_fields,
             )
-            _sync_student_name(
+            student_fields += _student_name_changes(
                 student, roster,
                 fallback_first=request.data.get("first_name", "") or "",
                 fallback_last=request.data.get("last_name", "") or "",
             )
+            if student_fields:
+                # Barcha talaba o'zgarishlari — bitta UPDATE.
+                student.save(update_fields=[*dict.fromkeys(student_fields), "updated_at"], prevalidated=True)
 
             # Append-only: always create a new survey row.
-            survey = Bot2SurveyResponse.objects.create(
+            answers_data = request.data.get("answers", {}) or {}
+            survey = Bot2SurveyResponse(
                 student=student,
                 roster=roster,
                 program=program,
@@ -922,53 +882,46 @@ def submit_survey(request):
                 employment_role=request.data.get("employment_role", "") or "",
                 suggestions=request.data.get("suggestions", "") or "",
                 consents=request.data.get("consents", {}) or {},
-                answers=request.data.get("answers", {}) or {},
+                answers=answers_data,
                 submitted_at=timezone.now(),
             )
-            # Link any pre-uploaded documents to this survey.
-            # Primary path: bind every document that carries this run's session key —
+            survey.save(force_insert=True, prevalidated=True)
+            # Link any pre-uploaded documents to this survey in one UPDATE.
+            # Primary path: every document that carries this run's session key —
             # robust even if a doc_id was dropped from the answers payload.
-            session_key = (request.data.get("survey_session_key") or "").strip()[:64]
-            if session_key:
-                Bot2Document.objects.filter(
-                    survey_session_key=session_key, student=student, survey__isnull=True
-                ).update(survey=survey)
             # Fallback path: explicit doc_ids (backward compatible; also covers docs
             # uploaded before session keys existed / when the key is absent).
-            answers_data = request.data.get("answers", {}) or {}
-            for key in ("cv_doc_id", "cert_doc_id", "employment_doc_id"):
-                doc_id = answers_data.get(key)
-                if doc_id:
-                    Bot2Document.objects.filter(
-                        id=doc_id, student=student, survey__isnull=True
-                    ).update(survey=survey)
+            doc_match = Q()
+            session_key = (request.data.get("survey_session_key") or "").strip()[:64]
+            if session_key:
+                doc_match |= Q(survey_session_key=session_key)
+            doc_ids = [doc_id for doc_id in (normalize_id(answers_data.get(key)) for key in SURVEY_DOC_KEYS) if doc_id]
+            if doc_ids:
+                doc_match |= Q(id__in=doc_ids)
+            if doc_match:
+                Bot2Document.objects.filter(doc_match, student=student, survey__isnull=True).update(survey=survey)
+            # Bog'langan hujjatlar + talabaning umumiy verification'lari bo'yicha holat.
+            refresh_doc_status(Bot2SurveyResponse.objects.filter(pk=survey.pk))
+            bump_data_version()
     except ValidationError as exc:
         # full_clean()/validate_unique poygasi ham xuddi shu idempotency_key duplikatini
         # IntegrityError o'rniga ValidationError sifatida ko'rsatishi mumkin — bu duplikat
         # emas, idempotent takror: qatorni qayta so'rab, 200 + mavjud qator qaytaramiz.
         if idempotency_key:
-            existing = Bot2SurveyResponse.objects.filter(idempotency_key=idempotency_key).first()
-            if existing:
+            replay = _idempotent_replay(idempotency_key)
+            if replay:
                 logger.info("submit_survey idempotent replay (validation race) for idempotency_key=%s", idempotency_key)
-                return Response(
-                    {"ok": True, "response_id": str(existing.id), "idempotent": True,
-                     "roster": {"program_id": str(existing.program_id) if existing.program_id else None, "course_year": existing.course_year}},
-                    status=status.HTTP_200_OK,
-                )
+                return replay
         return build_error_response("VALIDATION_ERROR", exc.messages, status.HTTP_400_BAD_REQUEST)
     except IntegrityError:
         # Check-then-insert poygasi: xuddi shu idempotency_key bilan parallel so'rov
         # unique cheklovda yutgan bo'lishi mumkin. Qayta so'raymiz — qator endi mavjud
         # bo'lsa, bu duplikat emas, idempotent takror: 200 + mavjud qator qaytadi.
         if idempotency_key:
-            existing = Bot2SurveyResponse.objects.filter(idempotency_key=idempotency_key).first()
-            if existing:
+            replay = _idempotent_replay(idempotency_key)
+            if replay:
                 logger.info("submit_survey idempotent replay (race) for idempotency_key=%s", idempotency_key)
-                return Response(
-                    {"ok": True, "response_id": str(existing.id), "idempotent": True,
-                     "roster": {"program_id": str(existing.program_id) if existing.program_id else None, "course_year": existing.course_year}},
-                    status=status.HTTP_200_OK,
-                )
+                return replay
         # Boshqa unique/FK cheklov buzildi (masalan StudentRoster) — bu idempotency
         # duplikati EMAS; xatoni "Duplicate idempotency_key" deb yashirmaymiz.
         logger.exception("submit_survey integrity error for student_external_id=%s", student_external_id)
@@ -981,13 +934,17 @@ def submit_survey(request):
         logger.exception("submit_survey unexpected error for student_external_id=%s", student_external_id)
         return build_error_response("SERVER_ERROR", "An internal error occurred.", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    log_audit(
-        actor_type="service",
-        actor_service="bot2",
-        action="create",
-        entity=survey,
-        request=None,
-        after_data={"student_external_id": student_external_id, "survey_campaign": campaign},
+    # Audit javob yo'lida emas: commit'dan keyin yoziladi; xatosi topshiruvni buzmaydi.
+    transaction.on_commit(
+        lambda: log_audit(
+            actor_type="service",
+            actor_service="bot2",
+            action="create",
+            entity=survey,
+            request=None,
+            after_data={"student_external_id": student_external_id, "survey_campaign": campaign},
+        ),
+        robust=True,
     )
     return Response(
         {
@@ -999,6 +956,389 @@ def submit_survey(request):
     )
 
 
+def _batch_error(index, code, message):
+    return {"index": index, "status": "error", "error": {"code": code, "message": message}}
+
+
+def _batch_replay(index, row):
+    return {
+        "index": index, "status": "idempotent", "response_id": str(row["id"]),
+        "roster": {"program_id": str(row["program_id"]) if row["program_id"] else None, "course_year": row["course_year"]},
+    }
+
+
+def _parse_batch_item(raw, now):
+    """Validate one submit-batch item like submit_survey validates its payload
+    (everything that needs no DB). Raises APIError; returns a normalized dict."""
+    if not isinstance(raw, dict):
+        raise APIError("VALIDATION_ERROR", "Each item must be an object.")
+    student_external_id = raw.get("student_external_id")
+    if not student_external_id:
+        raise APIError("VALIDATION_ERROR", "student_external_id is required.")
+    course_year = raw.get("course_year") or 1
+    try:
+        course_year = int(course_year)
+    except Exception:
+        raise APIError("INVALID_COURSE_YEAR", "course_year must be an integer between 1 and 5.")
+    if course_year < 1 or course_year > 5:
+        raise APIError("INVALID_COURSE_YEAR", "course_year must be between 1 and 5.")
+    telegram_user_id = raw.get("telegram_user_id") or None
+    if telegram_user_id is not None:
+        try:
+            telegram_user_id = int(telegram_user_id)
+        except (TypeError, ValueError):
+            raise APIError("VALIDATION_ERROR", "telegram_user_id must be an integer.")
+    gender = raw.get("gender") or ""
+    if gender and gender not in Bot2Student.Gender.values:
+        raise APIError("VALIDATION_ERROR", f"gender must be one of {', '.join(Bot2Student.Gender.values)}.")
+    # Oflayn takror/backfill: asl topshiruv vaqti saqlanadi (bo'lmasa — hozir).
+    submitted_at = now
+    if raw.get("submitted_at"):
+        submitted_at = parse_iso_datetime(str(raw["submitted_at"]))
+        if submitted_at is None:
+            raise APIError("INVALID_SUBMITTED_AT", "submitted_at must be an ISO-8601 datetime.")
+    return {
+        "raw": raw,
+        "student_external_id": str(student_external_id),
+        "course_year": course_year,
+        "idempotency_key": raw.get("idempotency_key") or None,
+        "program_id": _safe_program_id(raw.get("program_id")),
+        "region_id": raw.get("region_id") or None,
+        "campaign": raw.get("survey_campaign") or "default",
+        "telegram_user_id": telegram_user_id,
+        "gender": gender,
+        "submitted_at": submitted_at,
+    }
+
+
+def _submit_survey_items(items) -> list:
+    """submit_survey for many items inside the caller's transaction; see
+    submit_survey_batch. Returns per-item results in input order."""
+    now = timezone.now()
+    results = [None] * len(items)
+    parsed = []
+    for index, raw in enumerate(items):
+        try:
+            parsed.append((index, _parse_batch_item(raw, now)))
+        except APIError as exc:
+            results[index] = _batch_error(index, exc.default_code, exc.detail)
+
+    # Idempotency: saqlangan qatorlar + batch ichidagi takroriy kalitlar.
+    keys = {item["idempotency_key"] for _, item in parsed if item["idempotency_key"]}
+    stored = {
+        row["idempotency_key"]: row
+        for row in Bot2SurveyResponse.objects.filter(idempotency_key__in=keys).values(
+            "id", "idempotency_key", "program_id", "course_year"
+        )
+    }
+    pending, first_by_key, duplicates = [], {}, {}
+    for index, item in parsed:
+        key = item["idempotency_key"]
+        if key in stored:
+            results[index] = _batch_replay(index, stored[key])
+        elif key in first_by_key:
+            duplicates[index] = first_by_key[key]
+        else:
+            if key:
+                first_by_key[key] = index
+            pending.append((index, item))
+
+    # Bulk resolve: rosterlar (program bilan), talabalar (region bilan), akkauntlar, katalog.
+    ext_ids = {item["student_external_id"] for _, item in pending}
+    rosters = {
+        r.student_external_id: r
+        for r in StudentRoster.objects.select_related("program").filter(student_external_id__in=ext_ids)
+    }
+    students = {
+        s.student_external_id: s
+        for s in Bot2Student.objects.select_related("region").filter(student_external_id__in=ext_ids)
+    }
+    accounts = {
+        a.telegram_user_id: a
+        for a in Bot2StudentAccount.objects.filter(
+            telegram_user_id__in={item["telegram_user_id"] for _, item in pending} - {None}
+        )
+    }
+    catalog = get_catalog_items(
+        [item["program_id"] for _, item in pending] + [item["region_id"] for _, item in pending]
+    )
+
+    def catalog_item(item_id, types):
+        found = catalog.get(normalize_id(item_id))
+        return found if found is not None and found.type in types else None
+
+    new_rosters, changed_rosters = {}, {}
+    new_students, changed_students = {}, {}
+    new_accounts, changed_accounts = {}, {}
+    surveys = []  # (index, survey, item)
+    for index, item in pending:
+        raw, ext_id = item["raw"], item["student_external_id"]
+        roster, course_year, program = rosters.get(ext_id), item["course_year"], None
+        if roster is None:
+            if not item["program_id"]:
+                results[index] = _batch_error(index, "ROSTER_NOT_FOUND", "Student roster not found and program_id not provided.")
+                continue
+            program = catalog_item(item["program_id"], PROGRAM_TYPES)
+            if not program:
+                results[index] = _batch_error(index, "INVALID_PROGRAM", "program_id must reference a program or direction catalog item.")
+                continue
+        else:
+            course_year = roster.course_year or course_year
+            program = roster.program or (catalog_item(item["program_id"], PROGRAM_TYPES) if item["program_id"] else None)
+        region = None
+        if item["region_id"]:
+            region = catalog_item(item["region_id"], REGION_TYPES)
+            if not region:
+                results[index] = _batch_error(index, "INVALID_REGION", "region_id must reference a region catalog item.")
+                continue
+
+        answers = raw.get("answers", {}) or {}
+        employment_status = raw.get("employment_status", "") or ""
+        survey = Bot2SurveyResponse(
+            program=program,
+            course_year=course_year if course_year else None,
+            survey_campaign=item["campaign"],
+            idempotency_key=item["idempotency_key"],
+            source="survey",
+            employment_status=employment_status,
+            # bulk_create save()ni chetlab o'tadi — klass shu yerda.
+            employment_class=classify_employment_status(employment_status),
+            employment_company=raw.get("employment_company", "") or "",
+            employment_role=raw.get("employment_role", "") or "",
+            suggestions=raw.get("suggestions", "") or "",
+            consents=raw.get("consents", {}) or {},
+            answers=answers,
+            submitted_at=item["submitted_at"],
+        )
+        # Maydon validatorlari — talaba/roster o'zgarishlaridan OLDIN (xato element
+        # hech narsa yozmaydi). clean()dagi roster/program/kurs mosligi quyidagi
+        # tanlovdan kelib chiqadi (submit_survey bilan bir xil qoida).
+        try:
+            survey.clean_fields(exclude=["student", "roster", "program"])
+        except ValidationError as exc:
+            results[index] = _batch_error(index, "VALIDATION_ERROR", exc.messages)
+            continue
+
+        if roster is None:
+            roster = StudentRoster(
+                student_external_id=ext_id, program=program, course_year=course_year if course_year else None,
+                roster_campaign="bot2_auto", is_active=True,
+            )
+            rosters[ext_id] = new_rosters[ext_id] = roster
+        elif program and not roster.program:
+            # Back-fill program/course_year onto roster when bot collects them
+            roster.program = program
+            if course_year and not roster.course_year:
+                roster.course_year = course_year
+            if ext_id not in new_rosters:
+                changed_rosters[ext_id] = roster
+
+        student = students.get(ext_id)
+        student_fields = []
+        if student is None:
+            student = Bot2Student(student_external_id=ext_id, roster=roster)
+            students[ext_id] = new_students[ext_id] = student
+        elif student.roster_id != roster.pk:
+            student.roster = roster
+            student_fields.append("roster")
+        if item["gender"] and student.gender != item["gender"]:
+            student.gender = item["gender"]
+            student_fields.append("gender")
+        if region is not None and student.region_id != region.pk:
+            student.region = region
+            student_fields.append("region")
+
+        telegram_user_id = item["telegram_user_id"]
+        account = accounts.get(telegram_user_id) if telegram_user_id else None
+        if telegram_user_id and account is not None and account.student_id != student.pk:
+            # _link_account qoidasi: boshqa talabaga tegishli akkaunt ko'chirilmaydi.
+            logger.warning(
+                "Refusing to re-link telegram account %s from student %s to student %s without verification",
+                telegram_user_id, account.student_id, student.pk,
+            )
+        elif telegram_user_id:
+            phone, username = raw.get("phone", "") or "", raw.get("username", "") or ""
+            values = {
+                "username": username,
+                "first_name": raw.get("first_name", "") or "",
+                "last_name": raw.get("last_name", "") or "",
+                "is_active": True,
+                "last_seen_at": now,
+            }
+            if phone:
+                values["phone"] = phone
+            if account is None:
+                account = Bot2StudentAccount(telegram_user_id=telegram_user_id, student=student, **values)
+                accounts[telegram_user_id] = new_accounts[telegram_user_id] = account
+            else:
+                for attr, val in values.items():
+                    setattr(account, attr, val)
+                if telegram_user_id not in new_accounts:
+                    changed_accounts[telegram_user_id] = account
+            if student.telegram_user_id != telegram_user_id:
+                student.telegram_user_id = telegram_user_id
+                student_fields.append("telegram_user_id")
+            for attr, val in (("phone", phone), ("username", username)):
+                if val and getattr(student, attr) != val:
+                    setattr(student, attr, val)
+                    student_fields.append(attr)
+        student_fields += _student_name_changes(
+            student, roster,
+            fallback_first=raw.get("first_name", "") or "",
+            fallback_last=raw.get("last_name", "") or "",
+        )
+        if student_fields and ext_id not in new_students:
+            changed_students.setdefault(ext_id, set()).update(student_fields)
+
+        survey.student, survey.roster = student, roster
+        surveys.append((index, survey, item))
+
+    # Yozish: har jadvalga bitta bulk INSERT / UPDATE.
+    StudentRoster.objects.bulk_create(new_rosters.values())
+    if changed_rosters:
+        for roster in changed_rosters.values():
+            roster.updated_at = now
+        StudentRoster.objects.bulk_update(changed_rosters.values(), ["program", "course_year", "updated_at"])
+    if new_rosters or changed_rosters:
+        refresh_roster_totals({r.roster_campaign for r in [*new_rosters.values(), *changed_rosters.values()]})
+    Bot2Student.objects.bulk_create(new_students.values())
+    if changed_students:
+        fields = set().union(*changed_students.values())
+        changed = [students[ext_id] for ext_id in changed_students]
+        for student in changed:
+            student.updated_at = now
+        Bot2Student.objects.bulk_update(changed, [*fields, "updated_at"])
+    Bot2StudentAccount.objects.bulk_create(new_accounts.values())
+    if changed_accounts:
+        for account in changed_accounts.values():
+            account.updated_at = now
+        Bot2StudentAccount.objects.bulk_update(
+            changed_accounts.values(),
+            ["username", "first_name", "last_name", "phone", "is_active", "last_seen_at", "updated_at"],
+        )
+    # bulk yozuvlar save()ni chetlab o'tadi — qidiruv hujjatlari bir marta yangilanadi.
+    refresh_search_documents({
+        *(student.id for student in new_students.values()),
+        *(students[ext_id].id for ext_id in changed_students),
+        *(account.student_id for account in [*new_accounts.values(), *changed_accounts.values()]),
+    })
+
+    # idempotency_key poygasi: parallel so'rov yutgan kalitlar o'tkazib yuboriladi
+    # (ON CONFLICT DO NOTHING), so'ng g'olib qator idempotent natija sifatida qaytadi.
+    Bot2SurveyResponse.objects.bulk_create([survey for _, survey, _ in surveys], ignore_conflicts=True)
+    winners = {
+        row["idempotency_key"]: row
+        for row in Bot2SurveyResponse.objects.filter(
+            idempotency_key__in=[survey.idempotency_key for _, survey, _ in surveys if survey.idempotency_key]
+        ).values("id", "idempotency_key", "program_id", "course_year")
+    }
+    created, doc_cases, doc_match = [], [], Q()
+    for index, survey, item in surveys:
+        winner = winners.get(survey.idempotency_key)
+        if winner is not None and winner["id"] != survey.pk:
+            logger.info("submit_survey_batch idempotent replay (race) for idempotency_key=%s", survey.idempotency_key)
+            results[index] = _batch_replay(index, winner)
+            continue
+        created.append(survey)
+        results[index] = {
+            "index": index, "status": "created", "response_id": str(survey.pk),
+            "roster": {"program_id": str(survey.roster.program_id) if survey.roster.program_id else None,
+                       "course_year": survey.roster.course_year},
+        }
+        # Hujjatlar: submit_survey'dagi session key + doc_id qoidasi; birinchi mos
+        # element yutadi (ketma-ket submit'lar bilan bir xil natija).
+        match = Q()
+        session_key = (item["raw"].get("survey_session_key") or "").strip()[:64]
+        if session_key:
+            match |= Q(survey_session_key=session_key)
+        answers = survey.answers if isinstance(survey.answers, dict) else {}
+        doc_ids = [d for d in (normalize_id(answers.get(key)) for key in SURVEY_DOC_KEYS) if d]
+        if doc_ids:
+            match |= Q(id__in=doc_ids)
+        if match:
+            match &= Q(student_id=survey.student.pk)
+            doc_cases.append(When(match, then=Value(survey.pk)))
+            doc_match |= match
+    for index, first in duplicates.items():
+        source = results[first]
+        if source and source["status"] in ("created", "idempotent"):
+            results[index] = {**source, "index": index, "status": "idempotent"}
+        else:
+            results[index] = {**source, "index": index}
+
+    if doc_cases:
+        # Barcha elementlarning hujjatlari — bitta UPDATE.
+        Bot2Document.objects.filter(doc_match, survey__isnull=True).update(
+            survey=Case(*doc_cases, output_field=models.UUIDField())
+        )
+    if created:
+        refresh_doc_status(Bot2SurveyResponse.objects.filter(pk__in=[survey.pk for survey in created]))
+        record_submissions(submission_cell(survey) for survey in created)
+        refresh_latest_surveys({survey.student.pk for survey in created})
+        bump_data_version()
+        transaction.on_commit(
+            lambda: log_audit_bulk(
+                actor_type="service",
+                actor_service="bot2",
+                action="create",
+                entries=[
+                    (survey, {"student_external_id": survey.student.student_external_id, "survey_campaign": survey.survey_campaign})
+                    for survey in created
+                ],
+                meta={"type": "survey_batch"},
+            ),
+            robust=True,
+        )
+    return results
+
+
+@api_view(["POST"])
+@permission_classes([])
+@throttle_classes([SurveySubmitThrottle])
+def submit_survey_batch(request):
+    """
+    Batch submit_survey for offline replay and historical backfill.
+
+    Body: {"items": [<submit_survey payload>, ...]} (at most SURVEY_BATCH_MAX_ITEMS);
+    an item may also carry `submitted_at` (ISO-8601) to keep its original time.
+    Every item follows submit_survey's rules (roster values win, idempotency_key
+    replays the stored row) and gets a result in input order:
+    {"index", "status": "created" | "idempotent" | "error", "response_id"/"error"}.
+    Rosters, students, accounts and catalog ids are resolved in bulk, surveys are
+    inserted with one bulk_create and read models are refreshed once per batch.
+    A conflicting concurrent write rolls the whole batch back (409) — items are
+    idempotent, so the same batch can simply be retried.
+    """
+    verify_service_token(request.headers.get("X-SERVICE-TOKEN"), service_name="bot2")
+
+    items = request.data.get("items") if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return build_error_response("VALIDATION_ERROR", "items must be a non-empty list.", status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.SURVEY_BATCH_MAX_ITEMS:
+        return build_error_response(
+            "BATCH_TOO_LARGE", f"At most {settings.SURVEY_BATCH_MAX_ITEMS} items per batch.", status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        with transaction.atomic():
+            results = _submit_survey_items(items)
+    except IntegrityError:
+        logger.exception("submit_survey_batch integrity error")
+        return build_error_response(
+            "CONFLICT",
+            "Submission conflicts with existing data (integrity constraint).",
+            status.HTTP_409_CONFLICT,
+        )
+
+    counts = {"created": 0, "idempotent": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return Response(
+        {"ok": not counts["error"], "created": counts["created"], "idempotent": counts["idempotent"],
+         "errors": counts["error"], "results": results},
+        status=status.HTTP_207_MULTI_STATUS if counts["error"] else status.HTTP_200_OK,
+    )
+
+
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([])
 def bot_fsm_state(request, user_id: int):
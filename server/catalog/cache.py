@@ -0,0 +1,65 @@
+"""Cached catalog lookups for hot write paths (bot submissions).
+
+Catalog items change rarely while every survey submission validates its
+program/region ids against them. Items are cached by id for
+`CATALOG_CACHE_TTL` seconds; `CatalogItem.save()`/`delete()` drop the entry,
+so the TTL only bounds staleness for writes that bypass the model
+(queryset `.update()`).
+"""
+
+import uuid
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from catalog.models import CatalogItem
+
+PROGRAM_TYPES = (CatalogItem.ItemType.PROGRAM, CatalogItem.ItemType.DIRECTION)
+REGION_TYPES = (CatalogItem.ItemType.REGION,)
+
+
+def _key(item_id) -> str:
+    return f"catalog:item:{item_id}"
+
+
+def normalize_id(value) -> Optional[str]:
+    """Canonical UUID string for `value`, or None for blank/"None"/"null"/junk."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text.lower() in ("", "none", "null"):
+        return None
+    try:
+        return str(uuid.UUID(text))
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def get_catalog_items(item_ids: Iterable) -> dict:
+    """{normalized id: CatalogItem} for the known ids among `item_ids` — one cache
+    round-trip plus at most one query for the ids not cached yet."""
+    ids = {normalize_id(item_id) for item_id in item_ids} - {None}
+    if not ids:
+        return {}
+    cached = cache.get_many([_key(item_id) for item_id in ids])
+    items = {str(item.pk): item for item in cached.values()}
+    missing = ids - items.keys()
+    if missing:
+        fetched = {str(item.pk): item for item in CatalogItem.objects.filter(id__in=missing)}
+        cache.set_many({_key(item_id): item for item_id, item in fetched.items()}, timeout=settings.CATALOG_CACHE_TTL)
+        items.update(fetched)
+    return items
+
+
+def get_catalog_item(item_id, types: Iterable[str]) -> Optional[CatalogItem]:
+    """The item with `item_id` if its type is one of `types`, else None.
+
+    Misses (unknown ids) are not cached — a freshly created item is visible at once.
+    """
+    item = get_catalog_items([item_id]).get(normalize_id(item_id))
+    return item if item is not None and item.type in types else None
+
+
+def forget_catalog_item(item_id) -> None:
+    cache.delete(_key(item_id))
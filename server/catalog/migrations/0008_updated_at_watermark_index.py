@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_auto'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogitem',
+            index=models.Index(fields=['updated_at'], name='catalog_cat_updated_caf929_idx'),
+        ),
+    ]
@@ -37,6 +37,8 @@ class CatalogItem(BaseModel):
         indexes = [
             models.Index(fields=["type", "code"]),
             models.Index(fields=["type", "is_active"]),
+            # /surveys ro'yxati ETag'idagi Max(updated_at) watermark'i.
+            models.Index(fields=["updated_at"]),
         ]
         constraints = [
             # unique when code is provided (non-null)
@@ -50,6 +52,17 @@ class CatalogItem(BaseModel):
     def __str__(self) -> str:
         return f"{self.type}: {self.name}"
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        from catalog.cache import forget_catalog_item
+        forget_catalog_item(self.pk)
+        return result
+
+    def delete(self, *args, **kwargs):
+        from catalog.cache import forget_catalog_item
+        forget_catalog_item(self.pk)
+        return super().delete(*args, **kwargs)
+
 
 class CatalogRelation(BaseModel):
     class RelationType(models.TextChoices):
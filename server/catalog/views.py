@@ -8,6 +8,7 @@ from catalog.models import CatalogItem, CatalogRelation
 from catalog.serializers import CatalogItemSerializer, CatalogRelationSerializer, ProgramSerializer
 from common.exceptions import APIError
 from common.permissions import IsAdminCatalogWriter, IsViewerOrAdminReadOnly
+from common.replica import ReplicaReadMixin
 
 
 class CatalogItemViewSet(viewsets.ModelViewSet):
@@ -134,7 +135,7 @@ class CatalogRelationViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class ProgramViewSet(viewsets.ReadOnlyModelViewSet):
+class ProgramViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ProgramSerializer
     permission_classes = [IsViewerOrAdminReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -0,0 +1,122 @@
+"""`GET /api/v1/export/<entity>.ndjson` — bulk pulls for the data team.
+
+One JSON object per line, streamed straight from a server-side cursor
+(`.iterator(chunk_size=...)`): no OFFSET pages, no COUNT(*), no page-size cap.
+Filters are the same FilterSets (and search) the list endpoints use.
+
+Incremental sync: rows come ordered by (updated_at, id); pass the largest
+`updated_at` seen as `?updated_since=` next time. The bound is inclusive, so
+rows sharing the boundary timestamp are re-sent — upsert by `id` on the client.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from common.exceptions import build_error_response
+from common.permissions import IsAdminUserRole, IsViewerOrAdminReadOnly
+from common.replica import replica_reads
+from common.time import parse_iso_datetime
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+DEFAULT_CHUNK_SIZE = 2000
+MAX_CHUNK_SIZE = 10000
+_FLUSH_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ExportEntity:
+    # (request) -> filtrlangan queryset
+    queryset: Callable
+    admin_only: bool = False
+
+
+def _viewset_queryset(viewset_cls):
+    """List-endpoint queryset: the viewset's own get_queryset + filter backends."""
+
+    def build(request):
+        view = viewset_cls(request=request, args=(), kwargs={}, format_kwarg=None, action="list")
+        return view.filter_queryset(view.get_queryset())
+
+    return build
+
+
+def _audit_queryset(request):
+    from audit.filters import AuditLogFilterSet
+    from audit.models import AuditLog
+
+    return AuditLogFilterSet(request.query_params, queryset=AuditLog.objects.all(), request=request).qs
+
+
+def _entities() -> dict:
+    from bot2.views import Bot2StudentRosterViewSet, Bot2StudentViewSet, Bot2SurveyResponseViewSet
+
+    return {
+        "surveys": ExportEntity(_viewset_queryset(Bot2SurveyResponseViewSet)),
+        "roster": ExportEntity(_viewset_queryset(Bot2StudentRosterViewSet)),
+        "students": ExportEntity(_viewset_queryset(Bot2StudentViewSet)),
+        "audit-logs": ExportEntity(_audit_queryset, admin_only=True),
+    }
+
+
+def _columns(model) -> list[str]:
+    # Konkret ustunlar (FK'lar `<name>_id` sifatida) — nested serializer yo'q.
+    return [f.attname for f in model._meta.concrete_fields]
+
+
+def _iter_ndjson(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buf: list[str] = []
+    size = 0
+    for row in rows:
+        line = encoder.encode(row) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= _FLUSH_BYTES:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+@replica_reads
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsViewerOrAdminReadOnly])
+def export_ndjson(request, entity: str):
+    spec = _entities().get(entity)
+    if spec is None:
+        return build_error_response("NOT_FOUND", f"Unknown export entity: {entity}", status.HTTP_404_NOT_FOUND)
+    if spec.admin_only and not IsAdminUserRole().has_permission(request, None):
+        return build_error_response(
+            "FORBIDDEN", "You do not have permission to perform this action.", status.HTTP_403_FORBIDDEN
+        )
+
+    qs = spec.queryset(request)
+    since_raw = request.query_params.get("updated_since")
+    if since_raw:
+        since = parse_iso_datetime(since_raw)
+        if not since:
+            return build_error_response(
+                "INVALID_UPDATED_SINCE", "updated_since must be ISO datetime.", status.HTTP_400_BAD_REQUEST
+            )
+        qs = qs.filter(updated_at__gte=since)
+
+    try:
+        chunk_size = min(int(request.query_params.get("chunk_size") or DEFAULT_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    except ValueError:
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    rows = (
+        qs.prefetch_related(None)
+        .order_by("updated_at", "id")
+        .values(*_columns(qs.model))
+        .iterator(chunk_size=max(chunk_size, 1))
+    )
+    response = StreamingHttpResponse(_iter_ndjson(rows), content_type=NDJSON_CONTENT_TYPE)
+    response["Content-Disposition"] = f'attachment; filename="{entity}.ndjson"'
+    return response
@@ -0,0 +1,57 @@
+"""Conditional GET (strong ETag + If-None-Match → 304) for polled read endpoints.
+
+The ETag is computed from cheap inputs — a data-version and/or `updated_at`
+watermarks plus the normalized query params — never from the response body, so
+a matching `If-None-Match` is answered before the expensive query runs.
+Responses carry `Cache-Control: private, no-cache`: browsers keep the body and
+revalidate on every poll, which is what makes the 304s happen without any
+client code.
+"""
+
+import hashlib
+
+from django.db.models import Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong, quoted ETag over `parts` (stringified in order)."""
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return quote_etag(digest)
+
+
+def normalized_params(params, exclude=()) -> str:
+    """Query params as an order-insensitive string (QueryDict)."""
+    return "&".join(
+        f"{name}={value}"
+        for name in sorted(params)
+        if name not in exclude
+        for value in sorted(params.getlist(name))
+    )
+
+
+def updated_watermark(*querysets) -> tuple:
+    """Max(`updated_at`) of each queryset — one indexed lookup per table."""
+    return tuple(qs.aggregate(mark=Max("updated_at"))["mark"] for qs in querysets)
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    # W/ prefiksli (zaif) teglarni ham solishtiramiz: GET uchun zaif taqqoslash yetarli.
+    return "*" in tags or etag in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag: str):
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
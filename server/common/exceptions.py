@@ -3,11 +3,14 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from django.db.utils import InterfaceError, OperationalError
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions, status
 from rest_framework.response import Response
 from rest_framework.views import exception_handler as drf_exception_handler
 
+from common.replica import reading_from_replica
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +35,10 @@ def build_error_response(code: str, message: Any, status_code: int, details: Any
 
 
 def custom_exception_handler(exc: Exception, context: dict) -> Response:
+    if isinstance(exc, (OperationalError, InterfaceError)) and reading_from_replica():
+        # common.replica.run_on_replica so'rovni default'da qayta bajaradi.
+        raise exc
+
     response = drf_exception_handler(exc, context)
 
     if isinstance(exc, APIError):
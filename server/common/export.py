@@ -0,0 +1,182 @@
+"""Streaming CSV/XLSX export (`?format=csv|xlsx`).
+
+Rows are pulled lazily from an iterable and written out as they come, so memory
+stays flat regardless of row count:
+
+* csv  — each row is encoded and streamed as soon as it is produced;
+* xlsx — openpyxl write-only mode spools rows to temp files, the finished zip is
+  written to a temporary file and streamed from disk in chunks.
+
+DRF treats `?format=` as a renderer override, so views that export must list
+`EXPORT_RENDERERS`; the renderers only exist to pass content negotiation (the
+payload itself is produced by `streaming_export`).
+"""
+
+import csv
+import functools
+import json
+import tempfile
+from datetime import date, datetime
+from typing import Iterable, Mapping, NamedTuple, Sequence
+from uuid import UUID
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+EXPORT_FORMATS = ("csv", "xlsx")
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_CHUNK_SIZE = 64 * 1024
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Faqat xato javoblari shu yerga tushadi (eksport o'zi stream qilinadi).
+        return JSONRenderer().render(data)
+
+
+class XLSXRenderer(CSVRenderer):
+    media_type = XLSX_CONTENT_TYPE
+    format = "xlsx"
+    charset = None
+
+
+EXPORT_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, XLSXRenderer]
+
+
+class ExportTable(NamedTuple):
+    """One sheet (xlsx) / the whole file (csv): header labels + row value sequences.
+
+    `widths` maps column letters to xlsx column widths (csv ignores it).
+    """
+
+    title: str
+    headers: Sequence[str]
+    rows: Iterable[Sequence]
+    widths: Mapping[str, float] | None = None
+
+
+def export_format(request) -> str | None:
+    fmt = (request.query_params.get("format") or "").lower()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        # openpyxl tz-aware datetime'ni qabul qilmaydi; ISO satr ikkala formatda bir xil.
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class _LineBuffer:
+    """csv.writer target that hands back the written line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _iter_csv(table: ExportTable):
+    writer = csv.writer(_LineBuffer())
+    # BOM: Excel UTF-8 CSV'ni (kirill/o'zbek harflari) to'g'ri ochishi uchun.
+    chunk = ["\ufeff", writer.writerow(table.headers)]
+    size = 0
+    for row in table.rows:
+        line = writer.writerow([_cell(v) for v in row])
+        chunk.append(line)
+        size += len(line)
+        if size >= _CHUNK_SIZE:
+            yield "".join(chunk).encode("utf-8")
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+
+
+def _iter_xlsx(tables: Sequence[ExportTable]):
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(fill_type="solid", fgColor="1F4E79")
+    header_alignment = Alignment(horizontal="center")
+
+    wb = openpyxl.Workbook(write_only=True)
+    for table in tables:
+        ws = wb.create_sheet(title=table.title[:31])
+        # Write-only varaqda ustun kengligi birinchi qatordan oldin berilishi kerak.
+        for letter, width in (table.widths or {}).items():
+            ws.column_dimensions[letter].width = width
+        header = []
+        for label in table.headers:
+            cell = WriteOnlyCell(ws, value=label)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header.append(cell)
+        ws.append(header)
+        for row in table.rows:
+            ws.append([_cell(v) for v in row])
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(_CHUNK_SIZE):
+            yield chunk
+
+
+def streaming_export(fmt: str, filename: str, tables: Sequence[ExportTable]) -> StreamingHttpResponse:
+    """Stream `tables` as `filename.<fmt>`. CSV holds one table, so only the
+    first (primary) table is written; xlsx gets one sheet per table."""
+    if fmt == "csv":
+        body = _iter_csv(tables[0])
+        content_type = "text/csv; charset=utf-8"
+    else:
+        body = _iter_xlsx(tables)
+        content_type = XLSX_CONTENT_TYPE
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+def dict_table(title: str, columns: Sequence[str], rows: Iterable[dict]) -> ExportTable:
+    """Table over dict rows (API payloads); column names double as headers."""
+    return ExportTable(title, list(columns), ([row.get(c) for c in columns] for row in rows))
+
+
+def exportable(tables, filename):
+    """Add `?format=csv|xlsx` to a DRF function view that returns `Response(data)`.
+
+    `tables(data)` turns the JSON payload into ExportTables; `filename` is a
+    string or `callable(request)`. Goes below `@api_view`/`@permission_classes`.
+    Non-200 responses (validation errors) are returned as JSON unchanged.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            fmt = export_format(request)
+            if fmt:
+                # Xato javoblari JSON bo'lib qolsin (CSV/XLSX renderer emas).
+                request.accepted_renderer = JSONRenderer()
+                request.accepted_media_type = JSONRenderer.media_type
+            response = view(request, *args, **kwargs)
+            if not fmt or not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+                return response
+            name = filename(request) if callable(filename) else filename
+            return streaming_export(fmt, name, tables(response.data))
+
+        wrapper.renderer_classes = EXPORT_RENDERERS
+        return wrapper
+
+    return decorator
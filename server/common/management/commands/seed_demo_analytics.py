@@ -10,6 +10,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
+from analytics.rollups import rebuild_coverage
 from bot2.models import Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
 from catalog.models import CatalogItem
 
@@ -76,6 +77,8 @@ class Command(BaseCommand):
             Bot2Student.objects.all().delete()
             StudentRoster.objects.filter(roster_campaign=CAMPAIGN).delete()
             ProgramEnrollment.objects.filter(campaign=CAMPAIGN, academic_year=ACADEMIC_YEAR).delete()
+            # Queryset .delete() model hook'larini chetlab o'tadi — rollup'ni tozalaymiz.
+            rebuild_coverage()
             self.stdout.write(self.style.WARNING("✓ Old demo data cleared."))
 
         programs = list(
@@ -24,6 +24,17 @@ class BaseModel(UUIDModel, TimeStampedModel):
         abstract = True
 
 
+def clean_in_memory(instance) -> None:
+    """`full_clean()` without its queries: field validators + `clean()` only.
+
+    FK existence and unique/constraint checks are left to the database — the
+    caller must already hold the related objects and handle IntegrityError.
+    """
+    fk_names = [f.name for f in instance._meta.concrete_fields if f.is_relation]
+    instance.clean_fields(exclude=fk_names)
+    instance.clean()
+
+
 class ServiceToken(BaseModel):
     class Service(models.TextChoices):
         BOT2 = "bot2", "Bot2"
@@ -1,6 +1,295 @@
+"""List pagination: page numbers by default, keyset (cursor) mode on request.
+
+Page-number mode costs an OFFSET scan plus a `COUNT(*)` per request, so deep
+pages of large tables get linearly slower. Views that declare
+`cursor_ordering` also accept `?cursor=` (empty value — first page): rows are
+read with `WHERE (key, id) < (last key, last id) ORDER BY key, id LIMIT n+1`
+over a composite `(key, id)` index, so the Nth page costs the same as the
+first and no COUNT runs. Response: `{"next": <url|null>, "results": [...]}`.
+
+    cursor_ordering = "-submitted_at"                      # default key
+    cursor_ordering_fields = ["submitted_at", "created_at"]  # allowed ?ordering=
+
+Nullable keys follow PostgreSQL's default NULL placement (NULLs sort as the
+largest value), so one plain `(key, id)` btree serves both directions.
+
+Page-number responses also carry `count_mode` — how `count` was obtained.
+Views pick a default with `count_mode = "..."` (default "exact"); clients may
+override it with `?count_mode=`:
+
+* exact    — `COUNT(*)` of the filtered queryset;
+* cached   — the same COUNT, cached per query SQL for `PAGINATION_COUNT_CACHE_TTL`;
+* estimate — planner estimate (PostgreSQL `reltuples`; `EXPLAIN` rows when filtered);
+* auto     — exact below `PAGINATION_EXACT_COUNT_MAX` rows, estimate for the
+  unfiltered table, cached otherwise.
+
+Non-exact pages read one extra row to decide `next`, so an estimate never
+truncates a page or hides the last one.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import uuid
+from collections import OrderedDict
+from functools import cached_property, partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import F, Q
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from common.exceptions import APIError
+
+CURSOR_PARAM = "cursor"
+COUNT_MODE_PARAM = "count_mode"
+COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE, COUNT_AUTO = "exact", "cached", "estimate", "auto"
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE, COUNT_AUTO)
+
+
+def _invalid_cursor():
+    return APIError("INVALID_CURSOR", "Invalid cursor", 400)
+
+
+# ---------------------------------------------------------------------- #
+# count strategies
+# ---------------------------------------------------------------------- #
+
+def _is_unfiltered(queryset) -> bool:
+    return not queryset.query.where
+
+
+def table_row_estimate(model, using):
+    """Planner row estimate of `model`'s table (PostgreSQL `reltuples`); None
+    elsewhere or when the table was never ANALYZEd."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def planner_estimate(queryset):
+    """Row estimate without running the query: `reltuples` for the whole table,
+    the top plan node's rows (`EXPLAIN`) when filtered. None off PostgreSQL."""
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    if _is_unfiltered(queryset):
+        return table_row_estimate(queryset.model, using=queryset.db)
+    try:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+    except EmptyResultSet:
+        return 0
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def cached_count(queryset) -> int:
+    """Exact COUNT, cached per query SQL (filters included) for a short TTL."""
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.sha1(f"{queryset.model._meta.label}|{sql}|{params!r}".encode("utf-8")).hexdigest()
+    key = f"pagination:count:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=settings.PAGINATION_COUNT_CACHE_TTL)
+    return count
+
+
+def resolve_count_mode(queryset, mode: str) -> str:
+    """`auto` → exact / estimate / cached by table size and filters; `estimate`
+    without planner statistics (not PostgreSQL) → exact."""
+    if mode == COUNT_AUTO:
+        table_rows = table_row_estimate(queryset.model, using=queryset.db)
+        if table_rows is None or table_rows < settings.PAGINATION_EXACT_COUNT_MAX:
+            return COUNT_EXACT
+        return COUNT_ESTIMATE if _is_unfiltered(queryset) else COUNT_CACHED
+    if mode == COUNT_ESTIMATE and connections[queryset.db].vendor != "postgresql":
+        return COUNT_EXACT
+    return mode
+
+
+class _LookaheadPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountStrategyPaginator(Paginator):
+    """Django Paginator whose `count` comes from `count_mode`.
+
+    In non-exact modes `count` is only informative: pages are sliced
+    independently of it (one row of look-ahead decides `has_next`), and once
+    the last page is reached `count` is corrected to the real total.
+    """
+
+    def __init__(self, object_list, per_page, count_mode=COUNT_EXACT, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_mode = count_mode
+
+    @cached_property
+    def count(self):
+        if self.count_mode == COUNT_CACHED:
+            return cached_count(self.object_list)
+        if self.count_mode == COUNT_ESTIMATE:
+            estimate = planner_estimate(self.object_list)
+            if estimate is not None:
+                return estimate
+            self.count_mode = COUNT_EXACT  # statistika yo'q (ANALYZE qilinmagan)
+        return super().count
+
+    def validate_number(self, number):
+        if self.count_mode == COUNT_EXACT:
+            return super().validate_number(number)
+        # Taxminiy sanoq bo'yicha sahifani rad etmaymiz — bo'sh bo'lsa page() aytadi.
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        if self.count_mode == COUNT_EXACT:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        has_next = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        seen = bottom + len(rows)
+        if has_next:
+            self.count = max(self.count, seen + 1)
+        else:
+            # Oxirgi sahifa — haqiqiy jami ma'lum, alohida COUNT shart emas.
+            self.count, self.count_mode = seen, COUNT_EXACT
+        return _LookaheadPage(rows, number, self, has_next)
 
 
 class DefaultPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            CURSOR_PARAM in request.query_params and getattr(view, "cursor_ordering", None) is not None
+        )
+        if self.cursor_mode:
+            return self._paginate_keyset(queryset, request, view)
+        requested = request.query_params.get(COUNT_MODE_PARAM)
+        mode = requested if requested in COUNT_MODES else getattr(view, "count_mode", COUNT_EXACT)
+        self.django_paginator_class = partial(CountStrategyPaginator, count_mode=resolve_count_mode(queryset, mode))
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response(OrderedDict([("next", self.next_link), ("results", data)]))
+        response = super().get_paginated_response(data)
+        response.data["count_mode"] = self.page.paginator.count_mode
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        paginated = super().get_paginated_response_schema(schema)
+        paginated["properties"]["count_mode"] = {"type": "string", "enum": [COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE]}
+        paginated["description"] = "`?cursor=` bilan: faqat `next` va `results` (count yo'q)."
+        return paginated
+
+    # ------------------------------------------------------------------ #
+    # keyset mode
+    # ------------------------------------------------------------------ #
+
+    def _cursor_key(self, request, view):
+        """(field name, descending) — `?ordering=` if allowed for cursors, else the view default."""
+        allowed = getattr(view, "cursor_ordering_fields", ())
+        requested = request.query_params.get("ordering", "").strip()
+        if requested.lstrip("-") in allowed:
+            term = requested
+        else:
+            term = view.cursor_ordering
+        return term.lstrip("-"), term.startswith("-")
+
+    def _paginate_keyset(self, queryset, request, view):
+        self.request = request
+        page_size = self.get_page_size(request)
+        name, descending = self._cursor_key(request, view)
+        field = queryset.model._meta.get_field(name)
+        # Unikal kalitda (masalan student_external_id) id tie-break keraksiz.
+        tiebreak = not field.unique
+        nulls = field.null
+
+        raw_cursor = request.query_params.get(CURSOR_PARAM, "")
+        if raw_cursor:
+            value, last_id = self._decode(raw_cursor, field)
+            queryset = queryset.filter(self._after(name, descending, nulls, tiebreak, value, last_id))
+
+        key = F(name).desc(nulls_first=True) if descending else F(name).asc(nulls_last=True)
+        if not nulls:
+            key = F(name).desc() if descending else F(name).asc()
+        ordering = [key]
+        if tiebreak:
+            ordering.append(F("pk").desc() if descending else F("pk").asc())
+        rows = list(queryset.order_by(*ordering)[: page_size + 1])
+
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_link = None
+        if has_next:
+            last = rows[-1]
+            cursor = self._encode(getattr(last, field.attname), last.pk)
+            self.next_link = replace_query_param(
+                remove_query_param(request.build_absolute_uri(), "page"), CURSOR_PARAM, cursor
+            )
+        return rows
+
+    @staticmethod
+    def _after(name, descending, nulls, tiebreak, value, last_id):
+        """Rows strictly after (value, last_id) in the keyset order."""
+        op = "lt" if descending else "gt"
+        if value is None:
+            # NULL kalitli qatorlar: DESC — boshida, ASC — oxirida.
+            rest = Q(**{f"{name}__isnull": True, f"pk__{op}": last_id})
+            return (rest | Q(**{f"{name}__isnull": False})) if descending else rest
+        bound = "lte" if descending else "gte"
+        if tiebreak:
+            after = Q(**{f"{name}__{bound}": value}) & (Q(**{f"{name}__{op}": value}) | Q(**{f"pk__{op}": last_id}))
+        else:
+            after = Q(**{f"{name}__{op}": value})
+        if nulls and not descending:
+            after |= Q(**{f"{name}__isnull": True})
+        return after
+
+    @staticmethod
+    def _encode(value, pk) -> str:
+        text = value.isoformat() if hasattr(value, "isoformat") else value
+        payload = json.dumps([text, str(pk)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode(raw, field):
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            text, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            value = None if text is None else field.to_python(text)
+            return value, uuid.UUID(pk)
+        except (binascii.Error, UnicodeError, ValueError, TypeError, AttributeError, ValidationError):
+            raise _invalid_cursor()
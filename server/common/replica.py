@@ -0,0 +1,185 @@
+"""Optional read replica for dashboard/analytics reads.
+
+With `POSTGRES_REPLICA_HOST` set, settings define a `replica` alias and
+`ReplicaRouter` is active. Reads go to the replica only inside an opted-in
+block — `@replica_reads` (function views, above `@api_view`) or
+`ReplicaReadMixin` (viewsets) — and only for safe methods; everything else,
+including all writes, stays on `default`.
+
+Read-your-writes:
+
+* within a request — once anything is written, later reads use `default`;
+  reads inside an open `default` transaction also stay there;
+* across requests — a successful unsafe request sets a short-lived cookie
+  (`PrimaryPinMiddleware`), and pinned clients read from `default` until the
+  replica has had time to catch up (`REPLICA_PIN_SECONDS`).
+
+Fallback: if the replica raises a connection-level error, the (safe) view is
+re-run on `default` and the replica is skipped for `REPLICA_RETRY_SECONDS`
+(`custom_exception_handler` lets such errors propagate out of DRF for this).
+Auth tables (`authn`, sessions) are always read from `default`, so a revoked
+token or a new password is never checked against lagging data.
+"""
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "db_primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Replika lag'i ahamiyatli bo'lmagan (yoki noto'g'ri bo'lishi xavfli) ilovalar.
+PRIMARY_ONLY_APPS = {"authn", "sessions", "auth", "contenttypes"}
+
+# Joriy blok holati: {"alias": ..., "wrote": bool}; None — replika ishlatilmaydi.
+_state: ContextVar = ContextVar("replica_read_state", default=None)
+_down_until = 0.0
+
+
+def reading_from_replica() -> bool:
+    return _state.get() is not None
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def replica_available() -> bool:
+    return replica_configured() and time.monotonic() >= _down_until
+
+
+def mark_replica_down() -> None:
+    global _down_until
+    _down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+class ReplicaRouter:
+    """Routes reads to the replica inside opted-in blocks (`run_on_replica`) only."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state["wrote"]:
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state["alias"]
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _wants_replica(request) -> bool:
+    return (
+        request.method in SAFE_METHODS
+        and PIN_COOKIE not in request.COOKIES
+        and replica_available()
+    )
+
+
+def _stream_on(alias, iterator):
+    """Re-enter the replica block around each chunk of a streaming response
+    (export generators run after the view has returned)."""
+    iterator = iter(iterator)
+    while True:
+        token = _state.set({"alias": alias, "wrote": False})
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+def run_on_replica(request, call):
+    """`call()` with reads routed to the replica when `request` allows it."""
+    if not _wants_replica(request):
+        return call()
+    token = _state.set({"alias": REPLICA_ALIAS, "wrote": False})
+    try:
+        response = call()
+    except (OperationalError, InterfaceError):
+        logger.warning("replica read failed, retrying on default", exc_info=True)
+        mark_replica_down()
+        _state.reset(token)
+        token = None
+        return call()
+    finally:
+        if token is not None:
+            _state.reset(token)
+    if getattr(response, "streaming", False):
+        response.streaming_content = _stream_on(REPLICA_ALIAS, response.streaming_content)
+    return response
+
+
+@contextmanager
+def primary_reads():
+    """Reads inside the block use `default` even within a replica block — for
+    results that must not come from a lagging replica (e.g. ones that will be cached)."""
+    token = _state.set(None)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def replica_reads(view):
+    """Function-view decorator; goes above `@api_view` so the whole DRF
+    dispatch (auth included — auth tables are routed to default anyway) runs
+    inside the replica block."""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return run_on_replica(request, lambda: view(request, *args, **kwargs))
+
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """Viewset mixin: list/retrieve (safe methods) read from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        return run_on_replica(request, lambda: super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs))
+
+
+class PrimaryPinMiddleware:
+    """After a successful write, pin the client to `default` for a few seconds."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and replica_configured()
+        ):
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
@@ -5,6 +5,8 @@ pin test-only environment defaults:
 
 * ``DJANGO_SECRET_KEY`` — production settings now fail fast on the dev default
   when ``DJANGO_DEBUG`` is false (which it is under tests), so give tests a key.
+* ``DJANGO_CACHE_BACKEND`` — in-process cache, so test runs never read or
+  write the shared on-disk analytics cache.
 * transport-security flags off — the test client speaks plain HTTP, so SSL
   redirect / Secure cookies must not be force-enabled by the prod-safe defaults.
 
@@ -14,6 +16,7 @@ Each uses ``setdefault`` so a real CI environment can still override them.
 import os
 
 os.environ.setdefault("DJANGO_SECRET_KEY", "test-insecure-secret-key-not-for-production")
+os.environ.setdefault("DJANGO_CACHE_BACKEND", "locmem")
 os.environ.setdefault("SECURE_SSL_REDIRECT", "false")
 os.environ.setdefault("JWT_COOKIE_SECURE", "false")
 os.environ.setdefault("SESSION_COOKIE_SECURE", "false")
@@ -9,7 +9,7 @@ import logging
 from django.utils import timezone
 
 from ai_verification.generation import generate_text, SUPPORTED_MIME
-from bot2.models import Bot2Document
+from bot2.models import Bot2Document, EmploymentClass
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +57,7 @@ def _build_context(ls) -> str:
         lines.append(f"Jins: {GENDER[s.gender]}")
     if survey:
         if survey.employment_status:
-            emp = "ishlamoqda" if survey.employment_status == "employed" else "ishlamayapti"
+            emp = "ishlamoqda" if survey.employment_class == EmploymentClass.EMPLOYED else "ishlamayapti"
             lines.append(f"Bandlik holati: {emp}")
             if survey.employment_company:
                 lines.append(f"Ish joyi: {survey.employment_company}")
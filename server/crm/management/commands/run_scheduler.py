@@ -9,14 +9,18 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Long-lived scheduler: runs followups + pending vacancy posts every INTERVAL seconds."
+    help = (
+        "Long-lived scheduler: runs followups + pending vacancy posts every INTERVAL seconds; "
+        "token GC and survey insights refresh roughly hourly."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--interval", type=int, default=60)
 
     def handle(self, *args, **opts):
         interval = opts["interval"]
-        # RevokedToken GC (cleanup_tokens) har siklda emas — taxminan soatiga bir marta.
+        # RevokedToken GC (cleanup_tokens) va survey_insights yangilash har siklda
+        # emas — taxminan soatiga bir marta.
         gc_every = max(1, 3600 // max(interval, 1))
         cycle = 0
         self.stdout.write(self.style.SUCCESS(f"Scheduler started (interval={interval}s)"))
@@ -26,7 +30,7 @@ class Command(BaseCommand):
             close_old_connections()
             cmds = ["process_followups", "post_pending_vacancies"]
             if cycle % gc_every == 0:
-                cmds.append("cleanup_tokens")
+                cmds += ["cleanup_tokens", "refresh_survey_insights"]
             for cmd in cmds:
                 try:
                     call_command(cmd)
@@ -72,6 +72,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "common.replica.PrimaryPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -127,6 +128,60 @@ if os.getenv("USE_SQLITE", "0") == "1":
         "OPTIONS": {"timeout": 20},
     }
 
+# Ixtiyoriy o'qish replikasi (common/replica.py): analytics, ReadOnly viewset'lar va
+# eksportlarning GET so'rovlari shu yerdan o'qiydi; yozuvlar doim `default`da.
+if os.getenv("POSTGRES_REPLICA_HOST") and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("POSTGRES_REPLICA_HOST"),
+        "PORT": os.getenv("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["common.replica.ReplicaRouter"]
+# Yozuvdan keyin mijoz shuncha soniya `default`dan o'qiydi (replika lag'i uchun).
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+# Replika xatosidan keyin shuncha soniya unga murojaat qilinmaydi.
+REPLICA_RETRY_SECONDS = int(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+# Umumiy kesh (analytics javoblari — analytics/cache.py). Default fayl keshi:
+# bitta hostdagi barcha gunicorn workerlari (va scheduler) uchun umumiy.
+# DJANGO_CACHE_BACKEND=db — DatabaseCache (`manage.py createcachetable` kerak),
+# locmem — faqat testlar/bitta jarayon uchun.
+CACHE_BACKEND = os.getenv("DJANGO_CACHE_BACKEND", "file").lower()
+if CACHE_BACKEND == "db":
+    _cache = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "django_cache"}
+elif CACHE_BACKEND == "locmem":
+    _cache = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "crm-server"}
+else:
+    _cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("DJANGO_CACHE_DIR", str(BASE_DIR / ".cache")),
+    }
+_cache["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("DJANGO_CACHE_MAX_ENTRIES", "5000"))}
+CACHES = {"default": _cache}
+
+# Analytics javob keshining TTL'i (soniya). Asosiy invalidatsiya — data-version.
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+
+# Katalog elementlari keshi (catalog/cache.py) — submit_survey program/region tekshiruvi.
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+# /bot2/surveys/submit-batch: bitta so'rovdagi elementlar chegarasi.
+SURVEY_BATCH_MAX_ITEMS = int(os.getenv("SURVEY_BATCH_MAX_ITEMS", "500"))
+# Roster import (bot2/roster_import.py): bitta tranzaksiyadagi qatorlar soni va
+# shundan kichik JSON import'lar navbatsiz (so'rov ichida) bajariladi.
+ROSTER_IMPORT_CHUNK_SIZE = int(os.getenv("ROSTER_IMPORT_CHUNK_SIZE", "2000"))
+ROSTER_IMPORT_INLINE_MAX_ROWS = int(os.getenv("ROSTER_IMPORT_INLINE_MAX_ROWS", "1000"))
+# `import_roster --loader auto`: shundan katta fayl PostgreSQL COPY loader bilan yuklanadi.
+ROSTER_IMPORT_COPY_MIN_BYTES = int(os.getenv("ROSTER_IMPORT_COPY_MIN_BYTES", str(5 * 1024 * 1024)))
+
+# Ro'yxat `count` strategiyasi (common/pagination.py, ?count_mode=): "auto" rejimida
+# shundan kichik jadvallar aniq sanaladi; "cached" sanoq shuncha soniya saqlanadi.
+PAGINATION_EXACT_COUNT_MAX = int(os.getenv("PAGINATION_EXACT_COUNT_MAX", "50000"))
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv("PAGINATION_COUNT_CACHE_TTL", "30"))
+
+# survey_insights qayta tahlili: kamida shuncha yangi (ko'rilmagan) taklif yig'ilganda.
+SURVEY_INSIGHTS_MIN_NEW = int(os.getenv("SURVEY_INSIGHTS_MIN_NEW", "20"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
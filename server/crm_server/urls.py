@@ -14,7 +14,10 @@ from bot2.views import (
     Bot2DocumentViewSet,
     ProgramEnrollmentViewSet,
     import_roster,
+    roster_import_job,
+    roster_rollover,
     submit_survey,
+    submit_survey_batch,
     survey_stats,
     bot_verify,
     bot_register,
@@ -35,10 +38,14 @@ from analytics.views import (
     bot2_program_details_by_year,
     enrollments_overview,
     bot2_academic_years,
+    bot2_bundle,
+    bot2_timeseries,
     students_by_direction,
     students_by_direction_xlsx,
     survey_insights,
+    analytics_cache_stats,
 )
+from common.bulk_export import export_ndjson
 from crm.access import AccessLinkView, AccessLinkDocumentView, AccessLinkAskView
 
 
@@ -77,7 +84,10 @@ urlpatterns = [
         path("auth/me", MeView.as_view(), name="auth-me"),
         # Bot2
         path("admin/roster/import", import_roster, name="bot2-roster-import"),
+        path("admin/roster/import/<uuid:job_id>", roster_import_job, name="bot2-roster-import-job"),
+        path("admin/roster/rollover", roster_rollover, name="bot2-roster-rollover"),
         path("bot2/surveys/submit", submit_survey, name="bot2-survey-submit"),
+        path("bot2/surveys/submit-batch", submit_survey_batch, name="bot2-survey-submit-batch"),
         path("bot2/surveys/stats", survey_stats, name="bot2-survey-stats"),
         path("bot/verify", bot_verify, name="bot-verify"),
         path("bot/register", bot_register, name="bot-register"),
@@ -96,9 +106,13 @@ urlpatterns = [
         path("analytics/bot2/program-details-by-year", bot2_program_details_by_year, name="analytics-bot2-program-year"),
         path("analytics/bot2/enrollments-overview", enrollments_overview, name="analytics-bot2-enrollments-overview"),
         path("analytics/bot2/academic-years", bot2_academic_years, name="analytics-bot2-academic-years"),
+        path("analytics/bot2/bundle", bot2_bundle, name="analytics-bot2-bundle"),
+        path("analytics/bot2/timeseries", bot2_timeseries, name="analytics-bot2-timeseries"),
         path("analytics/students-by-direction", students_by_direction, name="analytics-students-by-direction"),
         path("analytics/students-by-direction.xlsx", students_by_direction_xlsx, name="analytics-students-by-direction-xlsx"),
         path("analytics/survey-insights", survey_insights, name="analytics-survey-insights"),
+        path("analytics/cache-stats", analytics_cache_stats, name="analytics-cache-stats"),
+        path("export/<slug:entity>.ndjson", export_ndjson, name="export-ndjson"),
         # Employers
         path("", include("employers.urls")),
         # CRM (leads, followups)
@@ -10,13 +10,14 @@ from rest_framework.views import APIView
 
 from audit.utils import log_audit
 from common.permissions import IsAdminUserRole, ServiceTokenPermission
+from common.replica import ReplicaReadMixin
 from .models import Document
 from .serializers import DocumentSerializer, DocumentUploadSerializer
 
 logger = logging.getLogger(__name__)
 
 
-class DocumentViewSet(viewsets.ReadOnlyModelViewSet):
+class DocumentViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Document.objects.select_related("student", "reviewed_by").order_by("-created_at")
     serializer_class = DocumentSerializer
     permission_classes = [IsAuthenticated]
@@ -1,6 +1,8 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
+from analytics.cache import reset_cache_stats
 from authn.models import User
 from catalog.models import CatalogItem
 from common.auth import _hashed
@@ -17,6 +19,16 @@ def service_tokens(settings):
     settings.SERVICE_TOKENS = {"bot2": _hashed("raw-bot2-service-token")}
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """The analytics response cache outlives a test's DB rollback; start each test empty."""
+    cache.clear()
+    reset_cache_stats()
+    yield
+    cache.clear()
+    reset_cache_stats()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
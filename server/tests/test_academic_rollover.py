@@ -0,0 +1,95 @@
+"""Academic-year rollover (bot2.rollover): enrollment snapshot + set-based promotion."""
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.models import CoverageTotal
+from bot2.models import AcademicYearRollover, Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse("bot2-roster-rollover")
+
+
+@pytest.fixture
+def rosters(program_item):
+    made = {}
+    for sid, course, active, campaign in (
+        ("RO-1", 1, True, "default"), ("RO-2", 1, True, "default"), ("RO-3", 4, True, "default"),
+        ("RO-4", 5, True, "default"), ("RO-5", 2, False, "default"), ("RO-6", 3, True, "other"),
+    ):
+        made[sid] = StudentRoster.objects.create(
+            student_external_id=sid, program=program_item, course_year=course, is_active=active,
+            roster_campaign=campaign,
+        )
+    return made
+
+
+def _courses():
+    return dict(StudentRoster.objects.values_list("student_external_id", "course_year"))
+
+
+def test_rollover_snapshots_and_promotes(api_client, admin_user, viewer_user, program_item, rosters):
+    ProgramEnrollment.objects.create(program=program_item, course_year=1, student_count=40, academic_year="2025-2026")
+    ProgramEnrollment.objects.create(program=program_item, course_year=2, student_count=35, academic_year="2026-2027")
+    student = Bot2Student.objects.create(student_external_id="RO-1", roster=rosters["RO-1"])
+    survey = Bot2SurveyResponse.objects.create(
+        student=student, roster=rosters["RO-1"], program=program_item, course_year=1, submitted_at=timezone.now(),
+    )
+
+    api_client.force_authenticate(user=viewer_user)
+    assert api_client.post(URL, {"academic_year": "2025-2026"}, format="json").status_code == status.HTTP_403_FORBIDDEN
+
+    api_client.force_authenticate(user=admin_user)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.post(URL, {"academic_year": "2025-2026"}, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert (resp.data["next_academic_year"], resp.data["promoted"], resp.data["graduated"]) == ("2026-2027", 3, 1)
+    roster_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "bot2_studentroster"')]
+    assert len(roster_updates) == 1
+
+    assert _courses() == {"RO-1": 2, "RO-2": 2, "RO-3": 5, "RO-4": 5, "RO-5": 2, "RO-6": 3}
+    closing = dict(
+        ProgramEnrollment.objects.filter(academic_year="2025-2026").values_list("course_year", "student_count")
+    )
+    assert closing == {1: 2, 4: 1, 5: 1}
+    # Qo'lda kiritilgan keyingi yil qatori saqlanadi; 4-kurs → 5 (bitiruvchilar).
+    upcoming = dict(
+        ProgramEnrollment.objects.filter(academic_year="2026-2027").values_list("course_year", "student_count")
+    )
+    assert upcoming == {2: 35, 5: 1}
+    assert CoverageTotal.objects.get(
+        campaign="default", source="enrollment", academic_year="2025-2026", course_year=1,
+    ).total == 2
+    assert CoverageTotal.objects.get(campaign="default", source="roster", course_year=2).total == 2
+
+    survey.refresh_from_db()
+    assert survey.course_year == 1      # so'rovnoma snapshot'i o'zgarmaydi
+
+    again = api_client.post(URL, {"academic_year": "2025-2026"}, format="json")
+    assert again.status_code == status.HTTP_200_OK
+    assert (again.data["performed"], again.data["id"]) == (False, resp.data["id"])
+    assert _courses()["RO-1"] == 2
+
+
+def test_rollover_validates_year(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.post(URL, {"academic_year": "2025"}, format="json")
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert not AcademicYearRollover.objects.exists()
+
+
+def test_command_is_idempotent_per_campaign(rosters):
+    call_command("rollover_academic_year", "--academic-year", "2025-2026", "--campaign", "other")
+    call_command("rollover_academic_year", "--academic-year", "2025-2026", "--campaign", "other")
+    assert _courses()["RO-6"] == 4
+    assert _courses()["RO-1"] == 1
+    assert AcademicYearRollover.objects.get().promoted_count == 1
+    with pytest.raises(CommandError):
+        call_command("rollover_academic_year", "--academic-year", "bad")
@@ -0,0 +1,138 @@
+"""analytics-bot2-bundle — several analytics panels in one round-trip.
+
+Each panel in the bundle must be byte-for-byte the payload of its own endpoint
+for the same query params; this file enforces that parity.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from bot2.models import Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
+from catalog.models import CatalogItem
+
+pytestmark = pytest.mark.django_db
+
+PANEL_URLS = {
+    "coverage": "analytics-bot2-course",
+    "program": "analytics-bot2-program",
+    "matrix": "analytics-bot2-matrix",
+    "details": "analytics-bot2-program-year",
+    "overview": "analytics-bot2-enrollments-overview",
+    "academic_years": "analytics-bot2-academic-years",
+    "directions": "analytics-students-by-direction",
+    "timeseries": "analytics-bot2-timeseries",
+}
+
+
+def _range():
+    return {
+        "from": (timezone.now() - timedelta(days=3)).isoformat(),
+        "to": (timezone.now() + timedelta(days=1)).isoformat(),
+    }
+
+
+@pytest.fixture
+def seeded(program_item):
+    other = CatalogItem.objects.create(type=program_item.type, name="Second Program", code="P-2")
+    now = timezone.now()
+    for idx, (program, year, emp) in enumerate(
+        [
+            (program_item, 1, "employed"),
+            (program_item, 2, ""),
+            (program_item, 5, "ishlayapman"),
+            (other, 2, "employed"),
+            (other, 3, "unemployed"),
+        ]
+    ):
+        roster = StudentRoster.objects.create(
+            student_external_id=f"B-{idx}", program=program, course_year=year, is_active=True
+        )
+        student = Bot2Student.objects.create(student_external_id=f"B-{idx}", roster=roster)
+        for days_ago in (2, 0):
+            Bot2SurveyResponse.objects.create(
+                student=student, roster=roster, program=program, course_year=year,
+                survey_campaign="default", employment_status=emp,
+                submitted_at=now - timedelta(days=days_ago, hours=idx),
+            )
+    for program in (program_item, other):
+        for year in (1, 2, 3):
+            ProgramEnrollment.objects.create(
+                program=program, course_year=year, student_count=10 + year,
+                academic_year="2025-2026", campaign="default",
+            )
+    return program_item, other
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {"course_year": "2"},
+        {"course_year": "5"},
+        {"course_year": "2", "academic_year": "2025-2026"},
+        {"course_year": "1", "academic_year": "2099-2100"},
+    ],
+)
+def test_bundle_panels_match_single_endpoints(api_client, admin_user, seeded, extra):
+    api_client.force_authenticate(user=admin_user)
+    params = {**_range(), **extra}
+
+    resp = api_client.get(
+        reverse("analytics-bot2-bundle"), {**params, "panels": ",".join(PANEL_URLS)}
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert list(resp.data) == list(PANEL_URLS)
+
+    for panel, url_name in PANEL_URLS.items():
+        single = api_client.get(reverse(url_name), params)
+        assert single.status_code == status.HTTP_200_OK
+        assert resp.data[panel] == single.data, panel
+
+
+def test_bundle_uses_fewer_queries_than_separate_calls(api_client, admin_user, seeded):
+    api_client.force_authenticate(user=admin_user)
+    params = {**_range(), "course_year": "2"}
+    panels = ["coverage", "program", "matrix", "details", "overview"]
+
+    with CaptureQueriesContext(connection) as separate:
+        for panel in panels:
+            api_client.get(reverse(PANEL_URLS[panel]), params)
+    with CaptureQueriesContext(connection) as bundled:
+        api_client.get(reverse("analytics-bot2-bundle"), {**params, "panels": ",".join(panels)})
+
+    assert len(bundled) < len(separate)
+
+
+def test_bundle_rejects_unknown_or_missing_panels(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-bundle")
+
+    resp = api_client.get(url, _range())
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "PANELS_REQUIRED"
+
+    resp = api_client.get(url, {**_range(), "panels": "coverage,nope"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "INVALID_PANEL"
+    assert resp.data["error"]["details"]["unknown"] == ["nope"]
+
+
+def test_bundle_range_and_course_year_errors_match_endpoints(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-bundle")
+
+    resp = api_client.get(url, {"panels": "coverage"})
+    assert resp.data["error"]["code"] == "TIME_RANGE_REQUIRED"
+
+    # Panels that do not need a range work without one.
+    resp = api_client.get(url, {"panels": "academic_years,directions"})
+    assert resp.status_code == status.HTTP_200_OK
+
+    resp = api_client.get(url, {**_range(), "panels": "details"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "COURSE_YEAR_REQUIRED"
@@ -0,0 +1,147 @@
+"""Versioned analytics response cache (analytics/cache.py).
+
+Responses are keyed on (endpoint, normalized params, data-version); survey
+submit, roster import and enrollment writes bump the version.
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics import cache as analytics_cache
+from analytics.cache import cache_stats, data_version
+from analytics.models import StatCounter
+from bot2.models import StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+def _range():
+    return {
+        "from": (timezone.now() - timedelta(days=1)).isoformat(),
+        "to": (timezone.now() + timedelta(days=1)).isoformat(),
+    }
+
+
+def test_second_call_is_served_from_cache(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    params = _range()
+
+    first = api_client.get(url, params)
+    assert first["X-Cache"] == "MISS"
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = api_client.get(url, params)
+    assert second["X-Cache"] == "HIT"
+    assert second.data == first.data
+    # Faqat autentifikatsiya/ruxsat so'rovlari qoladi — agregatsiya yo'q.
+    assert not any("coverage" in q["sql"] for q in ctx.captured_queries)
+
+    stats = cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_param_order_does_not_change_key(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-academic-years")
+    api_client.get(f"{url}?campaign=default&x=1")
+    assert api_client.get(f"{url}?x=1&campaign=default")["X-Cache"] == "HIT"
+    assert api_client.get(f"{url}?campaign=other")["X-Cache"] == "MISS"
+
+
+def test_errors_are_not_cached(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    assert api_client.get(url).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url)["X-Cache"] == "MISS"
+
+
+def test_submit_survey_invalidates(api_client, admin_user, program_item):
+    StudentRoster.objects.create(
+        student_external_id="C-1", program=program_item, course_year=1, is_active=True
+    )
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    params = _range()
+    before = api_client.get(url, params)
+    assert before.data[0]["responded"] == 0
+
+    version = data_version()
+    api_client.force_authenticate(user=None)
+    resp = api_client.post(
+        reverse("bot2-survey-submit"),
+        {"student_external_id": "C-1", "survey_campaign": "default"},
+        format="json",
+        HTTP_X_SERVICE_TOKEN="raw-bot2-service-token",
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert data_version() != version
+
+    api_client.force_authenticate(user=admin_user)
+    after = api_client.get(url, params)
+    assert after["X-Cache"] == "MISS"
+    assert after.data[0]["responded"] == 1
+
+
+def test_roster_import_and_enrollment_writes_invalidate(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    params = _range()
+    api_client.get(url, params)
+
+    rows = [{"student_external_id": "C-2", "program_id": str(program_item.id), "course_year": 2}]
+    api_client.post(reverse("bot2-roster-import"), rows, format="json")
+    resp = api_client.get(url, params)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data[1]["total"] == 1
+
+    api_client.post(
+        reverse("bot2-enrollment-list"),
+        {"program": str(program_item.id), "course_year": 2, "student_count": 30,
+         "academic_year": "2025-2026", "campaign": "default"},
+        format="json",
+    )
+    resp = api_client.get(url, params)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.data[1]["total"] == 30
+
+
+def test_export_format_reuses_cached_payload(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-students-by-direction")
+    api_client.get(url)
+    resp = api_client.get(url, {"format": "csv"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert cache_stats()["hits"] == 1
+
+
+def test_cache_stats_endpoint_is_admin_only(api_client, admin_user, viewer_user):
+    api_client.force_authenticate(user=viewer_user)
+    assert api_client.get(reverse("analytics-cache-stats")).status_code == status.HTTP_403_FORBIDDEN
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("analytics-cache-stats"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert {"hits", "misses", "hit_ratio", "data_version"} <= set(resp.data)
+
+
+def test_cache_stats_are_flushed_to_stat_counters_after_request(api_client, admin_user, program_item, monkeypatch):
+    monkeypatch.setattr(analytics_cache, "_last_flush", time.monotonic())
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-students-by-direction")
+    api_client.get(url)
+    api_client.get(url)
+    # Flush oralig'ida so'rov hech qanday umumiy holatga yozmaydi.
+    assert not StatCounter.objects.filter(name__startswith="analytics.cache.").exists()
+
+    monkeypatch.setattr(analytics_cache, "_last_flush", 0.0)
+    api_client.get(url)
+    stored = dict(StatCounter.objects.filter(name__startswith="analytics.cache.").values_list("name", "value"))
+    assert stored == {"analytics.cache.hits": 2, "analytics.cache.misses": 1}
+    assert (cache_stats()["hits"], cache_stats()["misses"]) == (2, 1)
@@ -0,0 +1,38 @@
+"""manage.py bench_analytics — synthetic generator + endpoint timing report."""
+
+import json
+
+import pytest
+from django.core.management import call_command
+
+from analytics.models import SubmissionDay
+from bot2.models import Bot2LatestSurvey, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+def test_generates_dataset_and_reports_every_endpoint(tmp_path, program_item):
+    out = tmp_path / "bench.json"
+    call_command(
+        "bench_analytics", students=30, surveys_per_student=2, batch_size=7, runs=2, output=str(out)
+    )
+
+    assert StudentRoster.objects.filter(roster_campaign="bench").count() == 30
+    assert Bot2SurveyResponse.objects.filter(survey_campaign="bench").count() == 60
+    # bulk_create'dan keyin read-model va rollup qayta qurilgan.
+    assert Bot2LatestSurvey.objects.filter(survey_campaign="bench").count() == 30
+    assert sum(SubmissionDay.objects.filter(campaign="bench").values_list("submissions", flat=True)) == 60
+
+    report = json.loads(out.read_text())
+    assert report["dataset"]["surveys"] == 60
+    assert {"course-year-coverage", "bundle", "timeseries", "surveys-list"} <= set(report["endpoints"])
+    for name, row in report["endpoints"].items():
+        assert row["status"] == 200, name
+        assert row["p50_ms"] <= row["p95_ms"]
+        assert row["queries"] >= 1
+
+
+def test_rerun_appends_students(program_item):
+    call_command("bench_analytics", students=5, surveys_per_student=1, runs=1, output="/dev/null")
+    call_command("bench_analytics", students=5, surveys_per_student=1, runs=1, output="/dev/null")
+    assert StudentRoster.objects.filter(roster_campaign="bench").count() == 10
@@ -0,0 +1,110 @@
+"""ETag / If-None-Match on analytics and bot2/surveys (common.conditional).
+
+A matching If-None-Match must be answered with 304 before the endpoint's own
+queries run; any write that changes the payload must change the ETag.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.cache import cache_stats
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+def _range():
+    return {
+        "from": (timezone.now() - timedelta(days=1)).isoformat(),
+        "to": (timezone.now() + timedelta(days=1)).isoformat(),
+    }
+
+
+@pytest.fixture
+def survey(program_item):
+    roster = StudentRoster.objects.create(
+        student_external_id="E-1", program=program_item, course_year=2, is_active=True
+    )
+    student = Bot2Student.objects.create(student_external_id="E-1", roster=roster)
+    return Bot2SurveyResponse.objects.create(
+        student=student, roster=roster, program=program_item, course_year=2,
+        survey_campaign="default", submitted_at=timezone.now(),
+    )
+
+
+def test_analytics_304_skips_computation(api_client, admin_user, survey):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    params = _range()
+
+    first = api_client.get(url, params)
+    etag = first["ETag"]
+    assert first["Cache-Control"] == "private, no-cache"
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = api_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == status.HTTP_304_NOT_MODIFIED
+    assert second["ETag"] == etag
+    assert not second.content
+    assert not any("coverage" in q["sql"] for q in ctx.captured_queries)
+    assert cache_stats()["not_modified"] == 1
+
+    # Boshqa parametrlar — boshqa ETag.
+    other = api_client.get(url, {**params, "course_year": "2"}, HTTP_IF_NONE_MATCH=etag)
+    assert other.status_code == status.HTTP_200_OK
+
+
+def test_analytics_etag_changes_after_submit(api_client, admin_user, survey):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    params = _range()
+    etag = api_client.get(url, params)["ETag"]
+
+    api_client.force_authenticate(user=None)
+    api_client.post(
+        reverse("bot2-survey-submit"),
+        {"student_external_id": "E-1", "survey_campaign": "default"},
+        format="json",
+        HTTP_X_SERVICE_TOKEN="raw-bot2-service-token",
+    )
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["ETag"] != etag
+
+
+def test_survey_list_conditional_get(api_client, admin_user, survey):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("bot2-survey-list")
+
+    with CaptureQueriesContext(connection) as full:
+        first = api_client.get(url)
+    etag = first["ETag"]
+
+    with CaptureQueriesContext(connection) as conditional:
+        resp = api_client.get(url, HTTP_IF_NONE_MATCH=f"W/{etag}")
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not any("bot2_bot2surveyresponse" in q["sql"] and "LIMIT" in q["sql"] for q in conditional.captured_queries)
+    assert len(conditional) < len(full)
+
+    # Ro'yxatda ko'rinadigan talaba ma'lumoti o'zgardi → yangi ETag.
+    student = survey.student
+    student.first_name = "Yangi"
+    student.save()
+    resp = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["ETag"] != etag
+
+
+def test_survey_list_etag_depends_on_filters(api_client, admin_user, survey):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("bot2-survey-list")
+    etag = api_client.get(url)["ETag"]
+    resp = api_client.get(url, {"course_year": 2}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
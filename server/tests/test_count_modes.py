@@ -0,0 +1,92 @@
+"""Page-number `count` strategies (?count_mode= / view `count_mode`).
+
+SQLite has no planner statistics, so `auto` always resolves to exact here;
+the PostgreSQL estimate functions are replaced to pin the auto decisions.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+from common import pagination
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse("bot2-survey-list")
+
+
+@pytest.fixture
+def add_survey(program_item):
+    counter = iter(range(10_000))
+
+    def _add():
+        ext_id = f"CNT-{next(counter)}"
+        roster = StudentRoster.objects.create(
+            student_external_id=ext_id, program=program_item, course_year=2, is_active=True
+        )
+        student = Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+        return Bot2SurveyResponse.objects.create(
+            student=student, roster=roster, program=program_item, course_year=2, submitted_at=timezone.now(),
+        )
+
+    return _add
+
+
+def _count_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"].upper()]
+
+
+def test_default_is_exact_and_reported(api_client, viewer_user, add_survey):
+    for _ in range(3):
+        add_survey()
+    api_client.force_authenticate(user=viewer_user)
+    resp = api_client.get(URL, {"page_size": 2})
+    assert (resp.data["count"], resp.data["count_mode"]) == (3, "exact")
+
+    # estimate SQLite'da mavjud emas — aniq sanoqqa tushadi.
+    resp = api_client.get(URL, {"page_size": 2, "count_mode": "estimate"})
+    assert (resp.data["count"], resp.data["count_mode"]) == (3, "exact")
+
+
+def test_cached_count_is_reused_per_filter(api_client, viewer_user, add_survey):
+    for _ in range(3):
+        add_survey()
+    api_client.force_authenticate(user=viewer_user)
+    resp = api_client.get(URL, {"page_size": 1, "count_mode": "cached"})
+    assert (resp.data["count"], resp.data["count_mode"]) == (3, "cached")
+
+    add_survey()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(URL, {"page_size": 1, "count_mode": "cached"})
+    assert (resp.data["count"], resp.data["count_mode"]) == (3, "cached")
+    assert not _count_queries(ctx)
+
+    # Boshqa filtr — boshqa kesh kaliti.
+    resp = api_client.get(URL, {"page_size": 1, "count_mode": "cached", "course_year": 2})
+    assert resp.data["count"] == 4
+
+
+def test_auto_picks_estimate_or_cached_for_big_tables(api_client, viewer_user, add_survey, monkeypatch, settings):
+    settings.PAGINATION_EXACT_COUNT_MAX = 1000
+    monkeypatch.setattr(pagination, "table_row_estimate", lambda model, using: 5000)
+    monkeypatch.setattr(pagination, "planner_estimate", lambda qs: 5000)
+    for _ in range(3):
+        add_survey()
+    api_client.force_authenticate(user=viewer_user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(URL, {"page_size": 2})
+    assert (resp.data["count"], resp.data["count_mode"]) == (5000, "estimate")
+    assert not _count_queries(ctx)
+    assert resp.data["next"]
+
+    # Taxmin oshirib yuborsa ham sahifa kesilmaydi; oxirgi sahifada jami aniq.
+    resp = api_client.get(URL, {"page_size": 2, "page": 2})
+    assert len(resp.data["results"]) == 1
+    assert (resp.data["count"], resp.data["count_mode"], resp.data["next"]) == (3, "exact", None)
+
+    resp = api_client.get(URL, {"page_size": 2, "course_year": 2})
+    assert (resp.data["count"], resp.data["count_mode"]) == (3, "cached")
@@ -0,0 +1,180 @@
+"""Coverage rollup (analytics.rollups) — CoverageTotal cells + daily responder buckets.
+
+The five coverage endpoints answer from the rollup; these tests pin that it matches
+a brute-force "latest answer per student in range" over the raw survey table, and
+that roster/enrollment/survey writes keep it current.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.models import CoverageResponseDay, CoverageTotal
+from analytics.rollups import responded_cells, total_rows
+from bot2.models import classify_employment_status
+from bot2.models import Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+T0 = datetime(2026, 3, 10, 0, 0, tzinfo=dt_timezone.utc)
+
+
+def _student(program, ext_id, course_year, campaign="default"):
+    roster = StudentRoster.objects.create(
+        student_external_id=ext_id, program=program, course_year=course_year,
+        is_active=True, roster_campaign=campaign,
+    )
+    return Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+
+
+def _answer(student, submitted_at, employment_status="", campaign="default"):
+    return Bot2SurveyResponse.objects.create(
+        student=student, roster=student.roster, program=student.roster.program,
+        course_year=student.roster.course_year, survey_campaign=campaign,
+        employment_status=employment_status, submitted_at=submitted_at,
+    )
+
+
+def _reference(start, end, campaign="default"):
+    """Brute force: each student's latest answer inside [start, end]."""
+    latest = {}
+    for s in Bot2SurveyResponse.objects.filter(
+        survey_campaign=campaign, submitted_at__gte=start, submitted_at__lte=end
+    ):
+        key = (s.submitted_at, s.created_at, s.id)
+        if s.student_id not in latest or key > latest[s.student_id][0]:
+            latest[s.student_id] = (key, s)
+    cells = {}
+    for _, s in latest.values():
+        cell = cells.setdefault((s.program_id, s.course_year), [0, 0])
+        cell[0] += 1
+        cell[1] += int(classify_employment_status(s.employment_status) == "employed")
+    return cells
+
+
+@pytest.fixture
+def history(program_item):
+    """Students answering at various hours over several days, some re-answering."""
+    a = _student(program_item, "R-A", 1)
+    b = _student(program_item, "R-B", 2)
+    c = _student(program_item, "R-C", 2)
+    _answer(a, T0 + timedelta(hours=3), "unemployed")
+    _answer(a, T0 + timedelta(days=2, hours=20), "employed")
+    _answer(b, T0 + timedelta(days=1, hours=12), "ishlayapman")
+    _answer(c, T0 + timedelta(days=3, hours=1))
+    _answer(c, T0 + timedelta(days=6, hours=9), "employed")
+    return a, b, c
+
+
+@pytest.mark.parametrize(
+    "start_offset, end_offset",
+    [
+        (timedelta(0), timedelta(days=7)),                                   # whole days only
+        (timedelta(hours=5), timedelta(days=3, hours=2)),                    # partial both edges
+        (timedelta(days=1, hours=11), timedelta(days=1, hours=13)),          # inside one day
+        (timedelta(hours=-2), timedelta(days=2, hours=21)),                  # re-answer after `to`
+        (timedelta(days=2), timedelta(days=6, hours=8)),                     # latest after `to`
+    ],
+)
+def test_responded_cells_match_bruteforce(history, start_offset, end_offset):
+    start, end = T0 + start_offset, T0 + end_offset
+    cells = responded_cells(start, end, "default")
+    got = {key: [c["responded"], c["employed"]] for key, c in cells.items() if c["responded"]}
+    assert got == _reference(start, end)
+
+
+def test_roster_totals_follow_roster_edits(program_item):
+    roster = StudentRoster.objects.create(
+        student_external_id="T-1", program=program_item, course_year=1, is_active=True
+    )
+
+    def cell(year):
+        return total_rows("default").filter(course_year=year).aggregate(t=Sum("total"))["t"] or 0
+
+    assert cell(1) == 1
+    roster.course_year = 2
+    roster.save()
+    assert (cell(1), cell(2)) == (0, 1)
+    roster.is_active = False
+    roster.save()
+    assert cell(2) == 0
+    roster.is_active = True
+    roster.save()
+    StudentRoster.objects.get(pk=roster.pk).delete()
+    assert cell(2) == 0
+
+
+def test_roster_import_refreshes_totals(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    rows = [
+        {"student_external_id": f"I-{i}", "program_id": str(program_item.id), "course_year": 3}
+        for i in range(3)
+    ]
+    assert api_client.post(reverse("bot2-roster-import"), rows, format="json").status_code == 200
+    assert total_rows("default").get(program=program_item, course_year=3).total == 3
+
+    # Re-import moves one student to year 4 through the bulk_update path.
+    resp = api_client.post(
+        reverse("bot2-roster-import"),
+        [{"student_external_id": "I-0", "program_id": str(program_item.id), "course_year": 4}],
+        format="json",
+    )
+    assert resp.status_code == 200
+    assert total_rows("default").get(program=program_item, course_year=3).total == 2
+    assert total_rows("default").get(program=program_item, course_year=4).total == 1
+
+
+def test_enrollment_edits_refresh_totals(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    payload = {
+        "program": str(program_item.id), "course_year": 1, "student_count": 40,
+        "academic_year": "2025-2026", "campaign": "default",
+    }
+    resp = api_client.post(reverse("bot2-enrollment-list"), payload, format="json")
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert total_rows("default", "2025-2026").get(course_year=1).total == 40
+
+    url = reverse("bot2-enrollment-detail", args=[resp.data["id"]])
+    api_client.patch(url, {"academic_year": "2026-2027"}, format="json")
+    assert not total_rows("default", "2025-2026").exists()
+    assert total_rows("default", "2026-2027").get(course_year=1).total == 40
+
+    api_client.delete(url)
+    assert not total_rows("default", "2026-2027").exists()
+
+
+def test_student_and_roster_deletes_take_out_responders(api_client, admin_user, history):
+    a, b, c = history
+    start, end = T0, T0 + timedelta(days=7)
+    api_client.force_authenticate(user=admin_user)
+
+    assert api_client.delete(reverse("bot2-student-detail", args=[a.pk])).status_code == status.HTTP_204_NO_CONTENT
+    roster_url = reverse("bot2-roster-detail", args=[b.roster.pk])
+    assert api_client.delete(roster_url).status_code == status.HTTP_204_NO_CONTENT
+
+    cells = responded_cells(start, end, "default")
+    got = {key: [cell["responded"], cell["employed"]] for key, cell in cells.items() if cell["responded"]}
+    assert got == _reference(start, end) == {(c.roster.program_id, 2): [1, 1]}
+    assert CoverageResponseDay.objects.aggregate(n=Sum("responded"))["n"] == 1
+
+
+def test_rebuild_command_matches_incremental_state(history, program_item):
+    ProgramEnrollment.objects.create(
+        program=program_item, course_year=1, student_count=10,
+        academic_year="2025-2026", campaign="default",
+    )
+    fields = ("campaign", "source", "academic_year", "program_id", "course_year", "total")
+    totals = sorted(CoverageTotal.objects.values_list(*fields))
+    day_fields = ("campaign", "day", "program_id", "course_year", "responded", "employed")
+    days = sorted(CoverageResponseDay.objects.exclude(responded=0).values_list(*day_fields))
+
+    CoverageTotal.objects.all().delete()
+    CoverageResponseDay.objects.all().delete()
+    call_command("rebuild_coverage_rollup")
+
+    assert sorted(CoverageTotal.objects.values_list(*fields)) == totals
+    assert sorted(CoverageResponseDay.objects.values_list(*day_fields)) == days
@@ -0,0 +1,91 @@
+"""?cursor= — keyset pagination (common.pagination.DefaultPagination).
+
+Walking every `next` link must return each row exactly once in list order
+(NULL keys and equal keys included) without a COUNT query.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def surveys(program_item):
+    now = timezone.now()
+    # Teng submitted_at (tie-break id bo'yicha) va NULL qiymatlar ham bor.
+    stamps = [now, now, now - timedelta(hours=1), None, None, now - timedelta(days=1), now]
+    created = []
+    for idx, stamp in enumerate(stamps):
+        roster = StudentRoster.objects.create(
+            student_external_id=f"CUR-{idx}", program=program_item, course_year=2, is_active=True
+        )
+        student = Bot2Student.objects.create(student_external_id=f"CUR-{idx}", roster=roster)
+        created.append(Bot2SurveyResponse.objects.create(
+            student=student, roster=roster, program=program_item, course_year=2, submitted_at=stamp,
+        ))
+    return created
+
+
+def _walk(api_client, url, params):
+    ids, pages = [], 0
+    resp = api_client.get(url, params)
+    while True:
+        assert resp.status_code == status.HTTP_200_OK, resp.data
+        assert "count" not in resp.data
+        ids += [row["id"] for row in resp.data["results"]]
+        pages += 1
+        if not resp.data["next"]:
+            return ids, pages
+        resp = api_client.get(resp.data["next"])
+
+
+def _expected(rows, key, descending):
+    # NULL — eng katta qiymat (PostgreSQL default tartibi).
+    def sort_key(row):
+        value = getattr(row, key)
+        return (value is None, value or 0, row.pk)
+    return [str(row.pk) for row in sorted(rows, key=sort_key, reverse=descending)]
+
+
+def test_survey_cursor_walks_every_row_once(api_client, viewer_user, surveys):
+    api_client.force_authenticate(user=viewer_user)
+    url = reverse("bot2-survey-list")
+
+    ids, pages = _walk(api_client, url, {"cursor": "", "page_size": 2})
+    assert pages == 4
+    assert ids == _expected(surveys, "submitted_at", descending=True)
+
+    ids, _ = _walk(api_client, url, {"cursor": "", "page_size": 3, "ordering": "submitted_at"})
+    assert ids == _expected(surveys, "submitted_at", descending=False)
+
+
+def test_cursor_page_runs_no_count(api_client, viewer_user, surveys):
+    api_client.force_authenticate(user=viewer_user)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(reverse("bot2-student-list"), {"cursor": "", "page_size": 2, "ordering": "-created_at"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.data["results"]) == 2
+    assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+
+    ids, _ = _walk(api_client, reverse("bot2-student-list"), {"cursor": "", "page_size": 2})
+    assert len(ids) == len(set(ids)) == Bot2Student.objects.count()
+
+
+def test_invalid_cursor_is_400_and_page_mode_unchanged(api_client, viewer_user, surveys):
+    api_client.force_authenticate(user=viewer_user)
+    resp = api_client.get(reverse("bot2-roster-list"), {"cursor": "not-a-cursor"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "INVALID_CURSOR"
+
+    resp = api_client.get(reverse("bot2-roster-list"), {"page_size": 2})
+    assert resp.data["count"] == len(surveys)
+    assert resp.data["next"] and "page=2" in resp.data["next"]
@@ -0,0 +1,111 @@
+"""Persisted doc_status / employment_doc_status on Bot2SurveyResponse — kept in
+sync by DocumentVerification writes and document binding; the survey list
+filters on the column instead of per-row Exists subqueries."""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ai_verification.models import DocumentVerification
+from bot2.models import Bot2Document, Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "raw-bot2-service-token"
+
+
+def _file():
+    return SimpleUploadedFile("doc.png", b"\x89PNG\r\n\x1a\n", content_type="image/png")
+
+
+@pytest.fixture
+def student(program_item):
+    roster = StudentRoster.objects.create(student_external_id="D-1", program=program_item, course_year=2)
+    return Bot2Student.objects.create(student_external_id="D-1", roster=roster)
+
+
+def _survey(student, **extra):
+    return Bot2SurveyResponse.objects.create(
+        student=student, roster=student.roster, program=student.roster.program, course_year=2,
+        submitted_at=timezone.now(), **extra,
+    )
+
+
+def _verify(student, decision="pending", document_type="cv", source_document=None):
+    return DocumentVerification.objects.create(
+        student=student, document_type=document_type, final_decision=decision,
+        source_document=source_document, file=_file(),
+    )
+
+
+def test_student_level_verification_updates_all_surveys(student):
+    first, second = _survey(student), _survey(student, employment_status="employed")
+    verification = _verify(student, decision="pending")
+    assert set(Bot2SurveyResponse.objects.values_list("doc_status", flat=True)) == {"pending"}
+
+    verification.final_decision = DocumentVerification.FinalDecision.ACCEPTED
+    verification.save(update_fields=["final_decision", "updated_at"])
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.doc_status, first.employment_doc_status) == ("verified", "no_docs")
+    assert second.employment_doc_status == "no_docs"
+
+    _verify(student, decision="rejected", document_type="employment")
+    second.refresh_from_db()
+    assert (second.doc_status, second.employment_doc_status) == ("verified", "rejected")
+
+
+def test_bound_document_counts_only_for_its_survey(api_client, student):
+    other = _survey(student)
+    doc = Bot2Document.objects.create(student=student, doc_type="cv", file="bot2/docs/cv.pdf", survey_session_key="run-1")
+    _verify(student, decision="accepted", source_document=doc)
+    other.refresh_from_db()
+    assert other.doc_status == "no_docs"
+
+    resp = api_client.post(
+        reverse("bot2-survey-submit"),
+        {"student_external_id": "D-1", "survey_session_key": "run-1"},
+        format="json", HTTP_X_SERVICE_TOKEN=TOKEN,
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert Bot2SurveyResponse.objects.get(id=resp.data["response_id"]).doc_status == "verified"
+
+    doc.delete()  # verification talaba darajasiga o'tadi
+    other.refresh_from_db()
+    assert other.doc_status == "verified"
+
+
+def test_list_filters_on_column(api_client, admin_user, student, program_item):
+    roster = StudentRoster.objects.create(student_external_id="D-2", program=program_item, course_year=2)
+    plain = _survey(Bot2Student.objects.create(student_external_id="D-2", roster=roster))
+    verified = _survey(student)
+    _verify(student, decision="accepted")
+
+    api_client.force_authenticate(user=admin_user)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(reverse("bot2-survey-list"), {"doc_status": "verified"})
+    assert resp.status_code == status.HTTP_200_OK
+    rows = resp.data["results"] if isinstance(resp.data, dict) else resp.data
+    assert [r["id"] for r in rows] == [str(verified.id)]
+    assert rows[0]["doc_verification_status"] == "verified"
+    # ETag watermark'dan tashqari verification jadvaliga EXISTS subquery yo'q.
+    assert not any("EXISTS" in q["sql"] and "ai_verification_document" in q["sql"] for q in ctx.captured_queries)
+
+    resp = api_client.get(reverse("bot2-survey-list"), {"doc_status": "no_docs"})
+    rows = resp.data["results"] if isinstance(resp.data, dict) else resp.data
+    assert [r["id"] for r in rows] == [str(plain.id)]
+
+
+def test_rebuild_command_repairs_drift(student):
+    survey = _survey(student)
+    _verify(student, decision="accepted")
+    Bot2SurveyResponse.objects.filter(pk=survey.pk).update(doc_status="no_docs")
+
+    call_command("rebuild_doc_status")
+    survey.refresh_from_db()
+    assert survey.doc_status == "verified"
@@ -0,0 +1,110 @@
+"""Bot2SurveyResponse.employment_class — one classifier, persisted and indexed.
+
+survey_stats, analytics directions/details and the coverage rollup all read the
+stored column; these tests pin the classifier and that every write path keeps
+the column in step with employment_status.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from bot2.models import (
+    Bot2Student,
+    Bot2SurveyResponse,
+    EmploymentClass,
+    StudentRoster,
+    classify_employment_status,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", EmploymentClass.UNKNOWN),
+        (None, EmploymentClass.UNKNOWN),
+        ("  ", EmploymentClass.UNKNOWN),
+        ("employed", EmploymentClass.EMPLOYED),
+        (" Employed ", EmploymentClass.EMPLOYED),
+        ("unemployed", EmploymentClass.UNEMPLOYED),
+        ("Ishlayapman (to'liq stavka)", EmploymentClass.EMPLOYED),
+        ("Ishsizman, ish qidiryapman", EmploymentClass.UNEMPLOYED),
+        ("student", EmploymentClass.UNEMPLOYED),
+    ],
+)
+def test_classifier(value, expected):
+    assert classify_employment_status(value) == expected
+
+
+def _student(program, ext_id, course_year=2):
+    roster = StudentRoster.objects.create(
+        student_external_id=ext_id, program=program, course_year=course_year, is_active=True
+    )
+    return Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+
+
+def _survey(student, employment_status):
+    return Bot2SurveyResponse.objects.create(
+        student=student,
+        roster=student.roster,
+        program=student.roster.program,
+        course_year=student.roster.course_year,
+        survey_campaign="default",
+        employment_status=employment_status,
+        submitted_at=timezone.now(),
+    )
+
+
+def test_class_follows_status_on_save(program_item):
+    survey = _survey(_student(program_item, "E-1"), "employed")
+    assert survey.employment_class == EmploymentClass.EMPLOYED
+
+    survey.employment_status = "unemployed"
+    survey.save(update_fields=["employment_status"])
+    survey.refresh_from_db()
+    assert survey.employment_class == EmploymentClass.UNEMPLOYED
+
+
+def test_submit_survey_stores_class(api_client, program_item):
+    StudentRoster.objects.create(
+        student_external_id="E-2", program=program_item, course_year=1, is_active=True
+    )
+    resp = api_client.post(
+        reverse("bot2-survey-submit"),
+        {"student_external_id": "E-2", "survey_campaign": "default", "employment_status": "employed"},
+        format="json",
+        HTTP_X_SERVICE_TOKEN="raw-bot2-service-token",
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    survey = Bot2SurveyResponse.objects.get(pk=resp.data["response_id"])
+    assert survey.employment_class == EmploymentClass.EMPLOYED
+
+
+def test_stats_and_directions_agree(api_client, admin_user, program_item):
+    for idx, emp in enumerate(["employed", "Ishlayapman", "unemployed", ""]):
+        _survey(_student(program_item, f"E-3{idx}"), emp)
+
+    api_client.force_authenticate(user=admin_user)
+    stats = api_client.get(reverse("bot2-survey-stats")).data
+    assert stats == {"unique_students": 4, "employed": 2, "unemployed": 1}
+
+    directions = api_client.get(reverse("analytics-students-by-direction")).data
+    row = next(r for r in directions if str(r["program_id"]) == str(program_item.id))
+    assert row["employed"] == stats["employed"]
+
+
+def test_backfill_command_repairs_stale_rows(program_item):
+    employed = _survey(_student(program_item, "E-4"), "employed")
+    blank = _survey(_student(program_item, "E-5"), "")
+    Bot2SurveyResponse.objects.update(employment_class=EmploymentClass.UNEMPLOYED)
+
+    call_command("backfill_employment_class", chunk_size=1)
+
+    employed.refresh_from_db()
+    blank.refresh_from_db()
+    assert employed.employment_class == EmploymentClass.EMPLOYED
+    assert blank.employment_class == EmploymentClass.UNKNOWN
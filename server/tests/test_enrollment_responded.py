@@ -0,0 +1,95 @@
+"""ProgramEnrollment `responded_count` from analytics.CoverageResponseTotal.
+
+The list reads the stored cell; submits, roster backfills and the
+recompute-responded action must keep it equal to a fresh recount.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.models import CoverageResponseTotal
+from bot2.models import Bot2Student, Bot2SurveyResponse, ProgramEnrollment, StudentRoster
+from bot2.services import upsert_roster_row
+
+pytestmark = pytest.mark.django_db
+
+LIST = reverse("bot2-enrollment-list")
+
+
+def _student(program, ext_id, course_year):
+    roster = StudentRoster.objects.create(
+        student_external_id=ext_id, program=program, course_year=course_year, is_active=True
+    )
+    return Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+
+
+def _answer(student, program=None, course_year=None):
+    return Bot2SurveyResponse.objects.create(
+        student=student, roster=student.roster, program=program, course_year=course_year,
+        submitted_at=timezone.now(),
+    )
+
+
+def _responded(api_client):
+    resp = api_client.get(LIST)
+    assert resp.status_code == status.HTTP_200_OK
+    return {row["course_year"]: (row["responded_count"], row["coverage_percent"]) for row in resp.data["results"]}
+
+
+def test_list_reads_stored_responded_count(api_client, viewer_user, program_item):
+    ProgramEnrollment.objects.create(program=program_item, course_year=1, student_count=4)
+    ProgramEnrollment.objects.create(program=program_item, course_year=2, student_count=2)
+    a, b = _student(program_item, "EN-A", 1), _student(program_item, "EN-B", 2)
+    _answer(a, program_item, 1)
+    _answer(a, program_item, 1)          # qayta javob — bir marta sanaladi
+    _answer(b, program_item, 2)
+
+    api_client.force_authenticate(user=viewer_user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert _responded(api_client) == {1: (1, 25.0), 2: (1, 50.0)}
+    assert not any("bot2_bot2surveyresponse" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_roster_backfill_moves_responders(api_client, viewer_user, program_item):
+    ProgramEnrollment.objects.create(program=program_item, course_year=3, student_count=1)
+    student = _student(program_item, "EN-C", 3)
+    StudentRoster.objects.filter(pk=student.roster_id).update(course_year=None)
+    _answer(student, program_item, None)
+    api_client.force_authenticate(user=viewer_user)
+    assert _responded(api_client) == {3: (0, 0.0)}
+
+    upsert_roster_row({"student_external_id": "EN-C", "course_year": 3, "program": program_item})
+    assert _responded(api_client) == {3: (1, 100.0)}
+
+
+def test_student_and_roster_deletes_lower_responded_count(api_client, viewer_user, program_item):
+    ProgramEnrollment.objects.create(program=program_item, course_year=1, student_count=4)
+    a, b, c = (_student(program_item, f"EN-X{i}", 1) for i in range(3))
+    for student in (a, b, c):
+        _answer(student, program_item, 1)
+    api_client.force_authenticate(user=viewer_user)
+    assert _responded(api_client) == {1: (3, 75.0)}
+
+    a.delete()
+    StudentRoster.objects.get(pk=b.roster_id).delete()
+    assert _responded(api_client) == {1: (1, 25.0)}
+    assert CoverageResponseTotal.objects.get(program=program_item, course_year=1).responded == 1
+
+
+def test_recompute_action_repairs_cells(api_client, admin_user, viewer_user, program_item):
+    ProgramEnrollment.objects.create(program=program_item, course_year=1, student_count=1)
+    _answer(_student(program_item, "EN-D", 1), program_item, 1)
+    CoverageResponseTotal.objects.update(responded=7)
+
+    api_client.force_authenticate(user=viewer_user)
+    assert api_client.post(reverse("bot2-enrollment-recompute-responded")).status_code == status.HTTP_403_FORBIDDEN
+
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.post(reverse("bot2-enrollment-recompute-responded"), {}, format="json")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data == {"campaigns": ["default"]}
+    assert _responded(api_client) == {1: (1, 100.0)}
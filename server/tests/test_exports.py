@@ -0,0 +1,125 @@
+"""Streaming `?format=csv|xlsx` export for analytics endpoints and the survey list."""
+
+import csv
+import io
+from datetime import timedelta
+
+import openpyxl
+import pytest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+def _range():
+    return {
+        "from": (timezone.now() - timedelta(days=1)).isoformat(),
+        "to": (timezone.now() + timedelta(days=1)).isoformat(),
+    }
+
+
+def _body(resp) -> bytes:
+    assert isinstance(resp, StreamingHttpResponse)
+    return b"".join(resp.streaming_content)
+
+
+def _csv_rows(resp):
+    return list(csv.reader(io.StringIO(_body(resp).decode("utf-8-sig"))))
+
+
+@pytest.fixture
+def surveys(program_item):
+    roster = StudentRoster.objects.create(
+        student_external_id="E-1", program=program_item, course_year=2, is_active=True
+    )
+    student = Bot2Student.objects.create(
+        student_external_id="E-1", roster=roster, first_name="Ali", last_name="Валиев"
+    )
+    return [
+        Bot2SurveyResponse.objects.create(
+            student=student, roster=roster, program=program_item, course_year=2,
+            employment_status=status_, submitted_at=timezone.now() - timedelta(hours=i),
+        )
+        for i, status_ in enumerate(["employed", "unemployed", "employed"])
+    ]
+
+
+def test_course_year_coverage_csv_matches_json(api_client, admin_user, surveys):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-course")
+    data = api_client.get(url, _range()).data
+
+    resp = api_client.get(url, {**_range(), "format": "csv"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp["Content-Type"].startswith("text/csv")
+    assert 'filename="course-year-coverage.csv"' in resp["Content-Disposition"]
+    rows = _csv_rows(resp)
+    assert rows[0] == ["course_year", "total", "responded", "coverage_percent"]
+    assert [int(r[2]) for r in rows[1:]] == [row["responded"] for row in data]
+
+
+@pytest.mark.parametrize(
+    "url_name, extra, sheets",
+    [
+        ("analytics-bot2-matrix", {}, ["matrix"]),
+        ("analytics-bot2-enrollments-overview", {}, ["by_program", "by_year", "summary"]),
+        ("analytics-bot2-program-year", {"course_year": "2"}, ["programs"]),
+        ("analytics-bot2-bundle", {"panels": "coverage,academic_years"},
+         ["coverage.course_years", "academic_years.academic_years"]),
+    ],
+)
+def test_analytics_xlsx_has_one_sheet_per_table(api_client, admin_user, surveys, url_name, extra, sheets):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse(url_name), {**_range(), **extra, "format": "xlsx"})
+    assert resp.status_code == status.HTTP_200_OK
+    wb = openpyxl.load_workbook(io.BytesIO(_body(resp)), read_only=True)
+    assert wb.sheetnames == sheets
+
+
+def test_export_validation_errors_stay_json(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("analytics-bot2-course"), {"format": "csv"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp["Content-Type"].startswith("application/json")
+    assert resp.json()["error"]["code"] == "TIME_RANGE_REQUIRED"
+
+
+def test_survey_list_csv_exports_all_filtered_rows(api_client, admin_user, surveys):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(
+        reverse("bot2-survey-list"), {"format": "csv", "employment_status": "employed", "page_size": 1}
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    rows = _csv_rows(resp)
+    header, body = rows[0], rows[1:]
+    # Sahifalash eksportga ta'sir qilmaydi.
+    assert len(body) == 2
+    assert {r[header.index("employment_status")] for r in body} == {"employed"}
+    assert body[0][header.index("last_name")] == "Валиев"
+    assert body[0][header.index("doc_verification_status")] == "no_docs"
+
+
+def test_survey_list_xlsx(api_client, admin_user, surveys):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("bot2-survey-list"), {"format": "xlsx"})
+    assert resp.status_code == status.HTTP_200_OK
+    ws = openpyxl.load_workbook(io.BytesIO(_body(resp)), read_only=True)["surveys"]
+    assert len(list(ws.iter_rows(values_only=True))) == 1 + len(surveys)
+
+
+def test_students_by_direction_xlsx_streams(api_client, admin_user, surveys):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("analytics-students-by-direction-xlsx"))
+    assert resp.status_code == status.HTTP_200_OK
+    body = _body(resp)
+    ws = openpyxl.load_workbook(io.BytesIO(body), read_only=True).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][:4] == ("Program", "Total", "Registered", "Employed")
+    assert rows[1][1] == 1
+    # Dastur nomlari uzun — A ustuni kengligi saqlanadi.
+    assert openpyxl.load_workbook(io.BytesIO(body)).active.column_dimensions["A"].width == 40
@@ -0,0 +1,122 @@
+"""common.replica — optional read replica routing.
+
+The test database has no `replica` alias, so routing decisions are checked on
+the router itself with availability patched in; no query is sent to a replica.
+"""
+
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db.utils import OperationalError
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+
+from analytics.cache import DATA_BUMPED_AT_KEY, cached_response
+from authn.models import User
+from bot2.models import Bot2SurveyResponse
+from common import replica
+from common.replica import PIN_COOKIE, ReplicaRouter, reading_from_replica, replica_reads, run_on_replica
+
+router = ReplicaRouter()
+factory = APIRequestFactory()
+
+
+@pytest.fixture
+def replica_up(monkeypatch):
+    monkeypatch.setattr(replica, "replica_configured", lambda: True)
+    monkeypatch.setattr(replica, "_down_until", 0.0)
+
+
+def _routes():
+    return router.db_for_read(Bot2SurveyResponse), router.db_for_read(User)
+
+
+def test_no_block_means_default(replica_up):
+    assert _routes() == (None, None)
+
+
+def test_safe_request_reads_replica_except_auth_tables(replica_up):
+    seen = run_on_replica(factory.get("/x"), _routes)
+    assert seen == ("replica", None)
+
+
+def test_write_pins_rest_of_request_to_default(replica_up):
+    def view():
+        before = router.db_for_read(Bot2SurveyResponse)
+        router.db_for_write(Bot2SurveyResponse)
+        return before, router.db_for_read(Bot2SurveyResponse)
+
+    assert run_on_replica(factory.get("/x"), view) == ("replica", None)
+
+
+def test_unsafe_pinned_or_unconfigured_requests_stay_on_default(replica_up, monkeypatch):
+    assert run_on_replica(factory.post("/x"), _routes) == (None, None)
+    pinned = factory.get("/x")
+    pinned.COOKIES[PIN_COOKIE] = "1"
+    assert run_on_replica(pinned, _routes) == (None, None)
+    monkeypatch.setattr(replica, "replica_configured", lambda: False)
+    assert run_on_replica(factory.get("/x"), _routes) == (None, None)
+
+
+def test_replica_error_falls_back_to_default_and_backs_off(replica_up):
+    calls = []
+
+    @replica_reads
+    @api_view(["GET"])
+    @authentication_classes([])
+    @permission_classes([AllowAny])
+    def view(request):
+        calls.append(reading_from_replica())
+        if reading_from_replica():
+            raise OperationalError("replica down")
+        return Response({"ok": True})
+
+    resp = view(factory.get("/x"))
+    assert resp.status_code == 200
+    assert calls == [True, False]
+    assert replica.replica_available() is False
+
+
+def test_streaming_body_is_read_inside_replica_block(replica_up):
+    def view():
+        return StreamingHttpResponse(str(router.db_for_read(Bot2SurveyResponse)) for _ in range(2))
+
+    response = run_on_replica(factory.get("/x"), view)
+    assert b"".join(response.streaming_content) == b"replicareplica"
+    assert not reading_from_replica()
+
+
+@pytest.mark.django_db
+def test_successful_write_sets_pin_cookie(api_client, admin_user, program_item, replica_up):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.post(
+        reverse("bot2-enrollment-list"),
+        {"program": str(program_item.id), "course_year": 1, "student_count": 10,
+         "academic_year": "2025-2026", "campaign": "default"},
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert resp.cookies[PIN_COOKIE]["max-age"] == 5
+
+    assert PIN_COOKIE not in api_client.get(reverse("bot2-survey-list")).cookies
+
+
+def test_cache_miss_right_after_bump_is_computed_on_default(replica_up):
+    @replica_reads
+    @api_view(["GET"])
+    @authentication_classes([])
+    @permission_classes([AllowAny])
+    @cached_response("test-replica-lag")
+    def view(request):
+        return Response({"db": str(router.db_for_read(Bot2SurveyResponse))})
+
+    cache.set(DATA_BUMPED_AT_KEY, time.time())      # hozirgina bump bo'lgan
+    assert view(factory.get("/x")).data == {"db": "None"}   # keshga faqat primary natijasi tushadi
+
+    cache.clear()                                   # pin oynasi o'tgan, kesh bo'sh
+    assert view(factory.get("/x")).data == {"db": "replica"}
@@ -3,12 +3,15 @@
 Admin-only. Accepts a JSON list, a `{"rows": [...]}` envelope, or a multipart CSV upload.
 Each row is validated independently; a mix of good and bad rows yields HTTP 207 with the
 failures listed under `errors`. The endpoint always writes a `roster_import` audit row.
+File uploads are queued as a RosterImportJob (202); under pytest the background task
+runs synchronously, so the 202 payload already carries the finished job.
 
 `program_item` (a PROGRAM CatalogItem with code="PA") is the program referenced by rows.
 """
 
 import io
 
+import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
 from rest_framework.reverse import reverse
@@ -21,6 +24,11 @@ from bot2.models import StudentRoster
 URL = reverse("bot2-roster-import")
 
 
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
 def test_json_list_creates_rosters(api_client, admin_user, program_item):
     api_client.force_authenticate(user=admin_user)
     payload = [
@@ -78,7 +86,8 @@ def test_csv_file_upload_creates_rosters(api_client, admin_user, program_item):
 
     resp = api_client.post(URL, {"file": upload}, format="multipart")
 
-    assert resp.status_code == status.HTTP_200_OK
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert resp.data["status"] == "done"
     assert resp.data["created"] == 2
     assert StudentRoster.objects.filter(student_external_id="CSV-2", course_year=5).exists()
 
@@ -189,7 +198,7 @@ def test_csv_alias_headers_are_normalized(api_client, admin_user, program_item):
 
     resp = api_client.post(URL, {"file": upload}, format="multipart")
 
-    assert resp.status_code == status.HTTP_200_OK
+    assert resp.status_code == status.HTTP_202_ACCEPTED
     assert resp.data["created"] == 1
     roster = StudentRoster.objects.get(student_external_id="ALIAS-1")
     assert roster.first_name == "Ali"
@@ -206,7 +215,7 @@ def test_csv_merged_name_column_is_split(api_client, admin_user):
 
     resp = api_client.post(URL, {"file": upload}, format="multipart")
 
-    assert resp.status_code == status.HTTP_200_OK
+    assert resp.status_code == status.HTTP_202_ACCEPTED
     roster = StudentRoster.objects.get(student_external_id="MERGE-1")
     assert roster.first_name == "Ali"
     assert roster.last_name == "Valiyev"
@@ -354,10 +363,10 @@ def test_messy_real_world_xlsx_is_parsed(api_client, admin_user):
 
     resp = api_client.post(URL, {"file": upload}, format="multipart")
 
-    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert resp.status_code == status.HTTP_202_ACCEPTED, resp.data
     assert resp.data["created"] == 2
     assert resp.data["skipped"] == 1          # the id-less stats remnant row
-    assert resp.data["errors"] == []
+    assert resp.data["error_count"] == 0
 
     s1 = StudentRoster.objects.get(student_external_id="STU-1")
     # Merged "SURNAME FIRST PATRONYMIC" → first token / rest, preserving display order.
@@ -370,3 +379,41 @@ def test_messy_real_world_xlsx_is_parsed(api_client, admin_user):
     s2 = StudentRoster.objects.get(student_external_id="STU-2")
     assert s2.course_year == 2
     assert s2.birth_date == date(2005, 3, 1)
+
+
+def test_reimport_backfills_survey_snapshots_set_based(api_client, admin_user, program_item):
+    """Rosters fixed by a re-import fill their surveys' NULL program/course_year in
+    one UPDATE per field (not per roster); a non-null snapshot is never overwritten."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+
+    from bot2.models import Bot2Student, Bot2SurveyResponse
+    from catalog.models import CatalogItem
+
+    other = CatalogItem.objects.create(type=CatalogItem.ItemType.PROGRAM, name="Boshqa", code="OT")
+    surveys = []
+    for i in range(5):
+        roster = StudentRoster.objects.create(student_external_id=f"BF-{i}")
+        student = Bot2Student.objects.create(student_external_id=f"BF-{i}", roster=roster)
+        surveys.append(Bot2SurveyResponse.objects.create(student=student, roster=roster, submitted_at=timezone.now()))
+    Bot2SurveyResponse.objects.filter(pk=surveys[0].pk).update(program=other, course_year=4)
+
+    api_client.force_authenticate(user=admin_user)
+    rows = [{"student_external_id": f"BF-{i}", "program_id": str(program_item.id), "course_year": 2} for i in range(5)]
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.post(URL, rows, format="json")
+    assert resp.status_code == status.HTTP_200_OK
+
+    survey_updates = [
+        q["sql"] for q in ctx.captured_queries
+        if q["sql"].startswith('UPDATE "bot2_bot2surveyresponse"')
+    ]
+    assert len(survey_updates) == 2
+    snapshots = dict(
+        Bot2SurveyResponse.objects.values_list("roster__student_external_id", "program_id")
+    )
+    assert snapshots["BF-0"] == other.id           # append-only: eski snapshot saqlanadi
+    assert all(snapshots[f"BF-{i}"] == program_item.id for i in range(1, 5))
+    assert set(Bot2SurveyResponse.objects.exclude(pk=surveys[0].pk).values_list("course_year", flat=True)) == {2}
+    assert Bot2SurveyResponse.objects.get(pk=surveys[0].pk).course_year == 4
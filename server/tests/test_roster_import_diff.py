@@ -0,0 +1,109 @@
+"""Roster import fingerprints, `?dry_run=1` and `?mode=mirror`.
+
+A re-imported unchanged row is recognized by StudentRoster.import_fingerprint
+without loading the roster; dry runs only report the diff; mirror imports
+deactivate the campaign's rosters that are absent from the payload.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from audit.models import AuditLog
+from bot2.models import RosterImportJob, RosterImportKey, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse("bot2-roster-import")
+
+
+def _post(api_client, rows, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    return api_client.post(f"{URL}?{query}" if query else URL, rows, format="json")
+
+
+def test_unchanged_rows_are_skipped_by_fingerprint(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    rows = [{"student_external_id": f"FP-{i}", "first_name": "Ali", "course_year": 1} for i in range(3)]
+    assert _post(api_client, rows).data["created"] == 3
+
+    rows[0]["course_year"] = 2
+    with CaptureQueriesContext(connection) as ctx:
+        resp = _post(api_client, rows)
+    assert (resp.data["created"], resp.data["updated"], resp.data["unchanged"]) == (0, 1, 2)
+    assert [s["status"] for s in resp.data["students"]] == ["updated", "unchanged", "unchanged"]
+    # O'zgarmagan qatorlar yozilmaydi: bitta bulk UPDATE, faqat FP-0 uchun.
+    updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "bot2_studentroster"')]
+    changed_pk = StudentRoster.objects.get(student_external_id="FP-0").pk.hex
+    assert len(updates) == 1 and updates[0].endswith(f"IN ('{changed_pk}')")
+
+    # Boshqa yo'l bilan saqlash izni tozalaydi — qator qayta solishtiriladi, lekin o'zgarmagan.
+    roster = StudentRoster.objects.get(student_external_id="FP-1")
+    roster.save()
+    assert StudentRoster.objects.get(pk=roster.pk).import_fingerprint == ""
+    resp = _post(api_client, rows)
+    assert (resp.data["updated"], resp.data["unchanged"]) == (0, 3)
+    assert StudentRoster.objects.get(pk=roster.pk).import_fingerprint
+
+
+def test_dry_run_reports_diff_without_writing(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    StudentRoster.objects.create(student_external_id="DR-1", first_name="Ali", course_year=1, program=program_item)
+    StudentRoster.objects.create(student_external_id="DR-2", first_name="Vali", course_year=2)
+    audits = AuditLog.objects.count()
+
+    resp = _post(api_client, [
+        {"student_external_id": "DR-1", "course_year": 3, "first_name": ""},
+        {"student_external_id": "DR-2", "first_name": "Vali", "course_year": 2},
+        {"student_external_id": "DR-3", "course_year": 1},
+        {"student_external_id": "DR-4", "course_year": 9},
+    ], dry_run=1)
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["dry_run"] is True
+    assert (resp.data["created"], resp.data["updated"], resp.data["unchanged"]) == (1, 1, 1)
+    assert resp.data["samples"]["create"] == [{"row": 3, "student_external_id": "DR-3"}]
+    assert resp.data["samples"]["update"] == [
+        {"row": 1, "student_external_id": "DR-1", "changes": {"course_year": [1, 3]}}
+    ]
+    assert [e["row"] for e in resp.data["errors"]] == [4]
+    assert "students" not in resp.data
+    assert not StudentRoster.objects.filter(student_external_id="DR-3").exists()
+    assert StudentRoster.objects.get(student_external_id="DR-1").course_year == 1
+    assert AuditLog.objects.count() == audits
+
+
+def test_mirror_deactivates_absent_rosters_of_campaign(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    for sid, campaign in (("MR-1", "spring"), ("MR-2", "spring"), ("MR-3", "spring"), ("MR-4", "autumn")):
+        StudentRoster.objects.create(student_external_id=sid, roster_campaign=campaign, course_year=1)
+    rows = [
+        {"student_external_id": "MR-1", "campaign": "spring", "course_year": 1},
+        {"student_external_id": "MR-3", "campaign": "spring", "course_year": 8},   # xato, lekin faylda bor
+    ]
+
+    preview = _post(api_client, rows, mode="mirror", campaign="spring", dry_run=1)
+    assert preview.data["deactivated"] == 1
+    assert preview.data["samples"]["deactivate"] == [{"student_external_id": "MR-2"}]
+    assert StudentRoster.objects.get(student_external_id="MR-2").is_active
+
+    resp = _post(api_client, rows, mode="mirror", campaign="spring")
+    assert resp.status_code == status.HTTP_207_MULTI_STATUS
+    assert resp.data["deactivated"] == 1
+    active = dict(StudentRoster.objects.values_list("student_external_id", "is_active"))
+    assert active == {"MR-1": True, "MR-2": False, "MR-3": True, "MR-4": True}
+    assert not RosterImportKey.objects.exists()
+    job = RosterImportJob.objects.get(pk=resp.data["job_id"])
+    assert (job.mode, job.campaign, job.deactivated_count) == ("mirror", "spring", 1)
+
+
+def test_mirror_without_valid_rows_deactivates_nothing(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    StudentRoster.objects.create(student_external_id="ME-1", course_year=1)
+
+    resp = _post(api_client, [{"first_name": "no id"}], mode="mirror")
+    assert resp.data["deactivated"] == 0
+    assert StudentRoster.objects.get(student_external_id="ME-1").is_active
+    assert _post(api_client, [], mode="replace").status_code == status.HTTP_400_BAD_REQUEST
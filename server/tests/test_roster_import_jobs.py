@@ -0,0 +1,136 @@
+"""Roster import jobs (bot2.roster_import) — chunked, streamed, with progress.
+
+Background tasks run synchronously under pytest, so a queued job is finished
+by the time the 202 response is built.
+"""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from bot2 import roster_import
+from bot2.models import RosterImportJob, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse("bot2-roster-import")
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.ROSTER_IMPORT_CHUNK_SIZE = 2
+    settings.ROSTER_IMPORT_INLINE_MAX_ROWS = 2
+
+
+def _csv(text, encoding="utf-8"):
+    return SimpleUploadedFile("roster.csv", text.encode(encoding), content_type="text/csv")
+
+
+def test_file_job_reports_counts_and_paged_errors(api_client, admin_user, monkeypatch):
+    calls = []
+    original = roster_import._map_header
+    monkeypatch.setattr(roster_import, "_map_header", lambda raw: calls.append(raw) or original(raw))
+    api_client.force_authenticate(user=admin_user)
+    csv_text = (
+        "Student Id,Ism,Kurs\n"
+        "J-1,Ali,1\n"
+        "J-2,Vali,9\n"        # noto'g'ri kurs
+        ",,\n"                # ID'siz — skipped
+        "J-3,Olim,2\n"
+        "J-1,Ali,3\n"         # keyingi chunk'da takror — oxirgisi g'olib, bir marta sanaladi
+        "J-4,Bek,0\n"
+    )
+    resp = api_client.post(URL, {"file": _csv(csv_text)}, format="multipart")
+
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert len(calls) == 3    # sarlavha fayl uchun bir marta xaritalanadi
+    job = RosterImportJob.objects.get(pk=resp.data["id"])
+    assert (job.status, job.processed_rows) == ("done", 6)
+    assert (job.created_count, job.updated_count, job.skipped_count, job.error_count) == (2, 0, 1, 2)
+    assert not job.file
+    assert StudentRoster.objects.get(student_external_id="J-1").course_year == 3
+
+    detail = api_client.get(reverse("bot2-roster-import-job", args=[job.pk]), {"page_size": 1})
+    assert detail.status_code == status.HTTP_200_OK
+    assert detail.data["progress"] == 100.0
+    assert detail.data["errors"]["count"] == 2
+    assert [e["row"] for e in detail.data["errors"]["results"]] == [2]
+    assert detail.data["errors"]["next"]
+
+
+def test_large_json_payload_is_queued(api_client, admin_user, program_item):
+    api_client.force_authenticate(user=admin_user)
+    rows = [{"student_external_id": f"Q-{i}", "course_year": 1} for i in range(3)]
+
+    resp = api_client.post(URL, rows, format="json")
+
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert (resp.data["status"], resp.data["created"], resp.data["total_rows"]) == ("done", 3, 3)
+    assert RosterImportJob.objects.get(pk=resp.data["id"]).payload is None
+    assert StudentRoster.objects.filter(student_external_id__startswith="Q-").count() == 3
+
+
+def test_cp1251_csv_and_failed_chunk(api_client, admin_user, monkeypatch):
+    api_client.force_authenticate(user=admin_user)
+    upload = _csv("talaba id,ism\nC-1,Шохрух\nC-2,Ёкуб\nC-3,Али\n", "cp1251")
+    real_upsert = roster_import.bulk_upsert_roster_rows
+    batches = []
+
+    def flaky_upsert(rows, **kwargs):
+        batches.append(rows)
+        if len(batches) == 2:
+            raise RuntimeError("db down")
+        return real_upsert(rows, **kwargs)
+
+    monkeypatch.setattr(roster_import, "bulk_upsert_roster_rows", flaky_upsert)
+    resp = api_client.post(URL, {"file": upload}, format="multipart")
+
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert (resp.data["status"], resp.data["last_error"], resp.data["processed_rows"]) == ("failed", "db down", 3)
+    # Birinchi chunk saqlangan, ikkinchisi tranzaksiya bilan qaytarilgan.
+    assert StudentRoster.objects.get(student_external_id="C-1").first_name == "Шохрух"
+    assert not StudentRoster.objects.filter(student_external_id="C-3").exists()
+
+
+def test_job_endpoint_is_admin_only(api_client, viewer_user, admin_user):
+    job = RosterImportJob.objects.create(source=RosterImportJob.Source.JSON)
+    api_client.force_authenticate(user=viewer_user)
+    assert api_client.get(reverse("bot2-roster-import-job", args=[job.pk])).status_code == status.HTTP_403_FORBIDDEN
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("bot2-roster-import-job", args=["00000000-0000-0000-0000-000000000000"]))
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_management_command_uses_job(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text("student_id,course_year\nM-1,2\nM-2,7\n", encoding="utf-8")
+
+    call_command("import_roster", "--file", str(path))
+
+    job = RosterImportJob.objects.get()
+    assert (job.status, job.created_count, job.error_count) == ("done", 1, 1)
+    assert StudentRoster.objects.filter(student_external_id="M-1", course_year=2).exists()
+
+
+def test_copy_loader_falls_back_to_orm_off_postgres(tmp_path, settings):
+    settings.ROSTER_IMPORT_COPY_MIN_BYTES = 1
+    path = tmp_path / "roster.csv"
+    path.write_text("student_id,ism\nL-1,Ali\n", encoding="utf-8")
+
+    with pytest.raises(CommandError, match="PostgreSQL"):
+        call_command("import_roster", "--file", str(path), "--loader", "copy")
+    assert not RosterImportJob.objects.exists()
+
+    call_command("import_roster", "--file", str(path))   # auto → SQLite'da ORM
+    assert RosterImportJob.objects.get().created_count == 1
+    assert StudentRoster.objects.get(student_external_id="L-1").first_name == "Ali"
+
+
+def test_copy_value_escaping():
+    assert roster_import._copy_value(None) == "\\N"
+    assert roster_import._copy_value(False) == "f"
+    assert roster_import._copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
@@ -0,0 +1,131 @@
+"""Live StatCounter rows behind survey_stats / verification_stats.
+
+Every write path must leave the counters equal to a fresh recount
+(`rebuild_stat_counters(dry_run=True)` reports no drift), and the endpoints
+must read them without aggregating the source tables.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ai_verification.models import DocumentVerification
+from analytics.models import StatCounter
+from analytics.rollups import rebuild_stat_counters
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "raw-bot2-service-token"
+
+
+@pytest.fixture
+def make_student(program_item):
+    counter = iter(range(10_000))
+
+    def _make():
+        ext_id = f"SC-{next(counter)}"
+        roster = StudentRoster.objects.create(student_external_id=ext_id, program=program_item, course_year=2)
+        return Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+
+    return _make
+
+
+def _survey(student, status_text, days_ago=0, campaign="default"):
+    return Bot2SurveyResponse.objects.create(
+        student=student, roster=student.roster, program=student.roster.program, course_year=2,
+        survey_campaign=campaign, employment_status=status_text,
+        submitted_at=timezone.now() - timedelta(days=days_ago),
+    )
+
+
+def _verification(student, **fields):
+    return DocumentVerification.objects.create(
+        student=student, document_type="cv",
+        file=SimpleUploadedFile("d.png", b"\x89PNG\r\n\x1a\n", content_type="image/png"), **fields,
+    )
+
+
+def test_survey_counters_follow_latest_answer(api_client, viewer_user, make_student):
+    first, second = make_student(), make_student()
+    _survey(first, "employed", days_ago=3)
+    _survey(first, "unemployed", days_ago=1, campaign="spring")   # yangi kampaniya — eng oxirgisi
+    _survey(first, "employed", days_ago=5, campaign="old")         # eskisi — hech narsa o'zgarmaydi
+    _survey(second, "")
+
+    api_client.force_authenticate(user=viewer_user)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = api_client.get(reverse("bot2-survey-stats"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data == {"unique_students": 2, "employed": 0, "unemployed": 1}
+    assert not any("bot2_bot2latestsurvey" in q["sql"] for q in ctx.captured_queries)
+    assert rebuild_stat_counters(dry_run=True) == {}
+
+    second.delete()
+    assert api_client.get(reverse("bot2-survey-stats")).data["unique_students"] == 1
+    assert rebuild_stat_counters(dry_run=True) == {}
+
+
+def test_verification_counters_follow_pipeline_and_review(api_client, admin_user, make_student, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    student = make_student()
+    verification = _verification(student)
+    _verification(student, status="done", confidence_level="red")
+
+    # Avto-tahlil natijasi, so'ng admin review (toifa override + qaror).
+    verification = DocumentVerification.objects.get(pk=verification.pk)
+    verification.status, verification.confidence_level = "done", "green"
+    verification.save()
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.patch(
+        reverse("ai-verify-review", args=[verification.id]),
+        {"final_decision": "accepted", "confidence_level": "yellow"}, format="json",
+    )
+    assert resp.status_code == status.HTTP_200_OK
+
+    with CaptureQueriesContext(connection) as ctx:
+        stats = api_client.get(reverse("ai-verify-stats")).data
+    assert not any("ai_verification_document" in q["sql"] for q in ctx.captured_queries)
+    assert stats["total"] == 2
+    assert stats["by_confidence"] == {"green": 0, "yellow": 1, "red": 1, "none": 0}
+    assert stats["by_decision"] == {"pending": 1, "accepted": 1, "rejected": 0}
+    assert stats["by_status"]["done"] == 2
+    assert rebuild_stat_counters(dry_run=True) == {}
+
+    student.roster.delete()
+    assert api_client.get(reverse("ai-verify-stats")).data["total"] == 0
+    assert rebuild_stat_counters(dry_run=True) == {}
+
+
+def test_batch_submit_keeps_counters_consistent(api_client, program_item, make_student):
+    existing = make_student()
+    _survey(existing, "employed", days_ago=2)
+    StudentRoster.objects.create(student_external_id="SC-NEW", program=program_item, course_year=1)
+    resp = api_client.post(
+        reverse("bot2-survey-submit-batch"),
+        {"items": [
+            {"student_external_id": existing.student_external_id, "idempotency_key": "sc1",
+             "employment_status": "unemployed"},
+            {"student_external_id": "SC-NEW", "idempotency_key": "sc2", "employment_status": "employed"},
+        ]},
+        format="json", HTTP_X_SERVICE_TOKEN=TOKEN,
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert rebuild_stat_counters(dry_run=True) == {}
+
+
+def test_repair_command_fixes_drift(make_student):
+    _survey(make_student(), "employed")
+    StatCounter.objects.filter(name="survey.latest.employed").update(value=42)
+
+    call_command("rebuild_stat_counters", "--check")
+    assert StatCounter.objects.get(name="survey.latest.employed").value == 42
+    call_command("rebuild_stat_counters")
+    assert StatCounter.objects.get(name="survey.latest.employed").value == 1
@@ -0,0 +1,97 @@
+"""?search= over Bot2Student.search_document (bot2.search).
+
+The document must follow every write path — model saves, the bot's account
+UPDATE and the bulk submit — and the three dashboard lists must search it.
+"""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ai_verification.models import DocumentVerification
+from bot2.models import Bot2Student, Bot2StudentAccount, Bot2SurveyResponse, StudentRoster
+from bot2.search import refresh_search_documents
+from bot2.views import _link_account
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "raw-bot2-service-token"
+
+
+@pytest.fixture
+def student(program_item):
+    roster = StudentRoster.objects.create(student_external_id="SR-1", program=program_item, course_year=2)
+    return Bot2Student.objects.create(
+        student_external_id="SR-1", roster=roster, first_name="G‘ayrat", last_name="Olimov"
+    )
+
+
+def _search(api_client, url_name, term):
+    resp = api_client.get(reverse(url_name), {"search": term})
+    assert resp.status_code == status.HTTP_200_OK
+    return [row["id"] for row in resp.data["results"]]
+
+
+def test_student_search_covers_accounts_without_duplicates(api_client, viewer_user, student):
+    Bot2StudentAccount.objects.create(student=student, telegram_user_id=5551, phone="+998 90 123-45-67")
+    Bot2StudentAccount.objects.create(student=student, telegram_user_id=5552, username="gayrat_o", phone="+998 90 765")
+    api_client.force_authenticate(user=viewer_user)
+
+    for term in ("g'ayrat olimov", "998901234567", "5552", "GAYRAT_O", "sr-1"):
+        assert _search(api_client, "bot2-student-list", term) == [str(student.id)], term
+    assert _search(api_client, "bot2-student-list", "998 olimov") == [str(student.id)]
+    assert _search(api_client, "bot2-student-list", "nobody") == []
+
+
+def test_document_follows_account_writes(student):
+    Bot2StudentAccount.objects.create(student=student, telegram_user_id=7001, phone="111")
+    student.refresh_from_db()
+    assert "7001" in student.search_document and "111" in student.search_document
+
+    # Botning UPDATE yo'li (_link_account) save()ni chetlab o'tadi.
+    _link_account(student, 7001, username="new_name", phone="222")
+    student.refresh_from_db()
+    assert "new_name" in student.search_document and "222" in student.search_document
+    assert "111" not in student.search_document
+
+    other = Bot2StudentAccount.objects.create(student=student, telegram_user_id=7002, username="second")
+    assert "second" in Bot2Student.objects.get(pk=student.pk).search_document
+    other.delete()
+    assert "second" not in Bot2Student.objects.get(pk=student.pk).search_document
+
+    Bot2Student.objects.filter(pk=student.pk).update(search_document="")
+    assert refresh_search_documents() == 1
+    student.refresh_from_db()
+    assert "olimov" in student.search_document
+
+
+def test_survey_and_verification_lists_search_student_document(api_client, admin_user, student, program_item, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    Bot2StudentAccount.objects.create(student=student, telegram_user_id=8001, phone="+998 91 000 11 22")
+    survey = Bot2SurveyResponse.objects.create(
+        student=student, roster=student.roster, program=program_item, course_year=2, submitted_at=timezone.now(),
+    )
+    verification = DocumentVerification.objects.create(
+        student=student, document_type="cv", file=SimpleUploadedFile("d.png", b"\x89PNG\r\n\x1a\n", content_type="image/png"),
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    assert _search(api_client, "bot2-survey-list", "998910001122") == [str(survey.id)]
+    assert _search(api_client, "ai-verify-list", "olimov") == [str(verification.id)]
+    assert _search(api_client, "ai-verify-list", "olimova") == []
+
+
+def test_batch_submit_refreshes_documents(api_client, program_item):
+    StudentRoster.objects.create(student_external_id="SB-1", program=program_item, course_year=2, first_name="Zarina")
+    resp = api_client.post(
+        reverse("bot2-survey-submit-batch"),
+        {"items": [{"student_external_id": "SB-1", "idempotency_key": "sb1", "telegram_user_id": 9901,
+                    "username": "zarina_b", "phone": "+998 93 555"}]},
+        format="json", HTTP_X_SERVICE_TOKEN=TOKEN,
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    document = Bot2Student.objects.get(student_external_id="SB-1").search_document
+    for token in ("sb-1", "zarina", "zarina_b", "9901", "99893555"):
+        assert token in document
@@ -0,0 +1,119 @@
+"""/bot2/surveys/submit-batch — bulk replay with per-item results and the same
+rules as submit_survey (roster wins, idempotency_key replays, rollups follow)."""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.models import CoverageResponseDay, SubmissionDay
+from audit.models import AuditLog
+from bot2.models import (
+    Bot2Document,
+    Bot2LatestSurvey,
+    Bot2Student,
+    Bot2StudentAccount,
+    Bot2SurveyResponse,
+    StudentRoster,
+)
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "raw-bot2-service-token"
+
+
+@pytest.fixture
+def submit_batch(api_client):
+    def _submit(items):
+        return api_client.post(
+            reverse("bot2-survey-submit-batch"), {"items": items}, format="json", HTTP_X_SERVICE_TOKEN=TOKEN
+        )
+
+    return _submit
+
+
+def test_batch_reports_per_item_status(submit_batch, program_item, django_capture_on_commit_callbacks):
+    StudentRoster.objects.create(student_external_id="B-1", program=program_item, course_year=3)
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = submit_batch([
+            {"student_external_id": "B-1", "idempotency_key": "k1", "course_year": 1, "telegram_user_id": 11,
+             "employment_status": "employed"},
+            {"student_external_id": "B-2", "idempotency_key": "k2", "program_id": str(program_item.id),
+             "course_year": 2, "gender": "female"},
+            {"student_external_id": "B-3", "idempotency_key": "k3"},
+            {"student_external_id": "B-1", "idempotency_key": "k1"},
+            {"student_external_id": "B-4", "course_year": 9},
+        ])
+
+    assert resp.status_code == status.HTTP_207_MULTI_STATUS
+    statuses = [r["status"] for r in resp.data["results"]]
+    assert statuses == ["created", "created", "error", "idempotent", "error"]
+    assert resp.data["results"][2]["error"]["code"] == "ROSTER_NOT_FOUND"
+    assert resp.data["results"][4]["error"]["code"] == "INVALID_COURSE_YEAR"
+    assert resp.data["results"][3]["response_id"] == resp.data["results"][0]["response_id"]
+    # Roster qiymati ustuvor (submit_survey kabi).
+    first = Bot2SurveyResponse.objects.get(idempotency_key="k1")
+    assert first.course_year == 3 and first.employment_class == "employed"
+    assert resp.data["results"][0]["roster"]["course_year"] == 3
+
+    auto = StudentRoster.objects.get(student_external_id="B-2")
+    assert (auto.roster_campaign, auto.program_id, auto.course_year) == ("bot2_auto", program_item.id, 2)
+    assert Bot2Student.objects.get(student_external_id="B-2").gender == "female"
+    assert Bot2StudentAccount.objects.get(telegram_user_id=11).student.student_external_id == "B-1"
+    assert Bot2LatestSurvey.objects.filter(survey__idempotency_key__in=["k1", "k2"]).count() == 2
+    assert sum(SubmissionDay.objects.values_list("submissions", flat=True)) == 2
+    assert AuditLog.objects.filter(entity_table="bot2_bot2surveyresponse", action="create").count() == 2
+
+
+def test_replayed_batch_is_idempotent(submit_batch, program_item):
+    StudentRoster.objects.create(student_external_id="B-1", program=program_item, course_year=1)
+    items = [{"student_external_id": "B-1", "idempotency_key": f"k{i}"} for i in range(3)]
+    first = submit_batch(items)
+    again = submit_batch(items)
+
+    assert first.status_code == again.status_code == status.HTTP_200_OK
+    assert (again.data["created"], again.data["idempotent"]) == (0, 3)
+    assert [r["response_id"] for r in again.data["results"]] == [r["response_id"] for r in first.data["results"]]
+    assert Bot2SurveyResponse.objects.count() == 3
+
+
+def test_backfilled_items_keep_time_and_move_latest_marker(submit_batch, program_item):
+    StudentRoster.objects.create(student_external_id="B-1", program=program_item, course_year=1)
+    now = timezone.now()
+    resp = submit_batch([
+        {"student_external_id": "B-1", "idempotency_key": "old", "submitted_at": (now - timedelta(days=10)).isoformat()},
+        {"student_external_id": "B-1", "idempotency_key": "new", "submitted_at": (now - timedelta(days=1)).isoformat(),
+         "employment_status": "employed"},
+    ])
+    assert resp.status_code == status.HTTP_200_OK
+
+    marker = Bot2LatestSurvey.objects.get(student__student_external_id="B-1")
+    assert marker.survey.idempotency_key == "new"
+    buckets = list(CoverageResponseDay.objects.values_list("day", "responded", "employed"))
+    assert buckets == [((now - timedelta(days=1)).date(), 1, 1)]
+
+
+def test_documents_bound_to_their_item(submit_batch, program_item):
+    roster = StudentRoster.objects.create(student_external_id="B-1", program=program_item, course_year=1)
+    student = Bot2Student.objects.create(student_external_id="B-1", roster=roster)
+    cv = Bot2Document.objects.create(student=student, doc_type="cv", file="bot2/docs/cv.pdf", survey_session_key="run-1")
+    cert = Bot2Document.objects.create(student=student, doc_type="certificate", file="bot2/docs/cert.pdf")
+
+    resp = submit_batch([
+        {"student_external_id": "B-1", "idempotency_key": "a", "survey_session_key": "run-1"},
+        {"student_external_id": "B-1", "idempotency_key": "b", "answers": {"cert_doc_id": str(cert.id)}},
+    ])
+    assert resp.status_code == status.HTTP_200_OK
+    cv.refresh_from_db()
+    cert.refresh_from_db()
+    assert cv.survey.idempotency_key == "a"
+    assert cert.survey.idempotency_key == "b"
+
+
+def test_batch_limits(submit_batch, settings):
+    settings.SURVEY_BATCH_MAX_ITEMS = 2
+    assert submit_batch([]).status_code == status.HTTP_400_BAD_REQUEST
+    resp = submit_batch([{"student_external_id": str(i)} for i in range(3)])
+    assert resp.data["error"]["code"] == "BATCH_TOO_LARGE"
@@ -0,0 +1,108 @@
+"""submit_survey query budget — the hot write path must stay within
+SUBMIT_SURVEY_QUERY_BUDGET (documented in bot2/views.py) and keep its
+idempotency, document-binding and audit behaviour."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from audit.models import AuditLog
+from bot2.models import Bot2Document, Bot2Student, Bot2SurveyResponse, StudentRoster
+from bot2.views import SUBMIT_SURVEY_QUERY_BUDGET
+from catalog.models import CatalogItem
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = "raw-bot2-service-token"
+
+
+@pytest.fixture
+def region(db):
+    return CatalogItem.objects.create(type=CatalogItem.ItemType.REGION, name="Toshkent")
+
+
+@pytest.fixture
+def submit(api_client):
+    def _submit(**payload):
+        return api_client.post(
+            reverse("bot2-survey-submit"), payload, format="json", HTTP_X_SERVICE_TOKEN=TOKEN
+        )
+
+    return _submit
+
+
+def _payload(region, key, **extra):
+    return {
+        "student_external_id": "QB-1",
+        "telegram_user_id": 777,
+        "region_id": str(region.id),
+        "gender": "male",
+        "phone": "+998901234567",
+        "idempotency_key": key,
+        "employment_status": "employed",
+        **extra,
+    }
+
+
+def test_repeat_submission_stays_within_budget(submit, program_item, region, django_capture_on_commit_callbacks):
+    roster = StudentRoster.objects.create(
+        student_external_id="QB-1", program=program_item, course_year=2, first_name="Ali", last_name="Valiyev"
+    )
+    assert submit(**_payload(region, "k-0")).status_code == status.HTTP_200_OK
+    student = Bot2Student.objects.get(student_external_id="QB-1")
+    docs = [
+        Bot2Document.objects.create(student=student, doc_type=doc_type, file=f"bot2/docs/{doc_type}.pdf")
+        for doc_type in ("cv", "certificate")
+    ]
+
+    with CaptureQueriesContext(connection) as ctx, django_capture_on_commit_callbacks(execute=True):
+        resp = submit(**_payload(
+            region, "k-1", gender="female",
+            answers={"cv_doc_id": str(docs[0].id), "cert_doc_id": str(docs[1].id), "employment_doc_id": "None"},
+        ))
+
+    assert resp.status_code == status.HTTP_200_OK, resp.data
+    assert len(ctx.captured_queries) <= SUBMIT_SURVEY_QUERY_BUDGET, "\n".join(
+        q["sql"][:120] for q in ctx.captured_queries
+    )
+    survey = Bot2SurveyResponse.objects.get(id=resp.data["response_id"])
+    assert (survey.roster_id, survey.program_id, survey.course_year) == (roster.id, program_item.id, 2)
+    assert set(Bot2Document.objects.filter(survey=survey).values_list("id", flat=True)) == {d.id for d in docs}
+    student.refresh_from_db()
+    assert (student.gender, student.region_id, student.first_name) == ("female", region.id, "Ali")
+    assert AuditLog.objects.filter(entity_id=survey.id, action="create").exists()
+
+
+def test_catalog_lookup_is_cached_and_invalidated_on_save(submit, program_item, region):
+    StudentRoster.objects.create(student_external_id="QB-1", program=program_item, course_year=2)
+    assert submit(**_payload(region, "k-0")).status_code == status.HTTP_200_OK
+
+    with CaptureQueriesContext(connection) as ctx:
+        submit(**_payload(region, "k-1"))
+    assert not any('FROM "catalog_catalogitem"' in q["sql"] for q in ctx.captured_queries)
+
+    region.type = CatalogItem.ItemType.OTHER
+    region.save()
+    resp = submit(**_payload(region, "k-2"))
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "INVALID_REGION"
+
+
+def test_idempotency_key_race_replays_existing_row(submit, program_item, region, monkeypatch):
+    StudentRoster.objects.create(student_external_id="QB-1", program=program_item, course_year=2)
+    first = submit(**_payload(region, "k-race"))
+    assert first.status_code == status.HTTP_200_OK
+
+    # Parallel so'rov dastlabki tekshiruvdan o'tib ketgan holat: INSERT unique'da yiqiladi.
+    from bot2 import views
+
+    calls = iter([None])
+    real = views._idempotent_replay
+    monkeypatch.setattr(views, "_idempotent_replay", lambda key: next(calls, None) or real(key))
+    resp = submit(**_payload(region, "k-race"))
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["idempotent"] is True
+    assert resp.data["response_id"] == first.data["response_id"]
+    assert Bot2SurveyResponse.objects.filter(idempotency_key="k-race").count() == 1
@@ -0,0 +1,158 @@
+"""survey_insights — fingerprinted suggestions, persisted theme clusters.
+
+The AI (analytics.insights.generate_text) is replaced by a recorder: tests pin
+that only unseen suggestions are sent, results are merged into stored themes and
+reads never call the AI.
+"""
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics import insights
+from analytics.models import SurveyInsight, SurveyInsightItem
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    calls = []
+
+    def fake_generate_text(prompt, **kwargs):
+        calls.append(prompt)
+        new_block = prompt.split("Yangi fikrlar:\n", 1)[1]
+        numbers = [int(line.split(".", 1)[0]) for line in new_block.splitlines()]
+        has_theme = "T1." in prompt
+        return {
+            "ok": True,
+            "text": "",
+            "usage": {},
+            "json": {
+                "themes": [
+                    {"previous": "T1" if has_theme else None, "title": "Amaliyot",
+                     "description": "Ko'proq amaliyot", "items": numbers},
+                ],
+                "summary": f"{len(calls)}-tahlil",
+                "recommendations": ["Amaliyot dasturlarini kengaytirish"],
+            },
+        }
+
+    monkeypatch.setattr(insights, "generate_text", fake_generate_text)
+    return calls
+
+
+@pytest.fixture
+def add_suggestion(program_item):
+    counter = iter(range(10_000))
+
+    def _add(text, campaign="default"):
+        ext_id = f"S-{next(counter)}"
+        roster = StudentRoster.objects.create(
+            student_external_id=ext_id, program=program_item, course_year=2, is_active=True
+        )
+        student = Bot2Student.objects.create(student_external_id=ext_id, roster=roster)
+        return Bot2SurveyResponse.objects.create(
+            student=student, roster=roster, program=program_item, course_year=2,
+            survey_campaign=campaign, suggestions=text, submitted_at=timezone.now(),
+        )
+
+    return _add
+
+
+def test_fingerprint_normalizes_case_and_whitespace():
+    assert insights.suggestion_fingerprint("Ko'proq  amaliyot\n") == insights.suggestion_fingerprint(
+        "ko'proq amaliyot"
+    )
+
+
+def test_duplicates_are_analysed_once_and_persisted(ai, add_suggestion):
+    add_suggestion("Ko'proq amaliyot kerak")
+    add_suggestion("ko'proq  amaliyot kerak")
+    add_suggestion("Stipendiya oshirilsin")
+
+    insight = insights.refresh_survey_insights("default")
+    assert len(ai) == 1
+    assert SurveyInsightItem.objects.count() == 2
+    assert insight.computed_at is not None
+    assert insight.themes == [{"title": "Amaliyot", "description": "Ko'proq amaliyot", "count": 2}]
+
+
+def test_reanalysis_waits_for_threshold_and_sends_only_new(ai, add_suggestion, settings):
+    settings.SURVEY_INSIGHTS_MIN_NEW = 2
+    add_suggestion("Birinchi fikr")
+    insights.refresh_survey_insights("default")
+
+    add_suggestion("Ikkinchi fikr")
+    insights.refresh_survey_insights("default")
+    assert len(ai) == 1  # bitta yangi taklif — chegaradan kam
+
+    add_suggestion("Uchinchi fikr")
+    insight = insights.refresh_survey_insights("default")
+    assert len(ai) == 2
+    assert "Birinchi fikr" not in ai[1]
+    assert "Ikkinchi fikr" in ai[1] and "Uchinchi fikr" in ai[1]
+    assert insight.themes[0]["count"] == 3
+    assert insight.summary == "2-tahlil"
+
+
+def test_failed_ai_call_keeps_items_pending(monkeypatch, add_suggestion):
+    monkeypatch.setattr(
+        insights, "generate_text", lambda prompt, **kw: {"ok": False, "text": "", "usage": {}, "json": None}
+    )
+    add_suggestion("Fikr")
+    insight = insights.refresh_survey_insights("default")
+    assert insight.status == SurveyInsight.Status.FAILED
+    assert insight.computed_at is None
+    assert insights.pending_count("default") == 1
+
+
+def test_get_returns_stored_result_without_ai(api_client, viewer_user, ai, add_suggestion):
+    add_suggestion("Fikr")
+    insights.refresh_survey_insights("default")
+
+    api_client.force_authenticate(user=viewer_user)
+    resp = api_client.get(reverse("analytics-survey-insights"), {"campaign": "default"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.data["summary"] == "1-tahlil"
+    assert resp.data["computed_at"] is not None
+    assert (resp.data["analysed"], resp.data["pending"]) == (1, 0)
+    assert len(ai) == 1
+
+    assert api_client.post(reverse("analytics-survey-insights")).status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_post_queues_refresh_and_command_covers_campaigns(api_client, admin_user, ai, add_suggestion):
+    add_suggestion("Bahorgi fikr", campaign="spring")
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.post(f"{reverse('analytics-survey-insights')}?campaign=spring")
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert resp.data["queued"] is True
+    assert resp.data["themes"][0]["title"] == "Amaliyot"
+
+    add_suggestion("Kuzgi fikr", campaign="autumn")
+    call_command("refresh_survey_insights")
+    assert set(SurveyInsight.objects.exclude(computed_at=None).values_list("campaign", flat=True)) == {
+        "spring", "autumn", insights.ALL_CAMPAIGNS,
+    }
+    assert len(ai) == 3
+
+
+def test_campaign_omitted_analyses_all_campaigns(api_client, admin_user, ai, add_suggestion):
+    add_suggestion("Bahorgi fikr", campaign="spring")
+    add_suggestion("Kuzgi fikr", campaign="autumn")
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-survey-insights")
+
+    resp = api_client.post(url)
+    assert resp.status_code == status.HTTP_202_ACCEPTED
+    assert resp.data["campaign"] == insights.ALL_CAMPAIGNS
+    assert "Bahorgi fikr" in ai[0] and "Kuzgi fikr" in ai[0]
+    assert api_client.get(url).data["analysed"] == 2
+
+    # Yangi taklif yo'q — navbatga qo'yilmaydi, saqlangan natija qaytadi.
+    resp = api_client.post(url)
+    assert (resp.data["queued"], resp.data["status"], len(ai)) == (False, "idle", 1)
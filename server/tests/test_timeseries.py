@@ -0,0 +1,145 @@
+"""analytics-bot2-timeseries — submissions per day/week from SubmissionDay counters.
+
+The counters must agree with a direct scan of Bot2SurveyResponse.submitted_at;
+the endpoint reads only the counter table.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from analytics.models import SubmissionDay
+from analytics.rollups import rebuild_submission_days
+from bot2.models import Bot2Student, Bot2SurveyResponse, StudentRoster
+from catalog.models import CatalogItem
+
+pytestmark = pytest.mark.django_db
+
+UTC = dt_timezone.utc
+# Dushanba — haftalik guruhlash shu kundan boshlanadi.
+MONDAY = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def seeded(program_item):
+    other = CatalogItem.objects.create(type=program_item.type, name="Second Program", code="P-2")
+    plan = [
+        # (program, course_year, employment_status, day offsets)
+        (program_item, 1, "employed", [0, 1]),
+        (program_item, 2, "unemployed", [1]),
+        (other, 2, "", [1, 8]),
+    ]
+    for idx, (program, year, emp, offsets) in enumerate(plan):
+        roster = StudentRoster.objects.create(
+            student_external_id=f"T-{idx}", program=program, course_year=year, is_active=True
+        )
+        student = Bot2Student.objects.create(student_external_id=f"T-{idx}", roster=roster)
+        for offset in offsets:
+            Bot2SurveyResponse.objects.create(
+                student=student, roster=roster, program=program, course_year=year,
+                survey_campaign="default", employment_status=emp,
+                submitted_at=MONDAY + timedelta(days=offset),
+            )
+    return program_item, other
+
+
+def _params(**extra):
+    return {
+        "from": MONDAY.replace(hour=0).isoformat(),
+        "to": (MONDAY + timedelta(days=9)).isoformat(),
+        **extra,
+    }
+
+
+def test_daily_totals(api_client, admin_user, seeded):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(reverse("analytics-bot2-timeseries"), _params())
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.data["periods"]) == 10
+    [series] = resp.data["series"]
+    assert series["counts"][:3] == [1, 3, 0]
+    assert series["counts"][8] == 1
+    assert series["total"] == 5
+
+
+def test_weekly_grouped_by_employment(api_client, admin_user, seeded):
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(
+        reverse("analytics-bot2-timeseries"), _params(granularity="week", group_by="employment")
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert [str(p) for p in resp.data["periods"]] == ["2026-03-02", "2026-03-09"]
+    counts = {s["key"]: s["counts"] for s in resp.data["series"]}
+    assert counts == {"employed": [2, 0], "unemployed": [1, 0], "unknown": [1, 1]}
+
+
+def test_group_by_program_and_course_year_filter(api_client, admin_user, seeded):
+    program_item, other = seeded
+    api_client.force_authenticate(user=admin_user)
+    resp = api_client.get(
+        reverse("analytics-bot2-timeseries"), _params(group_by="program", course_year="2")
+    )
+    totals = {s["label"]: s["total"] for s in resp.data["series"]}
+    assert totals == {program_item.name: 1, other.name: 2}
+
+
+def test_counters_match_source_and_rebuild(seeded):
+    live = set(SubmissionDay.objects.values_list(
+        "day", "program_id", "course_year", "employment_class", "submissions"
+    ))
+    SubmissionDay.objects.all().delete()
+    rebuild_submission_days()
+    rebuilt = set(SubmissionDay.objects.values_list(
+        "day", "program_id", "course_year", "employment_class", "submissions"
+    ))
+    assert live == rebuilt
+    assert sum(row[-1] for row in live) == Bot2SurveyResponse.objects.count()
+
+
+def test_edit_moves_submission_between_cells(seeded):
+    survey = Bot2SurveyResponse.objects.get(student__student_external_id="T-1")
+    survey.employment_status = "employed"
+    survey.submitted_at = MONDAY + timedelta(days=3)
+    survey.save()
+
+    cells = {
+        (row.day.isoformat(), row.employment_class): row.submissions
+        for row in SubmissionDay.objects.filter(course_year=2, program=survey.program)
+    }
+    assert cells[("2026-03-03", "unemployed")] == 0
+    assert cells[("2026-03-05", "employed")] == 1
+
+
+def test_student_and_roster_deletes_subtract_submissions(seeded):
+    Bot2Student.objects.get(student_external_id="T-0").delete()
+    StudentRoster.objects.get(student_external_id="T-2").delete()
+
+    live = {cell[:-1]: cell[-1] for cell in SubmissionDay.objects.exclude(submissions=0).values_list(
+        "day", "program_id", "course_year", "employment_class", "submissions"
+    )}
+    assert sum(live.values()) == Bot2SurveyResponse.objects.count() == 1
+    rebuild_submission_days()
+    assert live == {cell[:-1]: cell[-1] for cell in SubmissionDay.objects.values_list(
+        "day", "program_id", "course_year", "employment_class", "submissions"
+    )}
+
+
+def test_reads_only_counter_table(api_client, admin_user, seeded):
+    api_client.force_authenticate(user=admin_user)
+    with CaptureQueriesContext(connection) as ctx:
+        api_client.get(reverse("analytics-bot2-timeseries"), _params(group_by="course_year"))
+    assert not any("bot2_bot2surveyresponse" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_validation_errors(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("analytics-bot2-timeseries")
+    assert api_client.get(url).data["error"]["code"] == "TIME_RANGE_REQUIRED"
+    resp = api_client.get(url, _params(granularity="month"))
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.data["error"]["code"] == "INVALID_GRANULARITY"
+    assert api_client.get(url, _params(group_by="region")).data["error"]["code"] == "INVALID_GROUP_BY"